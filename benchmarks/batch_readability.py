@@ -0,0 +1,99 @@
+"""
+Benchmark del análisis de legibilidad por lotes.
+
+Genera un conjunto sintético de redacciones en español y compara el cálculo
+por lotes (`text_metrics.calcular_indices_lote`) con el cálculo texto a texto
+(`text_metrics.calcular_indices`, que no incluye MTLD ni bandas de frecuencia).
+
+Uso:
+    python benchmarks/batch_readability.py
+    python benchmarks/batch_readability.py --textos 10000 --palabras 300
+    python benchmarks/batch_readability.py --json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from text_metrics import calcular_indices, calcular_indices_lote  # noqa: E402
+
+FRASES = [
+    "El verano pasado fui a la playa con mis amigos",
+    "Mi familia vive en una ciudad pequeña cerca de la montaña",
+    "Creo que aprender idiomas es fundamental para entender otras culturas",
+    "Aunque estaba cansado, decidí terminar el trabajo antes de dormir",
+    "Los estudiantes debatieron sobre las consecuencias económicas de la globalización",
+    "Me gusta cocinar platos tradicionales los fines de semana",
+    "La biblioteca del barrio organiza actividades gratuitas para los niños",
+    "Si tuviera más tiempo, viajaría por toda Latinoamérica",
+    "Es imprescindible que las instituciones garanticen la transparencia",
+    "Ayer llovió mucho y no pudimos salir al parque"
+]
+
+
+def generar_textos(num_textos, palabras_por_texto, semilla=42):
+    """Redacciones sintéticas formadas por frases del corpus en orden aleatorio."""
+    rng = random.Random(semilla)
+    textos = []
+    for _ in range(num_textos):
+        frases = []
+        total = 0
+        while total < palabras_por_texto:
+            frase = rng.choice(FRASES)
+            frases.append(frase)
+            total += len(frase.split())
+        textos.append(". ".join(frases) + ".")
+    return textos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--textos", type=int, default=10000, help="Número de redacciones")
+    parser.add_argument("--palabras", type=int, default=300, help="Palabras por redacción")
+    parser.add_argument("--muestra-individual", type=int, default=1000,
+                        help="Textos medidos con el cálculo texto a texto (se extrapola)")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    textos = generar_textos(args.textos, args.palabras)
+
+    inicio = time.perf_counter()
+    df = calcular_indices_lote(textos)
+    segundos_lote = time.perf_counter() - inicio
+
+    muestra = textos[:args.muestra_individual]
+    inicio = time.perf_counter()
+    for texto in muestra:
+        calcular_indices(texto)
+    segundos_individual = (time.perf_counter() - inicio) * len(textos) / max(len(muestra), 1)
+
+    resultado = {
+        "textos": len(textos),
+        "tokens": int(df["palabras"].sum()),
+        "segundos_lote": round(segundos_lote, 3),
+        "textos_por_segundo_lote": round(len(textos) / segundos_lote),
+        "segundos_individual_estimados": round(segundos_individual, 3),
+        "medias": {columna: round(float(df[columna].mean()), 3) for columna in
+                   ("ttr", "mtld", "longitud_media_oracion", "densidad_lexica", "szigriszt")}
+    }
+
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return
+
+    print(f"Textos: {resultado['textos']} ({resultado['tokens']} tokens)")
+    print(f"Lote:        {resultado['segundos_lote']:.2f} s "
+          f"({resultado['textos_por_segundo_lote']} textos/s, incluye MTLD y bandas)")
+    print(f"Individual:  {resultado['segundos_individual_estimados']:.2f} s (estimado, sin MTLD)")
+    print("\nMedias:")
+    for columna, valor in resultado["medias"].items():
+        print(f"  {columna:25s} {valor}")
+
+
+if __name__ == "__main__":
+    main()
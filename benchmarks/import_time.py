@@ -0,0 +1,131 @@
+"""
+Benchmark de arranque en frío de la aplicación.
+
+Importa el módulo indicado en un proceso nuevo con `python -X importtime`
+y mide el tiempo total de importación, la memoria residente máxima (RSS)
+del proceso y qué bibliotecas pesadas se cargaron durante el arranque.
+
+Uso:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --modulo real_time_writing_assistant --repeticiones 5
+    python benchmarks/import_time.py --json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliotecas que deben cargarse solo en su punto de uso
+BIBLIOTECAS_PESADAS = [
+    "pandas", "numpy", "matplotlib", "altair", "gspread", "google.oauth2",
+    "openai", "PIL", "qrcode", "docx"
+]
+
+LINEA_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+MARCA_RSS = "__RSS_KB__"
+
+
+def medir_importacion(modulo):
+    """
+    Importa `modulo` en un proceso nuevo y devuelve sus métricas de arranque.
+
+    Args:
+        modulo: Nombre del módulo a importar (relativo a la raíz del repositorio)
+
+    Returns:
+        dict: total_ms, rss_mb, modulos (nombre -> ms acumulados de primer nivel)
+              y cargados (conjunto de módulos importados)
+    """
+    codigo = (
+        "import resource, sys\n"
+        f"import {modulo}\n"
+        f"print('{MARCA_RSS}', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=REPO_DIR, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+
+    total_us = 0
+    modulos = {}
+    directas = {}
+    cargados = set()
+    for linea in proceso.stderr.splitlines():
+        m = LINEA_IMPORTTIME.match(linea)
+        if not m:
+            continue
+        acumulado, sangria, nombre = int(m.group(2)), len(m.group(3)), m.group(4)
+        cargados.add(nombre)
+        # -X importtime escribe los hijos antes que el padre
+        if sangria == 1:
+            if nombre == modulo:
+                total_us = acumulado
+                modulos = directas
+            directas = {}
+        elif sangria == 3:
+            directas[nombre] = acumulado / 1000
+
+    rss_kb = 0
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith(MARCA_RSS):
+            rss_kb = int(linea.split()[1])
+
+    return {
+        "total_ms": total_us / 1000,
+        "rss_mb": rss_kb / 1024,
+        "modulos": modulos,
+        "cargados": cargados
+    }
+
+
+def cargada(biblioteca, cargados):
+    return any(nombre == biblioteca or nombre.startswith(biblioteca + ".") for nombre in cargados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modulo", default="streamlit_app", help="Módulo a importar")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Procesos medidos")
+    parser.add_argument("--top", type=int, default=10, help="Dependencias más lentas a mostrar")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    mediciones = [medir_importacion(args.modulo) for _ in range(args.repeticiones)]
+    ultima = mediciones[-1]
+
+    resultado = {
+        "modulo": args.modulo,
+        "repeticiones": args.repeticiones,
+        "total_ms_mediana": statistics.median(m["total_ms"] for m in mediciones),
+        "rss_mb_mediana": statistics.median(m["rss_mb"] for m in mediciones),
+        "dependencias_mas_lentas": sorted(
+            ultima["modulos"].items(), key=lambda kv: kv[1], reverse=True)[:args.top],
+        "bibliotecas_pesadas_cargadas": [
+            b for b in BIBLIOTECAS_PESADAS if cargada(b, ultima["cargados"])]
+    }
+
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return
+
+    print(f"Módulo: {resultado['modulo']} ({resultado['repeticiones']} procesos)")
+    print(f"Tiempo de importación (mediana): {resultado['total_ms_mediana']:.1f} ms")
+    print(f"RSS máximo por proceso (mediana): {resultado['rss_mb_mediana']:.1f} MB")
+    print("\nDependencias más lentas:")
+    for nombre, ms in resultado["dependencias_mas_lentas"]:
+        print(f"  {ms:9.1f} ms  {nombre}")
+    print("\nBibliotecas pesadas cargadas al arrancar:")
+    for biblioteca in BIBLIOTECAS_PESADAS:
+        estado = "cargada" if biblioteca in resultado["bibliotecas_pesadas_cargadas"] else "diferida"
+        print(f"  {biblioteca:15s} {estado}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimar_tamano(valor):
+    """Estimación barata del tamaño en bytes de un valor serializable."""
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, str):
+        return len(valor.encode("utf-8"))
+    try:
+        return len(json.dumps(valor, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class BoundedTTLCache:
+    """
+    Caché en memoria con límite de entradas y de bytes, caducidad (TTL) y
+    desalojo LRU. Es segura entre hilos y lleva contadores de aciertos,
+    fallos, desalojos y caducidades.
+
+    Args:
+        max_entries: Número máximo de entradas
+        max_bytes: Tamaño máximo aproximado en bytes
+        ttl: Segundos de vida de cada entrada (None = sin caducidad)
+        size_fn: Función para estimar el tamaño de un valor
+    """
+
+    def __init__(self, max_entries=256, max_bytes=4 * 1024 * 1024, ttl=3600,
+                 size_fn=estimar_tamano):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_fn = size_fn
+
+        self._data = OrderedDict()  # clave -> (valor, expira_en, tamaño)
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Devuelve el valor asociado a `key` o `default` si no existe o caducó."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            valor, expira_en, _ = entry
+            if expira_en is not None and expira_en <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return valor
+
+    def set(self, key, value, ttl=None):
+        """Guarda un valor. Si no cabe ni vaciando la caché, no se guarda."""
+        size = self.size_fn(value)
+        if size > self.max_bytes:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expira_en = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expira_en, size)
+            self._bytes += size
+            self._enforce_limits()
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            valor = self._data[key][0]
+            self._remove(key)
+            return valor
+
+    def invalidate(self, predicate):
+        """Elimina las entradas cuya clave cumple `predicate`. Devuelve cuántas."""
+        with self._lock:
+            claves = [k for k in self._data if predicate(k)]
+            for k in claves:
+                self._remove(k)
+            return len(claves)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge_expired(self):
+        """Elimina las entradas caducadas. Devuelve cuántas se eliminaron."""
+        ahora = time.monotonic()
+        with self._lock:
+            caducadas = [k for k, (_, exp, _) in self._data.items()
+                         if exp is not None and exp <= ahora]
+            for k in caducadas:
+                self._remove(k)
+            self.expirations += len(caducadas)
+            return len(caducadas)
+
+    def stats(self):
+        """Devuelve ocupación y contadores de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entradas": len(self._data),
+                "max_entradas": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.hits,
+                "fallos": self.misses,
+                "desalojos": self.evictions,
+                "caducadas": self.expirations,
+                "tasa_aciertos": self.hits / total if total else 0.0
+            }
+
+    # --- Internos ---
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _enforce_limits(self):
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
@@ -0,0 +1,202 @@
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BANK_PATH = os.environ.get(
+    "TEXTOCORRECTOR_EXERCISE_BANK",
+    os.path.join(tempfile.gettempdir(), "textocorrector_banco_ejercicios.sqlite3")
+)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ejercicios (
+    id INTEGER PRIMARY KEY,
+    banda TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    patron TEXT NOT NULL,
+    idioma TEXT NOT NULL,
+    huella TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    creado REAL NOT NULL,
+    servidos INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (banda, categoria, patron, idioma, huella)
+)
+"""
+
+
+def banda_nivel(nivel):
+    """Convierte el nivel del estudiante en su banda del MCER (A1-A2, B1-B2, C1-C2)."""
+    nivel = (nivel or "").lower()
+    if "principiante" in nivel or "a1" in nivel or "a2" in nivel:
+        return "A1-A2"
+    if "avanzado" in nivel or "c1" in nivel or "c2" in nivel:
+        return "C1-C2"
+    return "B1-B2"
+
+
+def _normalizar(texto):
+    """Minúsculas, espacios colapsados y sin puntuación en los extremos (conserva las tildes)."""
+    texto = unicodedata.normalize("NFC", str(texto or "")).lower()
+    texto = re.sub(r"\s+", " ", texto).strip()
+    return texto.strip(".,;:!?¡¿\"'«»()[]")
+
+
+def patron_error(error):
+    """
+    Reduce un error a un patrón normalizado que se repite entre estudiantes:
+    las palabras que cambian entre el fragmento erróneo y su corrección
+    (p. ej. "es cansado" -> "estoy cansado" da "es>estoy").
+
+    Args:
+        error: Error con "fragmento_erroneo" y "correccion"
+
+    Returns:
+        str: Patrón normalizado, o "" si el error no tiene fragmento
+    """
+    erroneo = _normalizar(error.get("fragmento_erroneo", "")).split()
+    correcto = _normalizar(error.get("correccion", "")).split()
+    if not erroneo:
+        return ""
+    if not correcto:
+        return " ".join(erroneo)
+
+    quitadas, puestas = [], []
+    matcher = difflib.SequenceMatcher(a=erroneo, b=correcto, autojunk=False)
+    for operacion, i1, i2, j1, j2 in matcher.get_opcodes():
+        if operacion != "equal":
+            quitadas.extend(erroneo[i1:i2])
+            puestas.extend(correcto[j1:j2])
+    if not quitadas and not puestas:
+        return " ".join(erroneo)
+    return f"{' '.join(quitadas)}>{' '.join(puestas)}"
+
+
+def huella_ejercicio(ejercicio):
+    """Huella del contenido de un ejercicio, para no guardar duplicados."""
+    partes = [_normalizar(ejercicio.get(campo, ""))
+              for campo in ("instrucciones", "contenido", "solucion")]
+    return hashlib.sha256("\x00".join(partes).encode("utf-8")).hexdigest()
+
+
+class ExerciseBank:
+    """
+    Banco local de ejercicios con solución, reutilizables entre estudiantes.
+
+    Los ejercicios se guardan en SQLite indexados por (banda de nivel,
+    categoría de error, patrón normalizado, idioma de las instrucciones) y se
+    deduplican por contenido. Un índice en memoria clave -> ids, reconstruido
+    al abrir el banco, resuelve cada consulta con una búsqueda en diccionario
+    y una lectura por clave primaria.
+
+    Args:
+        path: Fichero SQLite del banco
+        max_por_patron: Ejercicios que se conservan como máximo por patrón
+    """
+
+    def __init__(self, path=DEFAULT_BANK_PATH, max_por_patron=5):
+        self.path = path
+        self.max_por_patron = max_por_patron
+        self._lock = threading.Lock()
+        self._index = {}  # (banda, categoria, patron, idioma) -> [id, ...]
+        self.stats = {"aciertos": 0, "fallos": 0, "guardados": 0, "duplicados": 0}
+
+        directorio = os.path.dirname(self.path)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(ESQUEMA)
+        self._conn.commit()
+        self._load_index()
+
+    def _load_index(self):
+        filas = self._conn.execute(
+            "SELECT id, banda, categoria, patron, idioma FROM ejercicios ORDER BY id")
+        for id_, banda, categoria, patron, idioma in filas:
+            self._index.setdefault((banda, categoria, patron, idioma), []).append(id_)
+
+    # --- API pública ---
+
+    def buscar(self, nivel, categoria, patron, idioma, limite=1):
+        """
+        Devuelve hasta `limite` ejercicios guardados para un patrón de error,
+        empezando por los menos servidos.
+
+        Args:
+            nivel: Nivel del estudiante (se reduce a su banda)
+            categoria: Categoría del error ("Gramática", "Léxico"...)
+            patron: Patrón normalizado (ver patron_error)
+            idioma: Idioma de las instrucciones
+
+        Returns:
+            list: Ejercicios ({titulo, tipo, instrucciones, contenido, solucion})
+        """
+        clave = (banda_nivel(nivel), categoria, patron, idioma)
+        with self._lock:
+            ids = self._index.get(clave)
+            if not ids:
+                self.stats["fallos"] += 1
+                return []
+
+            marcas = ",".join("?" * len(ids))
+            filas = self._conn.execute(
+                f"SELECT id, datos FROM ejercicios WHERE id IN ({marcas}) "
+                "ORDER BY servidos, id LIMIT ?", (*ids, limite)).fetchall()
+            self._conn.executemany(
+                "UPDATE ejercicios SET servidos = servidos + 1 WHERE id = ?",
+                [(id_,) for id_, _ in filas])
+            self._conn.commit()
+            self.stats["aciertos"] += 1
+        return [json.loads(datos) for _, datos in filas]
+
+    def add(self, nivel, categoria, patron, idioma, ejercicio):
+        """
+        Guarda un ejercicio si no existe ya uno igual para el mismo patrón.
+
+        Returns:
+            bool: True si se guardó
+        """
+        if not patron:
+            return False
+        clave = (banda_nivel(nivel), categoria, patron, idioma)
+        datos = {campo: ejercicio.get(campo, "") for campo in
+                 ("titulo", "tipo", "instrucciones", "contenido", "solucion")}
+
+        with self._lock:
+            if len(self._index.get(clave, [])) >= self.max_por_patron:
+                return False
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO ejercicios "
+                "(banda, categoria, patron, idioma, huella, datos, creado) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*clave, huella_ejercicio(datos),
+                 json.dumps(datos, ensure_ascii=False), time.time()))
+            self._conn.commit()
+            if not cursor.rowcount:
+                self.stats["duplicados"] += 1
+                return False
+            self._index.setdefault(clave, []).append(cursor.lastrowid)
+            self.stats["guardados"] += 1
+        return True
+
+    def resumen(self):
+        """Devuelve el número de ejercicios y de patrones cubiertos."""
+        with self._lock:
+            return {
+                "ejercicios": sum(len(ids) for ids in self._index.values()),
+                "patrones": len(self._index)
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
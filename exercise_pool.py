@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_DIR = os.environ.get(
+    "TEXTOCORRECTOR_POOL_DIR",
+    os.path.join(tempfile.gettempdir(), "textocorrector_pool")
+)
+
+
+def normalizar_tema(tema):
+    """Normaliza un tema para la comparación exacta (sin tildes, mayúsculas ni espacios extra)."""
+    if not tema:
+        return ""
+    tema = unicodedata.normalize("NFKD", tema)
+    tema = "".join(c for c in tema if not unicodedata.combining(c))
+    tema = re.sub(r"\s+", " ", tema).strip().lower()
+    return tema.rstrip(".")
+
+
+def _slug(texto):
+    return re.sub(r"[^a-z0-9]+", "_", normalizar_tema(texto)).strip("_") or "tema"
+
+
+class RateLimiter:
+    """Limitador sencillo: garantiza un intervalo mínimo entre operaciones."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, stop_event=None, min_interval=None):
+        """
+        Espera hasta que se permita la siguiente operación. Devuelve False si se detiene.
+        `min_interval` sustituye puntualmente al intervalo configurado.
+        """
+        intervalo = self.min_interval if min_interval is None else min_interval
+        with self._lock:
+            espera = self._last + intervalo - time.time()
+        if espera > 0:
+            if stop_event is not None:
+                if stop_event.wait(espera):
+                    return False
+            else:
+                time.sleep(espera)
+        with self._lock:
+            self._last = time.time()
+        return True
+
+
+class ImageExercisePool:
+    """
+    Reserva en disco de ejercicios de descripción de imágenes ya generados.
+
+    Mantiene hasta `objetivo` ejercicios listos por cada par (nivel, tema popular).
+    Un hilo en segundo plano repone la reserva respetando un intervalo mínimo
+    entre generaciones; mientras algún par esté por debajo de la mitad del
+    objetivo (por ejemplo, cuando una clase entera agota un tema) repone en
+    ráfaga con `intervalo_rafaga`. Las imágenes se guardan en el ImageStore; en disco solo
+    se guarda el identificador de la imagen y la descripción.
+
+    Args:
+        image_store: Almacén donde residen las imágenes de los ejercicios
+        generador: Función (tema, nivel) -> (imagen_id, descripcion) o None
+        temas: Temas populares que se mantienen precalentados
+        niveles: Niveles para los que se precalientan ejercicios
+        objetivo: Ejercicios listos por cada par (nivel, tema)
+        intervalo_minimo: Segundos mínimos entre dos generaciones
+        intervalo_rafaga: Segundos entre generaciones con la reserva casi agotada
+        base_dir: Directorio de la reserva
+    """
+
+    def __init__(self, image_store, generador, temas, niveles, objetivo=2,
+                 intervalo_minimo=30.0, intervalo_rafaga=5.0, base_dir=DEFAULT_POOL_DIR):
+        self.image_store = image_store
+        self.generador = generador
+        self.temas = list(temas)
+        self.niveles = list(niveles)
+        self.objetivo = objetivo
+        self.base_dir = base_dir
+        self.rate_limiter = RateLimiter(intervalo_minimo)
+        self.intervalo_rafaga = intervalo_rafaga
+        # Por debajo de este número de ejercicios se repone en ráfaga
+        self.minimo_rafaga = max(1, objetivo // 2)
+
+        self._temas_por_clave = {normalizar_tema(t): t for t in self.temas}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"servidos": 0, "fallos_reserva": 0, "generados": 0}
+
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    # --- Rutas ---
+
+    def _dir(self, nivel, tema):
+        return os.path.join(self.base_dir, _slug(nivel), _slug(tema))
+
+    def _entries(self, nivel, tema):
+        directorio = self._dir(nivel, tema)
+        try:
+            nombres = sorted(n for n in os.listdir(directorio) if n.endswith(".json"))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(directorio, n) for n in nombres]
+
+    # --- API pública ---
+
+    def tema_precalentado(self, tema):
+        """Devuelve el tema popular que coincide exactamente con `tema`, o None."""
+        return self._temas_por_clave.get(normalizar_tema(tema))
+
+    def disponibles(self, nivel, tema):
+        """Número de ejercicios listos para (nivel, tema)."""
+        tema_pool = self.tema_precalentado(tema)
+        if tema_pool is None:
+            return 0
+        return len(self._entries(nivel, tema_pool))
+
+    def take(self, nivel, tema):
+        """
+        Retira un ejercicio listo de la reserva.
+
+        Args:
+            nivel: Nivel del estudiante
+            tema: Tema solicitado (solo coincide con temas populares exactos)
+
+        Returns:
+            dict: Ejercicio ({imagen_id, descripcion, tema, nivel}) o None si no hay
+        """
+        tema_pool = self.tema_precalentado(tema)
+        if tema_pool is None or nivel not in self.niveles:
+            return None
+
+        with self._lock:
+            for path in self._entries(nivel, tema_pool):
+                # Reclamar el fichero de forma atómica
+                reclamado = path + ".taken"
+                try:
+                    os.replace(path, reclamado)
+                except OSError:
+                    continue
+
+                try:
+                    with open(reclamado, "r", encoding="utf-8") as f:
+                        ejercicio = json.load(f)
+                except (OSError, ValueError):
+                    ejercicio = None
+                finally:
+                    try:
+                        os.remove(reclamado)
+                    except OSError:
+                        pass
+
+                # La imagen pudo ser desalojada del almacén
+                if ejercicio and self.image_store.contains(ejercicio.get("imagen_id")):
+                    self.stats["servidos"] += 1
+                    self._wake.set()
+                    return ejercicio
+
+        self.stats["fallos_reserva"] += 1
+        self._wake.set()
+        return None
+
+    def add(self, nivel, tema, imagen_id, descripcion):
+        """Añade un ejercicio a la reserva."""
+        directorio = self._dir(nivel, tema)
+        os.makedirs(directorio, exist_ok=True)
+        ejercicio = {
+            "imagen_id": imagen_id,
+            "descripcion": descripcion,
+            "tema": tema,
+            "nivel": nivel,
+            "creado": time.time()
+        }
+        nombre = f"{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}.json"
+        fd, tmp_path = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(ejercicio, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(directorio, nombre))
+
+    def start(self):
+        """Arranca el hilo de reposición si no está en marcha."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._fill_loop, name="image-exercise-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # --- Reposición ---
+
+    def _siguiente_deficit(self):
+        """
+        Devuelve el par (nivel, tema) con menos ejercicios por debajo del
+        objetivo y cuántos tiene, o None si la reserva está completa.
+        """
+        candidato = None
+        minimo = self.objetivo
+        for nivel in self.niveles:
+            for tema in self.temas:
+                n = len(self._entries(nivel, tema))
+                if n < minimo:
+                    candidato, minimo = (nivel, tema), n
+        return None if candidato is None else (candidato, minimo)
+
+    def _fill_loop(self):
+        while not self._stop.is_set():
+            deficit = self._siguiente_deficit()
+            if deficit is None:
+                # Reserva completa: esperar a que se consuma algo
+                self._wake.wait(timeout=300)
+                self._wake.clear()
+                continue
+
+            (nivel, tema), disponibles = deficit
+            # Reserva casi agotada: reponer en ráfaga en lugar de al ritmo normal
+            intervalo = self.intervalo_rafaga if disponibles < self.minimo_rafaga else None
+            if not self.rate_limiter.wait(self._stop, intervalo):
+                break
+
+            try:
+                resultado = self.generador(tema, nivel)
+            except Exception as e:
+                logger.error(f"Error al reponer la reserva de ejercicios: {e}")
+                resultado = None
+
+            if resultado and resultado[0]:
+                imagen_id, descripcion = resultado
+                self.add(nivel, tema, imagen_id, descripcion)
+                self.stats["generados"] += 1
+                logger.info(f"Ejercicio precalentado: {nivel} / {tema}")
+            else:
+                # Evitar bucles rápidos si la API falla
+                self._stop.wait(self.rate_limiter.min_interval)
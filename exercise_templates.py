@@ -0,0 +1,500 @@
+import hashlib
+import random
+import re
+import unicodedata
+
+# Idiomas de instrucciones en los que están redactadas las plantillas
+IDIOMAS_PLANTILLAS = ("Español", "Spanish")
+
+FRASES_POR_EJERCICIO = 5
+
+PERSONAS = ["yo", "tú", "él", "nosotros", "vosotros", "ellos"]
+
+# --- Tablas de conjugación ---
+
+TERMINACIONES = {
+    "presente": {
+        "ar": "o as a amos áis an",
+        "er": "o es e emos éis en",
+        "ir": "o es e imos ís en"
+    },
+    "indefinido": {
+        "ar": "é aste ó amos asteis aron",
+        "er": "í iste ió imos isteis ieron",
+        "ir": "í iste ió imos isteis ieron"
+    },
+    "imperfecto": {
+        "ar": "aba abas aba ábamos abais aban",
+        "er": "ía ías ía íamos íais ían",
+        "ir": "ía ías ía íamos íais ían"
+    },
+    "subjuntivo": {
+        "ar": "e es e emos éis en",
+        "er": "a as a amos áis an",
+        "ir": "a as a amos áis an"
+    }
+}
+
+# Formas irregulares (los tiempos que faltan se conjugan como regulares)
+IRREGULARES = {
+    "ser": {
+        "presente": "soy eres es somos sois son",
+        "indefinido": "fui fuiste fue fuimos fuisteis fueron",
+        "imperfecto": "era eras era éramos erais eran",
+        "subjuntivo": "sea seas sea seamos seáis sean"
+    },
+    "estar": {
+        "presente": "estoy estás está estamos estáis están",
+        "indefinido": "estuve estuviste estuvo estuvimos estuvisteis estuvieron",
+        "subjuntivo": "esté estés esté estemos estéis estén"
+    },
+    "ir": {
+        "presente": "voy vas va vamos vais van",
+        "indefinido": "fui fuiste fue fuimos fuisteis fueron",
+        "imperfecto": "iba ibas iba íbamos ibais iban",
+        "subjuntivo": "vaya vayas vaya vayamos vayáis vayan"
+    },
+    "tener": {
+        "presente": "tengo tienes tiene tenemos tenéis tienen",
+        "indefinido": "tuve tuviste tuvo tuvimos tuvisteis tuvieron",
+        "subjuntivo": "tenga tengas tenga tengamos tengáis tengan"
+    },
+    "hacer": {
+        "presente": "hago haces hace hacemos hacéis hacen",
+        "indefinido": "hice hiciste hizo hicimos hicisteis hicieron",
+        "subjuntivo": "haga hagas haga hagamos hagáis hagan"
+    },
+    "poder": {
+        "presente": "puedo puedes puede podemos podéis pueden",
+        "indefinido": "pude pudiste pudo pudimos pudisteis pudieron",
+        "subjuntivo": "pueda puedas pueda podamos podáis puedan"
+    },
+    "querer": {
+        "presente": "quiero quieres quiere queremos queréis quieren",
+        "indefinido": "quise quisiste quiso quisimos quisisteis quisieron",
+        "subjuntivo": "quiera quieras quiera queramos queráis quieran"
+    },
+    "decir": {
+        "presente": "digo dices dice decimos decís dicen",
+        "indefinido": "dije dijiste dijo dijimos dijisteis dijeron",
+        "subjuntivo": "diga digas diga digamos digáis digan"
+    }
+}
+
+# Verbos del léxico con un complemento que concuerda con cualquier sujeto
+# (sin posesivos ni adjetivos variables); "ser" lleva la forma singular y
+# plural del atributo
+VERBOS = {
+    "hablar": "español con los compañeros",
+    "trabajar": "en una oficina",
+    "estudiar": "para el examen",
+    "comprar": "pan en el mercado",
+    "cocinar": "para toda la familia",
+    "comer": "en casa",
+    "beber": "mucha agua",
+    "aprender": "algo nuevo",
+    "vivir": "cerca del centro",
+    "escribir": "correos a la familia",
+    "ser": ("muy puntual", "muy puntuales"),
+    "estar": "en la biblioteca",
+    "ir": "al cine",
+    "tener": "mucho trabajo",
+    "hacer": "los deberes",
+    "poder": "salir temprano",
+    "querer": "viajar a México",
+    "decir": "la verdad"
+}
+
+# Tiempos por banda de nivel, con los marcadores que los introducen
+TIEMPOS_POR_BANDA = {
+    "A1-A2": ["presente"],
+    "B1-B2": ["indefinido", "imperfecto"],
+    "C1-C2": ["subjuntivo", "indefinido"]
+}
+
+MARCADORES_TIEMPO = {
+    "presente": ["Normalmente", "Todos los días", "Los lunes"],
+    "indefinido": ["Ayer", "El año pasado", "La semana pasada"],
+    "imperfecto": ["Antes", "En aquella época", "Cuando vivíamos allí,"],
+    # Marcadores impersonales: admiten cualquier sujeto en la subordinada
+    "subjuntivo": ["Es posible que", "Es importante que", "Ojalá"]
+}
+
+NOMBRES_TIEMPO = {
+    "presente": "presente de indicativo",
+    "indefinido": "pretérito indefinido",
+    "imperfecto": "pretérito imperfecto",
+    "subjuntivo": "presente de subjuntivo"
+}
+
+
+def conjugar(infinitivo, tiempo, persona):
+    """
+    Conjuga un verbo del léxico.
+
+    Args:
+        infinitivo: Verbo en infinitivo
+        tiempo: "presente", "indefinido", "imperfecto" o "subjuntivo"
+        persona: Índice de persona (0 = yo ... 5 = ellos)
+
+    Returns:
+        str: Forma conjugada
+    """
+    irregular = IRREGULARES.get(infinitivo, {}).get(tiempo)
+    if irregular:
+        return irregular.split()[persona]
+    raiz, grupo = infinitivo[:-2], infinitivo[-2:]
+    return raiz + TERMINACIONES[tiempo][grupo].split()[persona]
+
+
+def _construir_formas():
+    formas = {}
+    for infinitivo in VERBOS:
+        for tiempo in TERMINACIONES:
+            for persona in range(len(PERSONAS)):
+                formas.setdefault(conjugar(infinitivo, tiempo, persona), infinitivo)
+    return formas
+
+
+# Forma conjugada -> infinitivo (para reconocer el verbo de un error)
+FORMAS_VERBALES = _construir_formas()
+
+# --- Léxico nominal ---
+
+# (sustantivo, género, plural, empieza por a tónica)
+SUSTANTIVOS_POR_BANDA = {
+    "A1-A2": [
+        ("libro", "m", "libros", False), ("casa", "f", "casas", False),
+        ("coche", "m", "coches", False), ("ciudad", "f", "ciudades", False),
+        ("día", "m", "días", False), ("mano", "f", "manos", False),
+        ("problema", "m", "problemas", False), ("foto", "f", "fotos", False),
+        ("mapa", "m", "mapas", False), ("noche", "f", "noches", False)
+    ],
+    "B1-B2": [
+        ("tema", "m", "temas", False), ("idioma", "m", "idiomas", False),
+        ("sistema", "m", "sistemas", False), ("clima", "m", "climas", False),
+        ("moto", "f", "motos", False), ("radio", "f", "radios", False),
+        ("canción", "f", "canciones", False), ("lección", "f", "lecciones", False),
+        ("costumbre", "f", "costumbres", False), ("planeta", "m", "planetas", False)
+    ],
+    "C1-C2": [
+        ("agua", "f", "aguas", True), ("águila", "f", "águilas", True),
+        ("aula", "f", "aulas", True), ("alma", "f", "almas", True),
+        ("hacha", "f", "hachas", True), ("análisis", "m", "análisis", False),
+        ("crisis", "f", "crisis", False), ("sofá", "m", "sofás", False),
+        ("pirámide", "f", "pirámides", False), ("tesis", "f", "tesis", False)
+    ]
+}
+
+# Adjetivos regulares en -o (masculino singular)
+ADJETIVOS = ["nuevo", "antiguo", "pequeño", "bonito", "moderno", "conocido", "extraño", "famoso"]
+
+ARTICULOS = {
+    ("m", False): "el", ("f", False): "la", ("m", True): "los", ("f", True): "las"
+}
+
+DETERMINANTES = {
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "del", "al",
+    "este", "esta", "estos", "estas", "ese", "esa", "esos", "esas",
+    "aquel", "aquella", "aquellos", "aquellas", "mucho", "mucha", "muchos", "muchas"
+}
+
+
+def articulo(genero, plural=False, a_tonica=False):
+    """Artículo definido, incluido "el" ante femeninos con a tónica (el agua)."""
+    if a_tonica and genero == "f" and not plural:
+        return "el"
+    return ARTICULOS[(genero, plural)]
+
+
+def concordar_adjetivo(adjetivo, genero, plural=False):
+    forma = adjetivo[:-1] + "a" if genero == "f" else adjetivo
+    return forma + "s" if plural else forma
+
+
+# --- Frases de ser/estar y por/para ---
+
+FRASES_SER_ESTAR = {
+    "A1-A2": [
+        ("Mi hermano ___ médico.", "es"),
+        ("La biblioteca ___ al lado del parque.", "está"),
+        ("Nosotros ___ de Colombia.", "somos"),
+        ("Hoy ___ muy cansada, no he dormido bien.", "estoy"),
+        ("¿Dónde ___ mis llaves?", "están"),
+        ("Esta mesa ___ de madera.", "es"),
+        ("Mis padres ___ contentos con la noticia.", "están"),
+        ("___ las tres de la tarde.", "Son")
+    ],
+    "B1-B2": [
+        ("Ana ___ muy lista: siempre saca buenas notas.", "es"),
+        ("¿___ listos? Salimos en cinco minutos.", "Estáis"),
+        ("La fiesta ___ en casa de Marta.", "es"),
+        ("Esta sopa ___ riquísima, ¿quién la ha hecho?", "está"),
+        ("Mi abuelo ___ muy mayor, tiene noventa años.", "es"),
+        ("El concierto ___ cancelado por la lluvia.", "fue"),
+        ("Las tiendas ___ cerradas los domingos.", "están"),
+        ("Juan ___ aburrido: nadie quiere hablar con él.", "es")
+    ],
+    "C1-C2": [
+        ("La carta ___ escrita por el propio director.", "fue"),
+        ("Cuando llegamos, la puerta ya ___ abierta.", "estaba"),
+        ("Que tú ___ aquí me tranquiliza mucho.", "estés"),
+        ("No es que ___ difícil, es que no tengo tiempo.", "sea"),
+        ("El presupuesto ___ aprobado el mes pasado.", "fue"),
+        ("Ese chico ___ muy despierto para su edad.", "es"),
+        ("La reunión ___ a punto de empezar.", "está"),
+        ("Las paredes ya ___ pintadas cuando nos mudamos.", "estaban")
+    ]
+}
+
+FRASES_POR_PARA = {
+    "A1-A2": [
+        ("Este regalo es ___ ti.", "para"),
+        ("Camino ___ el parque todas las mañanas.", "por"),
+        ("Estudio español ___ trabajar en Madrid.", "para"),
+        ("Te llamo ___ teléfono esta noche.", "por"),
+        ("Gracias ___ tu ayuda.", "por"),
+        ("Salgo ___ la oficina a las ocho.", "para"),
+        ("Trabajo ___ la mañana.", "por"),
+        ("Necesito el informe ___ el lunes.", "para")
+    ],
+    "B1-B2": [
+        ("Cambié mi bicicleta ___ una guitarra.", "por"),
+        ("___ ser extranjero, habla muy bien español.", "Para"),
+        ("No fui a clase ___ estar enfermo.", "por"),
+        ("El libro fue escrito ___ una periodista.", "por"),
+        ("___ mí, esta es la mejor opción.", "Para"),
+        ("Pagamos veinte euros ___ persona.", "por"),
+        ("Lo hice ___ que estuvieras contento.", "para"),
+        ("Pasaremos ___ tu casa antes de cenar.", "por")
+    ],
+    "C1-C2": [
+        ("El trabajo está ___ terminar: faltan dos capítulos.", "por"),
+        ("Estaba ___ salir cuando sonó el teléfono.", "para"),
+        ("___ mucho que insistas, no voy a cambiar de opinión.", "Por"),
+        ("No está el tiempo ___ bromas.", "para"),
+        ("Lo dejaron ___ imposible y al final lo consiguieron.", "por"),
+        ("___ lo visto, nadie ha leído el informe.", "Por"),
+        ("¿___ qué sirve este aparato?", "Para"),
+        ("Me tomaron ___ tonto, pero sabía lo que hacía.", "por")
+    ]
+}
+
+
+# --- Clasificación de errores ---
+
+def _palabras(texto):
+    texto = unicodedata.normalize("NFC", str(texto or "")).lower()
+    return re.findall(r"[a-záéíóúüñ]+", texto)
+
+
+def _sin_tildes(texto):
+    return "".join(c for c in unicodedata.normalize("NFD", texto) if not unicodedata.combining(c))
+
+
+def clasificar_error(error):
+    """
+    Identifica si un error corresponde a un tipo que las plantillas cubren.
+
+    Args:
+        error: Error con "fragmento_erroneo", "correccion" y "explicacion"
+
+    Returns:
+        dict: {"tipo": "ser_estar" | "por_para" | "concordancia" | "conjugacion",
+               "verbo": infinitivo o None}, o None si no se reconoce
+    """
+    erroneas = _palabras(error.get("fragmento_erroneo", ""))
+    correctas = _palabras(error.get("correccion", ""))
+    explicacion = _sin_tildes(" ".join(_palabras(error.get("explicacion", ""))))
+
+    # Palabras que cambian entre el fragmento y la corrección
+    quitadas = [p for p in erroneas if p not in correctas]
+    puestas = [p for p in correctas if p not in erroneas]
+    cambiadas = set(quitadas) | set(puestas)
+    if not cambiadas:
+        return None
+
+    verbos = {FORMAS_VERBALES[p] for p in cambiadas if p in FORMAS_VERBALES}
+
+    if cambiadas <= {"por", "para"}:
+        return {"tipo": "por_para", "verbo": None}
+    if verbos == {"ser", "estar"} or ({"ser", "estar"} & verbos and "ser" in explicacion and "estar" in explicacion):
+        return {"tipo": "ser_estar", "verbo": None}
+    if cambiadas & DETERMINANTES or "concordancia" in explicacion or "genero" in explicacion:
+        if not verbos:
+            return {"tipo": "concordancia", "verbo": None}
+
+    # Conjugación: un verbo del léxico en la corrección que sustituye a otra forma suya
+    for palabra in puestas:
+        if palabra in FORMAS_VERBALES:
+            verbo = FORMAS_VERBALES[palabra]
+            # Misma raíz sin tildes: forma mal acentuada o mal conjugada (fuí, tené)
+            raiz = _sin_tildes(palabra)[:3]
+            if (any(_sin_tildes(p)[:3] == raiz for p in quitadas)
+                    or any(FORMAS_VERBALES.get(p) == verbo for p in quitadas)
+                    or any(clave in explicacion for clave in ("conjug", "tiempo verbal", "preterito", "subjuntivo"))):
+                return {"tipo": "conjugacion", "verbo": verbo}
+    return None
+
+
+# --- Generadores ---
+
+def _rng(semilla):
+    valor = int(hashlib.md5(str(semilla).encode("utf-8")).hexdigest()[:8], 16)
+    return random.Random(valor)
+
+
+def _enumerar(lineas):
+    return "\n".join(f"{i}. {linea}" for i, linea in enumerate(lineas, start=1))
+
+
+def _ejercicio_huecos(titulo, instrucciones, frases, rng):
+    seleccion = rng.sample(frases, min(FRASES_POR_EJERCICIO, len(frases)))
+    return {
+        "titulo": titulo,
+        "tipo": "Completar huecos",
+        "instrucciones": instrucciones,
+        "contenido": _enumerar(frase for frase, _ in seleccion),
+        "solucion": _enumerar(solucion for _, solucion in seleccion)
+    }
+
+
+def _ejercicio_ser_estar(banda, rng, verbo=None):
+    return _ejercicio_huecos(
+        "Ser o estar",
+        "Completa cada frase con la forma adecuada de ser o estar.",
+        FRASES_SER_ESTAR[banda], rng)
+
+
+def _ejercicio_por_para(banda, rng, verbo=None):
+    return _ejercicio_huecos(
+        "Por o para",
+        "Completa cada frase con por o para.",
+        FRASES_POR_PARA[banda], rng)
+
+
+def _ejercicio_concordancia(banda, rng, verbo=None):
+    sustantivos = rng.sample(SUSTANTIVOS_POR_BANDA[banda], FRASES_POR_EJERCICIO)
+
+    if banda == "A1-A2":
+        contenido = [f"___ {sustantivo}" for sustantivo, _, _, _ in sustantivos]
+        solucion = [f"{articulo(genero, a_tonica=a_tonica)} {sustantivo}"
+                    for sustantivo, genero, _, a_tonica in sustantivos]
+        return {
+            "titulo": "El género de los sustantivos",
+            "tipo": "Completar huecos",
+            "instrucciones": "Escribe el artículo definido (el, la) delante de cada sustantivo.",
+            "contenido": _enumerar(contenido),
+            "solucion": _enumerar(solucion)
+        }
+
+    contenido, solucion = [], []
+    for sustantivo, genero, plural, a_tonica in sustantivos:
+        adjetivo = rng.choice(ADJETIVOS)
+        if banda == "B1-B2":
+            contenido.append(f"___ {sustantivo} ___ ({adjetivo})")
+            solucion.append(f"{articulo(genero, a_tonica=a_tonica)} {sustantivo} "
+                            f"{concordar_adjetivo(adjetivo, genero)}")
+        else:
+            contenido.append(f"{articulo(genero, a_tonica=a_tonica)} {sustantivo} "
+                             f"{concordar_adjetivo(adjetivo, genero)}")
+            solucion.append(f"{articulo(genero, plural=True)} {plural} "
+                            f"{concordar_adjetivo(adjetivo, genero, plural=True)}")
+
+    if banda == "B1-B2":
+        return {
+            "titulo": "Concordancia de artículo, sustantivo y adjetivo",
+            "tipo": "Completar huecos",
+            "instrucciones": "Escribe el artículo definido y el adjetivo entre paréntesis "
+                             "en la forma que concuerde con el sustantivo.",
+            "contenido": _enumerar(contenido),
+            "solucion": _enumerar(solucion)
+        }
+    return {
+        "titulo": "Concordancia en plural",
+        "tipo": "Transformación",
+        "instrucciones": "Pasa cada grupo nominal al plural. Atención a los "
+                         "femeninos que empiezan por a tónica.",
+        "contenido": _enumerar(contenido),
+        "solucion": _enumerar(solucion)
+    }
+
+
+def _complemento(verbo, persona):
+    complemento = VERBOS[verbo]
+    if isinstance(complemento, tuple):
+        return complemento[persona >= 3]
+    return complemento
+
+
+def _frase_con_hueco(tiempo, persona, verbo, rng):
+    marcador = rng.choice(MARCADORES_TIEMPO[tiempo])
+    return f"{marcador} {PERSONAS[persona]} ___ ({verbo}) {_complemento(verbo, persona)}."
+
+
+def _ejercicio_conjugacion(banda, rng, verbo=None):
+    tiempos = TIEMPOS_POR_BANDA[banda]
+    verbos = rng.sample(sorted(VERBOS), FRASES_POR_EJERCICIO)
+    if verbo in VERBOS and verbo not in verbos:
+        verbos[0] = verbo
+
+    # Niveles intermedios: transformar del presente al tiempo pasado
+    if banda == "B1-B2" and rng.random() < 0.5:
+        tiempo = rng.choice(tiempos)
+        contenido, solucion = [], []
+        for v in verbos:
+            # Se descartan las personas en las que ambas formas coinciden
+            # (nosotros en los verbos regulares en -ar e -ir)
+            persona = rng.choice([p for p in range(len(PERSONAS))
+                                  if conjugar(v, "presente", p) != conjugar(v, tiempo, p)])
+            sujeto = PERSONAS[persona].capitalize()
+            complemento = _complemento(v, persona)
+            contenido.append(f"{sujeto} {conjugar(v, 'presente', persona)} {complemento}.")
+            solucion.append(f"{sujeto} {conjugar(v, tiempo, persona)} {complemento}.")
+        return {
+            "titulo": f"Del presente al {NOMBRES_TIEMPO[tiempo]}",
+            "tipo": "Transformación",
+            "instrucciones": f"Reescribe cada frase en {NOMBRES_TIEMPO[tiempo]}.",
+            "contenido": _enumerar(contenido),
+            "solucion": _enumerar(solucion)
+        }
+
+    contenido, solucion = [], []
+    for v in verbos:
+        tiempo = rng.choice(tiempos)
+        persona = rng.randrange(len(PERSONAS))
+        contenido.append(_frase_con_hueco(tiempo, persona, v, rng))
+        solucion.append(conjugar(v, tiempo, persona))
+    nombres = " y ".join(NOMBRES_TIEMPO[t] for t in tiempos)
+    return {
+        "titulo": "Conjugación verbal",
+        "tipo": "Completar huecos",
+        "instrucciones": f"Conjuga el verbo entre paréntesis en {nombres}, según el contexto.",
+        "contenido": _enumerar(contenido),
+        "solucion": _enumerar(solucion)
+    }
+
+
+GENERADORES = {
+    "ser_estar": _ejercicio_ser_estar,
+    "por_para": _ejercicio_por_para,
+    "concordancia": _ejercicio_concordancia,
+    "conjugacion": _ejercicio_conjugacion
+}
+
+
+def generar_ejercicio_local(clasificacion, banda, semilla=""):
+    """
+    Genera un ejercicio con solución a partir de las plantillas, sin IA.
+
+    Args:
+        clasificacion: Resultado de clasificar_error
+        banda: Banda de nivel ("A1-A2", "B1-B2" o "C1-C2")
+        semilla: Valor que fija la selección de frases (p. ej. el patrón del error)
+
+    Returns:
+        dict: Ejercicio ({titulo, tipo, instrucciones, contenido, solucion})
+    """
+    generador = GENERADORES[clasificacion["tipo"]]
+    rng = _rng(f"{clasificacion['tipo']}|{banda}|{semilla}")
+    return generador(banda, rng, verbo=clasificacion.get("verbo"))
@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+logger = logging.getLogger(__name__)
+
+# Directorio por defecto del almacén (se puede cambiar con una variable de entorno)
+DEFAULT_IMAGE_STORE_DIR = os.environ.get(
+    "TEXTOCORRECTOR_IMAGE_DIR",
+    os.path.join(tempfile.gettempdir(), "textocorrector_imagenes")
+)
+
+IMAGE_SUFFIX = ".img"
+THUMB_SUFFIX = ".thumb.png"
+
+
+class ImageStore:
+    """
+    Almacén local de imágenes direccionado por contenido (SHA-256).
+
+    Cada imagen se guarda una sola vez en disco junto con una miniatura
+    pregenerada. El tamaño total está limitado y, al superarlo, se eliminan
+    las imágenes usadas hace más tiempo (LRU). El orden de uso se persiste
+    en la fecha de modificación de los ficheros, de modo que sobrevive a
+    reinicios del proceso.
+    """
+
+    def __init__(self, base_dir=DEFAULT_IMAGE_STORE_DIR, max_bytes=200 * 1024 * 1024,
+                 thumb_size=(384, 384)):
+        self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # image_id -> bytes ocupados (imagen + miniatura)
+        self._total_bytes = 0
+
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._load_index()
+
+    # --- Rutas ---
+
+    def _image_path(self, image_id):
+        return os.path.join(self.base_dir, image_id + IMAGE_SUFFIX)
+
+    def _thumb_path(self, image_id):
+        return os.path.join(self.base_dir, image_id + THUMB_SUFFIX)
+
+    def _load_index(self):
+        """Reconstruye el índice LRU a partir de los ficheros existentes."""
+        entradas = []
+        for nombre in os.listdir(self.base_dir):
+            if not nombre.endswith(IMAGE_SUFFIX):
+                continue
+            image_id = nombre[:-len(IMAGE_SUFFIX)]
+            try:
+                stat = os.stat(self._image_path(image_id))
+            except OSError:
+                continue
+            size = stat.st_size
+            thumb_path = self._thumb_path(image_id)
+            if os.path.exists(thumb_path):
+                size += os.path.getsize(thumb_path)
+            entradas.append((stat.st_mtime, image_id, size))
+
+        for _, image_id, size in sorted(entradas):
+            self._index[image_id] = size
+            self._total_bytes += size
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _make_thumbnail(self, image_bytes):
+        """Genera una miniatura PNG. Devuelve None si la imagen no es legible."""
+        try:
+            from PIL import Image
+
+            with Image.open(BytesIO(image_bytes)) as img:
+                img = img.convert("RGB")
+                img.thumbnail(self.thumb_size)
+                buffer = BytesIO()
+                img.save(buffer, format="PNG", optimize=True)
+                return buffer.getvalue()
+        except Exception as e:
+            logger.warning(f"No se pudo generar la miniatura: {e}")
+            return None
+
+    # --- API pública ---
+
+    def put(self, image_bytes):
+        """
+        Guarda una imagen y su miniatura si aún no existen.
+
+        Args:
+            image_bytes: Contenido binario de la imagen
+
+        Returns:
+            str: Identificador (hash SHA-256) de la imagen
+        """
+        image_id = hashlib.sha256(image_bytes).hexdigest()
+
+        with self._lock:
+            if image_id in self._index and os.path.exists(self._image_path(image_id)):
+                self._touch(image_id)
+                return image_id
+
+        thumb_bytes = self._make_thumbnail(image_bytes)
+
+        with self._lock:
+            self._write_atomic(self._image_path(image_id), image_bytes)
+            size = len(image_bytes)
+            if thumb_bytes is not None:
+                self._write_atomic(self._thumb_path(image_id), thumb_bytes)
+                size += len(thumb_bytes)
+
+            self._total_bytes -= self._index.pop(image_id, 0)
+            self._index[image_id] = size
+            self._total_bytes += size
+            self._evict(keep=image_id)
+
+        return image_id
+
+    def get(self, image_id):
+        """Devuelve los bytes de la imagen o None si no está en el almacén."""
+        return self._read(image_id, self._image_path(image_id))
+
+    def get_thumbnail(self, image_id):
+        """Devuelve la miniatura o, si no existe, la imagen completa."""
+        thumb = self._read(image_id, self._thumb_path(image_id))
+        return thumb if thumb is not None else self.get(image_id)
+
+    def contains(self, image_id):
+        with self._lock:
+            return image_id in self._index
+
+    def stats(self):
+        """Devuelve el número de imágenes y la ocupación actual."""
+        with self._lock:
+            return {
+                "imagenes": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    # --- Internos ---
+
+    def _read(self, image_id, path):
+        if not image_id:
+            return None
+        with self._lock:
+            if image_id not in self._index:
+                return None
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                if path == self._image_path(image_id):
+                    # El fichero desapareció: limpiar el índice
+                    self._total_bytes -= self._index.pop(image_id, 0)
+                return None
+            self._touch(image_id)
+            return data
+
+    def _touch(self, image_id):
+        """Marca la imagen como usada recientemente (en memoria y en disco)."""
+        self._index.move_to_end(image_id)
+        try:
+            os.utime(self._image_path(image_id), None)
+        except OSError:
+            pass
+
+    def _evict(self, keep=None):
+        """Elimina imágenes LRU hasta respetar el límite de tamaño."""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            image_id, size = next(iter(self._index.items()))
+            if image_id == keep:
+                self._index.move_to_end(image_id)
+                continue
+            del self._index[image_id]
+            self._total_bytes -= size
+            for path in (self._image_path(image_id), self._thumb_path(image_id)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            logger.info(f"Imagen {image_id[:12]} eliminada del almacén (LRU)")
@@ -0,0 +1,329 @@
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import unicodedata
+
+from exercise_templates import TERMINACIONES, conjugar
+from text_metrics import PALABRAS_FUNCIONALES, tokenizar
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_LISTA_PATH = os.path.join(DATA_DIR, "vocabulario_mcer.tsv")
+DEFAULT_INDEX_DIR = os.environ.get(
+    "TEXTOCORRECTOR_LEXICON_DIR",
+    os.path.join(tempfile.gettempdir(), "textocorrector_lexico")
+)
+
+NIVELES_MCER = ("A1", "A2", "B1", "B2", "C1", "C2")
+
+# Proporción de palabras de contenido que debe cubrir un nivel para asignarlo
+COBERTURA_NIVEL = 0.9
+
+# Cabecera del índice compilado: firma, versión y número de entradas. Le siguen
+# las claves (uint64 ordenadas), los niveles (uint8) y los rangos (uint32).
+FIRMA = b"TCLX"
+VERSION_FORMATO = 1
+CABECERA = struct.Struct("<4sIQ")
+
+SIN_TILDE = str.maketrans("áéíóú", "aeiou")
+
+
+def clave_palabra(palabra):
+    """Clave de 64 bits de una palabra (minúsculas, NFC) para el índice compilado."""
+    palabra = unicodedata.normalize("NFC", palabra).lower()
+    return int.from_bytes(hashlib.blake2b(palabra.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# --- Flexión para expandir los lemas ---
+
+def plural(palabra):
+    """Plural regular de un sustantivo o adjetivo."""
+    if palabra[-1] in "aeioué" or palabra[-1] in "áó":
+        return palabra + "s"
+    if palabra[-1] in "sx" and palabra[-2:] not in ("ás", "és", "ís", "ós", "ús"):
+        return palabra
+    if palabra[-1] == "z":
+        return palabra[:-1] + "ces"
+    # canción -> canciones, inglés -> ingleses
+    if len(palabra) > 2 and palabra[-2] in "áéíóú" and palabra[-1] in "ns":
+        palabra = palabra[:-2] + palabra[-2].translate(SIN_TILDE) + palabra[-1]
+    return palabra + "es"
+
+
+def femenino(adjetivo):
+    """Femenino de un adjetivo (los terminados en -e o en consonante no varían)."""
+    if adjetivo.endswith("o"):
+        return adjetivo[:-1] + "a"
+    if adjetivo.endswith("or"):
+        return adjetivo + "a"
+    return adjetivo
+
+
+def formas_lema(lema, categoria, irregulares=()):
+    """
+    Formas flexionadas de un lema: plural de los sustantivos, género y número
+    de los adjetivos y conjugación regular (más las formas irregulares dadas)
+    de los verbos.
+
+    Args:
+        lema: Lema en minúsculas
+        categoria: "n", "adj", "v" u "otro"
+        irregulares: Formas irregulares adicionales
+
+    Returns:
+        set: Formas del lema, incluido el propio lema
+    """
+    formas = {lema}
+    if categoria == "n":
+        formas.add(plural(lema))
+    elif categoria == "adj":
+        forma_femenina = femenino(lema)
+        formas.update({forma_femenina, plural(lema), plural(forma_femenina)})
+    elif categoria == "v":
+        infinitivo = lema[:-2] if lema.endswith("se") else lema
+        formas.add(infinitivo)
+        grupo = infinitivo[-2:]
+        if grupo in ("ar", "er", "ir"):
+            for tiempo in TERMINACIONES:
+                for persona in range(6):
+                    formas.add(conjugar(infinitivo, tiempo, persona))
+            raiz = infinitivo[:-2]
+            formas.add(raiz + ("ando" if grupo == "ar" else "iendo"))
+            participio = raiz + ("ado" if grupo == "ar" else "ido")
+            formas.update({participio, participio[:-1] + "a",
+                           participio + "s", participio[:-1] + "as"})
+    formas.update(irregulares)
+    return formas
+
+
+# --- Construcción y carga del índice ---
+
+def leer_lista(ruta_lista):
+    """
+    Lee la lista de vocabulario (TSV: lema, categoría, nivel y formas
+    irregulares opcionales). El orden de las líneas es el rango de frecuencia.
+
+    Returns:
+        list: Tuplas (lema, categoria, nivel, formas irregulares)
+    """
+    entradas = []
+    with open(ruta_lista, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip() or linea.startswith("#"):
+                continue
+            campos = linea.rstrip("\n").split("\t")
+            lema, categoria, nivel = campos[0].strip().lower(), campos[1].strip(), campos[2].strip()
+            irregulares = campos[3].split() if len(campos) > 3 else []
+            if nivel in NIVELES_MCER:
+                entradas.append((lema, categoria, nivel, irregulares))
+    return entradas
+
+
+def construir_indice(ruta_lista, ruta_indice):
+    """
+    Compila la lista de vocabulario en un índice binario ordenado que se
+    puede proyectar en memoria (mmap). Cada forma se guarda con el nivel más
+    bajo y el rango más frecuente de los lemas que la generan.
+
+    Returns:
+        int: Número de formas indexadas
+    """
+    import numpy as np
+
+    mejores = {}  # clave -> (nivel, rango)
+    for rango, (lema, categoria, nivel, irregulares) in enumerate(leer_lista(ruta_lista), start=1):
+        valor = (NIVELES_MCER.index(nivel), rango)
+        for forma in formas_lema(lema, categoria, irregulares):
+            clave = clave_palabra(forma)
+            if clave not in mejores or valor < mejores[clave]:
+                mejores[clave] = valor
+
+    claves = np.array(sorted(mejores), dtype="<u8")
+    niveles = np.array([mejores[c][0] for c in claves.tolist()], dtype="u1")
+    rangos = np.array([mejores[c][1] for c in claves.tolist()], dtype="<u4")
+
+    directorio = os.path.dirname(ruta_indice)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directorio or None, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(CABECERA.pack(FIRMA, VERSION_FORMATO, len(claves)))
+            f.write(claves.tobytes())
+            f.write(rangos.tobytes())
+            f.write(niveles.tobytes())
+        os.replace(tmp_path, ruta_indice)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(claves)
+
+
+class LexicalIndex:
+    """
+    Índice de vocabulario por nivel del MCER proyectado en memoria.
+
+    Las claves de 64 bits de las formas están ordenadas, de modo que cada
+    consulta es una búsqueda binaria sobre el array (vectorizada para todos los
+    tokens de un texto). Como el fichero se proyecta con mmap, los procesos
+    que lo abren comparten las mismas páginas y no se crea ningún diccionario.
+
+    Args:
+        ruta_indice: Fichero compilado con construir_indice
+    """
+
+    def __init__(self, ruta_indice):
+        import numpy as np
+
+        with open(ruta_indice, "rb") as f:
+            firma, version, n = CABECERA.unpack(f.read(CABECERA.size))
+        if firma != FIRMA or version != VERSION_FORMATO:
+            raise ValueError(f"Índice léxico no válido: {ruta_indice}")
+
+        self.ruta = ruta_indice
+        inicio = CABECERA.size
+        self._claves = np.memmap(ruta_indice, dtype="<u8", mode="r", offset=inicio, shape=(n,))
+        inicio += 8 * n
+        self._rangos = np.memmap(ruta_indice, dtype="<u4", mode="r", offset=inicio, shape=(n,))
+        inicio += 4 * n
+        self._niveles = np.memmap(ruta_indice, dtype="u1", mode="r", offset=inicio, shape=(n,))
+
+    def __len__(self):
+        return len(self._claves)
+
+    def buscar(self, palabras):
+        """
+        Consulta varias palabras a la vez.
+
+        Args:
+            palabras: Lista de palabras en minúsculas
+
+        Returns:
+            tuple: (niveles, rangos) como arrays de NumPy; nivel -1 y rango 0
+                   para las palabras que no están en el índice
+        """
+        import numpy as np
+
+        claves = np.fromiter(map(clave_palabra, palabras), dtype="<u8", count=len(palabras))
+        if not len(self._claves):
+            return np.full(len(claves), -1, dtype=np.int8), np.zeros(len(claves), dtype=np.uint32)
+
+        pos = np.minimum(np.searchsorted(self._claves, claves), len(self._claves) - 1)
+        encontradas = self._claves[pos] == claves
+        niveles = np.where(encontradas, self._niveles[pos], -1).astype(np.int8)
+        rangos = np.where(encontradas, self._rangos[pos], 0).astype(np.uint32)
+        return niveles, rangos
+
+    def nivel(self, palabra):
+        """Nivel del MCER de una palabra ("A1"... "C2") o None si no está."""
+        niveles, _ = self.buscar([palabra])
+        return NIVELES_MCER[niveles[0]] if niveles[0] >= 0 else None
+
+
+def cargar_indice(ruta_lista=DEFAULT_LISTA_PATH, directorio=DEFAULT_INDEX_DIR):
+    """
+    Abre el índice compilado de la lista indicada, compilándolo antes si no
+    existe. El nombre del fichero incluye un resumen del contenido de la
+    lista, así que un cambio en ella genera un índice nuevo.
+
+    Returns:
+        LexicalIndex: Índice proyectado en memoria
+    """
+    with open(ruta_lista, "rb") as f:
+        resumen = hashlib.sha256(f.read()).hexdigest()[:16]
+    nombre = os.path.splitext(os.path.basename(ruta_lista))[0]
+    ruta_indice = os.path.join(directorio, f"{nombre}-{resumen}.idx")
+
+    if not os.path.exists(ruta_indice):
+        total = construir_indice(ruta_lista, ruta_indice)
+        logger.info(f"Índice léxico compilado: {total} formas en {ruta_indice}")
+    return LexicalIndex(ruta_indice)
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def get_indice_lexico():
+    """Índice léxico compartido del proceso (None si no se pudo cargar)."""
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            try:
+                _indice = cargar_indice()
+            except Exception as e:
+                logger.error(f"No se pudo cargar el índice léxico: {e}")
+                return None
+        return _indice
+
+
+# --- Estimación del nivel léxico ---
+
+def estimar_nivel_lexico(texto, indice=None, max_destacadas=10):
+    """
+    Estima el nivel léxico (MCER) de un texto con el índice de vocabulario.
+
+    El nivel es el más bajo que cubre al menos el 90 % de las palabras de
+    contenido reconocidas. Se destacan las palabras de nivel B2 o superior y
+    las que no figuran en la lista (poco comunes, nombres propios o errores).
+
+    Args:
+        texto: Texto en español
+        indice: LexicalIndex (por defecto, el compartido del proceso)
+        max_destacadas: Número máximo de palabras destacadas
+
+    Returns:
+        dict: nivel, distribucion (proporción por nivel), cobertura,
+              palabras_destacadas, palabras_poco_comunes y descripcion,
+              o {"error": ...}
+    """
+    indice = indice or get_indice_lexico()
+    if indice is None:
+        return {"error": "Índice léxico no disponible."}
+
+    palabras = [p for p in tokenizar(texto) if p not in PALABRAS_FUNCIONALES and len(p) > 1]
+    if not palabras:
+        return {"error": "El texto no contiene palabras de contenido."}
+
+    niveles, _ = indice.buscar(palabras)
+    conocidas = niveles[niveles >= 0]
+    cobertura = len(conocidas) / len(palabras)
+
+    distribucion = {}
+    nivel = None
+    acumulado = 0
+    for i, etiqueta in enumerate(NIVELES_MCER):
+        cuenta = int((conocidas == i).sum())
+        distribucion[etiqueta] = round(cuenta / len(conocidas), 3) if len(conocidas) else 0.0
+        acumulado += cuenta
+        if nivel is None and len(conocidas) and acumulado / len(conocidas) >= COBERTURA_NIVEL:
+            nivel = etiqueta
+
+    # Palabras destacadas: primero las de nivel más alto, luego las desconocidas
+    avanzadas = {}
+    poco_comunes = []
+    for palabra, n in zip(palabras, niveles.tolist()):
+        if n >= NIVELES_MCER.index("B2"):
+            avanzadas.setdefault(palabra, n)
+        elif n < 0 and len(palabra) > 3 and palabra not in poco_comunes:
+            poco_comunes.append(palabra)
+    destacadas = sorted(avanzadas, key=lambda p: -avanzadas[p]) + poco_comunes
+
+    descripcion = (
+        f"El {round(cobertura * 100)} % de las palabras de contenido figura en la lista "
+        f"de vocabulario de referencia; el {round(COBERTURA_NIVEL * 100)} % de ellas "
+        f"corresponde a un nivel {nivel or 'no determinado'} o inferior."
+    )
+    return {
+        "nivel": nivel or "No determinado",
+        "distribucion": distribucion,
+        "cobertura": round(cobertura, 3),
+        "palabras_destacadas": destacadas[:max_destacadas],
+        "palabras_poco_comunes": poco_comunes[:max_destacadas],
+        "descripcion": descripcion
+    }
@@ -0,0 +1,325 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Tabla de modelos: categoría (capacidad relativa), coste en USD por millón de
+# tokens de entrada y de salida, latencia fija (s) y segundos por cada 1000
+# tokens generados. Las cifras son orientativas: se pueden ajustar con
+# TEXTOCORRECTOR_MODELOS (JSON {modelo: {campo: valor}}; los campos indicados
+# sustituyen a los de la tabla y los modelos nuevos deben traerlos todos) a la
+# vista de las latencias registradas.
+MODELOS = {
+    "gpt-4o-mini": {"categoria": 1, "entrada": 0.15, "salida": 0.60,
+                    "latencia_base": 0.5, "segundos_por_1k": 12, "vision": True},
+    "gpt-3.5-turbo": {"categoria": 1, "entrada": 0.50, "salida": 1.50,
+                      "latencia_base": 0.4, "segundos_por_1k": 10, "vision": False},
+    "gpt-4o": {"categoria": 2, "entrada": 2.50, "salida": 10.00,
+               "latencia_base": 0.6, "segundos_por_1k": 15, "vision": True},
+    "gpt-4-turbo": {"categoria": 3, "entrada": 10.00, "salida": 30.00,
+                    "latencia_base": 0.8, "segundos_por_1k": 30, "vision": True},
+}
+
+CAMPOS_MODELO = ("categoria", "entrada", "salida", "latencia_base", "segundos_por_1k")
+
+
+def _aplicar_configuracion_modelos(modelos, configuracion):
+    """
+    Fusiona campo a campo la configuración de TEXTOCORRECTOR_MODELOS con la
+    tabla de modelos. Se descarta (con un aviso) la configuración que no es
+    JSON válido y los modelos a los que les falta algún campo de CAMPOS_MODELO.
+    """
+    try:
+        cambios = json.loads(configuracion or "{}")
+        if not isinstance(cambios, dict) or not all(isinstance(v, dict) for v in cambios.values()):
+            raise ValueError("se esperaba un objeto {modelo: {campo: valor}}")
+    except ValueError as e:
+        logger.warning(f"TEXTOCORRECTOR_MODELOS no válido, se ignora: {e}")
+        return
+    for modelo, campos in cambios.items():
+        modelos.setdefault(modelo, {}).update(campos)
+    for modelo in list(modelos):
+        faltan = [c for c in CAMPOS_MODELO if c not in modelos[modelo]]
+        if faltan:
+            logger.warning(f"Modelo {modelo} sin {', '.join(faltan)}: se excluye del enrutado")
+            del modelos[modelo]
+
+
+_aplicar_configuracion_modelos(MODELOS, os.environ.get("TEXTOCORRECTOR_MODELOS"))
+
+# Política de cada función: modelo por defecto (el que se usa si el
+# enrutado está desactivado), categorías mínima y máxima, si el nivel del
+# estudiante sube la categoría, latencia máxima estimada (s), si necesita
+# visión y tokens de salida esperados (fijos + por palabra del texto)
+FUNCIONES = {
+    "correccion": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 3, "usa_nivel": True,
+                   "salida_fija": 400, "salida_por_palabra": 2.5},
+    "correccion_fragmento": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 3,
+                             "usa_nivel": True, "salida_fija": 150, "salida_por_palabra": 2.5},
+    "recorreccion": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 3, "usa_nivel": True,
+                     "salida_fija": 100, "salida_por_palabra": 2.5},
+    # El análisis global no reescribe el texto: basta un modelo barato
+    "analisis_global": {"por_defecto": "gpt-4o-mini", "minima": 1, "maxima": 1,
+                        "salida_fija": 400},
+    "complejidad": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 3,
+                    "salida_fija": 500},
+    "consigna": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 3, "usa_nivel": True,
+                 "salida_fija": 400},
+    "tarea_examen": {"por_defecto": "gpt-4-turbo", "minima": 2, "maxima": 3, "usa_nivel": True,
+                     "salida_fija": 600},
+    "ejemplos_evaluados": {"por_defecto": "gpt-4-turbo", "minima": 2, "maxima": 3,
+                           "usa_nivel": True, "salida_fija": 1500},
+    "ejercicios_personalizados": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 3,
+                                  "usa_nivel": True, "salida_fija": 1200},
+    "plan_estudio": {"por_defecto": "gpt-4-turbo", "minima": 2, "maxima": 3,
+                     "salida_fija": 1500},
+    "descripcion_imagen": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 2,
+                           "usa_nivel": True, "salida_fija": 400},
+    "ocr": {"por_defecto": "gpt-4o", "minima": 2, "maxima": 3, "vision": True,
+            "salida_fija": 0, "salida_por_palabra": 1.5},
+    # El asistente en tiempo real prima la latencia sobre la capacidad
+    "asistente": {"por_defecto": "gpt-3.5-turbo", "minima": 1, "maxima": 1,
+                  "latencia_maxima": 4, "salida_fija": 200, "salida_por_palabra": 3},
+    "general": {"por_defecto": "gpt-4-turbo", "minima": 1, "maxima": 3, "salida_fija": 500},
+}
+
+# A partir de estas palabras el texto se considera largo y sube una categoría
+PALABRAS_TEXTO_LARGO = 400
+
+MAX_DECISIONES = 1000
+
+# Con TEXTOCORRECTOR_ENRUTAR_MODELOS=0 cada función usa su modelo por defecto
+_config = {"activo": os.environ.get("TEXTOCORRECTOR_ENRUTAR_MODELOS", "1") != "0"}
+# Fichero JSONL opcional donde se añade cada decisión con su resultado
+RUTA_REGISTRO = os.environ.get("TEXTOCORRECTOR_REGISTRO_RUTAS")
+
+decisiones = deque(maxlen=MAX_DECISIONES)
+_decisiones_lock = threading.Lock()
+
+
+def enrutado_activo():
+    return _config["activo"]
+
+
+def activar_enrutado(activo=True):
+    """Activa o desactiva la elección de modelo (desactivado se usa el modelo por defecto)."""
+    _config["activo"] = bool(activo)
+
+
+def grado_nivel(nivel):
+    """0 para A1-A2, 1 para B1-B2, 2 para C1-C2 y None si no se reconoce el nivel."""
+    texto = (nivel or "").lower()
+    if "principiante" in texto or re.search(r"\ba[12]\b", texto):
+        return 0
+    if "intermedio" in texto or re.search(r"\bb[12]\b", texto):
+        return 1
+    if "avanzado" in texto or re.search(r"\bc[12]\b", texto):
+        return 2
+    return None
+
+
+def estimar_latencia(modelo, tokens_salida):
+    datos = MODELOS[modelo]
+    return datos["latencia_base"] + tokens_salida / 1000 * datos["segundos_por_1k"]
+
+
+def estimar_coste(modelo, tokens_entrada, tokens_salida):
+    """Coste estimado de una petición en USD."""
+    datos = MODELOS[modelo]
+    return (tokens_entrada * datos["entrada"] + tokens_salida * datos["salida"]) / 1_000_000
+
+
+def _candidatos(politica, categoria_minima):
+    return [m for m, datos in MODELOS.items()
+            if categoria_minima <= datos["categoria"] <= politica["maxima"]
+            and (datos.get("vision") or not politica.get("vision"))]
+
+
+def _dentro_de_latencia(politica, candidatos, tokens_salida):
+    return [m for m in candidatos
+            if politica.get("latencia_maxima") is None
+            or estimar_latencia(m, tokens_salida) <= politica["latencia_maxima"]]
+
+
+def _mas_barato(candidatos, tokens_entrada, tokens_salida):
+    return min(candidatos, key=lambda m: (estimar_coste(m, tokens_entrada, tokens_salida),
+                                          estimar_latencia(m, tokens_salida)))
+
+
+def elegir_modelo(funcion, nivel=None, palabras=0, tokens_entrada=0):
+    """
+    Elige el modelo de una petición: la categoría necesaria parte de la mínima
+    de la función y sube una por cada grado de nivel del estudiante (si la
+    función lo usa) y otra si el texto es largo, sin pasar de la máxima. Entre
+    los modelos de esa categoría o superior se descartan los que superan la
+    latencia máxima de la función y se elige el de menor coste estimado.
+
+    Args:
+        funcion: Nombre de la función (clave de FUNCIONES)
+        nivel: Nivel del estudiante (opcional)
+        palabras: Palabras del texto del estudiante
+        tokens_entrada: Tokens estimados del prompt
+
+    Returns:
+        dict: Decisión con "funcion", "modelo", "categoria" y las estimaciones
+              de tokens de salida, coste y latencia
+    """
+    politica = FUNCIONES.get(funcion, FUNCIONES["general"])
+    tokens_salida = round(politica.get("salida_fija", 0)
+                          + politica.get("salida_por_palabra", 0) * palabras)
+
+    categoria = politica["minima"]
+    if politica.get("usa_nivel"):
+        categoria += grado_nivel(nivel) or 0
+    if palabras > PALABRAS_TEXTO_LARGO:
+        categoria += 1
+    categoria = min(categoria, politica["maxima"])
+
+    if not _config["activo"]:
+        modelo = politica["por_defecto"]
+        motivo = "por defecto"
+    else:
+        candidatos = _candidatos(politica, categoria)
+        rapidos = _dentro_de_latencia(politica, candidatos, tokens_salida)
+        if rapidos:
+            modelo = _mas_barato(rapidos, tokens_entrada, tokens_salida)
+            motivo = "coste"
+        elif candidatos:
+            modelo = min(candidatos, key=lambda m: estimar_latencia(m, tokens_salida))
+            motivo = "latencia"
+        else:
+            modelo = politica["por_defecto"]
+            motivo = "sin candidatos"
+
+    return {
+        "funcion": funcion,
+        "nivel": grado_nivel(nivel),
+        "palabras": palabras,
+        "categoria": categoria,
+        "modelo": modelo,
+        "motivo": motivo,
+        "tokens_entrada": tokens_entrada,
+        "tokens_salida": tokens_salida,
+        "coste_estimado": estimar_coste(modelo, tokens_entrada, tokens_salida),
+        "latencia_estimada": estimar_latencia(modelo, tokens_salida),
+    }
+
+
+def escalar(decision):
+    """
+    Decisión para repetir una petición con un modelo más capaz, sin pasar de
+    la categoría máxima ni de la latencia máxima de la función; None si no
+    queda ninguno (o el enrutado está desactivado).
+    """
+    if not _config["activo"] or decision["modelo"] not in MODELOS:
+        return None
+    politica = FUNCIONES.get(decision["funcion"], FUNCIONES["general"])
+    categoria = MODELOS[decision["modelo"]]["categoria"] + 1
+    candidatos = _dentro_de_latencia(politica, _candidatos(politica, categoria),
+                                     decision["tokens_salida"])
+    if not candidatos:
+        return None
+    modelo = _mas_barato(candidatos, decision["tokens_entrada"], decision["tokens_salida"])
+    return dict(decision, modelo=modelo, categoria=MODELOS[modelo]["categoria"],
+                motivo=f"escalado desde {decision['modelo']}",
+                coste_estimado=estimar_coste(modelo, decision["tokens_entrada"],
+                                             decision["tokens_salida"]),
+                latencia_estimada=estimar_latencia(modelo, decision["tokens_salida"]))
+
+
+def respuesta_no_vacia(respuesta):
+    """Validación por defecto de las respuestas de texto libre."""
+    return isinstance(respuesta, str) and bool(respuesta.strip())
+
+
+def ejecutar_con_escalado(decision, enviar, validar=respuesta_no_vacia):
+    """
+    Hace una petición enrutada y, mientras la respuesta no sea válida, la
+    repite con el modelo que propone escalar. Cada intento se registra con
+    registrar_resultado.
+
+    Args:
+        decision: Resultado de elegir_modelo
+        enviar: Función modelo -> respuesta (las excepciones se propagan)
+        validar: Función respuesta -> bool
+
+    Returns:
+        tuple: (última respuesta, si es válida)
+    """
+    while True:
+        inicio = time.perf_counter()
+        try:
+            respuesta = enviar(decision["modelo"])
+        except Exception:
+            registrar_resultado(decision, time.perf_counter() - inicio, valido=None)
+            raise
+        valido = bool(validar(respuesta))
+        registrar_resultado(decision, time.perf_counter() - inicio, valido=valido)
+        siguiente = None if valido else escalar(decision)
+        if siguiente is None:
+            return respuesta, valido
+        logger.warning(f"Respuesta no válida de {decision['modelo']} ({decision['funcion']}); "
+                       f"se repite con {siguiente['modelo']}")
+        decision = siguiente
+
+
+def registrar_resultado(decision, duracion, valido=True):
+    """
+    Registra el resultado de una petición enrutada para contrastar la tabla de
+    modelos con los datos reales.
+
+    Args:
+        decision: Resultado de elegir_modelo o escalar
+        duracion: Segundos que tardó la petición
+        valido: Si la respuesta era válida (None si la petición falló)
+    """
+    registro = dict(decision, momento=time.time(), duracion=duracion, valido=valido)
+    with _decisiones_lock:
+        decisiones.append(registro)
+    logger.info(
+        f"Ruta {decision['funcion']} -> {decision['modelo']} ({decision['motivo']}, "
+        f"categoría {decision['categoria']}): {duracion:.2f} s "
+        f"(estimado {decision['latencia_estimada']:.2f} s), válido={valido}")
+
+    if RUTA_REGISTRO:
+        try:
+            with open(RUTA_REGISTRO, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"No se pudo escribir el registro de rutas: {e}")
+
+
+def resumen_decisiones():
+    """
+    Agrega las decisiones registradas por función y modelo.
+
+    Returns:
+        list: Una fila por (función, modelo) con peticiones, escaladas,
+              respuestas no válidas, latencia media estimada y real y coste
+              estimado total
+    """
+    with _decisiones_lock:
+        registros = list(decisiones)
+
+    grupos = {}
+    for r in registros:
+        grupos.setdefault((r["funcion"], r["modelo"]), []).append(r)
+
+    filas = []
+    for (funcion, modelo), grupo in sorted(grupos.items()):
+        filas.append({
+            "funcion": funcion,
+            "modelo": modelo,
+            "peticiones": len(grupo),
+            "escaladas": sum(1 for r in grupo if r["motivo"].startswith("escalado")),
+            "no_validas": sum(1 for r in grupo if r["valido"] is not True),
+            "latencia_estimada": sum(r["latencia_estimada"] for r in grupo) / len(grupo),
+            "latencia_media": sum(r["duracion"] for r in grupo) / len(grupo),
+            "coste_estimado": sum(r["coste_estimado"] for r in grupo)
+        })
+    return filas
@@ -0,0 +1,768 @@
+import hashlib
+import logging
+import os
+import re
+import struct
+import tempfile
+import threading
+import unicodedata
+
+from exercise_templates import IRREGULARES, TERMINACIONES
+from lexical_index import (
+    DEFAULT_INDEX_DIR, DEFAULT_LISTA_PATH, clave_palabra, femenino, leer_lista, plural
+)
+from text_metrics import PALABRAS_FUNCIONALES
+
+logger = logging.getLogger(__name__)
+
+# Categorías, géneros y números del léxico compilado
+SUSTANTIVO, ADJETIVO, VERBO, OTRA, FORMA_ERRONEA = range(5)
+SIN_GENERO, MASCULINO, FEMENINO, COMUN = range(4)
+SIN_NUMERO, SINGULAR, PLURAL, INVARIABLE = range(4)
+
+GENEROS = {"m": MASCULINO, "f": FEMENINO, "c": COMUN}
+
+# --- Género de los sustantivos ---
+
+# Sustantivos cuyo género no se deduce de la terminación
+GENERO_EXCEPCIONES = {
+    "día": "m", "mapa": "m", "clima": "m", "idioma": "m", "problema": "m", "tema": "m",
+    "sistema": "m", "programa": "m", "planeta": "m", "paradigma": "m", "sofá": "m",
+    "avión": "m", "camión": "m", "mano": "f", "foto": "f", "moto": "f", "radio": "f",
+    "calle": "f", "leche": "f", "carne": "f", "clase": "f", "tarde": "f", "noche": "f",
+    "parte": "f", "nieve": "f", "gente": "f", "fiebre": "f", "madre": "f", "mujer": "f",
+    "red": "f", "ley": "f", "razón": "f", "sangre": "f", "suerte": "f", "muerte": "f",
+    "frase": "f", "llave": "f", "nube": "f", "torre": "f", "fuente": "f", "mente": "f",
+    "base": "f", "serie": "f", "especie": "f", "superficie": "f", "índole": "f",
+    "imagen": "f", "flor": "f", "labor": "f", "luz": "f", "paz": "f", "voz": "f",
+    "nariz": "f", "raíz": "f", "cruz": "f", "piel": "f", "miel": "f", "sal": "f",
+    "cárcel": "f", "señal": "f", "análisis": "m", "énfasis": "m",
+    "estudiante": "c", "joven": "c", "artista": "c", "periodista": "c", "turista": "c",
+    "cliente": "c", "testigo": "c"
+}
+
+# Sustantivos que solo se usan en plural
+PLURALIA_TANTUM = {"vacaciones": "f", "ínfulas": "f", "ambages": "m", "gafas": "f"}
+
+PLURALES_IRREGULARES = {
+    "examen": "exámenes", "joven": "jóvenes", "imagen": "imágenes", "origen": "orígenes",
+    "país": "países", "currículum": "currículums", "régimen": "regímenes"
+}
+
+# Sustantivos femeninos que empiezan por a tónica y llevan "el" o "un" en singular
+A_TONICA = {"agua", "águila", "aula", "alma", "hacha", "hambre", "área", "arma", "ala", "ave", "habla"}
+
+TERMINACIONES_FEMENINAS = ("a", "ción", "sión", "xión", "dad", "tad", "tud", "umbre", "ez", "eza", "sis", "itis")
+
+
+def genero_sustantivo(lema):
+    """Género de un sustantivo ("m", "f" o "c" si es común en cuanto al género)."""
+    if lema in GENERO_EXCEPCIONES:
+        return GENERO_EXCEPCIONES[lema]
+    if lema.endswith(TERMINACIONES_FEMENINAS):
+        return "f"
+    return "m"
+
+
+def flexionar_adjetivo(lema, genero, numero):
+    """
+    Forma de un adjetivo para un género y número.
+
+    Args:
+        lema: Adjetivo en masculino singular
+        genero: MASCULINO, FEMENINO o COMUN (se deja en masculino)
+        numero: SINGULAR o PLURAL
+
+    Returns:
+        str: Forma flexionada
+    """
+    forma = femenino(lema) if genero == FEMENINO else lema
+    return plural(forma) if numero == PLURAL else forma
+
+
+# --- Determinantes ---
+
+# Serie de cada determinante: masculino singular, femenino singular,
+# masculino plural y femenino plural
+SERIES_DETERMINANTES = {
+    "el": ("el", "la", "los", "las"),
+    "un": ("un", "una", "unos", "unas"),
+    "este": ("este", "esta", "estos", "estas"),
+    "ese": ("ese", "esa", "esos", "esas"),
+    "aquel": ("aquel", "aquella", "aquellos", "aquellas"),
+    "mucho": ("mucho", "mucha", "muchos", "muchas"),
+    "poco": ("poco", "poca", "pocos", "pocas"),
+    "otro": ("otro", "otra", "otros", "otras"),
+    "nuestro": ("nuestro", "nuestra", "nuestros", "nuestras"),
+    "vuestro": ("vuestro", "vuestra", "vuestros", "vuestras"),
+    "alguno": ("algún", "alguna", "algunos", "algunas"),
+    "ninguno": ("ningún", "ninguna", "ningunos", "ningunas"),
+    "mi": ("mi", "mi", "mis", "mis"),
+    "tu": ("tu", "tu", "tus", "tus"),
+    "su": ("su", "su", "sus", "sus"),
+    "del": ("del", "de la", "de los", "de las"),
+    "al": ("al", "a la", "a los", "a las")
+}
+RASGOS_SERIE = ((MASCULINO, SINGULAR), (FEMENINO, SINGULAR), (MASCULINO, PLURAL), (FEMENINO, PLURAL))
+
+# Series que toman la forma masculina ante femeninos con a tónica ("el agua")
+SERIES_A_TONICA = {"el", "un", "alguno", "ninguno", "del", "al"}
+
+# Determinantes que también son pronombres átonos ("la veo"): ante una
+# palabra que puede ser verbo no se comprueba la concordancia
+CLITICOS = {"la", "las", "los"}
+
+
+def _analizar_determinantes():
+    analisis = {}
+    for serie, formas in SERIES_DETERMINANTES.items():
+        for forma, rasgos in zip(formas, RASGOS_SERIE):
+            if " " not in forma:
+                analisis.setdefault(forma, []).append((serie, *rasgos))
+    return analisis
+
+
+# forma -> [(serie, género, número), ...]
+DETERMINANTES = _analizar_determinantes()
+
+
+def forma_determinante(serie, genero, numero, a_tonica=False):
+    """Forma de un determinante de la serie para el género y número dados."""
+    if a_tonica and numero == SINGULAR and serie in SERIES_A_TONICA:
+        genero = MASCULINO
+    return SERIES_DETERMINANTES[serie][RASGOS_SERIE.index((genero, numero))]
+
+
+# --- Conjugación ---
+
+# Paradigmas irregulares que completan los de exercise_templates
+IRREGULARES_MORFOLOGIA = dict(IRREGULARES, **{
+    "ver": {
+        "presente": "veo ves ve vemos veis ven",
+        "indefinido": "vi viste vio vimos visteis vieron",
+        "imperfecto": "veía veías veía veíamos veíais veían",
+        "subjuntivo": "vea veas vea veamos veáis vean"
+    },
+    "dar": {
+        "presente": "doy das da damos dais dan",
+        "indefinido": "di diste dio dimos disteis dieron",
+        "subjuntivo": "dé des dé demos deis den"
+    },
+    "saber": {
+        "presente": "sé sabes sabe sabemos sabéis saben",
+        "indefinido": "supe supiste supo supimos supisteis supieron",
+        "subjuntivo": "sepa sepas sepa sepamos sepáis sepan"
+    }
+})
+
+# Verbos con cambio vocálico en la raíz: "ie" (e > ie), "ue" (o/u > ue) o "i" (e > i)
+CAMBIOS_RAIZ = {
+    "pensar": "ie", "empezar": "ie", "cerrar": "ie", "recomendar": "ie", "negar": "ie",
+    "entender": "ie", "perder": "ie", "sentir": "ie", "preferir": "ie", "sugerir": "ie",
+    "advertir": "ie", "venir": "ie",
+    "encontrar": "ue", "recordar": "ue", "probar": "ue", "contar": "ue", "denostar": "ue",
+    "jugar": "ue", "volver": "ue", "mover": "ue", "resolver": "ue", "promover": "ue",
+    "dormir": "ue",
+    "pedir": "i", "servir": "i", "repetir": "i", "seguir": "i", "conseguir": "i", "elegir": "i"
+}
+
+# Raíz irregular de la primera persona del presente y de todo el subjuntivo
+RAIZ_PRIMERA_PERSONA = {
+    "salir": "salg", "poner": "pong", "proponer": "propong", "suponer": "supong",
+    "traer": "traig", "venir": "veng"
+}
+
+# Pretéritos fuertes (raíz del indefinido, sin acento en la 1.ª y 3.ª persona)
+PRETERITOS_FUERTES = {
+    "poner": "pus", "proponer": "propus", "suponer": "supus", "venir": "vin",
+    "traer": "traj", "conducir": "conduj", "producir": "produj", "reducir": "reduj"
+}
+TERMINACIONES_FUERTES = "e iste o imos isteis ieron".split()
+
+# Verbos en -iar/-uar que acentúan la vocal débil (envío, evalúo)
+ACENTO_RAIZ = {"enviar": "í", "evaluar": "ú"}
+
+VOCALES = set("aeiouáéíóú")
+
+
+def _cambiar_raiz(raiz, cambio, infinitivo):
+    objetivo = "u" if infinitivo == "jugar" else ("e" if cambio in ("ie", "i") else "o")
+    pos = raiz.rfind(objetivo)
+    if pos < 0:
+        return raiz
+    return raiz[:pos] + cambio + raiz[pos + 1:]
+
+
+def _ajuste_ortografico(raiz, terminacion, grupo):
+    """Cambios de grafía de la raíz ante e (verbos en -ar) o ante a/o (en -er/-ir)."""
+    inicial = terminacion[:1].translate(str.maketrans("áéíóú", "aeiou"))
+    if grupo == "ar" and inicial == "e":
+        if raiz.endswith("z"):
+            return raiz[:-1] + "c"
+        if raiz.endswith("g"):
+            return raiz + "u"
+        if raiz.endswith("c"):
+            return raiz[:-1] + "qu"
+    elif grupo in ("er", "ir") and inicial in ("a", "o"):
+        if raiz.endswith("gu"):
+            return raiz[:-1]
+        if raiz.endswith("g"):
+            return raiz[:-1] + "j"
+        if raiz.endswith("c") and raiz[-2:-1] not in VOCALES:
+            return raiz[:-1] + "z"
+    return raiz
+
+
+def conjugar_verbo(infinitivo, tiempo, persona):
+    """
+    Conjuga un verbo en presente, indefinido, imperfecto o presente de
+    subjuntivo aplicando las irregularidades conocidas: paradigmas
+    irregulares, cambios vocálicos, primera persona en -go/-zco, pretéritos
+    fuertes, verbos en -uir y ajustes ortográficos (empecé, elijo, sigo).
+
+    Args:
+        infinitivo: Verbo en infinitivo
+        tiempo: Clave de TERMINACIONES
+        persona: Índice de persona (0 = yo ... 5 = ellos)
+
+    Returns:
+        str: Forma conjugada
+    """
+    irregular = IRREGULARES_MORFOLOGIA.get(infinitivo, {}).get(tiempo)
+    if irregular:
+        return irregular.split()[persona]
+
+    raiz, grupo = infinitivo[:-2], infinitivo[-2:]
+    terminacion = TERMINACIONES[tiempo][grupo].split()[persona]
+
+    if tiempo == "indefinido" and infinitivo in PRETERITOS_FUERTES:
+        fuerte = PRETERITOS_FUERTES[infinitivo]
+        final = TERMINACIONES_FUERTES[persona]
+        if fuerte.endswith("j") and final == "ieron":
+            final = "eron"
+        return fuerte + final
+
+    # Raíces terminadas en vocal (leer, creer, influir): leyó, leímos, influyo
+    if grupo in ("er", "ir") and raiz[-1:] in VOCALES and not raiz.endswith(("gu", "qu")):
+        if tiempo == "indefinido" and persona in (2, 5):
+            return raiz + ("yó" if persona == 2 else "yeron")
+        if infinitivo.endswith("uir"):
+            if (tiempo == "presente" and persona in (0, 1, 2, 5)) or tiempo == "subjuntivo":
+                return raiz + "y" + terminacion
+        elif terminacion.startswith("i"):
+            terminacion = "í" + terminacion[1:]
+
+    fija = None
+    if (tiempo == "presente" and persona == 0) or tiempo == "subjuntivo":
+        if infinitivo in RAIZ_PRIMERA_PERSONA:
+            fija = RAIZ_PRIMERA_PERSONA[infinitivo]
+        elif infinitivo.endswith(("cer", "cir")) and raiz[-2:-1] in VOCALES:
+            fija = raiz[:-1] + "zc"
+    if fija:
+        return fija + terminacion
+
+    cambio = CAMBIOS_RAIZ.get(infinitivo)
+    if cambio:
+        if tiempo in ("presente", "subjuntivo") and persona in (0, 1, 2, 5):
+            raiz = _cambiar_raiz(raiz, cambio, infinitivo)
+        elif grupo == "ir" and ((tiempo == "indefinido" and persona in (2, 5))
+                                or (tiempo == "subjuntivo" and persona in (3, 4))):
+            raiz = _cambiar_raiz(raiz, "u" if cambio == "ue" else "i", infinitivo)
+
+    acento = ACENTO_RAIZ.get(infinitivo)
+    if acento and tiempo in ("presente", "subjuntivo") and persona in (0, 1, 2, 5):
+        raiz = raiz[:-1] + acento
+
+    return _ajuste_ortografico(raiz, terminacion, grupo) + terminacion
+
+
+def _conjugar_regular(infinitivo, tiempo, persona):
+    return infinitivo[:-2] + TERMINACIONES[tiempo][infinitivo[-2:]].split()[persona]
+
+
+def paradigma_verbal(infinitivo, irregulares=()):
+    """
+    Formas de un verbo y formas erróneas previsibles.
+
+    Las formas erróneas son las que resultan de conjugar como regular un verbo
+    irregular (teno, dormo, hació), de poner tilde a los pretéritos fuertes y
+    a los monosílabos (tuvó, fué) o de regularizar el participio (escribido).
+
+    Args:
+        infinitivo: Verbo en infinitivo (sin "se")
+        irregulares: Formas adicionales de la lista de vocabulario
+
+    Returns:
+        tuple: (set de formas válidas, dict forma errónea -> forma correcta)
+    """
+    validas = {infinitivo, *irregulares}
+    erroneas = {}
+    grupo = infinitivo[-2:]
+    if grupo not in ("ar", "er", "ir"):
+        return validas, erroneas
+
+    for tiempo in TERMINACIONES:
+        for persona in range(6):
+            correcta = conjugar_verbo(infinitivo, tiempo, persona)
+            validas.add(correcta)
+            regular = _conjugar_regular(infinitivo, tiempo, persona)
+            if regular != correcta:
+                erroneas[regular] = correcta
+            if tiempo == "indefinido" and persona in (0, 2) and correcta[-1:] in "eoi":
+                erroneas[correcta[:-1] + correcta[-1].translate(str.maketrans("eoi", "éóí"))] = correcta
+
+    raiz = infinitivo[:-2]
+    # Gerundio
+    cambio = CAMBIOS_RAIZ.get(infinitivo)
+    if grupo == "ar":
+        validas.add(raiz + "ando")
+    elif raiz[-1:] in VOCALES and not raiz.endswith(("gu", "qu")):
+        validas.add(raiz + "yendo")
+    elif grupo == "ir" and cambio:
+        validas.add(_cambiar_raiz(raiz, "u" if cambio == "ue" else "i", infinitivo) + "iendo")
+    else:
+        validas.add(raiz + "iendo")
+
+    # Participio: si la lista da uno irregular, el regular es un error
+    regular = raiz + ("ado" if grupo == "ar" else ("ído" if raiz[-1:] in VOCALES else "ido"))
+    irregular = next((f for f in irregulares if f.endswith(("to", "cho"))), None)
+    if irregular:
+        erroneas[regular] = irregular
+    else:
+        validas.add(regular)
+    participio = irregular or regular
+    validas.update({participio[:-1] + "a", participio + "s", participio[:-1] + "as"})
+
+    return validas, {e: c for e, c in erroneas.items() if e not in validas}
+
+
+# --- Léxico compilado ---
+
+# Cabecera: firma, versión, número de análisis y de cadenas. Siguen las
+# claves (uint64 ordenadas), el lema y la sugerencia de cada análisis
+# (índices uint32 en la tabla de cadenas), los offsets de las cadenas
+# (uint32), categoría, género y número (uint8) y el texto de las cadenas.
+FIRMA = b"TCMF"
+VERSION_FORMATO = 1
+CABECERA = struct.Struct("<4sIQQ")
+
+
+def analisis_lista(ruta_lista):
+    """
+    Análisis morfológicos de todas las formas que genera la lista de vocabulario.
+
+    Returns:
+        set: Tuplas (forma, categoria, genero, numero, lema, sugerencia)
+    """
+    analisis = set()
+    erroneas = {}
+
+    def anadir(forma, categoria, genero=SIN_GENERO, numero=SIN_NUMERO, lema="", sugerencia=""):
+        analisis.add((forma, categoria, genero, numero, lema, sugerencia))
+
+    for lema, categoria, _, irregulares in leer_lista(ruta_lista):
+        if " " in lema:
+            continue
+        if categoria == "n":
+            if lema in PLURALIA_TANTUM:
+                anadir(lema, SUSTANTIVO, GENEROS[PLURALIA_TANTUM[lema]], PLURAL, lema)
+                continue
+            genero = GENEROS[genero_sustantivo(lema)]
+            forma_plural = PLURALES_IRREGULARES.get(lema) or plural(lema)
+            if forma_plural == lema:
+                anadir(lema, SUSTANTIVO, genero, INVARIABLE, lema)
+            else:
+                anadir(lema, SUSTANTIVO, genero, SINGULAR, lema)
+                anadir(forma_plural, SUSTANTIVO, genero, PLURAL, lema)
+        elif categoria == "adj":
+            generos = (MASCULINO, FEMENINO) if femenino(lema) != lema else (COMUN,)
+            for genero in generos:
+                for numero in (SINGULAR, PLURAL):
+                    anadir(flexionar_adjetivo(lema, genero, numero), ADJETIVO, genero, numero, lema)
+        elif categoria == "v":
+            infinitivo = lema[:-2] if lema.endswith("se") else lema
+            validas, erroneas_verbo = paradigma_verbal(infinitivo, irregulares)
+            for forma in validas:
+                anadir(forma, VERBO, lema=infinitivo)
+            for forma, correcta in erroneas_verbo.items():
+                erroneas.setdefault(forma, (infinitivo, correcta))
+        else:
+            anadir(lema, OTRA)
+
+    for forma in PALABRAS_FUNCIONALES | set(DETERMINANTES):
+        anadir(forma, OTRA)
+
+    # Una forma errónea solo se marca si no es válida para ningún lema
+    validas = {a[0] for a in analisis}
+    for forma, (infinitivo, correcta) in erroneas.items():
+        if forma not in validas and len(forma) >= 3:
+            anadir(forma, FORMA_ERRONEA, lema=infinitivo, sugerencia=correcta)
+    return analisis
+
+
+def construir_lexico(ruta_lista, ruta_lexico):
+    """
+    Compila el léxico morfológico de la lista de vocabulario en un fichero
+    binario que se puede proyectar en memoria.
+
+    Returns:
+        int: Número de análisis
+    """
+    import numpy as np
+
+    filas = sorted((clave_palabra(forma), cat, gen, num, lema, sug)
+                   for forma, cat, gen, num, lema, sug in analisis_lista(ruta_lista))
+    cadenas = [""]
+    indice_cadena = {"": 0}
+    for *_, lema, sugerencia in filas:
+        for cadena in (lema, sugerencia):
+            if cadena not in indice_cadena:
+                indice_cadena[cadena] = len(cadenas)
+                cadenas.append(cadena)
+
+    codificadas = [c.encode("utf-8") for c in cadenas]
+    offsets = np.zeros(len(codificadas) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(c) for c in codificadas])
+
+    columnas = [
+        np.array([f[0] for f in filas], dtype="<u8"),
+        np.array([indice_cadena[f[4]] for f in filas], dtype="<u4"),
+        np.array([indice_cadena[f[5]] for f in filas], dtype="<u4"),
+        offsets,
+        np.array([f[1] for f in filas], dtype="u1"),
+        np.array([f[2] for f in filas], dtype="u1"),
+        np.array([f[3] for f in filas], dtype="u1")
+    ]
+
+    directorio = os.path.dirname(ruta_lexico)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directorio or None, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(CABECERA.pack(FIRMA, VERSION_FORMATO, len(filas), len(cadenas)))
+            for columna in columnas:
+                f.write(columna.tobytes())
+            f.write(b"".join(codificadas))
+        os.replace(tmp_path, ruta_lexico)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(filas)
+
+
+class MorphLexicon:
+    """
+    Léxico morfológico proyectado en memoria.
+
+    Cada forma puede tener varios análisis (p. ej. "casa": sustantivo y
+    verbo), guardados en posiciones contiguas del array ordenado de claves;
+    una búsqueda binaria vectorizada localiza el rango de todas las formas de
+    un texto a la vez.
+
+    Args:
+        ruta_lexico: Fichero compilado con construir_lexico
+    """
+
+    def __init__(self, ruta_lexico):
+        import numpy as np
+
+        with open(ruta_lexico, "rb") as f:
+            firma, version, n, m = CABECERA.unpack(f.read(CABECERA.size))
+        if firma != FIRMA or version != VERSION_FORMATO:
+            raise ValueError(f"Léxico morfológico no válido: {ruta_lexico}")
+
+        self.ruta = ruta_lexico
+        inicio = CABECERA.size
+
+        def columna(dtype, longitud):
+            # Vista ndarray sobre el mmap (sin la sobrecarga de np.memmap al indexar)
+            nonlocal inicio
+            array = np.memmap(ruta_lexico, dtype=dtype, mode="r", offset=inicio, shape=(longitud,))
+            inicio += array.nbytes
+            return np.asarray(array)
+
+        self._claves = columna("<u8", n)
+        self._lemas = columna("<u4", n)
+        self._sugerencias = columna("<u4", n)
+        self._offsets = columna("<u4", m + 1)
+        self._categorias = columna("u1", n)
+        self._generos = columna("u1", n)
+        self._numeros = columna("u1", n)
+        self._texto = columna("u1", int(self._offsets[-1]))
+        self._cadenas = {0: ""}
+
+    def __len__(self):
+        return len(self._claves)
+
+    def _cadena(self, indice):
+        # La tabla de cadenas es pequeña (lemas y sugerencias): se decodifica
+        # cada una la primera vez que se usa
+        cadena = self._cadenas.get(indice)
+        if cadena is None:
+            inicio, fin = int(self._offsets[indice]), int(self._offsets[indice + 1])
+            cadena = self._cadenas[indice] = self._texto[inicio:fin].tobytes().decode("utf-8")
+        return cadena
+
+    def analizar(self, palabras):
+        """
+        Análisis de varias palabras a la vez.
+
+        Args:
+            palabras: Lista de palabras en minúsculas
+
+        Returns:
+            list: Por palabra, lista de tuplas (categoria, genero, numero,
+                  lema, sugerencia); vacía si la palabra no está
+        """
+        import numpy as np
+
+        if not palabras:
+            return []
+        claves = np.fromiter(map(clave_palabra, palabras), dtype="<u8", count=len(palabras))
+        desde = np.searchsorted(self._claves, claves, side="left")
+        hasta = np.searchsorted(self._claves, claves, side="right")
+
+        # Posiciones de todos los análisis encontrados, en orden de palabra
+        cuantos = hasta - desde
+        posiciones = np.repeat(desde - np.cumsum(cuantos) + cuantos, cuantos) + np.arange(cuantos.sum())
+        filas = zip(self._categorias[posiciones].tolist(), self._generos[posiciones].tolist(),
+                    self._numeros[posiciones].tolist(), self._lemas[posiciones].tolist(),
+                    self._sugerencias[posiciones].tolist())
+        analisis = [(c, g, n, self._cadena(lema), self._cadena(sug)) for c, g, n, lema, sug in filas]
+
+        resultado = []
+        inicio = 0
+        for cuantos_palabra in cuantos.tolist():
+            resultado.append(analisis[inicio:inicio + cuantos_palabra])
+            inicio += cuantos_palabra
+        return resultado
+
+
+def cargar_lexico(ruta_lista=DEFAULT_LISTA_PATH, directorio=DEFAULT_INDEX_DIR):
+    """
+    Abre el léxico compilado de la lista indicada, compilándolo antes si no
+    existe. El nombre del fichero incluye un resumen de la lista y de las
+    tablas de este módulo.
+
+    Returns:
+        MorphLexicon: Léxico proyectado en memoria
+    """
+    h = hashlib.sha256()
+    with open(ruta_lista, "rb") as f:
+        h.update(f.read())
+    for tabla in (GENERO_EXCEPCIONES, PLURALIA_TANTUM, PLURALES_IRREGULARES, IRREGULARES_MORFOLOGIA,
+                  CAMBIOS_RAIZ, RAIZ_PRIMERA_PERSONA, PRETERITOS_FUERTES, ACENTO_RAIZ):
+        h.update(repr(sorted(tabla.items())).encode("utf-8"))
+    nombre = os.path.splitext(os.path.basename(ruta_lista))[0]
+    ruta_lexico = os.path.join(directorio, f"{nombre}-morfologia-{h.hexdigest()[:16]}.idx")
+
+    if not os.path.exists(ruta_lexico):
+        total = construir_lexico(ruta_lista, ruta_lexico)
+        logger.info(f"Léxico morfológico compilado: {total} análisis en {ruta_lexico}")
+    return MorphLexicon(ruta_lexico)
+
+
+_lexico = None
+_lexico_lock = threading.Lock()
+
+
+def get_lexico_morfologico():
+    """Léxico morfológico compartido del proceso (None si no se pudo cargar)."""
+    global _lexico
+    with _lexico_lock:
+        if _lexico is None:
+            try:
+                _lexico = cargar_lexico()
+            except Exception as e:
+                logger.error(f"No se pudo cargar el léxico morfológico: {e}")
+                return None
+        return _lexico
+
+
+# --- Comprobaciones ---
+
+RE_PALABRA = re.compile(r"[a-záéíóúüñ]+")
+
+EXPLICACIONES = {
+    "concordancia_determinante": {
+        "Español": "El determinante tiene que concordar en género y número con el sustantivo «{sustantivo}».",
+        "Inglés": "The determiner must agree in gender and number with the noun «{sustantivo}».",
+        "Francés": "Le déterminant doit s'accorder en genre et en nombre avec le nom «{sustantivo}»."
+    },
+    "concordancia_adjetivo": {
+        "Español": "El adjetivo tiene que concordar en género y número con el sustantivo «{sustantivo}».",
+        "Inglés": "The adjective must agree in gender and number with the noun «{sustantivo}».",
+        "Francés": "L'adjectif doit s'accorder en genre et en nombre avec le nom «{sustantivo}»."
+    },
+    "forma_verbal": {
+        "Español": "«{forma}» no es una forma correcta del verbo «{verbo}».",
+        "Inglés": "«{forma}» is not a correct form of the verb «{verbo}».",
+        "Francés": "«{forma}» n'est pas une forme correcte du verbe «{verbo}»."
+    }
+}
+
+
+def _hallazgo(regla, texto, inicio, fin, correccion, idioma, **datos):
+    explicaciones = EXPLICACIONES[regla]
+    return {
+        "regla": regla,
+        "categoria": "Gramática",
+        "fragmento_erroneo": texto[inicio:fin],
+        "correccion": correccion,
+        "explicacion": explicaciones.get(idioma, explicaciones["Español"]).format(**datos),
+        "inicio": inicio,
+        "fin": fin
+    }
+
+
+def _revisar(texto, idioma, lexico, comprobaciones):
+    """Analiza el texto una sola vez y aplica las comprobaciones indicadas."""
+    lexico = lexico or get_lexico_morfologico()
+    if lexico is None:
+        return []
+
+    texto = unicodedata.normalize("NFC", texto or "")
+    tokens = list(RE_PALABRA.finditer(texto.lower()))
+    analisis = lexico.analizar([t.group() for t in tokens])
+    hallazgos = []
+    for comprobacion in comprobaciones:
+        hallazgos.extend(comprobacion(texto, tokens, analisis, idioma))
+    return hallazgos
+
+
+def _contiguas(texto, anterior, siguiente):
+    """Comprueba que entre dos tokens solo hay espacios."""
+    return not texto[anterior.end():siguiente.start()].strip()
+
+
+def _conservar_mayuscula(original, correccion):
+    if original[:1].isupper():
+        return correccion[:1].upper() + correccion[1:]
+    return correccion
+
+
+def _concuerda(genero_a, numero_a, genero_b, numero_b):
+    return (genero_a == genero_b or COMUN in (genero_a, genero_b)) \
+        and (numero_a == numero_b or INVARIABLE in (numero_a, numero_b))
+
+
+def revisar_concordancia(texto, idioma="Español", lexico=None):
+    """
+    Detecta la falta de concordancia de género y número entre determinante,
+    sustantivo y adjetivo ("la problema", "unos casa", "el coche roja").
+
+    Args:
+        texto: Texto del estudiante
+        idioma: Idioma de las explicaciones
+        lexico: MorphLexicon (por defecto, el compartido del proceso)
+
+    Returns:
+        list: Hallazgos con fragmento_erroneo, correccion, explicacion y offsets
+    """
+    return _revisar(texto, idioma, lexico, (_concordancia,))
+
+
+def _concordancia(texto, tokens, analisis, idioma):
+    hallazgos = []
+    for i, token in enumerate(tokens[:-1]):
+        determinantes = DETERMINANTES.get(token.group())
+        siguiente = tokens[i + 1]
+        if not determinantes or not _contiguas(texto, token, siguiente):
+            continue
+        nombre = [a for a in analisis[i + 1] if a[0] == SUSTANTIVO]
+        if not nombre:
+            continue
+        if token.group() in CLITICOS and any(a[0] == VERBO for a in analisis[i + 1]):
+            continue
+
+        _, genero, numero, lema, _ = nombre[0]
+        a_tonica = lema in A_TONICA
+        concuerda = any(
+            g == MASCULINO and n == SINGULAR if a_tonica and serie in SERIES_A_TONICA and numero == SINGULAR
+            else _concuerda(g, n, genero, numero)
+            for serie, g, n in determinantes
+            for _, genero, numero, _, _ in nombre)
+        if not concuerda:
+            serie = determinantes[0][0]
+            numero_correcto = determinantes[0][2] if numero == INVARIABLE else numero
+            genero_correcto = MASCULINO if genero == COMUN else genero
+            correcta = forma_determinante(serie, genero_correcto, numero_correcto, a_tonica)
+            fragmento = texto[token.start():siguiente.end()]
+            hallazgos.append(_hallazgo(
+                "concordancia_determinante", texto, token.start(), siguiente.end(),
+                _conservar_mayuscula(fragmento, f"{correcta} {texto[siguiente.start():siguiente.end()]}"),
+                idioma, sustantivo=siguiente.group()))
+
+        # Adjetivo pospuesto
+        if i + 2 >= len(tokens) or not _contiguas(texto, siguiente, tokens[i + 2]):
+            continue
+        adjetivo = tokens[i + 2]
+        lecturas = analisis[i + 2]
+        if not lecturas or any(a[0] != ADJETIVO for a in lecturas):
+            continue
+        if any(_concuerda(g, n, genero_n, numero_n)
+               for _, g, n, _, _ in lecturas
+               for _, genero_n, numero_n, _, _ in nombre):
+            continue
+        genero_correcto = FEMENINO if genero == FEMENINO or (genero == COMUN and a_tonica) else MASCULINO
+        numero_correcto = PLURAL if numero == PLURAL else SINGULAR
+        if genero == COMUN or numero == INVARIABLE:
+            # El sustantivo no fija uno de los rasgos: se mantiene el del adjetivo
+            _, g_adj, n_adj, _, _ = lecturas[0]
+            genero_correcto = g_adj if genero == COMUN else genero_correcto
+            numero_correcto = n_adj if numero == INVARIABLE else numero_correcto
+        correcta = flexionar_adjetivo(lecturas[0][3], genero_correcto, numero_correcto)
+        hallazgos.append(_hallazgo(
+            "concordancia_adjetivo", texto, siguiente.start(), adjetivo.end(),
+            f"{texto[siguiente.start():siguiente.end()]} {correcta}",
+            idioma, sustantivo=siguiente.group()))
+
+    return hallazgos
+
+
+def revisar_formas_verbales(texto, idioma="Español", lexico=None):
+    """
+    Detecta formas verbales inexistentes de verbos irregulares (teno, dormo,
+    hació, tuvó, escribido) y propone la forma correcta.
+
+    Args:
+        texto: Texto del estudiante
+        idioma: Idioma de las explicaciones
+        lexico: MorphLexicon (por defecto, el compartido del proceso)
+
+    Returns:
+        list: Hallazgos con fragmento_erroneo, correccion, explicacion y offsets
+    """
+    return _revisar(texto, idioma, lexico, (_formas_verbales,))
+
+
+def _formas_verbales(texto, tokens, analisis, idioma):
+    hallazgos = []
+    for i, (token, lecturas) in enumerate(zip(tokens, analisis)):
+        erronea = next((a for a in lecturas if a[0] == FORMA_ERRONEA), None)
+        if erronea is None:
+            continue
+        # Tras un determinante se trata de un sustantivo ("el cerro")
+        if i and tokens[i - 1].group() in DETERMINANTES and _contiguas(texto, tokens[i - 1], token):
+            continue
+        original = texto[token.start():token.end()]
+        hallazgos.append(_hallazgo(
+            "forma_verbal", texto, token.start(), token.end(),
+            _conservar_mayuscula(original, erronea[4]), idioma,
+            forma=original, verbo=erronea[3]))
+    return hallazgos
+
+
+def revisar_morfologia(texto, idioma="Español", lexico=None):
+    """
+    Aplica todas las comprobaciones morfológicas (concordancia y formas
+    verbales) con un único análisis del texto.
+
+    Returns:
+        list: Hallazgos de la categoría "Gramática"
+    """
+    hallazgos = _revisar(texto, idioma, lexico, (_concordancia, _formas_verbales))
+    hallazgos.sort(key=lambda h: (h["inicio"], h["fin"]))
+    return hallazgos
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from span_index import normalizar
+
+# Similitud de Jaccard mínima (estimada) para considerar dos textos casi iguales
+UMBRAL_JACCARD = float(os.environ.get("TEXTOCORRECTOR_UMBRAL_DUPLICADOS", "0.8"))
+
+NUM_PERMUTACIONES = 64
+BANDAS = 16
+PALABRAS_POR_SHINGLE = 3
+MAX_ENTRADAS = 1000
+TTL_ENTRADAS = 24 * 3600
+
+# Hash universal (a·x + b) mod p sobre hashes de 32 bits: a·x + b cabe en 64 bits
+PRIMO_MERSENNE = (1 << 61) - 1
+MASCARA_32 = (1 << 32) - 1
+
+
+def shingles(texto, k=PALABRAS_POR_SHINGLE):
+    """
+    Conjunto de secuencias de k palabras consecutivas del texto normalizado
+    (minúsculas, sin tildes y con los espacios colapsados).
+
+    Args:
+        texto: Texto
+        k: Palabras por shingle
+
+    Returns:
+        set: Shingles del texto (vacío si no tiene palabras)
+    """
+    palabras = normalizar(texto or "").split()
+    if len(palabras) <= k:
+        return {" ".join(palabras)} if palabras else set()
+    return {" ".join(palabras[i:i + k]) for i in range(len(palabras) - k + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    Índice MinHash/LSH de textos recientes para encontrar casi duplicados.
+
+    La firma de cada texto son los mínimos de NUM_PERMUTACIONES funciones hash
+    sobre sus shingles; la proporción de mínimos iguales estima la similitud
+    de Jaccard. La firma se divide en bandas y dos textos son candidatos si
+    coinciden en alguna banda entera, así que una búsqueda solo compara con
+    unos pocos textos. El índice guarda como mucho max_entradas textos (se
+    desaloja el usado hace más tiempo) y cada uno caduca a los ttl segundos
+    de su último uso.
+
+    Args:
+        umbral: Similitud de Jaccard mínima para devolver un resultado
+        num_perm: Número de funciones hash de la firma
+        bandas: Número de bandas LSH (debe dividir a num_perm)
+        max_entradas: Número máximo de textos en el índice
+        ttl: Segundos de vida de cada entrada (None = sin caducidad)
+        semilla: Semilla de las funciones hash
+    """
+
+    def __init__(self, umbral=UMBRAL_JACCARD, num_perm=NUM_PERMUTACIONES, bandas=BANDAS,
+                 max_entradas=MAX_ENTRADAS, ttl=TTL_ENTRADAS, semilla=1):
+        import numpy as np
+
+        if num_perm % bandas:
+            raise ValueError("El número de bandas debe dividir al de permutaciones")
+
+        self.umbral = umbral
+        self.num_perm = num_perm
+        self.bandas = bandas
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+
+        rng = np.random.default_rng(semilla)
+        self._a = rng.integers(1, MASCARA_32, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, MASCARA_32, size=num_perm, dtype=np.uint64)[:, None]
+
+        self._entradas = OrderedDict()  # id -> (firma, expira_en, valor)
+        self._cubetas = {}              # (banda, bytes de la banda) -> set de ids
+        self._siguiente_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def firma(self, texto):
+        """Firma MinHash del texto (array de num_perm enteros) o None si no tiene palabras."""
+        import numpy as np
+
+        conjunto = shingles(texto)
+        if not conjunto:
+            return None
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in conjunto),
+                        dtype=np.uint64, count=len(conjunto))
+        hashes = (self._a * x + self._b) % np.uint64(PRIMO_MERSENNE) & np.uint64(MASCARA_32)
+        return hashes.min(axis=1)
+
+    def _claves_bandas(self, firma):
+        filas = self.num_perm // self.bandas
+        return [(i, firma[i * filas:(i + 1) * filas].tobytes()) for i in range(self.bandas)]
+
+    def _eliminar(self, id_entrada):
+        firma, _, _ = self._entradas.pop(id_entrada)
+        for clave in self._claves_bandas(firma):
+            ids = self._cubetas.get(clave)
+            if ids is not None:
+                ids.discard(id_entrada)
+                if not ids:
+                    del self._cubetas[clave]
+
+    def _purgar_caducadas(self, ahora):
+        # Las entradas están ordenadas por caducidad (el TTL es el mismo para
+        # todas y se renueva al usarlas): basta mirar las primeras
+        for id_entrada, (_, expira_en, _) in list(self._entradas.items()):
+            if expira_en is None or expira_en > ahora:
+                break
+            self._eliminar(id_entrada)
+
+    def agregar(self, texto, valor, firma=None):
+        """
+        Añade un texto al índice.
+
+        Args:
+            texto: Texto
+            valor: Dato asociado que devolverá buscar
+            firma: Firma ya calculada del texto (opcional)
+
+        Returns:
+            int: Identificador de la entrada, o None si el texto no tiene palabras
+        """
+        firma = self.firma(texto) if firma is None else firma
+        if firma is None:
+            return None
+
+        ahora = time.monotonic()
+        with self._lock:
+            self._purgar_caducadas(ahora)
+            id_entrada = self._siguiente_id
+            self._siguiente_id += 1
+            expira_en = ahora + self.ttl if self.ttl else None
+            self._entradas[id_entrada] = (firma, expira_en, valor)
+            for clave in self._claves_bandas(firma):
+                self._cubetas.setdefault(clave, set()).add(id_entrada)
+            while len(self._entradas) > self.max_entradas:
+                self._eliminar(next(iter(self._entradas)))
+        return id_entrada
+
+    def buscar(self, texto, firma=None, aceptar=None):
+        """
+        Busca el texto indexado más parecido por encima del umbral.
+
+        Args:
+            texto: Texto
+            firma: Firma ya calculada del texto (opcional)
+            aceptar: Función valor -> bool para descartar candidatos (opcional)
+
+        Returns:
+            tuple: (valor, similitud estimada) o None si no hay ninguno
+        """
+        firma = self.firma(texto) if firma is None else firma
+        if firma is None:
+            return None
+
+        ahora = time.monotonic()
+        with self._lock:
+            candidatos = set()
+            for clave in self._claves_bandas(firma):
+                candidatos |= self._cubetas.get(clave, set())
+
+            mejor = None
+            for id_entrada in candidatos:
+                firma_c, expira_en, valor = self._entradas[id_entrada]
+                if expira_en is not None and expira_en <= ahora:
+                    continue
+                if aceptar is not None and not aceptar(valor):
+                    continue
+                similitud = float((firma_c == firma).mean())
+                if similitud >= self.umbral and (mejor is None or similitud > mejor[1]):
+                    mejor = (id_entrada, similitud)
+
+            if mejor is None:
+                self.misses += 1
+                return None
+            # Un acierto renueva la entrada: los textos que se repiten se conservan
+            self.hits += 1
+            firma_c, _, valor = self._entradas.pop(mejor[0])
+            self._entradas[mejor[0]] = (firma_c, ahora + self.ttl if self.ttl else None, valor)
+            return valor, mejor[1]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entradas)
+
+    def stats(self):
+        with self._lock:
+            return {"entradas": len(self._entradas), "cubetas": len(self._cubetas),
+                    "hits": self.hits, "misses": self.misses}
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def get_indice_duplicados():
+    """Índice compartido de los textos corregidos recientemente."""
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            _indice = NearDuplicateIndex()
+        return _indice
@@ -0,0 +1,342 @@
+import re
+import unicodedata
+
+from morphology import revisar_morfologia
+
+ORIGEN_LOCAL = "revision_local"
+
+# Interrogativos y exclamativos que llevan tilde al principio de una pregunta
+# o exclamación directa
+INTERROGATIVOS = {
+    "que": "qué", "como": "cómo", "donde": "dónde", "adonde": "adónde",
+    "cuando": "cuándo", "quien": "quién", "quienes": "quiénes",
+    "cual": "cuál", "cuales": "cuáles", "cuanto": "cuánto", "cuanta": "cuánta",
+    "cuantos": "cuántos", "cuantas": "cuántas"
+}
+
+# Preposiciones que pueden preceder al interrogativo ("¿de dónde...?")
+PREPOSICIONES_INTERROGATIVO = {"a", "de", "en", "con", "por", "para", "desde", "hasta", "hacia", "sobre"}
+
+# Palabras frecuentes cuya forma sin tilde no existe en español
+TILDES_OBLIGATORIAS = {
+    "tambien": "también", "despues": "después", "ademas": "además", "aqui": "aquí",
+    "alli": "allí", "ahi": "ahí", "asi": "así", "facil": "fácil", "dificil": "difícil",
+    "musica": "música", "telefono": "teléfono", "pais": "país",
+    "dia": "día", "dias": "días",
+    "proximo": "próximo", "proxima": "próxima", "rapido": "rápido", "rapida": "rápida",
+    "estan": "están", "autobus": "autobús", "cafe": "café",
+    "frances": "francés", "aleman": "alemán", "leccion": "lección",
+    "cancion": "canción", "corazon": "corazón", "razon": "razón", "habitacion": "habitación",
+    "informacion": "información", "educacion": "educación", "situacion": "situación",
+    "arbol": "árbol", "lapiz": "lápiz", "examenes": "exámenes",
+    "jovenes": "jóvenes", "sabado": "sábado", "miercoles": "miércoles", "tenia": "tenía",
+    "tenian": "tenían", "habia": "había", "habian": "habían", "queria": "quería",
+    "podia": "podía", "vivia": "vivía"
+}
+
+# Formas que sin tilde también existen como verbo ("yo numero", "él pagina"):
+# solo se señalan tras un determinante, donde son sustantivo o adjetivo
+TILDES_TRAS_DETERMINANTE = {
+    "numero": "número", "pagina": "página", "medico": "médico",
+    "ultimo": "último", "ultima": "última", "ultimos": "últimos", "ultimas": "últimas"
+}
+
+DETERMINANTES = {"el", "la", "los", "las", "un", "una", "unos", "unas", "al", "del",
+                 "este", "esta", "estos", "estas", "ese", "esa", "esos", "esas",
+                 "aquel", "aquella", "aquellos", "aquellas", "mi", "mis", "tu", "tus",
+                 "su", "sus", "nuestro", "nuestra", "vuestro", "vuestra"}
+
+ABREVIATURAS = {"etc", "sr", "sra", "srta", "dr", "dra", "ej", "pág", "pag", "aprox",
+                "núm", "num", "vs", "ud", "uds", "tel", "av", "avda", "p"}
+
+RE_PALABRA = re.compile(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñ]+")
+RE_SEGMENTO = re.compile(r"[^.!?…\n]*[.!?…]+|[^.!?…\n]+")
+RE_ESPACIOS_DOBLES = re.compile(r"(\S+)([ \t]{2,})(?=(\S+))")
+RE_ESPACIO_ANTES = re.compile(r"([A-Za-zÁÉÍÓÚÜÑáéíóúüñ0-9]+)([ \t]+)([,.;:!?)»…]+)")
+# Palabras completas a ambos lados del signo: tras el punto solo palabras en
+# minúscula o con mayúscula inicial (no siglas como "EE.UU.")
+RE_FALTA_ESPACIO = re.compile(
+    r"(?<![A-Za-zÁÉÍÓÚÜÑáéíóúüñ.])([A-Za-zÁÉÍÓÚÜÑáéíóúüñ]{2,})([,;:])(?=([A-Za-zÁÉÍÓÚÜÑáéíóúüñ]+))"
+    r"|(?<![A-Za-zÁÉÍÓÚÜÑáéíóúüñ.])([A-ZÁÉÍÓÚÑa-záéíóúüñ][a-záéíóúüñ]+)(\.)"
+    r"(?=([A-ZÁÉÍÓÚÑ][a-záéíóúüñ]+))")
+# La palabra anterior incluye sus puntos internos ("EE.UU", "p") para
+# reconocer abreviaturas; la siguiente va en una búsqueda hacia delante para
+# que no la consuma la coincidencia (en "p. m. ahora" cada punto se mira aparte)
+RE_MINUSCULA_TRAS_PUNTO = re.compile(
+    r"([A-Za-zÁÉÍÓÚÜÑáéíóúüñ0-9]+(?:\.[A-Za-zÁÉÍÓÚÜÑáéíóúüñ0-9]+)*)?"
+    r"([.!?…]+[ \t]+|[.!?…]+\n\s*)(?=([a-záéíóúüñ][a-záéíóúüñ]*))")
+
+EXPLICACIONES = {
+    "espacios_dobles": {
+        "Español": "Sobra un espacio: entre dos palabras se escribe un solo espacio.",
+        "Inglés": "Extra space: only one space is written between two words.",
+        "Francés": "Espace en trop : on écrit un seul espace entre deux mots."
+    },
+    "espacio_antes": {
+        "Español": "En español no se deja espacio antes de la coma, el punto, los dos puntos, el punto y coma ni los signos de cierre.",
+        "Inglés": "In Spanish there is no space before commas, full stops, colons, semicolons or closing marks.",
+        "Francés": "En espagnol, on ne met pas d'espace avant la virgule, le point, les deux-points, le point-virgule ni les signes fermants."
+    },
+    "falta_espacio": {
+        "Español": "Después de un signo de puntuación se deja un espacio antes de la palabra siguiente.",
+        "Inglés": "A space is needed after a punctuation mark before the next word.",
+        "Francés": "Il faut un espace après un signe de ponctuation avant le mot suivant."
+    },
+    "mayuscula": {
+        "Español": "Después de punto (y al principio del texto) se escribe mayúscula.",
+        "Inglés": "A capital letter is needed after a full stop and at the beginning of the text.",
+        "Francés": "Il faut une majuscule après un point et au début du texte."
+    },
+    "apertura_interrogacion": {
+        "Español": "En español las preguntas llevan signo de apertura (¿) además del de cierre (?).",
+        "Inglés": "Spanish questions need an opening question mark (¿) as well as the closing one (?).",
+        "Francés": "En espagnol, les questions prennent un point d'interrogation ouvrant (¿) en plus du fermant (?)."
+    },
+    "apertura_exclamacion": {
+        "Español": "En español las exclamaciones llevan signo de apertura (¡) además del de cierre (!).",
+        "Inglés": "Spanish exclamations need an opening exclamation mark (¡) as well as the closing one (!).",
+        "Francés": "En espagnol, les exclamations prennent un point d'exclamation ouvrant (¡) en plus du fermant (!)."
+    },
+    "tilde_interrogativo": {
+        "Español": "Los interrogativos y exclamativos (qué, cómo, dónde, cuándo...) llevan tilde en las preguntas y exclamaciones.",
+        "Inglés": "Question and exclamation words (qué, cómo, dónde, cuándo...) take a written accent in questions and exclamations.",
+        "Francés": "Les mots interrogatifs et exclamatifs (qué, cómo, dónde, cuándo...) prennent un accent écrit dans les questions et les exclamations."
+    },
+    "tilde_obligatoria": {
+        "Español": "Esta palabra lleva tilde.",
+        "Inglés": "This word takes a written accent.",
+        "Francés": "Ce mot prend un accent écrit."
+    }
+}
+
+CATEGORIA_REGLA = {
+    "tilde_interrogativo": "Léxico",
+    "tilde_obligatoria": "Léxico"
+}
+
+
+def _conservar_mayuscula(original, correccion):
+    if original[:1].isupper():
+        return correccion[:1].upper() + correccion[1:]
+    return correccion
+
+
+def _hallazgo(regla, texto, inicio, fin, correccion, idioma):
+    explicaciones = EXPLICACIONES[regla]
+    return {
+        "regla": regla,
+        "categoria": CATEGORIA_REGLA.get(regla, "Puntuación"),
+        "fragmento_erroneo": texto[inicio:fin],
+        "correccion": correccion,
+        "explicacion": explicaciones.get(idioma, explicaciones["Español"]),
+        "inicio": inicio,
+        "fin": fin
+    }
+
+
+# --- Reglas ---
+
+def _espacios(texto, idioma):
+    hallazgos = []
+    for m in RE_ESPACIOS_DOBLES.finditer(texto):
+        fin = m.end() + len(m.group(3))
+        hallazgos.append(_hallazgo("espacios_dobles", texto, m.start(), fin,
+                                   f"{m.group(1)} {m.group(3)}", idioma))
+    for m in RE_ESPACIO_ANTES.finditer(texto):
+        hallazgos.append(_hallazgo("espacio_antes", texto, m.start(), m.end(),
+                                   m.group(1) + m.group(3), idioma))
+    for m in RE_FALTA_ESPACIO.finditer(texto):
+        palabra, signo, siguiente = (m.group(1), m.group(2), m.group(3)) if m.group(1) \
+            else (m.group(4), m.group(5), m.group(6))
+        hallazgos.append(_hallazgo("falta_espacio", texto, m.start(), m.end() + len(siguiente),
+                                   f"{palabra}{signo} {siguiente}", idioma))
+    return hallazgos
+
+
+def _mayusculas(texto, idioma):
+    hallazgos = []
+    primera = RE_PALABRA.search(texto)
+    if primera and primera.group().islower() and not texto[:primera.start()].strip(" \t\n¿¡\"'«("):
+        palabra = primera.group()
+        hallazgos.append(_hallazgo("mayuscula", texto, primera.start(), primera.end(),
+                                   palabra[0].upper() + palabra[1:], idioma))
+
+    for m in RE_MINUSCULA_TRAS_PUNTO.finditer(texto):
+        anterior = (m.group(1) or "").lower()
+        signos = m.group(2).rstrip()
+        palabra = m.group(3)
+        # Los puntos suspensivos no cierran necesariamente la oración
+        if "..." in signos or "…" in signos:
+            continue
+        # Abreviaturas: conocidas, de una letra o con puntos internos
+        if signos.startswith(".") and (anterior in ABREVIATURAS or len(anterior) == 1
+                                       or "." in anterior or palabra in ABREVIATURAS):
+            continue
+        hallazgos.append(_hallazgo("mayuscula", texto, m.start(), m.end() + len(palabra),
+                                   (m.group(1) or "") + m.group(2) + palabra[0].upper() + palabra[1:],
+                                   idioma))
+    return hallazgos
+
+
+def _preguntas_y_exclamaciones(texto, idioma):
+    hallazgos = []
+    for m in RE_SEGMENTO.finditer(texto):
+        segmento = m.group()
+        cierre = segmento.rstrip()[-1:]
+        if cierre not in "?!":
+            continue
+        apertura = "¿" if cierre == "?" else "¡"
+        palabras = list(RE_PALABRA.finditer(segmento))
+        if not palabras:
+            continue
+
+        # Inicio de la pregunta: el signo de apertura, el primer interrogativo
+        # o, si no hay ninguno, la primera palabra del segmento
+        pos_apertura = segmento.find(apertura)
+        if pos_apertura >= 0:
+            candidatas = [p for p in palabras if p.start() > pos_apertura]
+        else:
+            candidatas = palabras
+            for i, p in enumerate(palabras):
+                if p.group().lower() in INTERROGATIVOS:
+                    previa = palabras[i - 1] if i else None
+                    if previa is not None and previa.group().lower() in PREPOSICIONES_INTERROGATIVO \
+                            and segmento[previa.end():p.start()].strip() == "":
+                        candidatas = palabras[i - 1:]
+                    else:
+                        candidatas = palabras[i:]
+                    break
+            inicio = m.start() + candidatas[0].start()
+            fin = m.start() + len(segmento.rstrip())
+            regla = "apertura_interrogacion" if cierre == "?" else "apertura_exclamacion"
+            hallazgos.append(_hallazgo(regla, texto, inicio, fin,
+                                       apertura + texto[inicio:fin], idioma))
+
+        # Tilde del interrogativo o exclamativo inicial
+        if not candidatas:
+            continue
+        primera = candidatas[0]
+        if primera.group().lower() in PREPOSICIONES_INTERROGATIVO and len(candidatas) > 1:
+            primera = candidatas[1]
+        forma = primera.group()
+        if forma.lower() in INTERROGATIVOS and (cierre == "?" or forma.lower() in ("que", "como", "cuanto", "cuanta", "cuantos", "cuantas")):
+            inicio = m.start() + primera.start()
+            hallazgos.append(_hallazgo("tilde_interrogativo", texto, inicio, inicio + len(forma),
+                                       _conservar_mayuscula(forma, INTERROGATIVOS[forma.lower()]), idioma))
+    return hallazgos
+
+
+def _tildes(texto, idioma):
+    hallazgos = []
+    anterior = None
+    for m in RE_PALABRA.finditer(texto):
+        forma = m.group()
+        correccion = TILDES_OBLIGATORIAS.get(forma.lower())
+        if correccion is None and anterior in DETERMINANTES:
+            correccion = TILDES_TRAS_DETERMINANTE.get(forma.lower())
+        anterior = forma.lower()
+        if correccion:
+            hallazgos.append(_hallazgo("tilde_obligatoria", texto, m.start(), m.end(),
+                                       _conservar_mayuscula(forma, correccion), idioma))
+    return hallazgos
+
+
+# La concordancia y las formas verbales se comprueban con el léxico
+# morfológico compilado (ver morphology.py)
+REGLAS = (_espacios, _mayusculas, _preguntas_y_exclamaciones, _tildes, revisar_morfologia)
+
+
+def _normalizar_con_offsets(texto):
+    """
+    Normaliza el texto a NFC y devuelve, para cada posición del texto
+    normalizado (y para su final), la posición correspondiente en el original.
+    Cada carácter base se normaliza junto con sus marcas combinantes.
+    """
+    partes, mapa = [], []
+    inicio = 0
+    for i in range(1, len(texto) + 1):
+        if i == len(texto) or not unicodedata.combining(texto[i]):
+            grupo = unicodedata.normalize("NFC", texto[inicio:i])
+            partes.append(grupo)
+            mapa.extend([inicio] * len(grupo))
+            inicio = i
+    mapa.append(len(texto))
+    return "".join(partes), mapa
+
+
+def revisar_texto(texto, idioma="Español"):
+    """
+    Revisión determinista de la ortografía y la puntuación mecánicas: espacios
+    dobles o mal colocados, mayúscula tras punto, signos de apertura (¿ ¡) y
+    tildes de los interrogativos y de palabras frecuentes que siempre la llevan.
+    Incluye la concordancia nominal y las formas verbales inexistentes.
+
+    Args:
+        texto: Texto del estudiante
+        idioma: Idioma de las explicaciones (Español, Inglés o Francés)
+
+    Returns:
+        list: Hallazgos ordenados por posición, cada uno con regla, categoria,
+              fragmento_erroneo, correccion, explicacion y sus offsets
+              (inicio, fin) en el texto recibido, aunque no esté en NFC
+    """
+    texto = texto or ""
+    # Las reglas trabajan sobre NFC; con otra forma (p. ej. NFD, habitual al
+    # pegar desde macOS) los offsets se trasladan al texto recibido
+    if unicodedata.is_normalized("NFC", texto):
+        normalizado, mapa = texto, None
+    else:
+        normalizado, mapa = _normalizar_con_offsets(texto)
+
+    hallazgos = []
+    for regla in REGLAS:
+        hallazgos.extend(regla(normalizado, idioma))
+    if mapa is not None:
+        for h in hallazgos:
+            h["inicio"], h["fin"] = mapa[h["inicio"]], mapa[h["fin"]]
+            h["fragmento_erroneo"] = texto[h["inicio"]:h["fin"]]
+    hallazgos.sort(key=lambda h: (h["inicio"], h["fin"]))
+    return hallazgos
+
+
+def errores_por_categoria(hallazgos):
+    """
+    Agrupa los hallazgos en el esquema "errores" de la corrección
+    ({categoría: [{fragmento_erroneo, correccion, explicacion, ...}]}).
+    """
+    errores = {}
+    for h in hallazgos:
+        error = {k: v for k, v in h.items() if k not in ("regla", "categoria")}
+        error["origen"] = ORIGEN_LOCAL
+        errores.setdefault(h["categoria"], []).append(error)
+    return errores
+
+
+def _clave_error(error):
+    return tuple(
+        " ".join(unicodedata.normalize("NFC", str(error.get(campo, ""))).lower().split())
+        for campo in ("fragmento_erroneo", "correccion"))
+
+
+def fusionar_errores(errores_ia, errores_locales):
+    """
+    Añade los errores de la revisión local a los de la IA. Los locales van
+    primero en su categoría y se descartan los de la IA que los repiten.
+
+    Args:
+        errores_ia: Objeto "errores" devuelto por la IA
+        errores_locales: Errores de errores_por_categoria
+
+    Returns:
+        dict: Objeto "errores" combinado
+    """
+    errores_ia = errores_ia if isinstance(errores_ia, dict) else {}
+    vistos = {_clave_error(e) for lista in errores_locales.values() for e in lista}
+
+    combinados = {}
+    for categoria, lista in errores_ia.items():
+        combinados[categoria] = [e for e in (lista or [])
+                                 if not (isinstance(e, dict) and _clave_error(e) in vistos)]
+    for categoria, lista in errores_locales.items():
+        combinados[categoria] = list(lista) + combinados.get(categoria, [])
+    return combinados
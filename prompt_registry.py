@@ -0,0 +1,126 @@
+import hashlib
+import json
+import math
+import string
+import threading
+
+# Estimación aproximada para textos en español (sin tokenizador)
+CARACTERES_POR_TOKEN = 4
+
+
+def estimar_tokens(texto):
+    """Estimación del número de tokens de un texto."""
+    return math.ceil(len(texto or "") / CARACTERES_POR_TOKEN)
+
+
+class PlantillaPrompt:
+    """
+    Prompt con nombre: mensaje del sistema y del usuario con campos $campo
+    (string.Template), compilados una sola vez al crear la plantilla.
+
+    La versión es un resumen del contenido de la plantilla (textos y esquema
+    de salida), así que cambia sola al modificar el prompt y solo invalida
+    las respuestas cacheadas con esa plantilla.
+
+    Args:
+        nombre: Nombre único de la plantilla
+        sistema: Mensaje del sistema
+        usuario: Mensaje del usuario
+        esquema: Claves de primer nivel de la respuesta JSON y su tipo
+                 ({"errores": dict, ...}), o None si la respuesta es texto libre
+    """
+
+    def __init__(self, nombre, sistema, usuario, esquema=None):
+        self.nombre = nombre
+        self.esquema = esquema
+        self._sistema = string.Template(sistema)
+        self._usuario = string.Template(usuario)
+        if not (self._sistema.is_valid() and self._usuario.is_valid()):
+            raise ValueError(f"Plantilla '{nombre}' con marcadores $ no válidos")
+        self.campos = frozenset(self._sistema.get_identifiers()) | frozenset(
+            self._usuario.get_identifiers())
+
+        huella = hashlib.sha256(json.dumps(
+            [sistema, usuario, {k: t.__name__ for k, t in (esquema or {}).items()}],
+            ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+        self.version = f"{nombre}@{huella}"
+        # Tokens de la parte fija (sin los valores de los campos)
+        self.tokens_estimados = estimar_tokens(sistema) + estimar_tokens(usuario)
+
+        self.usos = 0
+        self.respuestas_invalidas = 0
+
+    def render(self, **valores):
+        """
+        Rellena los campos de la plantilla.
+
+        Args:
+            **valores: Valor de cada campo (todos obligatorios)
+
+        Returns:
+            tuple: (mensaje del sistema, mensaje del usuario)
+        """
+        faltan = self.campos - valores.keys()
+        sobran = valores.keys() - self.campos
+        if faltan or sobran:
+            raise ValueError(f"Campos incorrectos para la plantilla '{self.nombre}': "
+                             f"faltan {sorted(faltan)}, sobran {sorted(sobran)}")
+        return self._sistema.substitute(valores), self._usuario.substitute(valores)
+
+    def validar(self, respuesta):
+        """Lista de claves del esquema que faltan o tienen otro tipo en una respuesta JSON."""
+        if self.esquema is None:
+            return []
+        if not isinstance(respuesta, dict):
+            return sorted(self.esquema)
+        return [clave for clave, tipo in self.esquema.items()
+                if not isinstance(respuesta.get(clave), tipo)]
+
+    def registrar_respuesta(self, respuesta):
+        """Cuenta un uso de la plantilla y si la respuesta no cumple el esquema."""
+        self.usos += 1
+        if self.validar(respuesta):
+            self.respuestas_invalidas += 1
+
+
+class RegistroPrompts:
+    """Plantillas de prompt registradas, por nombre."""
+
+    def __init__(self):
+        self._plantillas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, plantilla):
+        """Registra una plantilla; no se admiten dos con el mismo nombre y distinto contenido."""
+        with self._lock:
+            anterior = self._plantillas.get(plantilla.nombre)
+            if anterior is not None and anterior.version != plantilla.version:
+                raise ValueError(f"Ya hay otra plantilla registrada como '{plantilla.nombre}'")
+            self._plantillas.setdefault(plantilla.nombre, plantilla)
+            return self._plantillas[plantilla.nombre]
+
+    def get(self, nombre):
+        return self._plantillas[nombre]
+
+    def versiones(self):
+        """Versiones vigentes de todas las plantillas."""
+        with self._lock:
+            return {p.version for p in self._plantillas.values()}
+
+    def resumen(self):
+        """Una fila por plantilla con su versión, tamaño estimado y usos."""
+        with self._lock:
+            plantillas = sorted(self._plantillas.values(), key=lambda p: p.nombre)
+        return [{"nombre": p.nombre, "version": p.version,
+                 "tokens_estimados": p.tokens_estimados,
+                 "esquema": ", ".join(p.esquema) if p.esquema else "texto",
+                 "usos": p.usos, "respuestas_invalidas": p.respuestas_invalidas}
+                for p in plantillas]
+
+
+registro_prompts = RegistroPrompts()
+
+
+def registrar_plantilla(nombre, sistema, usuario, esquema=None):
+    """Crea y registra una plantilla (ver PlantillaPrompt)."""
+    return registro_prompts.registrar(PlantillaPrompt(nombre, sistema, usuario, esquema))
@@ -1,183 +1,537 @@
-import streamlit as st
-import json
-import re
-import time
-from openai import OpenAI
-
-class RealTimeWritingAssistant:
-    def __init__(self, api_key, debounce_time=0.5):
-        self.client = OpenAI(api_key=api_key)
-        self.debounce_time = debounce_time
-        self.last_text = ""
-        self.last_check_time = 0
-        self.suggestions_cache = {}
-        
-    def get_text_with_highlighting(self, text, nivel="intermedio"):
-        # Si el texto es demasiado corto, no analizar
-        if len(text.strip()) < 10:  
-            return None
-            
-        # Si el texto no ha cambiado y está en caché, usar versión en caché
-        if text == self.last_text and text in self.suggestions_cache:
-            return self.suggestions_cache[text]
-            
-        # Actualizar texto de la última verificación
-        self.last_text = text
-        
-        # Verificar si ya tenemos este texto en caché
-        if text in self.suggestions_cache:
-            return self.suggestions_cache[text]
-        
-        try:
-            system_prompt = f"""
-            Eres un asistente de escritura para estudiantes de español.
-            Identifica errores y mejoras potenciales en el texto.
-            
-            - Adapta tu análisis al nivel {nivel} del estudiante
-            - Enfócate solo en los errores más importantes o patrones recurrentes
-            - Sé conciso en las sugerencias
-            
-            Responde ÚNICAMENTE en formato JSON con esta estructura:
-            {{
-              "errores": [
-                {{
-                  "fragmento": "texto con error",
-                  "sugerencia": "texto corregido",
-                  "tipo": "tipo de error",
-                  "explicacion": "explicación breve"
-                }}
-              ],
-              "patrones": [
-                {{
-                  "patron": "descripción del patrón recurrente",
-                  "sugerencia": "cómo mejorar"
-                }}
-              ],
-              "vocabulario": [
-                {{
-                  "palabra": "palabra que podría mejorarse",
-                  "alternativas": ["alternativa1", "alternativa2"]
-                }}
-              ]
-            }}
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                temperature=0.3,
-                max_tokens=500,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text}
-                ]
-            )
-            
-            try:
-                response_text = response.choices[0].message.content
-                json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    feedback_data = json.loads(json_str)
-                    
-                    self.suggestions_cache[text] = feedback_data
-                    return feedback_data
-                    
-            except Exception as e:
-                print(f"Error al parsear respuesta: {e}")
-                return None
-                
-        except Exception as e:
-            print(f"Error en la API: {e}")
-            return None
-        
-        return None
-
-    def render_text_editor_with_assistance(self, key="writing_area", height=250, default_value="", with_assistant=True):
-        # Inicializar session_state si es necesario
-        if key not in st.session_state:
-            st.session_state[key] = default_value
-        
-        nivel = st.session_state.get('nivel_estudiante', "intermedio")
-        
-        # Obtener el valor actual antes de renderizar el widget
-        current_value = st.session_state[key]
-        
-        # Renderizar el text_area
-        text = st.text_area(
-            "Escribe tu texto aquí:", 
-            height=height, 
-            key=key,
-            value=current_value
-        )
-        
-        # Mostrar botón de verificación solo si se solicita el asistente
-        if with_assistant:
-            if st.button("Verificar texto", key=f"check_button_{key}"):
-                if not text or len(text.strip()) < 10:
-                    st.warning("El texto es demasiado corto. Escribe al menos 10 caracteres para verificar.")
-                else:
-                    with st.spinner("Analizando texto..."):
-                        feedback = self.get_text_with_highlighting(text, nivel)
-                        
-                        if feedback:
-                            with st.container():
-                                total_sugerencias = (
-                                    len(feedback.get("errores", [])) + 
-                                    len(feedback.get("patrones", [])) + 
-                                    len(feedback.get("vocabulario", []))
-                                )
-                                
-                                if total_sugerencias > 0:
-                                    col1, col2 = st.columns([3, 1])
-                                    
-                                    with col1:
-                                        st.markdown(f"### Sugerencias ({total_sugerencias})")
-                                    
-                                    with col2:
-                                        st.markdown('<div style="text-align: right; font-size: 0.8em; color: #555;">Asistente activo</div>', 
-                                                    unsafe_allow_html=True)
-                                    
-                                    if feedback.get("errores", []):
-                                        with st.expander("Correcciones sugeridas", expanded=True):
-                                            for i, error in enumerate(feedback["errores"]):
-                                                st.markdown(f"**{error['tipo']}**: ")
-                                                col1, col2 = st.columns([1, 1])
-                                                with col1:
-                                                    st.error(f"{error['fragmento']}")
-                                                with col2:
-                                                    st.success(f"{error['sugerencia']}")
-                                                st.info(f"💡 {error['explicacion']}")
-                                                if i < len(feedback["errores"]) - 1:
-                                                    st.divider()
-                                    
-                                    if feedback.get("patrones", []):
-                                        with st.expander("Patrones recurrentes", expanded=False):
-                                            for patron in feedback["patrones"]:
-                                                st.markdown(f"**{patron['patron']}**")
-                                                st.info(f"✏️ {patron['sugerencia']}")
-                                                st.divider()
-                                    
-                                    if feedback.get("vocabulario", []):
-                                        with st.expander("Mejoras de vocabulario", expanded=False):
-                                            for vocab in feedback["vocabulario"]:
-                                                st.markdown(f"**{vocab['palabra']}** → *{', '.join(vocab['alternativas'])}*")
-                                else:
-                                    st.success("¡Bien hecho! No se han detectado errores o sugerencias en tu texto.")
-        
-        return text
-
-if __name__ == "__main__":
-    st.title("Prueba del Asistente de Escritura")
-    
-    assistant = RealTimeWritingAssistant("tu-api-key")
-    
-    st.session_state.nivel_estudiante = st.selectbox(
-        "Nivel de español:", 
-        ["principiante", "intermedio", "avanzado"]
-    )
-    
-    texto = assistant.render_text_editor_with_assistance(
-        key="demo_writing",
-        height=300,
-        default_value="Escribe algo en español para probar el asistente..."
-    )
+import streamlit as st
+import hashlib
+import json
+import unicodedata
+import re
+import threading
+import time
+from bounded_cache import BoundedTTLCache
+from model_router import ejecutar_con_escalado, elegir_modelo
+from prompt_registry import registrar_plantilla
+from span_index import localizar_fragmentos, resaltar_html
+
+# El modelo (elegido por model_router según el nivel) y la versión del
+# prompt forman parte de la clave de caché
+PROMPT_ASISTENTE = registrar_plantilla(
+    "asistente",
+    sistema="""
+        Eres un asistente de escritura para estudiantes de español.
+        Recibirás oraciones numeradas de un mismo texto. Identifica en cada una
+        los errores y las mejoras potenciales.
+        
+        - Adapta tu análisis al nivel $nivel del estudiante
+        - Enfócate solo en los errores más importantes
+        - Sé conciso en las sugerencias
+        - "fragmento" debe copiarse literalmente de la oración
+        
+        Responde ÚNICAMENTE en formato JSON con esta estructura:
+        {
+          "oraciones": [
+            {
+              "id": 1,
+              "errores": [
+                {
+                  "fragmento": "texto con error",
+                  "sugerencia": "texto corregido",
+                  "tipo": "tipo de error",
+                  "explicacion": "explicación breve"
+                }
+              ],
+              "vocabulario": [
+                {
+                  "palabra": "palabra que podría mejorarse",
+                  "alternativas": ["alternativa1", "alternativa2"]
+                }
+              ]
+            }
+          ]
+        }
+        Incluye todas las oraciones, aunque no tengan errores (listas vacías).
+        """,
+    usuario="$oraciones",
+    esquema={"oraciones": list})
+
+# Una oración termina en . ! ? … o en un salto de línea
+SENTENCE_PATTERN = re.compile(r"[^.!?…\n]+(?:[.!?…]+|\n|$)")
+
+
+def crear_cliente_openai(api_key):
+    # Importación diferida: el SDK de OpenAI solo se carga al crear el primer cliente
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+def normalizar_oracion(sentence):
+    # Forma canónica para compartir resultados entre estudiantes: mismos
+    # caracteres Unicode y espacios colapsados (mayúsculas y tildes se conservan)
+    return " ".join(unicodedata.normalize("NFC", sentence).split())
+
+
+def dividir_en_oraciones(text):
+    # Devuelve las oraciones no vacías del texto, en orden
+    return [m.group(0).strip() for m in SENTENCE_PATTERN.finditer(text) if m.group(0).strip()]
+
+
+def calcular_patrones(errores, minimo=2):
+    # Un patrón es un tipo de error que se repite en varias oraciones
+    grupos = {}
+    for error in errores:
+        tipo = (error.get("tipo") or "").strip()
+        if tipo:
+            grupos.setdefault(tipo.lower(), []).append(error)
+
+    patrones = []
+    for errores_tipo in sorted(grupos.values(), key=len, reverse=True):
+        if len(errores_tipo) < minimo:
+            continue
+        ejemplos = ", ".join(f"«{e.get('fragmento', '')}»" for e in errores_tipo[:3])
+        patrones.append({
+            "patron": f"{errores_tipo[0]['tipo']} ({len(errores_tipo)} casos: {ejemplos})",
+            "sugerencia": errores_tipo[0].get("explicacion", "")
+        })
+    return patrones
+
+
+def fusionar_vocabulario(resultados):
+    # Une las sugerencias de vocabulario sin repetir palabras
+    vistas = set()
+    vocabulario = []
+    for resultado in resultados:
+        for vocab in resultado.get("vocabulario", []):
+            palabra = (vocab.get("palabra") or "").strip().lower()
+            if palabra and palabra not in vistas:
+                vistas.add(palabra)
+                vocabulario.append(vocab)
+    return vocabulario
+
+
+class DebouncedAssistantWorker:
+    # Hilo por sesión que espera `debounce_time` desde la última edición antes
+    # de consultar al asistente. Los resultados de textos ya superados por una
+    # edición posterior se descartan; solo se publica la versión más reciente.
+
+    def __init__(self, assistant, debounce_time=None, idle_timeout=60):
+        self.assistant = assistant
+        self.debounce_time = assistant.debounce_time if debounce_time is None else debounce_time
+        self.idle_timeout = idle_timeout
+        self._cond = threading.Condition()
+        self._pending = None  # (versión, texto, nivel, instante de la edición)
+        self._version = 0
+        self._in_flight = None
+        self._thread = None
+        self.latest = None  # {"version", "text", "nivel", "feedback"}
+        self.discarded = 0
+
+    def submit(self, text, nivel):
+        # Registra una edición; reinicia la espera del debounce
+        with self._cond:
+            self._version += 1
+            self._pending = (self._version, text, nivel, time.monotonic())
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="writing-assistant-debounce", daemon=True)
+                self._thread.start()
+            return self._version
+
+    def is_busy(self):
+        with self._cond:
+            return self._pending is not None or self._in_flight is not None
+
+    def result(self):
+        with self._cond:
+            return self.latest
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    if not self._cond.wait(self.idle_timeout) and self._pending is None:
+                        # Sin ediciones recientes: el hilo termina y se recrea al editar
+                        self._thread = None
+                        return
+
+                version, text, nivel, edited_at = self._pending
+                remaining = edited_at + self.debounce_time - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+                self._pending = None
+                self._in_flight = version
+
+            feedback = self.assistant.get_text_with_highlighting(text, nivel)
+
+            with self._cond:
+                self._in_flight = None
+                if version != self._version:
+                    # Llegó una edición mientras se analizaba: resultado obsoleto
+                    self.discarded += 1
+                    continue
+                self.assistant.last_check_time = time.time()
+                self.latest = {
+                    "version": version,
+                    "text": text,
+                    "nivel": nivel,
+                    "feedback": feedback
+                }
+
+
+class RealTimeWritingAssistant:
+    def __init__(self, api_key=None, debounce_time=0.5, cache_max_entries=128,
+                 cache_max_bytes=2 * 1024 * 1024, cache_ttl=1800,
+                 sentence_cache_max_entries=2048, client=None, sentence_cache=None):
+        # Un cliente y una caché de oraciones compartidos permiten reutilizar
+        # análisis entre sesiones (ver AssistantService)
+        self.client = client if client is not None else crear_cliente_openai(api_key)
+        self.debounce_time = debounce_time
+        self.last_text = ""
+        self.last_check_time = 0
+        # Caché acotada (entradas, bytes y TTL) para que la memoria no crezca
+        self.suggestions_cache = BoundedTTLCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            ttl=cache_ttl
+        )
+        # Resultados por oración: al editar solo se analizan las oraciones nuevas
+        if sentence_cache is None:
+            sentence_cache = BoundedTTLCache(
+                max_entries=sentence_cache_max_entries,
+                max_bytes=cache_max_bytes,
+                ttl=cache_ttl
+            )
+        self.sentence_cache = sentence_cache
+        # Contadores propios de esta sesión sobre la caché de oraciones
+        self.sentence_hits = 0
+        self.sentence_misses = 0
+
+    def _decision(self, nivel):
+        return elegir_modelo(PROMPT_ASISTENTE.nombre, nivel=nivel)
+
+    def _cache_key(self, text, nivel):
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return (text_hash, nivel, self._decision(nivel)["modelo"], PROMPT_ASISTENTE.version)
+
+    def _sentence_key(self, sentence, nivel):
+        return self._cache_key(normalizar_oracion(sentence), nivel)
+
+    def _analyze_sentences(self, sentences, nivel):
+        # Analiza en una sola petición las oraciones indicadas.
+        # Devuelve {índice: {"errores": [...], "vocabulario": [...]}} o None si falla.
+        system_prompt, user_message = PROMPT_ASISTENTE.render(
+            nivel=nivel,
+            oraciones="\n".join(f"{i}. {sentence}" for i, sentence in enumerate(sentences, 1)))
+
+        def enviar(modelo):
+            response = self.client.chat.completions.create(
+                model=modelo,
+                temperature=0.3,
+                max_tokens=min(2000, 200 + 150 * len(sentences)),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_message}
+                ]
+            )
+            try:
+                response_text = response.choices[0].message.content
+                json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+                return json.loads(json_match.group(0)) if json_match else None
+            except Exception as e:
+                print(f"Error al parsear respuesta: {e}")
+                return None
+
+        def validar(data):
+            return isinstance(data, dict) and not PROMPT_ASISTENTE.validar(data)
+
+        # Una respuesta ilegible o fuera de esquema se repite con un modelo más capaz
+        try:
+            data, _ = ejecutar_con_escalado(self._decision(nivel), enviar, validar)
+        except Exception as e:
+            print(f"Error en la API: {e}")
+            return None
+        if not isinstance(data, dict):
+            return None
+        PROMPT_ASISTENTE.registrar_respuesta(data)
+
+        resultados = {}
+        for item in data.get("oraciones", []):
+            try:
+                idx = int(item.get("id")) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= idx < len(sentences):
+                resultados[idx] = {
+                    "errores": item.get("errores", []) or [],
+                    "vocabulario": item.get("vocabulario", []) or []
+                }
+        # Las oraciones omitidas en la respuesta se consideran sin errores
+        for idx in range(len(sentences)):
+            resultados.setdefault(idx, {"errores": [], "vocabulario": []})
+        return resultados
+
+    def get_text_with_highlighting(self, text, nivel="intermedio"):
+        # Si el texto es demasiado corto, no analizar
+        if len(text.strip()) < 10:  
+            return None
+            
+        # Actualizar texto de la última verificación
+        self.last_text = text
+        
+        # Verificar si ya tenemos este texto (y este nivel) en caché
+        cache_key = self._cache_key(text, nivel)
+        cached = self.suggestions_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        sentences = dividir_en_oraciones(text)
+
+        # Buscar cada oración en la caché; solo las nuevas o modificadas van a la API
+        por_oracion = [self.sentence_cache.get(self._sentence_key(s, nivel)) for s in sentences]
+        aciertos = sum(1 for resultado in por_oracion if resultado is not None)
+        self.sentence_hits += aciertos
+        self.sentence_misses += len(por_oracion) - aciertos
+        pendientes = []
+        for sentence, resultado in zip(sentences, por_oracion):
+            if resultado is None and sentence not in pendientes:
+                pendientes.append(sentence)
+
+        if pendientes:
+            nuevos = self._analyze_sentences(pendientes, nivel)
+            if nuevos is None:
+                return None
+            for idx, sentence in enumerate(pendientes):
+                self.sentence_cache.set(self._sentence_key(sentence, nivel), nuevos[idx])
+            nuevos_por_oracion = {sentence: nuevos[idx] for idx, sentence in enumerate(pendientes)}
+            por_oracion = [
+                resultado if resultado is not None else nuevos_por_oracion[sentence]
+                for sentence, resultado in zip(sentences, por_oracion)
+            ]
+
+        # Fusionar resultados y recalcular patrones y vocabulario sobre el conjunto
+        errores = [error for resultado in por_oracion for error in resultado.get("errores", [])]
+        feedback_data = {
+            "errores": errores,
+            "patrones": calcular_patrones(errores),
+            "vocabulario": fusionar_vocabulario(por_oracion)
+        }
+
+        self.suggestions_cache.set(cache_key, feedback_data)
+        return feedback_data
+
+    def get_worker(self, key):
+        # Un trabajador de debounce por sesión y por editor
+        worker_key = f"_assistant_worker_{key}"
+        worker = st.session_state.get(worker_key)
+        if worker is None or worker.assistant is not self:
+            worker = DebouncedAssistantWorker(self)
+            st.session_state[worker_key] = worker
+        return worker
+
+    def render_highlighted_text(self, text, errores):
+        # Resalta en el texto los fragmentos señalados por el asistente
+        spans = localizar_fragmentos(text, [error.get("fragmento", "") for error in errores])
+        if not spans:
+            return
+
+        html_resaltado = resaltar_html(
+            text, spans,
+            titulo_por_span=lambda span: errores[span["indice"]].get("sugerencia", "")
+        )
+        st.markdown(f'<div style="line-height: 1.8;">{html_resaltado}</div>', unsafe_allow_html=True)
+
+    def render_feedback(self, feedback, text=None):
+        if not feedback:
+            return
+
+        with st.container():
+            total_sugerencias = (
+                len(feedback.get("errores", [])) + 
+                len(feedback.get("patrones", [])) + 
+                len(feedback.get("vocabulario", []))
+            )
+            
+            if total_sugerencias > 0:
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.markdown(f"### Sugerencias ({total_sugerencias})")
+                
+                with col2:
+                    st.markdown('<div style="text-align: right; font-size: 0.8em; color: #555;">Asistente activo</div>', 
+                                unsafe_allow_html=True)
+                
+                if text and feedback.get("errores", []):
+                    self.render_highlighted_text(text, feedback["errores"])
+
+                if feedback.get("errores", []):
+                    with st.expander("Correcciones sugeridas", expanded=True):
+                        for i, error in enumerate(feedback["errores"]):
+                            st.markdown(f"**{error['tipo']}**: ")
+                            col1, col2 = st.columns([1, 1])
+                            with col1:
+                                st.error(f"{error['fragmento']}")
+                            with col2:
+                                st.success(f"{error['sugerencia']}")
+                            st.info(f"💡 {error['explicacion']}")
+                            if i < len(feedback["errores"]) - 1:
+                                st.divider()
+                
+                if feedback.get("patrones", []):
+                    with st.expander("Patrones recurrentes", expanded=False):
+                        for patron in feedback["patrones"]:
+                            st.markdown(f"**{patron['patron']}**")
+                            st.info(f"✏️ {patron['sugerencia']}")
+                            st.divider()
+                
+                if feedback.get("vocabulario", []):
+                    with st.expander("Mejoras de vocabulario", expanded=False):
+                        for vocab in feedback["vocabulario"]:
+                            st.markdown(f"**{vocab['palabra']}** → *{', '.join(vocab['alternativas'])}*")
+            else:
+                st.success("¡Bien hecho! No se han detectado errores o sugerencias en tu texto.")
+
+    def render_text_editor_with_assistance(self, key="writing_area", height=250, default_value="",
+                                           with_assistant=True, live=True, poll_interval=1.0):
+        # Inicializar session_state si es necesario
+        if key not in st.session_state:
+            st.session_state[key] = default_value
+        
+        nivel = st.session_state.get('nivel_estudiante', "intermedio")
+        feedback_key = f"{key}_sugerencias"
+        worker = self.get_worker(key) if with_assistant and live else None
+
+        def on_edit():
+            # Cada edición confirmada se encola; el trabajador aplica el debounce
+            texto_editado = st.session_state.get(key, "")
+            if len(texto_editado.strip()) >= 10:
+                worker.submit(texto_editado, nivel)
+        
+        # Renderizar el text_area (el valor vive en session_state[key])
+        text = st.text_area(
+            "Escribe tu texto aquí:", 
+            height=height, 
+            key=key,
+            on_change=on_edit if worker is not None else None
+        )
+        
+        if not with_assistant:
+            return text
+
+        # Modo en vivo: el panel se refresca solo, sin bloquear la interfaz
+        if worker is not None:
+            polling_key = f"{key}_polling"
+            st.session_state[polling_key] = worker.is_busy()
+
+            def live_panel():
+                resultado = worker.result()
+                if resultado is not None and resultado["text"] == st.session_state.get(key, ""):
+                    # Publicar en session_state las últimas sugerencias
+                    st.session_state[feedback_key] = resultado["feedback"]
+                if worker.is_busy():
+                    st.caption("⏳ Analizando tu texto...")
+                elif st.session_state.get(polling_key):
+                    # Análisis terminado: una recarga completa detiene el sondeo
+                    st.session_state[polling_key] = False
+                    st.rerun()
+                self.render_feedback(st.session_state.get(feedback_key), st.session_state.get(key, ""))
+
+            st.fragment(live_panel, run_every=poll_interval if worker.is_busy() else None)()
+            return text
+
+        # Modo manual: verificación bajo demanda
+        if st.button("Verificar texto", key=f"check_button_{key}"):
+            if not text or len(text.strip()) < 10:
+                st.warning("El texto es demasiado corto. Escribe al menos 10 caracteres para verificar.")
+            else:
+                with st.spinner("Analizando texto..."):
+                    st.session_state[feedback_key] = self.get_text_with_highlighting(text, nivel)
+                    self.render_feedback(st.session_state[feedback_key], text)
+        
+        return text
+
+class AssistantService:
+    # Servicio de proceso: un único cliente OpenAI (con su pool de conexiones)
+    # y una caché de oraciones compartida por todas las sesiones. Cada sesión
+    # obtiene una vista propia con su caché de textos completos y sus contadores.
+
+    def __init__(self, api_key, sentence_cache_max_entries=20000,
+                 sentence_cache_max_bytes=32 * 1024 * 1024, sentence_cache_ttl=6 * 3600):
+        self.client = crear_cliente_openai(api_key)
+        self.sentence_cache = BoundedTTLCache(
+            max_entries=sentence_cache_max_entries,
+            max_bytes=sentence_cache_max_bytes,
+            ttl=sentence_cache_ttl
+        )
+        self._lock = threading.Lock()
+        self.sessions_created = 0
+
+    def session_view(self, **kwargs):
+        with self._lock:
+            self.sessions_created += 1
+        return RealTimeWritingAssistant(
+            client=self.client, sentence_cache=self.sentence_cache, **kwargs)
+
+    def stats(self):
+        stats = self.sentence_cache.stats()
+        stats["sesiones"] = self.sessions_created
+        return stats
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_assistant_service(api_key):
+    # Una instancia por proceso (y por clave de API)
+    with _services_lock:
+        service = _services.get(api_key)
+        if service is None:
+            service = AssistantService(api_key)
+            _services[api_key] = service
+        return service
+
+
+def get_session_assistant(api_key, state_key="_writing_assistant"):
+    # Vista de la sesión actual sobre el servicio compartido
+    service = get_assistant_service(api_key)
+    assistant = st.session_state.get(state_key)
+    if assistant is None or assistant.client is not service.client:
+        assistant = service.session_view()
+        st.session_state[state_key] = assistant
+    return assistant
+
+
+def shared_cache_stats():
+    # Estadísticas de la caché compartida de los servicios ya creados en este
+    # proceso (toda la clase), o None si aún no se ha usado el asistente
+    with _services_lock:
+        services = list(_services.values())
+    if not services:
+        return None
+    stats = [service.stats() for service in services]
+    aciertos = sum(s["aciertos"] for s in stats)
+    consultas = aciertos + sum(s["fallos"] for s in stats)
+    return {
+        "tasa_aciertos": aciertos / consultas if consultas else 0.0,
+        "entradas": sum(s["entradas"] for s in stats),
+        "bytes": sum(s["bytes"] for s in stats),
+        "sesiones": sum(s["sesiones"] for s in stats)
+    }
+
+
+if __name__ == "__main__":
+    st.title("Prueba del Asistente de Escritura")
+    
+    assistant = get_session_assistant("tu-api-key")
+    
+    st.session_state.nivel_estudiante = st.selectbox(
+        "Nivel de español:", 
+        ["principiante", "intermedio", "avanzado"]
+    )
+    
+    texto = assistant.render_text_editor_with_assistance(
+        key="demo_writing",
+        height=300,
+        default_value="Escribe algo en español para probar el asistente..."
+    )
@@ -0,0 +1,152 @@
+import re
+from difflib import SequenceMatcher
+
+from orthography_checker import ORIGEN_LOCAL
+
+# Separador entre oraciones: espacios tras un signo de cierre o un salto de línea
+RE_SEPARADOR = re.compile(r"((?<=[.!?…])\s+|\s*\n\s*)")
+
+# Por encima de esta proporción de oraciones cambiadas se corrige todo de nuevo
+MAX_PROPORCION_CAMBIOS = 0.5
+
+
+def segmentar_oraciones(texto):
+    """
+    Divide un texto en oraciones conservando los separadores, de modo que
+    "".join(o + s for o, s in zip(oraciones, separadores)) reconstruye el texto.
+
+    Args:
+        texto: Texto a dividir
+
+    Returns:
+        tuple: (lista de oraciones, lista con el separador que sigue a cada una)
+    """
+    partes = RE_SEPARADOR.split(texto.strip())
+    oraciones = partes[0::2]
+    separadores = partes[1::2] + [""]
+    return oraciones, separadores
+
+
+def _clave_oracion(oracion):
+    return " ".join(oracion.split())
+
+
+def _localizar(fragmento, oraciones):
+    fragmento = _clave_oracion(fragmento)
+    if not fragmento:
+        return None
+    for i, oracion in enumerate(oraciones):
+        if fragmento in _clave_oracion(oracion):
+            return i
+    return None
+
+
+def crear_base(texto, resultado, clave):
+    """
+    Prepara una corrección para reutilizarla en el siguiente envío: alinea
+    cada oración del texto con su versión corregida y le asigna los errores
+    de la IA cuyo fragmento contiene. Los errores de la revisión local no se
+    guardan porque se recalculan siempre sobre el texto completo.
+
+    Args:
+        texto: Texto corregido
+        resultado: Resultado de corregir_texto
+        clave: Identificador de las opciones de la corrección (alumno, nivel...)
+
+    Returns:
+        dict: Base para planificar_recorreccion, o None si el texto corregido
+              no tiene las mismas oraciones que el original
+    """
+    oraciones, _ = segmentar_oraciones(texto)
+    corregidas, _ = segmentar_oraciones(resultado.get("texto_corregido") or "")
+    if len(oraciones) != len(corregidas):
+        return None
+
+    errores = [[] for _ in oraciones]
+    globales = []
+    for categoria, lista in (resultado.get("errores") or {}).items():
+        for error in lista or []:
+            if error.get("origen") == ORIGEN_LOCAL:
+                continue
+            i = _localizar(error.get("fragmento_erroneo", ""), oraciones)
+            (globales if i is None else errores[i]).append((categoria, dict(error)))
+
+    return {
+        "clave": clave,
+        "oraciones": oraciones,
+        "corregidas": corregidas,
+        "errores": errores,
+        "globales": globales,
+        "resultado": {k: v for k, v in resultado.items()
+                      if k not in ("errores", "texto_corregido", "aviso")}
+    }
+
+
+def planificar_recorreccion(base, texto, clave):
+    """
+    Compara un texto con la última corrección oración a oración.
+
+    Args:
+        base: Resultado de crear_base (o None)
+        texto: Texto nuevo
+        clave: Identificador de las opciones de la corrección actual
+
+    Returns:
+        dict: "oraciones" y "separadores" del texto nuevo y "origen", con el
+              índice en la base de cada oración sin cambios (None si es nueva
+              o se ha modificado); None si no hay base compatible o el texto
+              ha cambiado demasiado
+    """
+    if not base or base.get("clave") != clave:
+        return None
+
+    oraciones, separadores = segmentar_oraciones(texto)
+    anteriores = [_clave_oracion(o) for o in base["oraciones"]]
+    nuevas = [_clave_oracion(o) for o in oraciones]
+
+    origen = [None] * len(oraciones)
+    bloques = SequenceMatcher(None, anteriores, nuevas, autojunk=False).get_matching_blocks()
+    for a, b, n in bloques:
+        for k in range(n):
+            origen[b + k] = a + k
+
+    cambiadas = origen.count(None)
+    if cambiadas > MAX_PROPORCION_CAMBIOS * len(oraciones):
+        return None
+    return {"oraciones": oraciones, "separadores": separadores, "origen": origen}
+
+
+def reconstruir_correccion(base, plan, nuevas):
+    """
+    Une la corrección reutilizada de las oraciones sin cambios con la de las
+    oraciones nuevas, en el orden del texto.
+
+    Args:
+        base: Resultado de crear_base
+        plan: Resultado de planificar_recorreccion
+        nuevas: Diccionario posición -> (texto_corregido, [(categoria, error)])
+                con la corrección de las oraciones nuevas o modificadas
+
+    Returns:
+        dict: Resultado con la estructura de corregir_texto
+    """
+    texto = "".join(o + s for o, s in zip(plan["oraciones"], plan["separadores"]))
+    errores = {}
+    partes = []
+    for i, (oracion, separador) in enumerate(zip(plan["oraciones"], plan["separadores"])):
+        j = plan["origen"][i]
+        if j is None:
+            corregida, errores_oracion = nuevas.get(i, (oracion, []))
+        else:
+            corregida, errores_oracion = base["corregidas"][j], base["errores"][j]
+        partes.append(corregida + separador)
+        for categoria, error in errores_oracion:
+            errores.setdefault(categoria, []).append(dict(error))
+
+    # Errores que no se pudieron asignar a una oración (p. ej. de estructura):
+    # se conservan mientras su fragmento siga en el texto
+    for categoria, error in base["globales"]:
+        if _clave_oracion(error.get("fragmento_erroneo", "")) in _clave_oracion(texto):
+            errores.setdefault(categoria, []).append(dict(error))
+
+    return dict(base["resultado"], errores=errores, texto_corregido="".join(partes))
@@ -0,0 +1,197 @@
+import html
+import unicodedata
+from collections import deque
+
+
+def normalizar_con_mapa(texto):
+    """
+    Normaliza un texto para la búsqueda tolerante (minúsculas, sin tildes y
+    con los espacios colapsados) conservando la correspondencia con el original.
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        tuple: (texto normalizado, lista con la posición original de cada carácter normalizado)
+    """
+    chars = []
+    mapa = []
+    previo_espacio = True  # Ignora los espacios iniciales
+
+    for i, c in enumerate(texto):
+        if c.isspace():
+            if not previo_espacio:
+                chars.append(" ")
+                mapa.append(i)
+                previo_espacio = True
+            continue
+
+        for d in unicodedata.normalize("NFD", c):
+            if unicodedata.combining(d):
+                continue
+            for low in d.lower():
+                chars.append(low)
+                mapa.append(i)
+        previo_espacio = False
+
+    # Quitar el espacio final
+    if chars and chars[-1] == " ":
+        chars.pop()
+        mapa.pop()
+
+    return "".join(chars), mapa
+
+
+def normalizar(texto):
+    return normalizar_con_mapa(texto)[0]
+
+
+class AhoCorasick:
+    """
+    Autómata de Aho-Corasick para buscar muchos patrones a la vez en una
+    sola pasada sobre el texto.
+    """
+
+    def __init__(self, patrones):
+        self.patrones = list(patrones)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for idx, patron in enumerate(self.patrones):
+            if not patron:
+                continue
+            estado = 0
+            for c in patron:
+                siguiente = self._goto[estado].get(c)
+                if siguiente is None:
+                    siguiente = len(self._goto)
+                    self._goto[estado][c] = siguiente
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                estado = siguiente
+            self._out[estado].append(idx)
+
+        # Enlaces de fallo por anchura
+        cola = deque(self._goto[0].values())
+        while cola:
+            estado = cola.popleft()
+            for c, siguiente in self._goto[estado].items():
+                cola.append(siguiente)
+                f = self._fail[estado]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                destino = self._goto[f].get(c, 0)
+                self._fail[siguiente] = destino if destino != siguiente else 0
+                self._out[siguiente] = self._out[siguiente] + self._out[self._fail[siguiente]]
+
+    def buscar(self, texto):
+        """Devuelve las coincidencias como tuplas (inicio, fin, índice del patrón)."""
+        coincidencias = []
+        estado = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for pos, c in enumerate(texto):
+            while estado and c not in goto[estado]:
+                estado = fail[estado]
+            estado = goto[estado].get(c, 0)
+            for idx in out[estado]:
+                fin = pos + 1
+                coincidencias.append((fin - len(self.patrones[idx]), fin, idx))
+        return coincidencias
+
+
+def _limite_palabra(texto, inicio, fin):
+    """Comprueba que la coincidencia no corta una palabra por ninguno de sus extremos."""
+    if inicio > 0 and texto[inicio].isalnum() and texto[inicio - 1].isalnum():
+        return False
+    if fin < len(texto) and texto[fin - 1].isalnum() and texto[fin].isalnum():
+        return False
+    return True
+
+
+def localizar_fragmentos(texto, fragmentos):
+    """
+    Localiza cada fragmento en el texto original en una sola pasada.
+
+    La comparación ignora mayúsculas, tildes y diferencias de espacios. Si un
+    mismo fragmento aparece varias veces en la lista, se asigna a apariciones
+    sucesivas. El resultado no contiene solapamientos: ante un conflicto gana
+    la coincidencia que empieza antes y, a igual inicio, la más larga.
+
+    Args:
+        texto: Texto original del estudiante
+        fragmentos: Lista de fragmentos (p. ej. `fragmento_erroneo`)
+
+    Returns:
+        list: Spans ordenados {"inicio", "fin", "indice"} con offsets en el texto
+              original e índice del fragmento en la lista recibida
+    """
+    if not texto or not fragmentos:
+        return []
+
+    texto_norm, mapa = normalizar_con_mapa(texto)
+
+    # Agrupar fragmentos iguales: un patrón por forma normalizada
+    patrones = []
+    pendientes = []  # Por patrón: índices de fragmentos aún sin ubicar
+    por_forma = {}
+    for i, fragmento in enumerate(fragmentos):
+        forma = normalizar(fragmento or "")
+        if not forma:
+            continue
+        if forma not in por_forma:
+            por_forma[forma] = len(patrones)
+            patrones.append(forma)
+            pendientes.append(deque())
+        pendientes[por_forma[forma]].append(i)
+
+    if not patrones:
+        return []
+
+    coincidencias = AhoCorasick(patrones).buscar(texto_norm)
+    coincidencias.sort(key=lambda m: (m[0], m[0] - m[1]))
+
+    spans = []
+    ultimo_fin = 0
+    for inicio, fin, idx in coincidencias:
+        if inicio < ultimo_fin or not pendientes[idx]:
+            continue
+        if not _limite_palabra(texto_norm, inicio, fin):
+            continue
+        spans.append({
+            "inicio": mapa[inicio],
+            "fin": mapa[fin - 1] + 1,
+            "indice": pendientes[idx].popleft()
+        })
+        ultimo_fin = fin
+
+    return spans
+
+
+def resaltar_html(texto, spans, estilo_por_span=None, titulo_por_span=None):
+    """
+    Genera HTML con los spans resaltados mediante <mark>.
+
+    Args:
+        texto: Texto original
+        spans: Spans ordenados y sin solapamientos (ver localizar_fragmentos)
+        estilo_por_span: Función span -> estilo CSS del resaltado
+        titulo_por_span: Función span -> texto emergente (title)
+
+    Returns:
+        str: Fragmento HTML con el texto escapado y los errores marcados
+    """
+    partes = []
+    pos = 0
+    for span in spans:
+        partes.append(html.escape(texto[pos:span["inicio"]]))
+        estilo = estilo_por_span(span) if estilo_por_span else "background-color: #ffd6d6;"
+        titulo = titulo_por_span(span) if titulo_por_span else ""
+        partes.append(
+            f'<mark style="{html.escape(estilo)}" title="{html.escape(titulo)}">'
+            f'{html.escape(texto[span["inicio"]:span["fin"]])}</mark>'
+        )
+        pos = span["fin"]
+    partes.append(html.escape(texto[pos:]))
+    return "".join(partes).replace("\n", "<br>")
@@ -0,0 +1,40 @@
+import re
+
+import pytest
+
+from exercise_templates import (MARCADORES_TIEMPO, PERSONAS, VERBOS, _complemento,
+                                _frase_con_hueco, conjugar)
+
+# Oraciones principales con sujeto propio: la subordinada no puede repetirlo
+# ("Espero que yo venga" es agramatical)
+PRINCIPALES_PERSONALES = re.compile(
+    r"^(?:Espero|Quiero|Deseo|Prefiero) que yo\b|^(?:Esperamos|Queremos|Deseamos|Preferimos) que nosotros\b")
+
+
+class _Elegir:
+    """Generador aleatorio que siempre elige el elemento indicado."""
+
+    def __init__(self, valor):
+        self.valor = valor
+
+    def choice(self, opciones):
+        assert self.valor in opciones
+        return self.valor
+
+
+COMBINACIONES = [(tiempo, marcador, persona)
+                 for tiempo, marcadores in MARCADORES_TIEMPO.items()
+                 for marcador in marcadores
+                 for persona in range(len(PERSONAS))]
+
+
+@pytest.mark.parametrize("tiempo, marcador, persona", COMBINACIONES)
+def test_frase_con_hueco_es_gramatical_para_cada_marcador_y_persona(tiempo, marcador, persona):
+    for verbo in VERBOS:
+        frase = _frase_con_hueco(tiempo, persona, verbo, _Elegir(marcador))
+        resuelta = frase.replace(f"___ ({verbo})", conjugar(verbo, tiempo, persona))
+
+        assert frase.startswith(f"{marcador} {PERSONAS[persona]} ___ ({verbo}) ")
+        assert frase.endswith(f"{_complemento(verbo, persona)}.")
+        assert frase.count("___") == 1
+        assert not PRINCIPALES_PERSONALES.search(resuelta), resuelta
@@ -0,0 +1,28 @@
+import unicodedata
+
+import pytest
+
+from orthography_checker import revisar_texto
+
+TEXTO = "El día que fuí a la playa. despues comí  mucho con mi mamá. como estas?"
+
+
+@pytest.mark.parametrize("forma", ["NFC", "NFD"])
+def test_offsets_apuntan_al_texto_recibido(forma):
+    texto = unicodedata.normalize(forma, TEXTO)
+    hallazgos = revisar_texto(texto)
+
+    assert hallazgos
+    for h in hallazgos:
+        assert texto[h["inicio"]:h["fin"]] == h["fragmento_erroneo"]
+
+
+def test_texto_nfd_da_los_mismos_hallazgos_que_nfc():
+    nfc = revisar_texto(unicodedata.normalize("NFC", TEXTO))
+    nfd = revisar_texto(unicodedata.normalize("NFD", TEXTO))
+
+    def resumen(hallazgos):
+        return [(h["regla"], unicodedata.normalize("NFC", h["fragmento_erroneo"]), h["correccion"])
+                for h in hallazgos]
+
+    assert resumen(nfd) == resumen(nfc)
@@ -0,0 +1,288 @@
+import re
+import unicodedata
+
+VOCALES_FUERTES = set("aeoáéó")
+VOCALES_DEBILES_TONICAS = set("íú")
+VOCALES = VOCALES_FUERTES | VOCALES_DEBILES_TONICAS | set("iuü")
+
+RE_PALABRA = re.compile(r"[a-záéíóúüñ]+")
+RE_FIN_ORACION = re.compile(r"[.!?…]+|\n\s*\n")
+
+# Palabras gramaticales (artículos, preposiciones, conjunciones, pronombres,
+# determinantes y formas de los verbos auxiliares y copulativos). El resto
+# se consideran palabras de contenido para la densidad léxica.
+PALABRAS_FUNCIONALES = set("""
+el la los las lo un una unos unas al del
+a ante bajo cabe con contra de desde durante en entre hacia hasta mediante
+para por según sin so sobre tras versus vía
+y e ni o u pero mas sino aunque porque pues que si como cuando donde mientras
+luego conque sea ya tanto
+yo me mi mí conmigo tú te ti contigo usted ustedes él ella ello ellos ellas le les se sí consigo
+nos nosotros nosotras os vosotros vosotras
+mío mía míos mías tu tus su sus mis tuyo tuya tuyos tuyas suyo suya suyos suyas
+nuestro nuestra nuestros nuestras vuestro vuestra vuestros vuestras
+este esta esto estos estas ese esa eso esos esas aquel aquella aquello aquellos aquellas
+quien quienes cual cuales cuyo cuya cuyos cuyas qué quién quiénes cuál cuáles cuánto cuánta
+cuántos cuántas dónde cómo cuándo
+algún alguno alguna algunos algunas ningún ninguno ninguna ningunos ningunas
+otro otra otros otras mismo misma mismos mismas cada cualquier cualquiera
+todo toda todos todas mucho mucha muchos muchas poco poca pocos pocas
+varios varias tan tal tales demás
+no sí muy más menos también tampoco
+he has ha hemos habéis han había habías habíamos habíais habían hube hubo
+habrá habrán habría habrían haya hayas hayamos hayan hubiera hubieran haber habiendo habido
+soy eres es somos sois son era eras éramos erais eran fui fuiste fue fuimos fuisteis fueron
+sea seas seamos sean ser siendo sido será serán sería serían
+estoy estás está estamos estáis están estaba estabas estábamos estaban estar estado estando
+esté estés estemos estén
+""".split())
+
+# Escala Inflesz para el índice de Flesch-Szigriszt
+ESCALA_INFLESZ = [
+    (40, "muy difícil"),
+    (55, "algo difícil"),
+    (65, "normal"),
+    (80, "bastante fácil"),
+    (float("inf"), "muy fácil")
+]
+
+
+def tokenizar(texto):
+    """Devuelve las palabras del texto en minúsculas (sin números ni signos)."""
+    texto = unicodedata.normalize("NFC", texto or "").lower()
+    return RE_PALABRA.findall(texto)
+
+
+def contar_oraciones(texto):
+    """Cuenta las oraciones (segmentos con alguna palabra entre signos de cierre)."""
+    return max(1, sum(1 for segmento in RE_FIN_ORACION.split(texto or "")
+                      if RE_PALABRA.search(segmento.lower())))
+
+
+def contar_silabas(palabra):
+    """
+    Cuenta las sílabas de una palabra española por sus núcleos vocálicos:
+    cada grupo de vocales es una sílaba salvo los hiatos (dos vocales fuertes
+    o una débil tónica junto a una fuerte). La "y" final tras vocal forma
+    diptongo y la "y" aislada es una sílaba.
+
+    Args:
+        palabra: Palabra en minúsculas
+
+    Returns:
+        int: Número de sílabas (al menos 1)
+    """
+    if palabra == "y":
+        return 1
+
+    silabas = 0
+    anterior = None
+    for c in palabra:
+        if c not in VOCALES:
+            anterior = None
+            continue
+        if anterior is None:
+            silabas += 1
+        elif (anterior in VOCALES_FUERTES and c in VOCALES_FUERTES) \
+                or (anterior in VOCALES_DEBILES_TONICAS and c in VOCALES_FUERTES) \
+                or (anterior in VOCALES_FUERTES and c in VOCALES_DEBILES_TONICAS):
+            silabas += 1
+        anterior = c
+    return max(1, silabas)
+
+
+def interpretar_szigriszt(indice):
+    """Grado de dificultad del índice según la escala Inflesz."""
+    for limite, grado in ESCALA_INFLESZ:
+        if indice < limite:
+            return grado
+    return ESCALA_INFLESZ[-1][1]
+
+
+def calcular_indices(texto):
+    """
+    Calcula de forma determinista los índices estadísticos de un texto.
+
+    - TTR: tipos (palabras distintas) / tokens.
+    - Densidad léxica: palabras de contenido / total de palabras.
+    - Flesch-Szigriszt: 206,835 - 62,3 * (sílabas / palabras) - (palabras / frases),
+      interpretado con la escala Inflesz.
+
+    Args:
+        texto: Texto en español
+
+    Returns:
+        dict: ttr, densidad_lexica, szigriszt, inflesz, interpretacion y los
+              recuentos (palabras, palabras_distintas, oraciones, silabas),
+              o {"error": ...} si el texto no tiene palabras
+    """
+    palabras = tokenizar(texto)
+    if not palabras:
+        return {"error": "El texto no contiene palabras que analizar."}
+
+    total = len(palabras)
+    distintas = len(set(palabras))
+    contenido = sum(1 for p in palabras if p not in PALABRAS_FUNCIONALES)
+    silabas = sum(contar_silabas(p) for p in palabras)
+    oraciones = contar_oraciones(texto)
+
+    szigriszt = 206.835 - 62.3 * (silabas / total) - (total / oraciones)
+    grado = interpretar_szigriszt(szigriszt)
+
+    return {
+        "ttr": round(distintas / total, 3),
+        "densidad_lexica": round(contenido / total, 3),
+        "szigriszt": round(szigriszt, 1),
+        "inflesz": grado,
+        "palabras": total,
+        "palabras_distintas": distintas,
+        "oraciones": oraciones,
+        "silabas": silabas,
+        "interpretacion": (
+            f"El texto tiene {total} palabras ({distintas} distintas) en {oraciones} "
+            f"oraciones, con una media de {total / oraciones:.1f} palabras por oración "
+            f"y {silabas / total:.2f} sílabas por palabra. Según la escala Inflesz, "
+            f"su legibilidad es **{grado}**."
+        )
+    }
+
+
+# --- Análisis por lotes ---
+
+# Límites de las bandas de frecuencia (rango de la palabra en la lista de referencia)
+BANDAS_FRECUENCIA = (1000, 2000, 5000)
+
+UMBRAL_MTLD = 0.72
+
+
+def _mtld_sentido(tokens, umbral=UMBRAL_MTLD):
+    factores = 0.0
+    vistos = set()
+    distintos = 0
+    n = 0
+    for t in tokens:
+        n += 1
+        if t not in vistos:
+            vistos.add(t)
+            distintos += 1
+        # El TTR solo baja al repetirse una palabra
+        elif distintos <= umbral * n:
+            factores += 1
+            vistos = set()
+            distintos = 0
+            n = 0
+    if n:
+        factores += (1 - distintos / n) / (1 - umbral)
+    return len(tokens) / factores if factores else float(len(tokens))
+
+
+def mtld(tokens):
+    """
+    MTLD (McCarthy y Jarvis): longitud media de los tramos de texto que
+    mantienen el TTR por encima de 0,72, promediando ambos sentidos de lectura.
+    A diferencia del TTR, no depende de la longitud del texto.
+
+    Args:
+        tokens: Lista de palabras (o de sus identificadores)
+
+    Returns:
+        float: Valor MTLD (0 si no hay tokens)
+    """
+    if not tokens:
+        return 0.0
+    return (_mtld_sentido(tokens) + _mtld_sentido(tokens[::-1])) / 2
+
+
+def calcular_indices_lote(textos, nombres=None, rangos=None):
+    """
+    Calcula los índices de legibilidad y léxicos de muchos textos a la vez.
+
+    Los textos se tokenizan una sola vez sobre un vocabulario común; sílabas,
+    palabras funcionales y rangos de frecuencia se calculan por palabra
+    distinta y se agregan por texto con operaciones de NumPy sobre el vector
+    de tokens. Solo el MTLD, secuencial por naturaleza, recorre cada texto.
+    Con 10.000 redacciones de 300 palabras tarda unos segundos (ver
+    benchmarks/batch_readability.py).
+
+    Args:
+        textos: Lista (o Serie) de textos
+        nombres: Etiquetas de los textos para el índice del DataFrame (opcional)
+        rangos: Diccionario palabra -> rango de frecuencia de referencia. Si no
+                se indica, los rangos se calculan sobre el propio conjunto
+
+    Returns:
+        DataFrame: Una fila por texto con palabras, palabras_distintas,
+                   oraciones, silabas, ttr, mtld, longitud_media_oracion,
+                   silabas_por_palabra, densidad_lexica, szigriszt, inflesz y
+                   la proporción de tokens en cada banda de frecuencia
+    """
+    from itertools import chain
+
+    import numpy as np
+    import pandas as pd
+
+    textos = ["" if t is None else str(t) for t in textos]
+    n = len(textos)
+
+    # Tokenizar y numerar las palabras sobre un vocabulario común
+    tokens_por_texto = [tokenizar(texto) for texto in textos]
+    oraciones = np.fromiter(map(contar_oraciones, textos), dtype=np.int64, count=n)
+    longitudes = np.fromiter(map(len, tokens_por_texto), dtype=np.int64, count=n)
+    distintas = np.fromiter((len(set(t)) for t in tokens_por_texto), dtype=np.int64, count=n)
+
+    vocabulario = {p: i for i, p in enumerate(dict.fromkeys(chain.from_iterable(tokens_por_texto)))}
+    ids = np.fromiter(map(vocabulario.__getitem__, chain.from_iterable(tokens_por_texto)),
+                      dtype=np.int64, count=int(longitudes.sum()))
+    doc = np.repeat(np.arange(n), longitudes)
+    v = max(len(vocabulario), 1)
+
+    # Propiedades por palabra distinta
+    palabras_vocab = list(vocabulario)
+    silabas_vocab = np.fromiter((contar_silabas(p) for p in palabras_vocab),
+                                dtype=np.int64, count=len(palabras_vocab))
+    contenido_vocab = np.fromiter((p not in PALABRAS_FUNCIONALES for p in palabras_vocab),
+                                  dtype=bool, count=len(palabras_vocab))
+    if rangos is None:
+        frecuencias = np.bincount(ids, minlength=v)
+        orden = np.argsort(-frecuencias, kind="stable")
+        rango_vocab = np.empty(v, dtype=np.float64)
+        rango_vocab[orden] = np.arange(1, v + 1)
+    else:
+        rango_vocab = np.fromiter((rangos.get(p, np.inf) for p in palabras_vocab),
+                                  dtype=np.float64, count=len(palabras_vocab))
+
+    # Agregados por texto
+    silabas = np.bincount(doc, weights=silabas_vocab[ids], minlength=n)
+    contenido = np.bincount(doc, weights=contenido_vocab[ids], minlength=n)
+
+    num_bandas = len(BANDAS_FRECUENCIA) + 1
+    banda = np.searchsorted(np.asarray(BANDAS_FRECUENCIA), rango_vocab[ids], side="left")
+    por_banda = np.bincount(doc * num_bandas + banda, minlength=n * num_bandas).reshape(n, num_bandas)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = np.where(longitudes > 0, longitudes, np.nan)
+        silabas_por_palabra = silabas / total
+        longitud_media = total / oraciones
+        szigriszt = 206.835 - 62.3 * silabas_por_palabra - longitud_media
+        datos = {
+            "palabras": longitudes,
+            "palabras_distintas": distintas,
+            "oraciones": oraciones,
+            "silabas": silabas.astype(np.int64),
+            "ttr": distintas / total,
+            "mtld": [mtld(t) if t else np.nan for t in tokens_por_texto],
+            "longitud_media_oracion": longitud_media,
+            "silabas_por_palabra": silabas_por_palabra,
+            "densidad_lexica": contenido / total,
+            "szigriszt": szigriszt
+        }
+        etiquetas = [f"frec_{limite // 1000}k" for limite in BANDAS_FRECUENCIA] + ["frec_resto"]
+        for j, etiqueta in enumerate(etiquetas):
+            datos[etiqueta] = por_banda[:, j] / total
+
+    df = pd.DataFrame(datos, index=list(nombres) if nombres is not None else None)
+    limites = [-np.inf] + [limite for limite, _ in ESCALA_INFLESZ[:-1]] + [np.inf]
+    df.insert(df.columns.get_loc("szigriszt") + 1, "inflesz", pd.cut(
+        df["szigriszt"], bins=limites, right=False,
+        labels=[grado for _, grado in ESCALA_INFLESZ]))
+    return df
@@ -0,0 +1,8 @@
+"""
+Textocorrector ELE: corrección de textos en español con análisis contextual.
+
+Paquete de la aplicación. El script `streamlit_app.py` solo configura la
+página y delega en `textocorrector.app.main`; los módulos se importan una
+vez por proceso y cada sección de la interfaz se ejecuta solo cuando está
+seleccionada.
+"""
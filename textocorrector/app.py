@@ -0,0 +1,81 @@
+"""Punto de entrada de la interfaz: barra lateral, navegación y pie de página."""
+
+import streamlit as st
+
+from textocorrector.config import APP_VERSION
+from textocorrector.session import get_session_var, init_session_state, set_session_var
+from textocorrector.ui.components import ui_feedback_form, ui_header
+from textocorrector.ui.sidebar import ui_sidebar
+from textocorrector.ui.tabs.admin import es_administrador, tab_admin
+from textocorrector.ui.tabs.corregir import tab_corregir
+from textocorrector.ui.tabs.examen import tab_examen
+from textocorrector.ui.tabs.herramientas import tab_herramientas
+from textocorrector.ui.tabs.progreso import tab_progreso
+
+
+def crear_paginas():
+    """
+    Crea las secciones principales de la aplicación.
+
+    Returns:
+        list: Páginas de st.navigation en el orden de la barra de navegación
+              (el índice es el que usa `tab_navigate_to`)
+    """
+    paginas = [
+        st.Page(tab_corregir, title="Corregir texto", icon="📝",
+                url_path="corregir", default=True),
+        st.Page(tab_progreso, title="Tu progreso", icon="📊", url_path="progreso"),
+        st.Page(tab_examen, title="Exámenes oficiales", icon="🎓", url_path="examenes"),
+        st.Page(tab_herramientas, title="Herramientas", icon="🧰", url_path="herramientas")
+    ]
+
+    # Administración de cachés (solo con la clave de administración)
+    if es_administrador():
+        paginas.append(st.Page(tab_admin, title="Administración", icon="🛠️", url_path="admin"))
+
+    return paginas
+
+
+def main():
+    """Función principal que configura la interfaz y el flujo de la aplicación."""
+    # Inicializar session_state
+    init_session_state()
+
+    # Barra lateral: bienvenida, estado de conexiones y diagnóstico
+    ui_sidebar()
+
+    # Navegación: a diferencia de st.tabs, solo se ejecuta la sección seleccionada
+    paginas = crear_paginas()
+    pagina_actual = st.navigation(paginas, position="top")
+
+    # Navegación solicitada desde otra sección (p. ej. "Enviar a pestaña de corrección")
+    destino = get_session_var("tab_navigate_to")
+    if destino is not None:
+        set_session_var("tab_navigate_to", None)
+        if 0 <= destino < len(paginas) and paginas[destino].url_path != pagina_actual.url_path:
+            st.switch_page(paginas[destino])
+
+    set_session_var("active_tab_index", next(
+        (i for i, p in enumerate(paginas) if p.url_path == pagina_actual.url_path), 0))
+
+    # Mostrar cabecera de la aplicación
+    ui_header()
+
+    # Verificar si se ha inicializado la aplicación
+    if not get_session_var("app_initialized", False):
+        # Reflejar que ya está inicializada la app
+        set_session_var("app_initialized", True)
+
+    # Ejecutar solo la sección activa
+    pagina_actual.run()
+
+    # Mostrar formulario de feedback al final
+    ui_feedback_form()
+
+    # Pie de página
+    st.markdown("""
+    <div style="margin-top:50px;text-align:center;color:#888;font-size:0.8em;">
+        Textocorrector ELE © 2023-2025 - v{0}<br>
+        Desarrollado con 💙 para estudiantes de español
+    </div>
+    """.format(APP_VERSION), unsafe_allow_html=True)
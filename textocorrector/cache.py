@@ -0,0 +1,189 @@
+"""Gestor de cachés por espacios de nombres (respuestas de IA, historiales, exportaciones, audio, imágenes y ejercicios)."""
+
+import hashlib
+import logging
+import unicodedata
+
+from bounded_cache import BoundedTTLCache, estimar_tamano
+
+logger = logging.getLogger(__name__)
+
+# Versión de los prompts de IA que no están en el registro de plantillas.
+# Forma parte de la clave de sus respuestas cacheadas: al cambiar uno de esos
+# prompts hay que incrementarla. Las plantillas registradas usan su propia
+# versión, que cambia sola con el contenido.
+PROMPT_VERSION = "2025-04-v2"
+
+# Espacios de nombres
+NS_LLM = "llm"
+NS_HISTORIALES = "historiales"
+NS_EXPORTACIONES = "exportaciones"
+NS_AUDIO = "audio"
+NS_IMAGENES = "imagenes"
+NS_EJERCICIOS = "ejercicios"
+
+# Configuración por espacio: TTL (segundos), entradas y bytes máximos
+MB = 1024 * 1024
+CONFIG_NAMESPACES = {
+    NS_LLM: {"ttl": 6 * 3600, "max_entries": 1000, "max_bytes": 32 * MB},
+    NS_HISTORIALES: {"ttl": 15 * 60, "max_entries": 500, "max_bytes": 32 * MB},
+    NS_EXPORTACIONES: {"ttl": 3600, "max_entries": 200, "max_bytes": 64 * MB},
+    NS_AUDIO: {"ttl": 24 * 3600, "max_entries": 200, "max_bytes": 64 * MB},
+    NS_IMAGENES: {"ttl": 3600, "max_entries": 100, "max_bytes": 64 * MB},
+    NS_EJERCICIOS: {"ttl": 24 * 3600, "max_entries": 500, "max_bytes": 16 * MB}
+}
+
+# Espacios cuyas claves empiezan por la versión de prompt
+NAMESPACES_VERSIONADOS = (NS_LLM, NS_EJERCICIOS)
+
+
+def estimar_tamano_objeto(valor):
+    """Estima el tamaño en bytes de un valor, incluidos DataFrames y buffers."""
+    if hasattr(valor, "memory_usage"):
+        # DataFrame de pandas
+        try:
+            return int(valor.memory_usage(deep=True).sum())
+        except Exception:
+            return 64 * 1024
+    if hasattr(valor, "getbuffer"):
+        # BytesIO
+        return valor.getbuffer().nbytes
+    if isinstance(valor, tuple):
+        return sum(estimar_tamano_objeto(v) for v in valor)
+    return estimar_tamano(valor)
+
+
+def clave_estudiante(nombre):
+    """Normaliza el nombre de un estudiante para usarlo como prefijo de clave."""
+    nombre = unicodedata.normalize("NFC", str(nombre or "")).strip().lower()
+    return " ".join(nombre.split())
+
+
+def digest(*partes):
+    """Resumen SHA-256 estable de varias partes (se serializan como texto)."""
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(str(parte).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class CacheManager:
+    """
+    Conjunto de cachés acotadas (BoundedTTLCache) con nombre, cada una con su
+    TTL y límites de tamaño.
+
+    Convenciones de clave (tuplas) que permiten la invalidación selectiva:
+    - Entradas de un estudiante: el primer elemento es `clave_estudiante(nombre)`.
+    - Respuestas de IA y ejercicios generados: el primer elemento es la
+      versión de prompt.
+
+    Args:
+        config: Diccionario {espacio: {"ttl", "max_entries", "max_bytes"}}
+    """
+
+    def __init__(self, config=None):
+        self._namespaces = {}
+        for nombre, opciones in (config or CONFIG_NAMESPACES).items():
+            self._namespaces[nombre] = BoundedTTLCache(
+                size_fn=estimar_tamano_objeto, **opciones)
+
+    def namespace(self, nombre):
+        """Devuelve la caché de un espacio de nombres (KeyError si no existe)."""
+        return self._namespaces[nombre]
+
+    def namespaces(self):
+        return list(self._namespaces)
+
+    def get(self, nombre, clave, default=None):
+        return self._namespaces[nombre].get(clave, default)
+
+    def set(self, nombre, clave, valor, ttl=None):
+        self._namespaces[nombre].set(clave, valor, ttl=ttl)
+
+    def get_or_compute(self, nombre, clave, funcion, cachear_si=None, ttl=None):
+        """
+        Devuelve el valor cacheado o lo calcula y lo guarda.
+
+        Args:
+            nombre: Espacio de nombres
+            clave: Clave de la entrada
+            funcion: Función sin argumentos que calcula el valor
+            cachear_si: Predicado sobre el valor; si devuelve False no se guarda
+                        (por defecto no se guardan valores None)
+            ttl: TTL específico para esta entrada
+
+        Returns:
+            El valor cacheado o recién calculado
+        """
+        cache = self._namespaces[nombre]
+        faltante = object()
+        valor = cache.get(clave, faltante)
+        if valor is not faltante:
+            return valor
+
+        valor = funcion()
+        guardar = cachear_si(valor) if cachear_si is not None else valor is not None
+        if guardar:
+            cache.set(clave, valor, ttl=ttl)
+        return valor
+
+    # --- Invalidación selectiva ---
+
+    def invalidar(self, nombre, predicado):
+        """Elimina las entradas de un espacio cuya clave cumple `predicado`."""
+        return self._namespaces[nombre].invalidate(predicado)
+
+    def invalidar_estudiante(self, nombre_estudiante):
+        """
+        Elimina de todos los espacios las entradas de un estudiante.
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        prefijo = clave_estudiante(nombre_estudiante)
+        total = 0
+        for cache in self._namespaces.values():
+            total += cache.invalidate(
+                lambda k: isinstance(k, tuple) and k and k[0] == prefijo)
+        if total:
+            logger.info(f"Caché: {total} entradas invalidadas para el estudiante '{prefijo}'")
+        return total
+
+    def invalidar_versiones_prompt(self, versiones_vigentes=None):
+        """
+        Elimina las respuestas de IA generadas con versiones de prompt que ya
+        no están vigentes (por defecto, PROMPT_VERSION y la versión actual de
+        cada plantilla registrada).
+        """
+        if versiones_vigentes is None:
+            from prompt_registry import registro_prompts
+            versiones_vigentes = registro_prompts.versiones() | {PROMPT_VERSION}
+        total = 0
+        for nombre in NAMESPACES_VERSIONADOS:
+            total += self._namespaces[nombre].invalidate(
+                lambda k: isinstance(k, tuple) and k and k[0] not in versiones_vigentes)
+        if total:
+            logger.info(f"Caché: {total} respuestas de IA de versiones de prompt anteriores eliminadas")
+        return total
+
+    def clear(self, nombre=None):
+        """Vacía un espacio de nombres o, si no se indica, todos."""
+        caches = [self._namespaces[nombre]] if nombre else self._namespaces.values()
+        for cache in caches:
+            cache.clear()
+
+    def purge_expired(self):
+        """Elimina las entradas caducadas de todos los espacios."""
+        return sum(cache.purge_expired() for cache in self._namespaces.values())
+
+    def stats(self):
+        """Devuelve {espacio: estadísticas} con ocupación y tasa de aciertos."""
+        resultado = {}
+        for nombre, cache in self._namespaces.items():
+            resultado[nombre] = dict(cache.stats(), ttl=cache.ttl)
+        return resultado
+
+
+# Gestor compartido por todas las sesiones del proceso
+cache_manager = CacheManager()
@@ -0,0 +1,845 @@
+"""Claves, circuit breaker y clientes de las APIs externas (OpenAI, ElevenLabs, Google Sheets)."""
+
+import base64
+import copy
+import json
+import logging
+import os
+import re
+import requests
+import streamlit as st
+import threading
+import time
+import traceback
+from collections import deque
+from io import BytesIO
+
+from model_router import ejecutar_con_escalado, elegir_modelo
+from prompt_registry import estimar_tokens
+from textocorrector.cache import NS_AUDIO, NS_LLM, PROMPT_VERSION, cache_manager, digest
+
+logger = logging.getLogger(__name__)
+
+
+# --- 1. CONFIGURACIÓN DE CLAVES SEGURAS ---
+
+
+def get_api_keys():
+    """
+    Obtiene las claves de API de los secretos de Streamlit con manejo de errores.
+    Permite la operación en modo degradado si faltan claves (los avisos al
+    usuario se muestran en la barra lateral, ver ui.sidebar).
+    """
+    keys = {
+        "openai": None,
+        "elevenlabs": {"api_key": None, "voice_id": None},
+        "google_credentials": None,
+        "admin": None
+    }
+
+    try:
+        keys["openai"] = st.secrets["OPENAI_API_KEY"]
+    except Exception as e:
+        logger.warning(f"Error al obtener API Key de OpenAI: {e}")
+
+    try:
+        keys["elevenlabs"]["api_key"] = st.secrets["ELEVENLABS_API_KEY"]
+        keys["elevenlabs"]["voice_id"] = st.secrets["ELEVENLABS_VOICE_ID"]
+    except Exception as e:
+        logger.warning(f"Error al obtener configuración de ElevenLabs: {e}")
+
+    try:
+        keys["google_credentials"] = json.loads(
+            st.secrets["GOOGLE_CREDENTIALS"])
+    except Exception as e:
+        logger.warning(f"Error al obtener credenciales de Google: {e}")
+
+    # Clave opcional para acceder a la administración (?admin=<clave>)
+    try:
+        keys["admin"] = st.secrets["ADMIN_KEY"]
+    except Exception:
+        pass
+
+    return keys
+
+
+# Obtener claves de API (una vez por proceso)
+api_keys = get_api_keys()
+
+
+# --- 2. CIRCUIT BREAKER PARA APIS ---
+
+
+class CircuitBreaker:
+    """
+    Implementa el patrón Circuit Breaker para APIs externas.
+    Previene llamadas repetidas a APIs con fallo.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=300):
+        self.failure_threshold = failure_threshold  # Número de fallos antes de abrir
+        self.reset_timeout = reset_timeout  # Tiempo en segundos antes de reintentar
+
+        # Inicializar contadores para diferentes servicios
+        self.services = {
+            "openai": {"failures": 0, "last_failure_time": None, "open": False},
+            "elevenlabs": {"failures": 0, "last_failure_time": None, "open": False},
+            "google_sheets": {"failures": 0, "last_failure_time": None, "open": False}
+        }
+
+    def record_failure(self, service_name):
+        """Registra un fallo para el servicio especificado"""
+        if service_name not in self.services:
+            logger.warning(f"Servicio desconocido: {service_name}")
+            return
+
+        service = self.services[service_name]
+        service["failures"] += 1
+        service["last_failure_time"] = time.time()
+
+        if service["failures"] >= self.failure_threshold:
+            service["open"] = True
+            logger.warning(f"Circuit breaker ABIERTO para {service_name}")
+
+    def record_success(self, service_name):
+        """Registra un éxito y restablece contadores para el servicio"""
+        if service_name not in self.services:
+            return
+
+        service = self.services[service_name]
+        service["failures"] = 0
+        service["open"] = False
+
+    def can_execute(self, service_name):
+        """Determina si se puede ejecutar una llamada al servicio"""
+        if service_name not in self.services:
+            return True
+
+        service = self.services[service_name]
+
+        # Si el circuit breaker está abierto, verificar si ha pasado el tiempo de reset
+        if service["open"]:
+            if service["last_failure_time"] is None:
+                return True
+
+            elapsed = time.time() - service["last_failure_time"]
+            if elapsed > self.reset_timeout:
+                # Permitir un reintento
+                service["open"] = False
+                return True
+            else:
+                return False
+
+        return True
+
+    def get_status(self):
+        """Devuelve el estado actual de todos los servicios"""
+        return {name: {"open": info["open"], "failures": info["failures"]}
+                for name, info in self.services.items()}
+
+
+# Inicializar circuit breaker (compartido por todas las sesiones del proceso)
+circuit_breaker = CircuitBreaker()
+
+
+# --- 3. CONEXIÓN A GOOGLE SHEETS ---
+
+
+def connect_to_googlesheets():
+    """
+    Establece conexión con Google Sheets para almacenamiento de datos.
+    Retorna un diccionario con los objetos de conexión o None si hay error.
+    """
+    if api_keys["google_credentials"] is None:
+        return None
+
+    if not circuit_breaker.can_execute("google_sheets"):
+        st.warning(
+            "⚠️ Conexión a Google Sheets temporalmente deshabilitada debido a errores previos.")
+        return None
+
+    try:
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        scope = [
+            "https://spreadsheets.google.com/feeds",
+            "https://www.googleapis.com/auth/drive"
+        ]
+
+        creds = Credentials.from_service_account_info(
+            api_keys["google_credentials"], scopes=scope)
+        client_gsheets = gspread.authorize(creds)
+
+        # IDs de los documentos
+        CORRECTIONS_DOC_ID = "1GTaS0Bv_VN-wzTq1oiEbDX9_UdlTQXWhC9CLeNHVk_8"
+        TRACKING_DOC_ID = "1-OQsMGgWseZ__FyUVh0UtYVOLui_yoTMG0BxxTGPOU8"
+
+        sheets = {}
+
+        # Intentar abrir documentos con manejo de errores para cada uno
+        try:
+            sheets["corrections"] = client_gsheets.open_by_key(
+                CORRECTIONS_DOC_ID).sheet1
+            logger.info("Conectado a Historial_Correcciones_ELE")
+        except Exception as e:
+            logger.error(
+                f"Error al conectar con Historial_Correcciones_ELE: {e}")
+            sheets["corrections"] = None
+
+        try:
+            tracking_doc = client_gsheets.open_by_key(TRACKING_DOC_ID)
+
+            # Verificar si existe la hoja Seguimiento
+            try:
+                sheets["tracking"] = tracking_doc.worksheet("Seguimiento")
+                logger.info("Conectado a hoja Seguimiento")
+            except gspread.exceptions.WorksheetNotFound:
+                # Crear la hoja si no existe
+                sheets["tracking"] = tracking_doc.add_worksheet(
+                    title="Seguimiento", rows=100, cols=14)
+                # Añadir encabezados a la hoja
+                headers = ["Nombre", "Nivel", "Fecha", "Errores Gramática", "Errores Léxico",
+                           "Errores Puntuación", "Errores Estructura", "Total Errores",
+                           "Puntuación Coherencia", "Puntuación Cohesión", "Puntuación Registro",
+                           "Puntuación Adecuación Cultural", "Consejo Final"]
+                sheets["tracking"].append_row(headers)
+                logger.info("Hoja 'Seguimiento' creada y preparada")
+        except Exception as e:
+            logger.error(f"Error al conectar con hoja de Seguimiento: {e}")
+            sheets["tracking"] = None
+
+        # Verificar si hubo éxito en alguna conexión
+        if sheets["corrections"] is not None or sheets["tracking"] is not None:
+            circuit_breaker.record_success("google_sheets")
+            return sheets
+        else:
+            circuit_breaker.record_failure("google_sheets")
+            return None
+
+    except Exception as e:
+        logger.error(f"Error al conectar con Google Sheets: {e}")
+        circuit_breaker.record_failure("google_sheets")
+        return None
+
+
+# Conexión con Google Sheets: se establece en el primer uso y se comparte en el proceso
+_sheets_connection = None
+
+
+def get_sheets_connection():
+    """
+    Devuelve la conexión con Google Sheets, estableciéndola la primera vez.
+    Si falla, se reintenta en la siguiente llamada (limitado por el circuit breaker).
+    """
+    global _sheets_connection
+    if _sheets_connection is None:
+        _sheets_connection = connect_to_googlesheets()
+    return _sheets_connection
+
+
+# --- 4. CLIENTE DE OPENAI SEGURO ---
+
+
+def get_openai_client():
+    """
+    Crea un cliente de OpenAI con manejo de errores.
+    Retorna el cliente o None si no es posible crear la conexión.
+    """
+    if api_keys["openai"] is None:
+        return None
+
+    if not circuit_breaker.can_execute("openai"):
+        st.warning(
+            "⚠️ Conexión a OpenAI temporalmente deshabilitada debido a errores previos.")
+        return None
+
+    try:
+        from openai import OpenAI
+
+        client = OpenAI(api_key=api_keys["openai"])
+        circuit_breaker.record_success("openai")
+        return client
+    except Exception as e:
+        logger.error(f"Error al crear cliente OpenAI: {e}")
+        circuit_breaker.record_failure("openai")
+        return None
+
+
+# --- FUNCIÓN AUXILIAR PARA MANEJO DE EXCEPCIONES ---
+
+
+def handle_exception(func_name, exception, show_user=True):
+    """
+    Función de utilidad para manejar excepciones de manera consistente.
+
+    Args:
+        func_name: Nombre de la función donde ocurrió el error
+        exception: La excepción capturada
+        show_user: Si se debe mostrar un mensaje al usuario
+
+    Returns:
+        None
+    """
+    error_msg = f"Error en {func_name}: {str(exception)}"
+    logger.error(error_msg)
+    logger.error(traceback.format_exc())
+
+    if show_user:
+        st.error(f"⚠️ {error_msg}")
+        with st.expander("Detalles técnicos", expanded=False):
+            st.code(traceback.format_exc())
+
+    return None
+
+
+# --- 5. FUNCIONES DE API DE OPENAI ---
+
+
+def extract_json_safely(content):
+    """
+    Extrae contenido JSON de una respuesta con múltiples estrategias.
+    Implementa parsing robusto para evitar errores.
+
+    Args:
+        content: Contenido de texto que debería contener JSON
+
+    Returns:
+        dict: El contenido parseado como JSON o un diccionario con error
+    """
+    # Si es None o vacío, retornar error inmediatamente
+    if not content:
+        return {"error": "Contenido vacío, no se puede extraer JSON"}
+
+    # Intento directo
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        # Limpiar el contenido - eliminar caracteres que puedan causar problemas
+        # Esto puede ayudar con el problema "unknown extension ?1 at position 13"
+        content_clean = re.sub(r'[^\x20-\x7E]', '', content)
+
+        try:
+            return json.loads(content_clean)
+        except json.JSONDecodeError:
+            pass
+
+        # Búsqueda con regex para JSON completo
+        # Regex mejorada para JSON anidado
+        json_pattern = r'(\{(?:[^{}]|(?1))*\})'
+        match = re.search(json_pattern, content_clean, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError:
+                pass
+
+        # Segunda estrategia: buscar cualquier JSON entre llaves
+        simple_pattern = r'\{.*\}'
+        match = re.search(simple_pattern, content_clean, re.DOTALL)
+        if match:
+            try:
+                # Intentar limpiar el JSON encontrado
+                potential_json = match.group(0)
+                # Eliminar comillas mal formadas, escape chars, etc.
+                potential_json = re.sub(r'[\r\n\t]', ' ', potential_json)
+                return json.loads(potential_json)
+            except json.JSONDecodeError:
+                pass
+
+    # Si no se pudo extraer, devolver un objeto error
+    logger.warning(f"No se pudo extraer JSON de: {content[:100]}...")
+    return {"error": "No se pudo extraer JSON válido", "raw_content": content[:500]}
+
+
+def retry_with_backoff(func, max_retries=3, initial_delay=1):
+    """
+    Ejecuta una función con reintentos y backoff exponencial.
+
+    Args:
+        func: Función a ejecutar
+        max_retries: Número máximo de reintentos
+        initial_delay: Retraso inicial en segundos
+
+    Returns:
+        El resultado de la función o levanta la excepción
+    """
+    for attempt in range(max_retries):
+        try:
+            return func()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # Errores de red específicos - reintentamos
+            if attempt == max_retries - 1:
+                raise
+            delay = initial_delay * (2 ** attempt)  # Backoff exponencial
+            logger.info(
+                f"Reintento {attempt+1} en {delay} segundos debido a: {str(e)}")
+            time.sleep(delay)
+        except Exception as e:
+            # Otros errores - no reintentamos
+            logger.error(f"Error no recuperable: {str(e)}")
+            raise
+
+
+# Modo de medición: las peticiones se hacen en streaming para medir el tiempo
+# hasta el primer token y se registran los tokens de entrada, los que el
+# proveedor sirvió de su caché de prompts y los de salida. Se activa con
+# TEXTOCORRECTOR_MEDIR_PROMPTS=1 o desde la administración.
+_medicion = {"activa": os.environ.get("TEXTOCORRECTOR_MEDIR_PROMPTS", "") == "1"}
+MAX_MEDICIONES = 500
+# Caracteres del mensaje del sistema que identifican el prompt en las mediciones
+LONGITUD_ID_PROMPT = 1000
+mediciones_prompts = deque(maxlen=MAX_MEDICIONES)
+_mediciones_lock = threading.Lock()
+
+
+def medicion_prompts_activa():
+    return _medicion["activa"]
+
+
+def activar_medicion_prompts(activa=True):
+    """Activa o desactiva el modo de medición de prompts."""
+    _medicion["activa"] = bool(activa)
+
+
+def _registrar_medicion(model, messages, usage, ttft, duracion, version=None):
+    detalles = getattr(usage, "prompt_tokens_details", None)
+    medicion = {
+        "momento": time.time(),
+        "modelo": model,
+        "prompt": version or digest(messages[0]["content"][:LONGITUD_ID_PROMPT])[:8],
+        "tokens_entrada": getattr(usage, "prompt_tokens", None),
+        "tokens_cacheados": getattr(detalles, "cached_tokens", None) or 0,
+        "tokens_salida": getattr(usage, "completion_tokens", None),
+        "ttft": ttft,
+        "duracion": duracion
+    }
+    with _mediciones_lock:
+        mediciones_prompts.append(medicion)
+    logger.info(
+        f"Medición {model} [{medicion['prompt']}]: {medicion['tokens_entrada']} tokens de entrada "
+        f"({medicion['tokens_cacheados']} cacheados), primer token en "
+        f"{ttft if ttft is None else round(ttft, 2)} s, total {duracion:.2f} s")
+
+
+def resumen_mediciones_prompts():
+    """
+    Agrega las mediciones registradas por modelo y prompt.
+
+    Returns:
+        list: Una fila por (modelo, prompt) con peticiones, tokens de entrada
+              medios, proporción de tokens cacheados y tiempos medios hasta el
+              primer token y total
+    """
+    with _mediciones_lock:
+        mediciones = list(mediciones_prompts)
+
+    grupos = {}
+    for m in mediciones:
+        grupos.setdefault((m["modelo"], m["prompt"]), []).append(m)
+
+    filas = []
+    for (modelo, prompt), grupo in grupos.items():
+        entrada = sum(m["tokens_entrada"] or 0 for m in grupo)
+        ttfts = [m["ttft"] for m in grupo if m["ttft"] is not None]
+        filas.append({
+            "modelo": modelo,
+            "prompt": prompt,
+            "peticiones": len(grupo),
+            "tokens_entrada": round(entrada / len(grupo)),
+            "proporcion_cacheada": (sum(m["tokens_cacheados"] for m in grupo) / entrada
+                                    if entrada else 0.0),
+            "ttft_medio": sum(ttfts) / len(ttfts) if ttfts else None,
+            "duracion_media": sum(m["duracion"] for m in grupo) / len(grupo)
+        })
+    return filas
+
+
+def _completar_chat(client, model, messages, temperature, version=None):
+    """Pide una respuesta JSON al modelo y devuelve su contenido (midiéndola si procede)."""
+    if not _medicion["activa"]:
+        response = client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            response_format={"type": "json_object"},  # Forzar formato JSON
+            messages=messages
+        )
+        return response.choices[0].message.content
+
+    inicio = time.perf_counter()
+    ttft = None
+    usage = None
+    partes = []
+    stream = client.chat.completions.create(
+        model=model,
+        temperature=temperature,
+        response_format={"type": "json_object"},
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            if ttft is None:
+                ttft = time.perf_counter() - inicio
+            partes.append(chunk.choices[0].delta.content)
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+    _registrar_medicion(model, messages, usage, ttft, time.perf_counter() - inicio, version)
+    return "".join(partes)
+
+
+def _pedir_json(client, model, messages, max_retries, version):
+    """Pide la respuesta JSON y, si no se puede extraer, la vuelve a pedir una vez."""
+    raw_output = retry_with_backoff(
+        lambda: _completar_chat(client, model, messages, temperature=0.5, version=version),
+        max_retries=max_retries)
+
+    # Intentar extraer JSON
+    data_json = extract_json_safely(raw_output)
+
+    # Si falló la extracción pero podemos reintentar con un mensaje específico
+    if "error" in data_json and max_retries > 0:
+        # Añadir mensaje solicitando formato JSON específico
+        messages = messages + [{
+            "role": "user",
+            "content": (
+                "Tu respuesta anterior no cumplió el formato JSON requerido. "
+                "Por favor, responde ÚNICAMENTE en JSON válido con la estructura solicitada. "
+                "No incluyas texto extra, backticks, ni marcadores de código fuente."
+            )
+        }]
+
+        # Reintento específico para corrección de formato
+        # (temperatura más baja para un formato más preciso)
+        raw_output = retry_with_backoff(
+            lambda: _completar_chat(client, model, messages, temperature=0.3, version=version),
+            max_retries=1
+        )
+
+        # Nuevo intento de extracción
+        data_json = extract_json_safely(raw_output)
+    return raw_output, data_json
+
+
+def obtener_json_de_ia(system_msg, user_msg, model=None, max_retries=3, usar_cache=True,
+                       plantilla=None, funcion=None, nivel=None, palabras=0):
+    """
+    Obtiene una respuesta estructurada como JSON de OpenAI con sistema
+    de reintentos mejorado y estrategias robustas de extracción.
+
+    Si no se indica el modelo, lo elige model_router según la función, el
+    nivel y la longitud del texto; cuando la respuesta no es JSON válido o no
+    cumple el esquema de la plantilla, se repite con un modelo más capaz
+    (ver model_router.ejecutar_con_escalado).
+
+    Las respuestas válidas se guardan en el espacio "llm" de la caché, con
+    la versión de la plantilla (o PROMPT_VERSION si el prompt no viene de
+    una plantilla registrada) como prefijo de la clave.
+
+    Args:
+        system_msg: Mensaje del sistema para el prompt
+        user_msg: Mensaje del usuario para el prompt
+        model: Modelo de OpenAI a utilizar (None = elegirlo)
+        max_retries: Número máximo de reintentos
+        usar_cache: Si se consulta y alimenta la caché de respuestas
+        plantilla: PlantillaPrompt con la que se generaron los mensajes (opcional)
+        funcion: Función para el enrutado (por defecto, el nombre de la plantilla)
+        nivel: Nivel del estudiante, para el enrutado
+        palabras: Palabras del texto del estudiante, para el enrutado
+
+    Returns:
+        tuple: (contenido raw original, contenido JSON parseado)
+    """
+    decision = None
+    if model is None:
+        decision = elegir_modelo(
+            funcion or (plantilla.nombre if plantilla is not None else "general"),
+            nivel=nivel, palabras=palabras, tokens_entrada=estimar_tokens(system_msg + user_msg))
+        model = decision["modelo"]
+
+    version = plantilla.version if plantilla is not None else None
+    clave_cache = (version or PROMPT_VERSION, model, digest(system_msg, user_msg))
+    if usar_cache:
+        cacheado = cache_manager.get(NS_LLM, clave_cache)
+        if cacheado is not None:
+            raw_output, data_json = cacheado
+            return raw_output, copy.deepcopy(data_json)
+
+    client = get_openai_client()
+    if client is None:
+        return None, {"error": "Cliente OpenAI no disponible"}
+
+    if not circuit_breaker.can_execute("openai"):
+        return None, {"error": "Servicio OpenAI temporalmente no disponible"}
+
+    messages = [
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": user_msg}
+    ]
+
+    def enviar(modelo):
+        return _pedir_json(client, modelo, messages, max_retries, version)
+
+    def validar(respuesta):
+        _, data = respuesta
+        return "error" not in data and not (plantilla is not None and plantilla.validar(data))
+
+    try:
+        if decision is None:
+            raw_output, data_json = enviar(model)
+            valido = validar((raw_output, data_json))
+        else:
+            (raw_output, data_json), valido = ejecutar_con_escalado(decision, enviar, validar)
+
+        # Marcar como éxito la comunicación con OpenAI
+        circuit_breaker.record_success("openai")
+        if plantilla is not None:
+            plantilla.registrar_respuesta(data_json)
+
+        # Solo se cachean las respuestas válidas: una que no cumple el esquema
+        # se vuelve a pedir (y a enrutar) la próxima vez
+        if usar_cache and valido:
+            cache_manager.set(NS_LLM, clave_cache, (raw_output, copy.deepcopy(data_json)))
+        return raw_output, data_json
+
+    except Exception as e:
+        logger.error(f"Error en API de OpenAI: {str(e)}")
+        circuit_breaker.record_failure("openai")
+        return None, {"error": f"Error en API de OpenAI: {str(e)}"}
+
+
+# --- 6. INTEGRACIÓN CON ELEVENLABS ---
+
+
+def generar_audio_consejo(consejo_texto):
+    """
+    Genera un archivo de audio a partir del texto usando ElevenLabs.
+
+    Args:
+        consejo_texto: Texto a convertir en audio
+
+    Returns:
+        BytesIO: Buffer con el audio generado, o None si ocurre un error
+    """
+    if not api_keys["elevenlabs"]["api_key"] or not api_keys["elevenlabs"]["voice_id"]:
+        logger.warning("Claves de ElevenLabs no configuradas")
+        return None
+
+    if not circuit_breaker.can_execute("elevenlabs"):
+        logger.warning("ElevenLabs temporalmente no disponible")
+        return None
+
+    if not consejo_texto:
+        return None
+
+    # Limpiar el texto
+    audio_text = consejo_texto.replace("Consejo final:", "").strip()
+    if not audio_text:
+        return None
+
+    # El audio de un mismo texto y voz se reutiliza desde la caché
+    clave_cache = (api_keys["elevenlabs"]["voice_id"], digest(audio_text))
+    audio_cacheado = cache_manager.get(NS_AUDIO, clave_cache)
+    if audio_cacheado is not None:
+        return BytesIO(audio_cacheado)
+
+    try:
+        elevenlabs_api_key = api_keys["elevenlabs"]["api_key"]
+        elevenlabs_voice_id = api_keys["elevenlabs"]["voice_id"]
+
+        tts_url = f"https://api.elevenlabs.io/v1/text-to-speech/{elevenlabs_voice_id}"
+        headers = {
+            "xi-api-key": elevenlabs_api_key,
+            "Content-Type": "application/json"
+        }
+        data = {
+            "text": audio_text,
+            "model_id": "eleven_multilingual_v2",
+            "voice_settings": {
+                "stability": 0.3,
+                "similarity_boost": 0.9
+            }
+        }
+
+        # Función para envío de solicitud
+        def send_request():
+            response = requests.post(
+                tts_url, headers=headers, json=data, timeout=15)
+            response.raise_for_status()  # Levantar excepción si hay error
+            return response
+
+        # Usar sistema de reintentos
+        response_audio = retry_with_backoff(send_request, max_retries=2)
+
+        if response_audio.ok:
+            audio_bytes = BytesIO(response_audio.content)
+            cache_manager.set(NS_AUDIO, clave_cache, response_audio.content)
+            circuit_breaker.record_success("elevenlabs")
+            return audio_bytes
+        else:
+            logger.error(
+                f"Error en ElevenLabs API: {response_audio.status_code}")
+            circuit_breaker.record_failure("elevenlabs")
+            return None
+
+    except Exception as e:
+        logger.error(f"Error al generar audio: {str(e)}")
+        circuit_breaker.record_failure("elevenlabs")
+        return None
+
+
+# --- 7. INTEGRACIÓN CON DALL-E ---
+
+
+def generar_imagen_dalle(tema, nivel, mostrar_errores=True):
+    """
+    Genera una imagen utilizando DALL-E basada en un tema y adaptada al nivel del estudiante.
+
+    Args:
+        tema: Tema para la imagen
+        nivel: Nivel de español (principiante, intermedio, avanzado)
+        mostrar_errores: Mostrar los errores en la interfaz (False en segundo plano)
+
+    Returns:
+        tuple: (URL de la imagen generada, descripción de la imagen)
+    """
+    client = get_openai_client()
+    if client is None:
+        return None, "API de OpenAI no disponible"
+
+    if not circuit_breaker.can_execute("openai"):
+        return None, "Servicio OpenAI temporalmente no disponible"
+
+    # Adaptar la complejidad del prompt según el nivel
+    if "principiante" in nivel.lower():
+        complejidad = "simple con objetos y personas claramente identificables"
+    elif "intermedio" in nivel.lower():
+        complejidad = "con detalles moderados y una escena cotidiana con varios elementos"
+    else:
+        complejidad = "detallada con múltiples elementos, que pueda generar descripciones complejas"
+
+    # Crear el prompt para DALL-E
+    prompt = f"Una escena {complejidad} sobre {tema}. La imagen debe ser clara, bien iluminada, y adecuada para describir en español."
+
+    try:
+        # Función para envío de solicitud
+        def generate_image():
+            return client.images.generate(
+                model="dall-e-3",
+                prompt=prompt,
+                n=1,
+                size="1024x1024",
+                quality="standard"
+            )
+
+        # Usar sistema de reintentos
+        response = retry_with_backoff(generate_image, max_retries=2)
+
+        # Obtener la URL de la imagen
+        imagen_url = response.data[0].url
+
+        # Generar una descripción adaptada al nivel
+        descripcion_prompt = f"""
+        Crea una descripción en español de esta imagen generada para un estudiante de nivel {nivel}.
+
+        La descripción debe:
+        1. Ser apropiada para el nivel {nivel}
+        2. Utilizar vocabulario y estructuras gramaticales de ese nivel
+        3. Incluir entre 3-5 preguntas al final para que el estudiante practique describiendo la imagen
+
+        Tema de la imagen: {tema}
+        """
+
+        def generate_description(modelo):
+            return client.chat.completions.create(
+                model=modelo,
+                messages=[
+                    {"role": "system", "content": "Eres un profesor de español especializado en crear descripciones y actividades basadas en imágenes."},
+                    {"role": "user", "content": descripcion_prompt}
+                ],
+                temperature=0.7
+            )
+
+        descripcion, _ = ejecutar_con_escalado(
+            elegir_modelo("descripcion_imagen", nivel=nivel),
+            lambda modelo: retry_with_backoff(
+                lambda: generate_description(modelo), max_retries=2).choices[0].message.content)
+
+        # Registrar éxito
+        circuit_breaker.record_success("openai")
+        return imagen_url, descripcion
+
+    except Exception as e:
+        handle_exception("generar_imagen_dalle", e, show_user=mostrar_errores)
+        circuit_breaker.record_failure("openai")
+        return None, f"Error: {str(e)}"
+
+
+# --- 8. FUNCIÓN DE OCR PARA TEXTOS MANUSCRITOS ---
+
+
+def transcribir_imagen_texto(imagen_bytes, idioma="es"):
+    """
+    Transcribe texto manuscrito de una imagen utilizando la API de OpenAI.
+    Versión mejorada con manejo de errores y circuit breaker.
+
+    Args:
+        imagen_bytes: Bytes de la imagen a transcribir
+        idioma: Código de idioma (es, en, fr)
+
+    Returns:
+        str: Texto transcrito o mensaje de error
+    """
+    client = get_openai_client()
+    if client is None:
+        return "Error: API de OpenAI no disponible"
+
+    if not circuit_breaker.can_execute("openai"):
+        return "Error: Servicio OpenAI temporalmente no disponible"
+
+    try:
+        # Codificar la imagen en base64
+        encoded_image = base64.b64encode(imagen_bytes).decode('utf-8')
+
+        # Función para envío de solicitud (el modelo con visión lo elige el enrutador)
+        def send_ocr_request(modelo):
+            return client.chat.completions.create(
+                model=modelo,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": f"Eres un sistema de OCR especializado en transcribir texto manuscrito en {idioma}. Tu tarea es extraer con precisión el texto presente en la imagen."
+                    },
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": "Transcribe exactamente el texto manuscrito de esta imagen."},
+                            {"type": "image_url", "image_url": {
+                                "url": f"data:image/jpeg;base64,{encoded_image}"}}
+                        ]
+                    }
+                ],
+                max_tokens=1000
+            )
+
+        # Usar sistema de reintentos; una transcripción vacía se repite con
+        # un modelo más capaz
+        transcripcion, _ = ejecutar_con_escalado(
+            elegir_modelo("ocr"),
+            lambda modelo: retry_with_backoff(
+                lambda: send_ocr_request(modelo), max_retries=2).choices[0].message.content)
+
+        # Registrar éxito
+        circuit_breaker.record_success("openai")
+
+        return (transcripcion or "").strip()
+
+    except Exception as e:
+        logger.error(f"Error en transcribir_imagen_texto: {str(e)}")
+        logger.error(traceback.format_exc())
+
+        circuit_breaker.record_failure("openai")
+
+        return f"Error en la transcripción: {str(e)}"
+
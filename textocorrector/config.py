@@ -0,0 +1,13 @@
+"""Configuración base: logging y versión de la aplicación."""
+
+import logging
+
+# Configuración de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+
+# Versión de la aplicación
+APP_VERSION = "2.1.0"  # Actualizado para la versión reescrita
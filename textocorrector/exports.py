@@ -0,0 +1,633 @@
+"""Generación de informes exportables (DOCX, HTML y CSV)."""
+
+import json
+import logging
+import traceback
+from datetime import datetime
+from io import BytesIO, StringIO
+
+from textocorrector.cache import NS_EXPORTACIONES, cache_manager, clave_estudiante, digest
+from textocorrector.config import APP_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+# --- 1. GENERACIÓN DE INFORME DOCX (FUNCIÓN CORREGIDA) ---
+
+
+def _generar_informe_docx(nombre, nivel, fecha, texto_original, texto_corregido, errores_obj, analisis_contextual, consejo_final):
+    """
+    Genera un informe de corrección en formato Word (DOCX).
+    Versión optimizada con mejor manejo de errores y validación.
+
+    Args:
+        nombre: Nombre del estudiante
+        nivel: Nivel del estudiante
+        fecha: Fecha de la corrección
+        texto_original: Texto original del estudiante
+        texto_corregido: Texto con correcciones
+        errores_obj: Objeto con errores detectados
+        analisis_contextual: Objeto con análisis contextual
+        consejo_final: Consejo final para el estudiante
+
+    Returns:
+        BytesIO: Buffer con el documento generado
+    """
+    try:
+        from docx import Document
+        from docx.shared import Pt, RGBColor, Inches
+
+        # Crear el documento desde cero
+        doc = Document()
+
+        # Estilo del documento
+        doc.styles['Normal'].font.name = 'Calibri'
+        doc.styles['Normal'].font.size = Pt(11)
+
+        # Título
+        doc.add_heading('Informe de corrección textual', 0)
+
+        # Información general
+        doc.add_heading('Información general', level=1)
+        doc.add_paragraph(f'Nombre: {nombre}')
+        doc.add_paragraph(f'Nivel: {nivel}')
+        doc.add_paragraph(f'Fecha: {fecha}')
+
+        # Texto original
+        doc.add_heading('Texto original', level=1)
+        doc.add_paragraph(texto_original)
+
+        # Texto corregido
+        doc.add_heading('Texto corregido', level=1)
+        doc.add_paragraph(texto_corregido)
+
+        # Análisis de errores
+        doc.add_heading('Análisis de errores', level=1)
+
+        # SOLUCIÓN: Simplificar verificación de errores
+        if isinstance(errores_obj, dict):
+            for categoria, errores in errores_obj.items():
+                if isinstance(errores, list) and errores:
+                    doc.add_heading(categoria, level=2)
+                    for i, err in enumerate(errores, 1):
+                        if not isinstance(err, dict):
+                            continue
+
+                        p = doc.add_paragraph()
+                        fragmento = err.get('fragmento_erroneo', '')
+                        if fragmento:
+                            run = p.add_run('Fragmento erróneo: ')
+                            run.bold = True
+                            run = p.add_run(fragmento)
+                            run.font.color.rgb = RGBColor(255, 0, 0)
+
+                        correccion = err.get('correccion', '')
+                        if correccion:
+                            p = doc.add_paragraph()
+                            run = p.add_run('Corrección: ')
+                            run.bold = True
+                            run = p.add_run(correccion)
+                            run.font.color.rgb = RGBColor(0, 128, 0)
+
+                        explicacion = err.get('explicacion', '')
+                        if explicacion:
+                            p = doc.add_paragraph()
+                            run = p.add_run('Explicación: ')
+                            run.bold = True
+                            p.add_run(explicacion)
+
+                        doc.add_paragraph()  # Espacio
+        else:
+            doc.add_paragraph("No se detectaron errores significativos.")
+
+        # Análisis contextual
+        doc.add_heading('Análisis contextual', level=1)
+
+        # Tabla de puntuaciones
+        doc.add_heading('Puntuaciones', level=2)
+        table = doc.add_table(rows=1, cols=5)
+        table.style = 'Table Grid'
+
+        # Encabezados
+        hdr_cells = table.rows[0].cells
+        hdr_cells[0].text = 'Aspecto'
+        hdr_cells[1].text = 'Coherencia'
+        hdr_cells[2].text = 'Cohesión'
+        hdr_cells[3].text = 'Registro'
+        hdr_cells[4].text = 'Adecuación cultural'
+
+        # SOLUCIÓN: Simplificar verificación de análisis contextual
+        # Datos
+        row_cells = table.add_row().cells
+        row_cells[0].text = 'Puntuación'
+
+        # Manejar valores de manera más simple
+        coherencia = analisis_contextual.get('coherencia', {}) if isinstance(
+            analisis_contextual, dict) else {}
+        cohesion = analisis_contextual.get('cohesion', {}) if isinstance(
+            analisis_contextual, dict) else {}
+        registro = analisis_contextual.get('registro_linguistico', {}) if isinstance(
+            analisis_contextual, dict) else {}
+        adecuacion = analisis_contextual.get('adecuacion_cultural', {}) if isinstance(
+            analisis_contextual, dict) else {}
+
+        row_cells[1].text = str(coherencia.get('puntuacion', 'N/A'))
+        row_cells[2].text = str(cohesion.get('puntuacion', 'N/A'))
+        row_cells[3].text = str(registro.get('puntuacion', 'N/A'))
+        row_cells[4].text = str(adecuacion.get('puntuacion', 'N/A'))
+
+        # Añadir comentarios del análisis contextual
+        if coherencia:
+            doc.add_heading('Coherencia textual', level=3)
+            doc.add_paragraph(coherencia.get('comentario', 'No disponible'))
+
+        if cohesion:
+            doc.add_heading('Cohesión textual', level=3)
+            doc.add_paragraph(cohesion.get('comentario', 'No disponible'))
+
+        if registro:
+            doc.add_heading('Registro lingüístico', level=3)
+            doc.add_paragraph(
+                f"Tipo detectado: {registro.get('tipo_detectado', 'No especificado')}")
+            doc.add_paragraph(registro.get('adecuacion', 'No disponible'))
+
+        if adecuacion:
+            doc.add_heading('Adecuación cultural', level=3)
+            doc.add_paragraph(adecuacion.get('comentario', 'No disponible'))
+
+        # Consejo final
+        doc.add_heading('Consejo final', level=1)
+        doc.add_paragraph(consejo_final or "No disponible")
+
+        # SOLUCIÓN: Simplificar generación del QR
+        try:
+            import qrcode
+
+            qr = qrcode.QRCode(
+                version=1,
+                error_correction=qrcode.constants.ERROR_CORRECT_L,
+                box_size=10,
+                border=4,
+            )
+
+            # Generar un ID único para el informe
+            informe_id = f"{nombre.replace(' ', '')}_{fecha.replace(' ', '_').replace(':', '-')}"
+            qr_data = f"textocorrector://informe/{informe_id}"
+            qr.add_data(qr_data)
+            qr.make(fit=True)
+
+            img = qr.make_image(fill_color="black", back_color="white")
+
+            # Guardar QR como imagen temporal
+            qr_buffer = BytesIO()
+            img.save(qr_buffer)
+            qr_buffer.seek(0)
+
+            # Añadir la imagen del QR al documento
+            doc.add_heading('Acceso online', level=1)
+            doc.add_paragraph(
+                'Escanea este código QR para acceder a este informe online:')
+
+            # Añadir la imagen
+            doc.add_picture(qr_buffer, width=Inches(2.0))
+
+            # Cerrar el buffer del QR
+            qr_buffer.close()
+        except Exception as qr_error:
+            # Si hay error con el QR, simplemente seguimos sin él
+            doc.add_heading('Acceso online', level=1)
+            doc.add_paragraph('Código QR no disponible en este momento.')
+
+        # SOLUCIÓN: Guardar el documento simplificado
+        docx_buffer = BytesIO()
+        doc.save(docx_buffer)
+        docx_buffer.seek(0)
+
+        return docx_buffer
+
+    except Exception as e:
+        # Si hay un error general, hacemos un log y devolvemos None
+        logger.error(f"Error al generar informe DOCX: {str(e)}")
+        logger.error(traceback.format_exc())
+        return None
+
+
+# --- 2. GENERACIÓN DE INFORME HTML (FUNCIÓN CORREGIDA) ---
+
+
+def _generar_informe_html(nombre, nivel, fecha, texto_original, texto_corregido, analisis_contextual, consejo_final):
+    """
+    Genera un informe de corrección en formato HTML.
+    Versión optimizada con mejor manejo de valores nulos y formato.
+
+    Args:
+        nombre: Nombre del estudiante
+        nivel: Nivel del estudiante
+        fecha: Fecha de la corrección
+        texto_original: Texto original del estudiante
+        texto_corregido: Texto con correcciones
+        analisis_contextual: Objeto con análisis contextual
+        consejo_final: Consejo final para el estudiante
+
+    Returns:
+        str: Contenido HTML del informe
+    """
+    try:
+        # SOLUCIÓN: Simplificar verificación de entradas
+        # Usar valores seguros por defecto de manera más directa
+        nombre = nombre or "Estudiante"
+        nivel = nivel or "No especificado"
+        fecha = fecha or datetime.now().strftime("%Y-%m-%d %H:%M")
+        texto_original = texto_original or "No disponible"
+        texto_corregido = texto_corregido or "No disponible"
+        consejo_final = consejo_final or "No disponible"
+        app_version = APP_VERSION
+
+        # Función para sanitizar HTML
+        def sanitize_html(text):
+            if not text:
+                return ""
+            # Reemplazar caracteres problemáticos
+            sanitized = text.replace("<", "&lt;").replace(">", "&gt;")
+            # Convertir saltos de línea en <br>
+            sanitized = sanitized.replace("\n", "<br>")
+            return sanitized
+
+        # Sanitizar textos
+        texto_original_safe = sanitize_html(texto_original)
+        texto_corregido_safe = sanitize_html(texto_corregido)
+        consejo_final_safe = sanitize_html(consejo_final)
+
+        # SOLUCIÓN: Simplificar verificación de análisis contextual
+        analisis_contextual = analisis_contextual if isinstance(
+            analisis_contextual, dict) else {}
+
+        # Extraer datos de análisis contextual con manejo seguro
+        coherencia = analisis_contextual.get('coherencia', {})
+        cohesion = analisis_contextual.get('cohesion', {})
+        registro = analisis_contextual.get('registro_linguistico', {})
+        adecuacion = analisis_contextual.get('adecuacion_cultural', {})
+
+        puntuacion_coherencia = coherencia.get('puntuacion', 'N/A')
+        puntuacion_cohesion = cohesion.get('puntuacion', 'N/A')
+        puntuacion_registro = registro.get('puntuacion', 'N/A')
+        puntuacion_adecuacion = adecuacion.get('puntuacion', 'N/A')
+
+        # Crear HTML con estructura mejorada
+        html_content = f'''
+        <!DOCTYPE html>
+        <html lang="es">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Informe de corrección - {nombre}</title>
+            <style>
+                body {{ 
+                    font-family: Arial, sans-serif; 
+                    line-height: 1.6; 
+                    margin: 0;
+                    padding: 20px;
+                    color: #333;
+                }}
+                .container {{ 
+                    max-width: 800px; 
+                    margin: 0 auto; 
+                    padding: 20px; 
+                    box-shadow: 0 0 10px rgba(0,0,0,0.1);
+                    background-color: #fff;
+                    border-radius: 5px;
+                }}
+                h1 {{ 
+                    color: #2c3e50; 
+                    border-bottom: 2px solid #3498db;
+                    padding-bottom: 10px;
+                }}
+                h2 {{ 
+                    color: #3498db; 
+                    margin-top: 30px; 
+                    border-left: 4px solid #3498db;
+                    padding-left: 10px;
+                }}
+                h3 {{ 
+                    color: #2980b9; 
+                    margin-top: 20px;
+                }}
+                .original {{ 
+                    background-color: #f8f9fa; 
+                    padding: 15px; 
+                    border-left: 4px solid #6c757d; 
+                    white-space: pre-wrap;
+                    margin: 15px 0;
+                    border-radius: 4px;
+                }}
+                .corregido {{ 
+                    background-color: #e7f4e4; 
+                    padding: 15px; 
+                    border-left: 4px solid #28a745; 
+                    white-space: pre-wrap;
+                    margin: 15px 0;
+                    border-radius: 4px;
+                }}
+                .puntuaciones {{ 
+                    width: 100%; 
+                    border-collapse: collapse; 
+                    margin: 20px 0;
+                }}
+                .puntuaciones th, .puntuaciones td {{ 
+                    border: 1px solid #ddd; 
+                    padding: 10px; 
+                    text-align: center;
+                }}
+                .puntuaciones th {{ 
+                    background-color: #f2f2f2; 
+                    font-weight: bold;
+                }}
+                .consejo {{ 
+                    background-color: #e7f5fe; 
+                    padding: 15px; 
+                    border-left: 4px solid #17a2b8; 
+                    margin: 20px 0;
+                    border-radius: 4px;
+                }}
+                .footer {{ 
+                    margin-top: 50px; 
+                    padding-top: 20px; 
+                    border-top: 1px solid #ddd; 
+                    color: #6c757d; 
+                    font-size: 0.8em;
+                    text-align: center;
+                }}
+                @media print {{
+                    body {{ background-color: #fff; }}
+                    .container {{ box-shadow: none; }}
+                    a {{ text-decoration: none; color: #000; }}
+                }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>Informe de corrección textual</h1>
+
+                <section>
+                    <h2>Información general</h2>
+                    <p><strong>Nombre:</strong> {nombre}</p>
+                    <p><strong>Nivel:</strong> {nivel}</p>
+                    <p><strong>Fecha:</strong> {fecha}</p>
+                </section>
+
+                <section>
+                    <h2>Texto original</h2>
+                    <div class="original">
+                        {texto_original_safe}
+                    </div>
+
+                    <h2>Texto corregido</h2>
+                    <div class="corregido">
+                        {texto_corregido_safe}
+                    </div>
+                </section>
+
+                <section>
+                    <h2>Análisis contextual</h2>
+
+                    <h3>Puntuaciones</h3>
+                    <table class="puntuaciones">
+                        <tr>
+                            <th>Coherencia</th>
+                            <th>Cohesión</th>
+                            <th>Registro</th>
+                            <th>Adecuación cultural</th>
+                        </tr>
+                        <tr>
+                            <td>{puntuacion_coherencia}/10</td>
+                            <td>{puntuacion_cohesion}/10</td>
+                            <td>{puntuacion_registro}/10</td>
+                            <td>{puntuacion_adecuacion}/10</td>
+                        </tr>
+                    </table>
+                    
+                    <h3>Coherencia textual</h3>
+                    <p>{sanitize_html(coherencia.get('comentario', 'No disponible'))}</p>
+                    
+                    <h3>Cohesión textual</h3>
+                    <p>{sanitize_html(cohesion.get('comentario', 'No disponible'))}</p>
+                    
+                    <h3>Registro lingüístico</h3>
+                    <p><strong>Tipo detectado:</strong> {sanitize_html(registro.get('tipo_detectado', 'No especificado'))}</p>
+                    <p>{sanitize_html(registro.get('adecuacion', 'No disponible'))}</p>
+                    
+                    <h3>Adecuación cultural</h3>
+                    <p>{sanitize_html(adecuacion.get('comentario', 'No disponible'))}</p>
+                </section>
+
+                <section>
+                    <h2>Consejo final</h2>
+                    <div class="consejo">
+                        <p>{consejo_final_safe}</p>
+                    </div>
+                </section>
+
+                <div class="footer">
+                    <p>Textocorrector ELE - Informe generado el {fecha} - Versión {app_version}</p>
+                    <p>Este informe fue generado automáticamente por la aplicación Textocorrector ELE</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        '''
+
+        return html_content
+
+    except Exception as e:
+        logger.error(f"Error al generar informe HTML: {str(e)}")
+        logger.error(traceback.format_exc())
+
+        # Crear HTML básico de error
+        return f'''
+        <!DOCTYPE html>
+        <html>
+        <head><title>Error en informe</title></head>
+        <body>
+            <h1>Error al generar informe</h1>
+            <p>Se produjo un error al generar el informe. Por favor, inténtelo de nuevo.</p>
+        </body>
+        </html>
+        '''
+
+
+# --- 3. GENERACIÓN DE INFORME CSV ---
+
+
+def _generar_csv_analisis(nombre, nivel, fecha, datos_analisis):
+    """
+    Genera un archivo CSV con los datos de análisis de una corrección.
+    Versión mejorada con mejor manejo de errores y formato consistente.
+
+    Args:
+        nombre: Nombre del estudiante
+        nivel: Nivel del estudiante
+        fecha: Fecha de la corrección
+        datos_analisis: Diccionario con datos de análisis
+
+    Returns:
+        BytesIO: Buffer con el CSV generado
+    """
+    try:
+        # Asegurar que tenemos datos válidos
+        nombre = nombre or "Estudiante"
+        nivel = nivel or "No especificado"
+        fecha = fecha or datetime.now().strftime("%Y-%m-%d %H:%M")
+
+        # Verificar que datos_analisis es un diccionario
+        if not isinstance(datos_analisis, dict):
+            datos_analisis = {}
+
+        # Extraer datos con manejo seguro
+        errores = datos_analisis.get("errores", {}) or {}
+        analisis_contextual = datos_analisis.get(
+            "analisis_contextual", {}) or {}
+
+        # Contar errores por categoría con validación
+        num_gramatica = len(errores.get("Gramática", [])) if isinstance(
+            errores.get("Gramática"), list) else 0
+        num_lexico = len(errores.get("Léxico", [])) if isinstance(
+            errores.get("Léxico"), list) else 0
+        num_puntuacion = len(errores.get("Puntuación", [])) if isinstance(
+            errores.get("Puntuación"), list) else 0
+        num_estructura = len(errores.get("Estructura textual", [])) if isinstance(
+            errores.get("Estructura textual"), list) else 0
+        total_errores = num_gramatica + num_lexico + num_puntuacion + num_estructura
+
+        # Extraer puntuaciones con validación
+        coherencia = analisis_contextual.get("coherencia", {}) or {}
+        cohesion = analisis_contextual.get("cohesion", {}) or {}
+        registro = analisis_contextual.get("registro_linguistico", {}) or {}
+        adecuacion = analisis_contextual.get("adecuacion_cultural", {}) or {}
+
+        # Convertir a valores numéricos o 0 si no están disponibles
+        def safe_numeric(val, default=0):
+            if val is None:
+                return default
+            try:
+                return float(val)
+            except (ValueError, TypeError):
+                return default
+
+        coherencia_punt = safe_numeric(coherencia.get("puntuacion"))
+        cohesion_punt = safe_numeric(cohesion.get("puntuacion"))
+        registro_punt = safe_numeric(registro.get("puntuacion"))
+        adecuacion_punt = safe_numeric(adecuacion.get("puntuacion"))
+
+        # Extraer consejo final
+        consejo_final = datos_analisis.get("consejo_final", "")
+        # Limitar a 100 caracteres para el CSV
+        consejo_resumen = consejo_final[:100] + "..." if consejo_final and len(
+            consejo_final) > 100 else consejo_final
+
+        # Crear CSV en memoria
+        csv_buffer = StringIO()
+
+        # Encabezados
+        csv_buffer.write("Categoría,Dato\n")
+
+        # Datos básicos
+        csv_buffer.write(f"Nombre,{nombre}\n")
+        csv_buffer.write(f"Nivel,{nivel}\n")
+        csv_buffer.write(f"Fecha,{fecha}\n")
+
+        # Datos de errores
+        csv_buffer.write(f"Errores Gramática,{num_gramatica}\n")
+        csv_buffer.write(f"Errores Léxico,{num_lexico}\n")
+        csv_buffer.write(f"Errores Puntuación,{num_puntuacion}\n")
+        csv_buffer.write(f"Errores Estructura,{num_estructura}\n")
+        csv_buffer.write(f"Total Errores,{total_errores}\n")
+
+        # Datos de análisis contextual
+        csv_buffer.write(f"Puntuación Coherencia,{coherencia_punt}\n")
+        csv_buffer.write(f"Puntuación Cohesión,{cohesion_punt}\n")
+        csv_buffer.write(f"Puntuación Registro,{registro_punt}\n")
+        csv_buffer.write(f"Puntuación Adecuación Cultural,{adecuacion_punt}\n")
+
+        # Datos adicionales (sin incluir texto completo)
+        csv_buffer.write(
+            f"Tipo Registro,{registro.get('tipo_detectado', 'No especificado')}\n")
+        csv_buffer.write(f"Consejo Final (Resumen),{consejo_resumen}\n")
+
+        # Convertir a bytes
+        csv_bytes = csv_buffer.getvalue().encode(
+            'utf-8-sig')  # Usar UTF-8 con BOM para Excel
+
+        # Crear buffer de bytes
+        bytes_buffer = BytesIO(csv_bytes)
+        bytes_buffer.seek(0)  # Importante: posicionar al inicio del buffer
+
+        return bytes_buffer
+
+    except Exception as e:
+        logger.error(f"Error al generar CSV: {str(e)}")
+        logger.error(traceback.format_exc())
+
+        # Crear CSV básico con mensaje de error
+        csv_buffer = StringIO()
+        csv_buffer.write("Error,Mensaje\n")
+        csv_buffer.write(f"Error al generar CSV,{str(e)}\n")
+
+        return BytesIO(csv_buffer.getvalue().encode('utf-8-sig'))
+
+
+# --- 4. CACHÉ DE EXPORTACIONES ---
+
+
+def _exportacion_cacheada(tipo, nombre, partes, generar):
+    """
+    Devuelve un informe desde la caché de exportaciones o lo genera y lo guarda.
+
+    Args:
+        tipo: Formato del informe ("docx", "html" o "csv")
+        nombre: Nombre del estudiante (prefijo de la clave, para invalidar por estudiante)
+        partes: Datos de los que depende el informe
+        generar: Función sin argumentos que genera el informe
+
+    Returns:
+        BytesIO o str: Informe generado (los buffers se devuelven como copia nueva)
+    """
+    clave = (clave_estudiante(nombre), tipo, digest(*partes))
+    contenido = cache_manager.get(NS_EXPORTACIONES, clave)
+    if contenido is None:
+        resultado = generar()
+        if resultado is None:
+            return None
+        contenido = resultado.getvalue() if isinstance(resultado, BytesIO) else resultado
+        cache_manager.set(NS_EXPORTACIONES, clave, contenido)
+    return BytesIO(contenido) if isinstance(contenido, bytes) else contenido
+
+
+def generar_informe_docx(nombre, nivel, fecha, texto_original, texto_corregido, errores_obj, analisis_contextual, consejo_final):
+    """Genera (o recupera de la caché) el informe DOCX. Ver _generar_informe_docx."""
+    return _exportacion_cacheada(
+        "docx", nombre,
+        (nivel, fecha, texto_original, texto_corregido, json.dumps(errores_obj, sort_keys=True, default=str),
+         json.dumps(analisis_contextual, sort_keys=True, default=str), consejo_final),
+        lambda: _generar_informe_docx(nombre, nivel, fecha, texto_original, texto_corregido,
+                                      errores_obj, analisis_contextual, consejo_final)
+    )
+
+
+def generar_informe_html(nombre, nivel, fecha, texto_original, texto_corregido, analisis_contextual, consejo_final):
+    """Genera (o recupera de la caché) el informe HTML. Ver _generar_informe_html."""
+    return _exportacion_cacheada(
+        "html", nombre,
+        (nivel, fecha, texto_original, texto_corregido,
+         json.dumps(analisis_contextual, sort_keys=True, default=str), consejo_final),
+        lambda: _generar_informe_html(nombre, nivel, fecha, texto_original, texto_corregido,
+                                      analisis_contextual, consejo_final)
+    )
+
+
+def generar_csv_analisis(nombre, nivel, fecha, datos_analisis):
+    """Genera (o recupera de la caché) el CSV de análisis. Ver _generar_csv_analisis."""
+    return _exportacion_cacheada(
+        "csv", nombre,
+        (nivel, fecha, json.dumps(datos_analisis, sort_keys=True, default=str)),
+        lambda: _generar_csv_analisis(nombre, nivel, fecha, datos_analisis)
+    )
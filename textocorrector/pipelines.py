@@ -0,0 +1,1689 @@
+"""Procesos de corrección, análisis y generación de contenidos con IA."""
+
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from exercise_bank import banda_nivel, patron_error
+from exercise_templates import IDIOMAS_PLANTILLAS, clasificar_error, generar_ejercicio_local
+from lexical_index import estimar_nivel_lexico
+from model_router import ejecutar_con_escalado, elegir_modelo, respuesta_no_vacia
+from near_duplicates import get_indice_duplicados
+from orthography_checker import errores_por_categoria, fusionar_errores, revisar_texto
+from sentence_diff import crear_base, planificar_recorreccion, reconstruir_correccion
+from text_metrics import calcular_indices
+
+from textocorrector.cache import NS_EJERCICIOS, cache_manager, digest
+from textocorrector.clients import (
+    circuit_breaker, extract_json_safely, get_openai_client, handle_exception,
+    obtener_json_de_ia, retry_with_backoff, get_sheets_connection
+)
+from textocorrector.prompts import (
+    ANALISIS_GLOBAL, AVISO_ERRORES_DETECTADOS, COMPLEJIDAD, COMPLEJIDAD_CON_LEXICO, CONSIGNA,
+    CORRECCION, CORRECCION_FRAGMENTO, EJEMPLOS_EVALUADOS, EJERCICIOS, PLAN_ESTUDIO,
+    RECORRECCION, TAREA_EXAMEN, parametros_correccion)
+from textocorrector.session import get_session_var, set_session_var
+from textocorrector.storage import get_exercise_bank, guardar_correccion
+
+logger = logging.getLogger(__name__)
+
+
+def _completar_enrutado(client, decision, messages, plantilla=None, **opciones):
+    """
+    Pide una respuesta al modelo elegido por el enrutador y la repite con un
+    modelo más capaz si no es válida (ver model_router.ejecutar_con_escalado).
+
+    Args:
+        client: Cliente de OpenAI
+        decision: Resultado de elegir_modelo
+        messages: Mensajes de la petición
+        plantilla: Plantilla con esquema JSON; si se indica, la respuesta se
+                   extrae como JSON y se valida contra el esquema
+        **opciones: Otros parámetros de la petición (temperature...)
+
+    Returns:
+        str o dict: Texto de la respuesta, o JSON extraído si hay plantilla
+    """
+    def enviar(modelo):
+        response = retry_with_backoff(
+            lambda: client.chat.completions.create(model=modelo, messages=messages, **opciones),
+            max_retries=2)
+        contenido = response.choices[0].message.content
+        return contenido if plantilla is None else extract_json_safely(contenido)
+
+    if plantilla is None:
+        validar = respuesta_no_vacia
+    else:
+        def validar(data):
+            return "error" not in data and not plantilla.validar(data)
+
+    respuesta, _ = ejecutar_con_escalado(decision, enviar, validar)
+    return respuesta
+
+
+# --- 1. FUNCIONES DE GENERACIÓN DE CONSIGNAS ---
+
+
+def generar_consigna_escritura(nivel_actual, tipo_consigna):
+    """
+    Genera una consigna de escritura adaptada al nivel del estudiante
+    y el tipo de texto solicitado.
+
+    Args:
+        nivel_actual: Nivel del estudiante (principiante, intermedio, avanzado)
+        tipo_consigna: Tipo de texto a generar
+
+    Returns:
+        str: Consigna de escritura generada o mensaje de error
+    """
+    client = get_openai_client()
+    if client is None:
+        return "No se pudo generar la consigna debido a problemas de conexión."
+
+    if not circuit_breaker.can_execute("openai"):
+        return "Servicio temporalmente no disponible. Inténtelo más tarde."
+
+    # Si es aleatorio, seleccionar un tipo
+    if tipo_consigna == "Cualquiera (aleatorio)":
+        import random
+        tipos_disponibles = [
+            "Narración", "Correo/Carta formal", "Opinión/Argumentación",
+            "Descripción", "Diálogo"
+        ]
+        tipo_consigna = random.choice(tipos_disponibles)
+
+    # Construir prompt mejorado para OpenAI
+    system_message, prompt_consigna = CONSIGNA.render(
+        nivel=nivel_actual, tipo_consigna=tipo_consigna)
+
+    try:
+        # Modelo elegido por el enrutador; una respuesta no válida se repite
+        # con un modelo más capaz
+        consigna = _completar_enrutado(
+            client, elegir_modelo(CONSIGNA.nombre, nivel=nivel_actual),
+            [{"role": "system", "content": system_message},
+             {"role": "user", "content": prompt_consigna}],
+            temperature=0.8)
+
+        # Registrar éxito
+        circuit_breaker.record_success("openai")
+        consigna = (consigna or "").strip()
+        CONSIGNA.registrar_respuesta(consigna)
+        return consigna
+
+    except Exception as e:
+        error_msg = f"Error al generar consigna: {str(e)}"
+        logger.error(error_msg)
+        circuit_breaker.record_failure("openai")
+        return f"No se pudo generar la consigna. Error: {str(e)}"
+
+
+def obtener_criterios_evaluacion(tipo_examen, nivel_examen):
+    """
+    Obtiene los criterios de evaluación para un examen y nivel específicos.
+
+    Args:
+        tipo_examen: Tipo de examen (DELE, SIELE, etc.)
+        nivel_examen: Nivel del examen (A1, A2, etc.)
+
+    Returns:
+        str: Criterios de evaluación en formato markdown
+    """
+    # Criterios genéricos por defecto
+    criterios_default = """
+    ## Criterios de evaluación genéricos
+
+    ### Adecuación al contexto
+    - Ajuste a la tarea solicitada
+    - Adecuación al registro requerido
+    - Cumplimiento del propósito comunicativo
+
+    ### Coherencia y cohesión
+    - Organización lógica de las ideas
+    - Uso adecuado de conectores
+    - Desarrollo temático apropiado
+
+    ### Corrección gramatical
+    - Uso adecuado de estructuras gramaticales
+    - Control de tiempos verbales
+    - Concordancia nominal y verbal
+
+    ### Riqueza léxica
+    - Variedad y precisión del vocabulario
+    - Uso apropiado de expresiones idiomáticas
+    - Evitar repeticiones innecesarias
+    """
+
+    # Criterios específicos para DELE
+    if tipo_examen == "DELE":
+        if nivel_examen in ["A1", "A2"]:
+            return """
+            ## Criterios de evaluación DELE A1-A2
+
+            ### Adecuación al contexto (25%)
+            - Cumple con la tarea solicitada
+            - Se ajusta a la extensión requerida
+            - Emplea el registro adecuado (formal/informal)
+
+            ### Coherencia textual (25%)
+            - Las ideas están organizadas con lógica
+            - Usa conectores básicos (y, pero, porque)
+            - Información relevante y comprensible
+
+            ### Corrección gramatical (25%)
+            - Uso correcto de estructuras básicas
+            - Control de presente y pasados simples
+            - Concordancia nominal y verbal básica
+
+            ### Alcance y control léxico (25%)
+            - Vocabulario básico suficiente
+            - Ortografía de palabras frecuentes
+            - Expresiones memorizadas adecuadas
+            """
+        elif nivel_examen in ["B1", "B2"]:
+            return """
+            ## Criterios de evaluación DELE B1-B2
+
+            ### Adecuación a la tarea (20%)
+            - Cumple los puntos requeridos en la tarea
+            - Se ajusta a la extensión y formato
+            - Registro adecuado al destinatario y propósito
+
+            ### Coherencia y cohesión (20%)
+            - Progresión temática clara
+            - Uso variado de conectores y marcadores
+            - Estructura textual apropiada al género
+
+            ### Corrección gramatical (30%)
+            - Estructuras variadas con pocos errores
+            - Buen control de tiempos y modos verbales
+            - Uso adecuado de subordinación
+
+            ### Alcance y control léxico (30%)
+            - Vocabulario preciso y variado
+            - Pocas confusiones o imprecisiones léxicas
+            - Ortografía y puntuación generalmente correctas
+            """
+        else:  # C1-C2
+            return """
+            ## Criterios de evaluación DELE C1-C2
+
+            ### Adecuación a la tarea (20%)
+            - Desarrollo completo y matizado de todos los puntos
+            - Formato y extensión perfectamente ajustados
+            - Registro sofisticado y perfectamente adaptado
+
+            ### Coherencia y cohesión (20%)
+            - Estructura textual compleja y elaborada
+            - Amplia variedad de mecanismos de cohesión
+            - Desarrollo argumentativo sofisticado
+
+            ### Corrección gramatical (30%)
+            - Uso preciso y flexible de estructuras complejas
+            - Control de aspectos sutiles de la gramática
+            - Errores escasos y poco significativos
+
+            ### Alcance y control léxico (30%)
+            - Vocabulario amplio, preciso y natural
+            - Uso adecuado de expresiones idiomáticas
+            - Pleno control de matices y connotaciones
+            """
+
+    # Criterios específicos para SIELE
+    elif tipo_examen == "SIELE":
+        return """
+        ## Criterios de evaluación SIELE
+
+        ### Coherencia textual (25%)
+        - Organización lógica del contenido
+        - Desarrollo adecuado de las ideas
+        - Uso de conectores apropiados al nivel
+
+        ### Corrección lingüística (25%)
+        - Control gramatical según el nivel
+        - Precisión léxica adecuada
+        - Ortografía y puntuación
+
+        ### Adecuación al contexto (25%)
+        - Cumplimiento de la tarea solicitada
+        - Registro apropiado a la situación
+        - Longitud del texto según lo requerido
+
+        ### Alcance lingüístico (25%)
+        - Variedad de recursos gramaticales
+        - Riqueza de vocabulario
+        - Complejidad apropiada al nivel
+        """
+
+    # Por defecto, devolvemos criterios genéricos
+    return criterios_default
+
+
+def obtener_duracion_examen(tipo_examen, nivel_examen):
+    """
+    Obtiene la duración en segundos para un simulacro según el tipo y nivel de examen.
+
+    Args:
+        tipo_examen: Tipo de examen (DELE, SIELE, etc.)
+        nivel_examen: Nivel del examen (A1, A2, etc.)
+
+    Returns:
+        int: Duración en segundos
+    """
+    try:
+        # Verificar que los parámetros son válidos
+        if tipo_examen is None or nivel_examen is None:
+            logger.warning(
+                "Parámetros inválidos en obtener_duracion_examen: tipo_examen o nivel_examen es None")
+            return 45 * 60  # 45 minutos por defecto
+
+        # Mapeo de duraciones según examen y nivel
+        duraciones = {
+            "DELE": {
+                "A1": 25 * 60,  # 25 minutos
+                "A2": 30 * 60,
+                "B1": 40 * 60,
+                "B2": 60 * 60,
+                "C1": 80 * 60,
+                "C2": 90 * 60
+            },
+            "SIELE": {
+                "A1": 20 * 60,
+                "A2": 25 * 60,
+                "B1": 35 * 60,
+                "B2": 50 * 60,
+                "C1": 70 * 60,
+                "C2": 80 * 60
+            },
+            "CELU": {
+                "A1": 30 * 60,
+                "A2": 35 * 60,
+                "B1": 45 * 60,
+                "B2": 60 * 60,
+                "C1": 75 * 60,
+                "C2": 90 * 60
+            },
+            "DUCLE": {
+                "A1": 20 * 60,
+                "A2": 25 * 60,
+                "B1": 30 * 60,
+                "B2": 40 * 60,
+                "C1": 50 * 60,
+                "C2": 60 * 60
+            }
+        }
+
+        # Intentar obtener la duración específica
+        duracion = duraciones.get(tipo_examen, {}).get(nivel_examen)
+
+        # Si no se encuentra, usar el valor por defecto
+        if duracion is None:
+            logger.info(
+                f"No se encontró duración para {tipo_examen} nivel {nivel_examen}, usando valor por defecto")
+            duracion = 45 * 60  # 45 minutos por defecto
+
+        return duracion
+
+    except Exception as e:
+        logger.error(f"Error en obtener_duracion_examen: {str(e)}")
+        return 45 * 60  # 45 minutos por defecto
+
+
+def extraer_titulo(texto):
+    """
+    Extrae el título de una sección de texto.
+
+    Args:
+        texto: Texto de la sección
+
+    Returns:
+        str: Título extraído
+    """
+    if not texto:
+        return "Contenido sin título"
+
+    lineas = texto.strip().split("\n")
+    if lineas and lineas[0]:
+        # Eliminar caracteres no deseados que podrían aparecer en un título
+        titulo = lineas[0].strip().strip('#').strip('-').strip('*').strip()
+        return titulo
+
+    return "Contenido sin título"
+
+
+# --- 2. ANÁLISIS Y CORRECCIÓN DE TEXTOS ---
+
+
+def _resultado_sin_ia(indices, lexico, aviso):
+    """Análisis con solo los datos calculados localmente y un aviso."""
+    resultado = {"indices": indices, "aviso": aviso}
+    if lexico:
+        resultado["complejidad_lexica"] = lexico
+    return resultado
+
+
+def analizar_complejidad_texto(texto, indices=None, lexico=None):
+    """
+    Analiza la complejidad lingüística de un texto en español.
+    Los índices estadísticos (TTR, densidad léxica, Szigriszt) y el nivel
+    léxico (índice de vocabulario por nivel del MCER) se calculan localmente;
+    la IA solo aporta el análisis cualitativo. Si la IA no está disponible se
+    devuelven igualmente los datos locales, con un aviso.
+
+    Args:
+        texto: Texto a analizar
+        indices: Índices ya calculados con calcular_indices (opcional)
+        lexico: Nivel léxico ya estimado con estimar_nivel_lexico (opcional)
+
+    Returns:
+        dict: Análisis de complejidad (con "indices" y, si falta la parte
+              cualitativa, "aviso") o mensaje de error
+    """
+    if not texto:
+        return {"error": "No se pudo realizar el análisis. Verifique el texto."}
+
+    if indices is None:
+        indices = calcular_indices(texto)
+    if "error" in indices:
+        return indices
+
+    if lexico is None:
+        lexico = estimar_nivel_lexico(texto)
+    if "error" in lexico:
+        logger.warning(f"Nivel léxico no disponible: {lexico['error']}")
+        lexico = None
+
+    client = get_openai_client()
+    if client is None:
+        return _resultado_sin_ia(
+            indices, lexico, "El análisis cualitativo no está disponible: no hay conexión con OpenAI.")
+
+    if not circuit_breaker.can_execute("openai"):
+        return _resultado_sin_ia(
+            indices, lexico, "El análisis cualitativo está temporalmente no disponible. Inténtelo más tarde.")
+
+    try:
+        # Prompt para análisis de complejidad. El nivel léxico y las palabras
+        # destacadas ya vienen del índice local si está disponible
+        campos = {k: indices[k] for k in
+                  ("palabras", "oraciones", "ttr", "densidad_lexica", "szigriszt", "inflesz")}
+        if lexico:
+            plantilla = COMPLEJIDAD_CON_LEXICO
+            campos.update(nivel_lexico=lexico["nivel"],
+                          palabras_destacadas=", ".join(lexico["palabras_destacadas"]) or "ninguna")
+        else:
+            plantilla = COMPLEJIDAD
+        system_message, prompt_analisis = plantilla.render(texto=texto, **campos)
+
+        # Modelo elegido por el enrutador; una respuesta no válida se repite
+        # con un modelo más capaz
+        analisis_data = _completar_enrutado(
+            client, elegir_modelo("complejidad", palabras=indices["palabras"]),
+            [{"role": "system", "content": system_message},
+             {"role": "user", "content": prompt_analisis}],
+            plantilla=plantilla,
+            temperature=0.3,  # Temperatura baja para resultados más precisos
+            # Forzar respuesta en JSON
+            response_format={"type": "json_object"})
+        plantilla.registrar_respuesta(analisis_data)
+
+        # Verificar si se obtuvo un resultado válido
+        if "error" in analisis_data:
+            circuit_breaker.record_failure("openai")
+            return _resultado_sin_ia(
+                indices, lexico, "No se pudo procesar el análisis cualitativo. Formato de respuesta incorrecto.")
+
+        # Registrar éxito
+        circuit_breaker.record_success("openai")
+        analisis_data["indices"] = indices
+        if lexico:
+            descripcion = analisis_data.get("complejidad_lexica", {}).get("descripcion")
+            analisis_data["complejidad_lexica"] = dict(
+                lexico, descripcion=descripcion or lexico["descripcion"])
+        return analisis_data
+
+    except Exception as e:
+        handle_exception("analizar_complejidad_texto", e)
+        circuit_breaker.record_failure("openai")
+        return _resultado_sin_ia(indices, lexico, f"Error en el análisis cualitativo: {str(e)}")
+
+
+# Máximo de errores de la revisión local que se enumeran en el prompt
+MAX_ERRORES_LOCALES_PROMPT = 40
+
+
+def _errores_detectados(hallazgos):
+    """Lista de los errores mecánicos ya detectados, para el mensaje a la IA."""
+    if not hallazgos:
+        return ""
+    lineas = [f'- "{h["fragmento_erroneo"].strip()}" -> "{h["correccion"].strip()}"'
+              for h in hallazgos[:MAX_ERRORES_LOCALES_PROMPT]]
+    if len(hallazgos) > MAX_ERRORES_LOCALES_PROMPT:
+        lineas.append(f"- ... y {len(hallazgos) - MAX_ERRORES_LOCALES_PROMPT} más del mismo tipo")
+    return AVISO_ERRORES_DETECTADOS + "\n".join(lineas) + "\n"
+
+
+def corregir_texto(texto, nombre, nivel, idioma, tipo_texto, contexto_cultural, info_adicional="",
+                   revision=None):
+    """
+    Realiza una corrección completa de un texto con análisis contextual.
+
+    Los errores mecánicos (ortografía, puntuación, concordancia y formas
+    verbales) se detectan antes con la revisión local (orthography_checker);
+    la IA recibe la lista para no repetirlos y se añaden al resultado final.
+    Los textos de más de UMBRAL_TEXTO_LARGO palabras se corrigen por
+    fragmentos en paralelo (ver _corregir_por_fragmentos) y, si el texto es un
+    reenvío retocado del anterior o casi igual a otro corregido hace poco,
+    solo se corrigen las oraciones cambiadas (ver _recorregir_oraciones).
+
+    Args:
+        texto: Texto a corregir
+        nombre: Nombre del estudiante
+        nivel: Nivel del estudiante
+        idioma: Idioma de corrección (Español, Francés, Inglés)
+        tipo_texto: Tipo de texto
+        contexto_cultural: Contexto cultural relevante
+        info_adicional: Información adicional o contexto
+        revision: Hallazgos ya calculados con revisar_texto (opcional)
+
+    Returns:
+        dict: Resultado de la corrección o mensaje de error
+    """
+    try:
+        client = get_openai_client()
+        if client is None:
+            return {"error": "Servicio de corrección no disponible. Verifique la conexión."}
+
+        if not circuit_breaker.can_execute("openai"):
+            return {"error": "Servicio temporalmente no disponible. Inténtelo más tarde."}
+
+        # Validar la entrada
+        if not texto or not nombre:
+            return {"error": "El texto y el nombre son obligatorios."}
+
+        # Errores mecánicos ya detectados localmente
+        if revision is None:
+            revision = revisar_texto(texto, idioma)
+
+        # Instrucciones para el modelo de IA con análisis contextual avanzado:
+        # prefijo estático y parámetros al final (ver textocorrector.prompts)
+        system_message, user_message = CORRECCION.render(
+            texto=texto, nivel=nivel, nombre=nombre,
+            info_adicional=f"Información adicional: {info_adicional}" if info_adicional else "",
+            errores_detectados=_errores_detectados(revision),
+            **parametros_correccion(nivel, idioma, tipo_texto, contexto_cultural))
+
+        try:
+            # Si es un reenvío con pocos cambios, solo se corrigen las oraciones
+            # nuevas o modificadas
+            opciones = _clave_opciones(nivel, idioma, tipo_texto, contexto_cultural, info_adicional)
+            clave = digest(nombre, opciones)
+            base = get_session_var("correccion_base")
+            plan = planificar_recorreccion(base, texto, clave)
+
+            # Si no, se busca un texto casi igual corregido hace poco (plantillas
+            # compartidas, respuestas copiadas)
+            firma = get_indice_duplicados().firma(texto)
+            reanalizar = False
+            if plan is None and firma is not None:
+                base, reanalizar = _base_casi_duplicado(texto, firma, nombre, opciones)
+                if base is not None:
+                    plan = planificar_recorreccion(base, texto, base["clave"])
+
+            data_json = None
+            if plan is not None:
+                data_json = _recorregir_oraciones(
+                    base, plan, nombre, nivel, idioma,
+                    tipo_texto, contexto_cultural, revision)
+                if "error" not in data_json and reanalizar:
+                    data_json = _completar_analisis_personal(
+                        data_json, texto, nombre, nivel, idioma, tipo_texto,
+                        contexto_cultural, info_adicional)
+                if "error" in data_json:
+                    logger.warning(f"Recorrección diferencial fallida: {data_json['error']}")
+                    data_json = None
+
+            # Los textos largos se corrigen por fragmentos en paralelo
+            fragmentos = (dividir_en_fragmentos(texto)
+                          if len(texto.split()) > UMBRAL_TEXTO_LARGO else [])
+            if data_json is not None:
+                raw_output = json.dumps(data_json, ensure_ascii=False)
+            elif len(fragmentos) > 1:
+                data_json = _corregir_por_fragmentos(
+                    fragmentos, texto, nombre, nivel, idioma, tipo_texto,
+                    contexto_cultural, info_adicional, revision)
+                raw_output = None if "error" in data_json else json.dumps(
+                    data_json, ensure_ascii=False)
+            else:
+                # Enviar solicitud a OpenAI
+                raw_output, data_json = obtener_json_de_ia(
+                    system_message, user_message, max_retries=3, plantilla=CORRECCION,
+                    nivel=nivel, palabras=len(texto.split()))
+
+            # Verificar si hay error en la respuesta
+            if raw_output is None or "error" in data_json:
+                error_msg = data_json.get(
+                    "error", "Error desconocido en el procesamiento")
+                logger.error(f"Error en corrección: {error_msg}")
+                return {"error": error_msg}
+
+            # Registrar éxito
+            circuit_breaker.record_success("openai")
+
+            if revision:
+                data_json["errores"] = fusionar_errores(
+                    data_json.get("errores", {}), errores_por_categoria(revision))
+                raw_output = json.dumps(data_json, ensure_ascii=False)
+
+            # Guardar corrección si hay conexión a Google Sheets
+            if get_sheets_connection() is not None:
+                resultado_guardado = guardar_correccion(
+                    nombre, nivel, idioma, texto, raw_output)
+                if not resultado_guardado["success"]:
+                    logger.warning(
+                        f"No se pudo guardar la corrección: {resultado_guardado['message']}")
+
+            # Guardar el texto para posible uso futuro
+            set_session_var("ultimo_texto", texto)
+            # Una corrección incompleta (con fragmentos sin corregir) no se reutiliza
+            base = None if "aviso" in data_json else crear_base(texto, data_json, clave)
+            set_session_var("correccion_base", base)
+            if base is not None and firma is not None:
+                get_indice_duplicados().agregar(
+                    texto, {"opciones": opciones, "nombre": nombre, "base": base}, firma=firma)
+
+            # Devolver resultado
+            return data_json
+
+        except Exception as e:
+            error_msg = f"Error al corregir texto: {str(e)}"
+            logger.error(error_msg)
+            circuit_breaker.record_failure("openai")
+            return {"error": error_msg}
+
+    except Exception as e:
+        handle_exception("corregir_texto", e)
+        return {"error": f"Error al corregir texto: {str(e)}"}
+
+
+# --- Corrección de textos largos por fragmentos ---
+
+# A partir de este número de palabras el texto se corrige por párrafos
+UMBRAL_TEXTO_LARGO = 600
+PALABRAS_POR_FRAGMENTO = 350
+MAX_FRAGMENTOS_EN_PARALELO = 4
+PALABRAS_RESUMEN = 80
+
+RE_PARRAFOS = re.compile(r"\n\s*\n")
+RE_ORACIONES = re.compile(r"(?<=[.!?…])\s+")
+
+_correccion_executor = None
+_correccion_lock = threading.Lock()
+
+CATEGORIAS_ERRORES = ("Gramática", "Léxico", "Puntuación", "Estructura textual")
+
+
+def _parrafos(texto):
+    parrafos = [p.strip() for p in RE_PARRAFOS.split(texto) if p.strip()]
+    if len(parrafos) == 1:
+        # Sin líneas en blanco: cada salto de línea separa un párrafo
+        parrafos = [p.strip() for p in texto.splitlines() if p.strip()]
+    return parrafos
+
+
+def dividir_en_fragmentos(texto, max_palabras=PALABRAS_POR_FRAGMENTO):
+    """
+    Divide un texto en fragmentos de párrafos consecutivos de hasta
+    max_palabras palabras. Un párrafo más largo se corta entre oraciones.
+
+    Args:
+        texto: Texto a dividir
+        max_palabras: Número máximo de palabras por fragmento
+
+    Returns:
+        list: Fragmentos en orden, cada uno con "texto" y "separador" (lo que
+              lo separa del fragmento anterior: salto de párrafo o espacio)
+    """
+    # Unidades mínimas: párrafos u oraciones de un párrafo demasiado largo
+    unidades = []
+    for parrafo in _parrafos(texto):
+        if len(parrafo.split()) <= max_palabras:
+            unidades.append(("\n\n", parrafo))
+            continue
+        separador = "\n\n"
+        actual = []
+        for oracion in RE_ORACIONES.split(parrafo):
+            if actual and len(" ".join(actual + [oracion]).split()) > max_palabras:
+                unidades.append((separador, " ".join(actual)))
+                separador = " "
+                actual = []
+            actual.append(oracion)
+        unidades.append((separador, " ".join(actual)))
+
+    fragmentos = []
+    palabras = 0
+    for separador, unidad in unidades:
+        n = len(unidad.split())
+        if fragmentos and palabras + n <= max_palabras:
+            fragmentos[-1]["texto"] += separador + unidad
+            palabras += n
+        else:
+            fragmentos.append({"texto": unidad, "separador": separador})
+            palabras = n
+    if fragmentos:
+        fragmentos[0]["separador"] = ""
+    return fragmentos
+
+
+def resumir_texto(texto, max_palabras=PALABRAS_RESUMEN):
+    """
+    Resumen extractivo del texto (la primera oración de cada párrafo) que
+    sirve de contexto común a la corrección de cada fragmento.
+
+    Args:
+        texto: Texto a resumir
+        max_palabras: Longitud máxima aproximada del resumen
+
+    Returns:
+        str: Resumen
+    """
+    resumen = []
+    palabras = 0
+    for parrafo in _parrafos(texto):
+        oracion = RE_ORACIONES.split(parrafo, maxsplit=1)[0]
+        n = len(oracion.split())
+        if resumen and palabras + n > max_palabras:
+            break
+        resumen.append(oracion)
+        palabras += n
+    return " [...] ".join(resumen)
+
+
+def _corregir_fragmento(fragmento, posicion, total, resumen, nombre, nivel, idioma,
+                        tipo_texto, contexto_cultural, revision):
+    system_message, user_message = CORRECCION_FRAGMENTO.render(
+        resumen=resumen, posicion=posicion, total=total, nombre=nombre, fragmento=fragmento,
+        errores_detectados=_errores_detectados(
+            [h for h in revision if h["fragmento_erroneo"] in fragmento]),
+        **parametros_correccion(nivel, idioma, tipo_texto, contexto_cultural))
+    return obtener_json_de_ia(system_message, user_message, max_retries=2,
+                              plantilla=CORRECCION_FRAGMENTO, nivel=nivel,
+                              palabras=len(fragmento.split()))
+
+
+def _analisis_global(texto, nombre, nivel, idioma, tipo_texto, contexto_cultural,
+                     info_adicional):
+    system_message, user_message = ANALISIS_GLOBAL.render(
+        texto=texto, nombre=nombre,
+        info_adicional=f"Información adicional: {info_adicional}" if info_adicional else "",
+        **parametros_correccion(nivel, idioma, tipo_texto, contexto_cultural))
+    return obtener_json_de_ia(system_message, user_message, max_retries=2,
+                              plantilla=ANALISIS_GLOBAL, nivel=nivel,
+                              palabras=len(texto.split()))
+
+
+def _resultado_futuro(futuro):
+    try:
+        return futuro.result()
+    except Exception as e:
+        logger.error(f"Error en la corrección por fragmentos: {str(e)}")
+        return None, {"error": str(e)}
+
+
+def _corregir_por_fragmentos(fragmentos, texto, nombre, nivel, idioma, tipo_texto,
+                             contexto_cultural, info_adicional, revision):
+    """
+    Corrige un texto largo fragmento a fragmento con un pool acotado de hilos.
+    Cada petición lleva el nivel y un resumen del texto completo; una llamada
+    más barata analiza a la vez el texto entero (analisis_contextual, saludo
+    y consejo final). Los errores y el texto corregido se unen en orden; un
+    fragmento fallido se conserva sin corregir y se avisa.
+
+    Args:
+        fragmentos: Resultado de dividir_en_fragmentos
+        texto: Texto completo
+        nombre: Nombre del estudiante
+        nivel: Nivel del estudiante
+        idioma: Idioma de corrección
+        tipo_texto: Tipo de texto
+        contexto_cultural: Contexto cultural relevante
+        info_adicional: Información adicional o contexto
+        revision: Hallazgos de la revisión local
+
+    Returns:
+        dict: Resultado con la estructura de corregir_texto o {"error": ...}
+    """
+    global _correccion_executor
+
+    with _correccion_lock:
+        if _correccion_executor is None:
+            _correccion_executor = ThreadPoolExecutor(
+                max_workers=MAX_FRAGMENTOS_EN_PARALELO, thread_name_prefix="correccion")
+
+    resumen = resumir_texto(texto)
+    total = len(fragmentos)
+    # El análisis global se lanza primero para que no espere a los fragmentos
+    futuro_global = _correccion_executor.submit(
+        _analisis_global, texto, nombre, nivel, idioma, tipo_texto,
+        contexto_cultural, info_adicional)
+    futuros = [
+        _correccion_executor.submit(
+            _corregir_fragmento, fragmento["texto"], i, total, resumen, nombre,
+            nivel, idioma, tipo_texto, contexto_cultural, revision or [])
+        for i, fragmento in enumerate(fragmentos, start=1)
+    ]
+    logger.info(f"Corrección por fragmentos: {total} fragmentos")
+
+    errores = {categoria: [] for categoria in CATEGORIAS_ERRORES}
+    partes = []
+    fallidos = []
+    for i, (fragmento, futuro) in enumerate(zip(fragmentos, futuros), start=1):
+        raw_output, data_json = _resultado_futuro(futuro)
+        if raw_output is None or "error" in data_json:
+            logger.warning(f"Fragmento {i}/{total} sin corregir: {data_json.get('error')}")
+            fallidos.append(i)
+            partes.append(fragmento["separador"] + fragmento["texto"])
+            continue
+        for categoria, lista in (data_json.get("errores") or {}).items():
+            errores.setdefault(categoria, []).extend(lista or [])
+        partes.append(fragmento["separador"]
+                      + (data_json.get("texto_corregido") or fragmento["texto"]).strip())
+
+    if len(fallidos) == total:
+        return {"error": data_json.get("error", "No se pudo corregir ningún fragmento del texto")}
+
+    raw_global, global_json = _resultado_futuro(futuro_global)
+    if raw_global is None or "error" in global_json:
+        logger.warning(f"Análisis global no disponible: {global_json.get('error')}")
+        global_json = {}
+
+    resultado = {
+        "saludo": global_json.get("saludo", ""),
+        "tipo_texto": global_json.get("tipo_texto", ""),
+        "errores": errores,
+        "texto_corregido": "".join(partes),
+        "analisis_contextual": global_json.get("analisis_contextual", {}),
+        "consejo_final": global_json.get("consejo_final", ""),
+        "fin": "Fin de texto corregido."
+    }
+    if fallidos:
+        resultado["aviso"] = (
+            f"No se pudieron corregir {len(fallidos)} de {total} partes del texto "
+            f"(partes {', '.join(map(str, fallidos))}); se muestran sin corregir.")
+    return resultado
+
+
+# --- Recorrección diferencial de textos reenviados ---
+
+def _clave_opciones(nivel, idioma, tipo_texto, contexto_cultural, info_adicional):
+    return digest(nivel, idioma, tipo_texto, contexto_cultural, info_adicional or "")
+
+
+# Partes de una corrección escritas para un alumno concreto (lo nombran o
+# comentan su texto): no se reutilizan entre alumnos distintos
+CAMPOS_PERSONALES = ("saludo", "tipo_texto", "analisis_contextual", "consejo_final")
+
+
+def _base_casi_duplicado(texto, firma, nombre, opciones):
+    """
+    Busca entre los textos corregidos recientemente (de cualquier alumno) uno
+    casi igual con las mismas opciones de corrección y devuelve su base de
+    recorrección. Si es de otro alumno, solo se reutilizan los errores y el
+    texto corregido: el saludo, el análisis contextual y el consejo final se
+    quitan para generarlos de nuevo (ver _completar_analisis_personal).
+
+    Args:
+        texto: Texto a corregir
+        firma: Firma MinHash del texto
+        nombre: Nombre del estudiante
+        opciones: Clave de las opciones de corrección (_clave_opciones)
+
+    Returns:
+        tuple: (base para planificar_recorreccion o None si no hay ninguno,
+                True si hay que generar de nuevo las partes personales)
+    """
+    encontrado = get_indice_duplicados().buscar(
+        texto, firma=firma, aceptar=lambda entrada: entrada["opciones"] == opciones)
+    if encontrado is None:
+        return None, False
+
+    entrada, similitud = encontrado
+    logger.info(f"Texto casi duplicado de uno ya corregido (Jaccard ~{similitud:.2f})")
+    base = entrada["base"]
+    if entrada["nombre"] == nombre:
+        return base, False
+    resultado = {k: v for k, v in base["resultado"].items() if k not in CAMPOS_PERSONALES}
+    return dict(base, resultado=resultado), True
+
+
+def _completar_analisis_personal(resultado, texto, nombre, nivel, idioma, tipo_texto,
+                                 contexto_cultural, info_adicional):
+    """
+    Añade a una corrección reutilizada de otro alumno el saludo, el análisis
+    contextual y el consejo final de este texto y este alumno, con la
+    llamada de análisis global (más barata que corregir el texto).
+
+    Returns:
+        dict: Resultado completo o {"error": ...} si el análisis falla
+    """
+    raw_output, global_json = _analisis_global(
+        texto, nombre, nivel, idioma, tipo_texto, contexto_cultural, info_adicional)
+    if raw_output is None or "error" in global_json:
+        return {"error": global_json.get("error", "Análisis global no disponible")}
+    resultado = dict(resultado)
+    for campo in CAMPOS_PERSONALES:
+        resultado[campo] = global_json.get(campo, {} if campo == "analisis_contextual" else "")
+    return resultado
+
+
+def _recorregir_oraciones(base, plan, nombre, nivel, idioma, tipo_texto,
+                          contexto_cultural, revision):
+    """
+    Corrige solo las oraciones nuevas o modificadas de un texto reenviado y
+    reutiliza la corrección guardada del resto (ver sentence_diff). El
+    análisis contextual, el saludo y el consejo final se conservan.
+
+    Args:
+        base: Última corrección preparada con crear_base
+        plan: Resultado de planificar_recorreccion
+        nombre: Nombre del estudiante
+        nivel: Nivel del estudiante
+        idioma: Idioma de corrección
+        tipo_texto: Tipo de texto
+        contexto_cultural: Contexto cultural relevante
+        revision: Hallazgos de la revisión local
+
+    Returns:
+        dict: Resultado con la estructura de corregir_texto o {"error": ...}
+    """
+    oraciones = plan["oraciones"]
+    cambiadas = [i for i, j in enumerate(plan["origen"]) if j is None]
+    logger.info(f"Recorrección diferencial: {len(cambiadas)} de {len(oraciones)} oraciones")
+    if not cambiadas:
+        return reconstruir_correccion(base, plan, {})
+
+    lineas = []
+    for i in cambiadas:
+        if i > 0 and plan["origen"][i - 1] is not None:
+            lineas.append(f"(contexto) {oraciones[i - 1]}")
+        lineas.append(f"[{i + 1}] {oraciones[i]}")
+    system_message, user_message = RECORRECCION.render(
+        nombre=nombre, oraciones="\n".join(lineas),
+        errores_detectados=_errores_detectados(
+            [h for h in revision or []
+             if any(h["fragmento_erroneo"] in oraciones[i] for i in cambiadas)]),
+        **parametros_correccion(nivel, idioma, tipo_texto, contexto_cultural))
+
+    raw_output, data_json = obtener_json_de_ia(
+        system_message, user_message, max_retries=2, plantilla=RECORRECCION, nivel=nivel,
+        palabras=sum(len(oraciones[i].split()) for i in cambiadas))
+    if raw_output is None or "error" in data_json:
+        return {"error": data_json.get("error", "Error desconocido en el procesamiento")}
+
+    nuevas = {}
+    for entrada in data_json.get("oraciones") or []:
+        try:
+            i = int(entrada.get("numero")) - 1
+        except (TypeError, ValueError):
+            continue
+        if i not in cambiadas:
+            continue
+        errores = [(categoria, error)
+                   for categoria, lista in (entrada.get("errores") or {}).items()
+                   for error in lista or []]
+        nuevas[i] = ((entrada.get("texto_corregido") or oraciones[i]).strip(), errores)
+
+    return reconstruir_correccion(base, plan, nuevas)
+
+
+def corregir_examen(texto, tipo_examen, nivel_examen, tiempo_usado=None):
+    """
+    Corrige un texto de examen específico.
+
+    Args:
+        texto: Texto a corregir
+        tipo_examen: Tipo de examen
+        nivel_examen: Nivel del examen
+        tiempo_usado: Tiempo usado (opcional)
+
+    Returns:
+        dict: Resultado de la corrección
+    """
+    if not texto or not texto.strip():
+        return {"error": "El texto está vacío. Por favor, escribe una respuesta."}
+
+    # Guardar para futura referencia
+    set_session_var("ultimo_texto", texto)
+
+    # Obtener datos necesarios
+    nombre = get_session_var("usuario_actual", "Usuario")
+
+    # Mapear nivel del examen al formato de nivel de la aplicación
+    nivel_map = {
+        "A1": "Nivel principiante (A1-A2)",
+        "A2": "Nivel principiante (A1-A2)",
+        "B1": "Nivel intermedio (B1-B2)",
+        "B2": "Nivel intermedio (B1-B2)",
+        "C1": "Nivel avanzado (C1-C2)",
+        "C2": "Nivel avanzado (C1-C2)"
+    }
+    nivel = nivel_map.get(nivel_examen, "Nivel intermedio (B1-B2)")
+
+    # Construir información adicional
+    info_adicional = f"Examen {tipo_examen} nivel {nivel_examen}"
+    if tiempo_usado:
+        info_adicional += f" (Tiempo usado: {tiempo_usado})"
+
+    # Llamar a la función de corrección
+    resultado = corregir_texto(
+        texto, nombre, nivel, "Español", "Académico",
+        "Contexto académico", info_adicional
+    )
+
+    # Guardar resultado
+    set_session_var("correction_result", resultado)
+    set_session_var("last_correction_time", datetime.now().isoformat())
+    set_session_var("examen_result", resultado)
+
+    return resultado
+
+
+def corregir_descripcion_imagen(descripcion, tema_imagen, nivel):
+    """
+    Corrige una descripción de imagen.
+
+    Args:
+        descripcion: Texto de la descripción
+        tema_imagen: Tema de la imagen
+        nivel: Nivel del estudiante
+
+    Returns:
+        dict: Resultado de la corrección
+    """
+    if not descripcion or not descripcion.strip():
+        return {"error": "La descripción está vacía. Por favor, escribe una descripción."}
+
+    # Guardar para futura referencia
+    set_session_var("ultimo_texto", descripcion)
+
+    # Obtener datos necesarios
+    nombre = get_session_var("usuario_actual", "Usuario")
+
+    # Información adicional
+    info_adicional = f"Descripción de imagen sobre '{tema_imagen}'"
+
+    # Llamar a la función de corrección
+    resultado = corregir_texto(
+        descripcion, nombre, nivel, "Español", "Descriptivo",
+        "General/Internacional", info_adicional
+    )
+
+    # Guardar resultado
+    set_session_var("correction_result", resultado)
+    set_session_var("last_correction_time", datetime.now().isoformat())
+
+    return resultado
+
+
+def generar_tarea_examen(tipo_examen, nivel_examen):
+    """
+    Genera una tarea de expresión escrita para un examen específico.
+
+    Args:
+        tipo_examen: Tipo de examen (DELE, SIELE, etc.)
+        nivel_examen: Nivel del examen (A1, A2, etc.)
+
+    Returns:
+        str: Tarea generada para el examen
+    """
+    client = get_openai_client()
+    if client is None:
+        return "No se pudo generar la tarea. Servicio no disponible."
+
+    if not circuit_breaker.can_execute("openai"):
+        return "Servicio temporalmente no disponible. Inténtelo más tarde."
+
+    try:
+        # Prompt para generación de tarea
+        system_message, prompt_tarea = TAREA_EXAMEN.render(
+            tipo_examen=tipo_examen, nivel_examen=nivel_examen)
+
+        # Modelo elegido por el enrutador; una respuesta no válida se repite
+        # con un modelo más capaz
+        tarea = _completar_enrutado(
+            client, elegir_modelo(TAREA_EXAMEN.nombre, nivel=nivel_examen),
+            [{"role": "system", "content": system_message},
+             {"role": "user", "content": prompt_tarea}],
+            temperature=0.7)
+
+        # Registrar éxito
+        circuit_breaker.record_success("openai")
+        TAREA_EXAMEN.registrar_respuesta(tarea)
+        return tarea
+
+    except Exception as e:
+        error_msg = f"Error al generar tarea de examen: {str(e)}"
+        logger.error(error_msg)
+        circuit_breaker.record_failure("openai")
+        return f"No se pudo generar la tarea. Error: {str(e)}"
+
+
+def generar_ejemplos_evaluados(tipo_examen, nivel_examen):
+    """
+    Genera ejemplos de textos evaluados para un examen específico.
+
+    Args:
+        tipo_examen: Tipo de examen (DELE, SIELE, etc.)
+        nivel_examen: Nivel del examen (A1, A2, etc.)
+
+    Returns:
+        str: Ejemplos de textos evaluados
+    """
+    client = get_openai_client()
+    if client is None:
+        return "No se pudieron generar ejemplos. Servicio no disponible."
+
+    if not circuit_breaker.can_execute("openai"):
+        return "Servicio temporalmente no disponible. Inténtelo más tarde."
+
+    try:
+        # Prompt para generación de ejemplos
+        system_message, prompt_ejemplos = EJEMPLOS_EVALUADOS.render(
+            tipo_examen=tipo_examen, nivel_examen=nivel_examen)
+
+        # Modelo elegido por el enrutador; una respuesta no válida se repite
+        # con un modelo más capaz
+        ejemplos = _completar_enrutado(
+            client, elegir_modelo(EJEMPLOS_EVALUADOS.nombre, nivel=nivel_examen),
+            [{"role": "system", "content": system_message},
+             {"role": "user", "content": prompt_ejemplos}],
+            temperature=0.7)
+
+        # Registrar éxito
+        circuit_breaker.record_success("openai")
+        EJEMPLOS_EVALUADOS.registrar_respuesta(ejemplos)
+        return ejemplos
+
+    except Exception as e:
+        error_msg = f"Error al generar ejemplos evaluados: {str(e)}"
+        logger.error(error_msg)
+        circuit_breaker.record_failure("openai")
+        return f"No se pudieron generar ejemplos. Error: {str(e)}"
+
+
+# --- 3. RECURSOS Y EJERCICIOS RECOMENDADOS ---
+
+
+# Base de datos simplificada de recursos por niveles y categorías
+RECURSOS_DB = {
+    "A1-A2": {
+        "Gramática": [
+            {"título": "Presente de indicativo", "tipo": "Ficha",
+                "url": "https://www.profedeele.es/gramatica/presente-indicativo/", "nivel": "A1"},
+            {"título": "Los artículos en español", "tipo": "Vídeo",
+                "url": "https://www.youtube.com/watch?v=example1", "nivel": "A1"},
+            {"título": "Ser y estar", "tipo": "Ejercicios",
+                "url": "https://aprenderespanol.org/ejercicios/ser-estar", "nivel": "A2"},
+            {"título": "Pretérito indefinido", "tipo": "Explicación",
+                "url": "https://www.cervantes.es/gramatica/indefinido", "nivel": "A2"}
+        ],
+        "Léxico": [
+            {"título": "Vocabulario básico", "tipo": "Ficha",
+                "url": "https://www.spanishdict.com/vocabulario-basico", "nivel": "A1"},
+            {"título": "Alimentos y comidas", "tipo": "Tarjetas",
+                "url": "https://quizlet.com/es/alimentos", "nivel": "A1"},
+            {"título": "La ciudad", "tipo": "Podcast",
+                "url": "https://spanishpod101.com/la-ciudad", "nivel": "A2"}
+        ],
+        "Cohesión": [
+            {"título": "Conectores básicos", "tipo": "Guía",
+                "url": "https://www.lingolia.com/es/conectores-basicos", "nivel": "A2"},
+            {"título": "Organizar ideas", "tipo": "Ejercicios",
+                "url": "https://www.todo-claro.com/organizacion", "nivel": "A2"}
+        ],
+        "Registro": [
+            {"título": "Saludos formales e informales", "tipo": "Vídeo",
+                "url": "https://www.youtube.com/watch?v=example2", "nivel": "A1"},
+            {"título": "Peticiones corteses", "tipo": "Diálogos",
+                "url": "https://www.lingoda.com/es/cortesia", "nivel": "A2"}
+        ]
+    },
+    "B1-B2": {
+        "Gramática": [
+            {"título": "Subjuntivo presente", "tipo": "Guía",
+                "url": "https://www.profedeele.es/subjuntivo-presente/", "nivel": "B1"},
+            {"título": "Estilo indirecto", "tipo": "Ejercicios",
+                "url": "https://www.cervantes.es/estilo-indirecto", "nivel": "B2"}
+        ],
+        "Léxico": [
+            {"título": "Expresiones idiomáticas", "tipo": "Podcast",
+                "url": "https://spanishpod101.com/expresiones", "nivel": "B1"},
+            {"título": "Vocabulario académico", "tipo": "Glosario",
+                "url": "https://cvc.cervantes.es/vocabulario-academico", "nivel": "B2"}
+        ],
+        "Cohesión": [
+            {"título": "Marcadores discursivos", "tipo": "Guía",
+                "url": "https://www.cervantes.es/marcadores", "nivel": "B1"},
+            {"título": "Conectores argumentativos", "tipo": "Ejercicios",
+                "url": "https://www.todo-claro.com/conectores", "nivel": "B2"}
+        ],
+        "Registro": [
+            {"título": "Lenguaje formal e informal", "tipo": "Curso",
+             "url": "https://www.coursera.org/spanish-registers", "nivel": "B1"},
+            {"título": "Comunicación profesional", "tipo": "Ejemplos",
+                "url": "https://www.cervantes.es/comunicacion-profesional", "nivel": "B2"}
+        ]
+    },
+    "C1-C2": {
+        "Gramática": [
+            {"título": "Construcciones pasivas", "tipo": "Análisis",
+                "url": "https://www.profedeele.es/pasivas-avanzadas/", "nivel": "C1"},
+            {"título": "Subordinadas complejas", "tipo": "Guía",
+                "url": "https://www.cervantes.es/subordinadas", "nivel": "C2"}
+        ],
+        "Léxico": [
+            {"título": "Lenguaje académico", "tipo": "Corpus",
+                "url": "https://www.rae.es/corpus-academico", "nivel": "C1"},
+            {"título": "Variantes dialectales", "tipo": "Curso",
+                "url": "https://www.coursera.org/variantes-espanol", "nivel": "C2"}
+        ],
+        "Cohesión": [
+            {"título": "Estructura textual avanzada", "tipo": "Manual",
+                "url": "https://www.uned.es/estructura-textual", "nivel": "C1"},
+            {"título": "Análisis del discurso", "tipo": "Investigación",
+                "url": "https://cvc.cervantes.es/analisis-discurso", "nivel": "C2"}
+        ],
+        "Registro": [
+            {"título": "Pragmática intercultural", "tipo": "Seminario",
+                "url": "https://www.cervantes.es/pragmatica", "nivel": "C1"},
+            {"título": "Lenguaje literario", "tipo": "Análisis",
+                "url": "https://www.rae.es/lenguaje-literario", "nivel": "C2"}
+        ]
+    }
+}
+
+
+def obtener_recursos_recomendados(errores_obj, analisis_contextual, nivel):
+    """
+    Obtiene recursos recomendados basados en los errores y análisis del estudiante.
+
+    Args:
+        errores_obj: Objeto con errores detectados
+        analisis_contextual: Objeto con análisis contextual
+        nivel: Nivel del estudiante
+
+    Returns:
+        list: Lista de recursos recomendados
+    """
+    recursos_recomendados = []
+
+    try:
+        # Verificar entradas
+        if not isinstance(errores_obj, dict):
+            errores_obj = {}
+        if not isinstance(analisis_contextual, dict):
+            analisis_contextual = {}
+
+        # Determinar el nivel para buscar recursos
+        if "principiante" in nivel.lower():
+            nivel_db = "A1-A2"
+        elif "intermedio" in nivel.lower():
+            nivel_db = "B1-B2"
+        else:
+            nivel_db = "C1-C2"
+
+        # Verificar errores gramaticales
+        if len(errores_obj.get("Gramática", [])) > 0:
+            recursos_gramatica = RECURSOS_DB.get(
+                nivel_db, {}).get("Gramática", [])
+            if recursos_gramatica:
+                recursos_recomendados.extend(recursos_gramatica[:2])
+
+        # Verificar errores léxicos
+        if len(errores_obj.get("Léxico", [])) > 0:
+            recursos_lexico = RECURSOS_DB.get(nivel_db, {}).get("Léxico", [])
+            if recursos_lexico:
+                recursos_recomendados.extend(recursos_lexico[:2])
+
+        # Verificar problemas de cohesión
+        if analisis_contextual.get("cohesion", {}).get("puntuacion", 10) < 7:
+            recursos_cohesion = RECURSOS_DB.get(
+                nivel_db, {}).get("Cohesión", [])
+            if recursos_cohesion:
+                recursos_recomendados.extend(recursos_cohesion[:1])
+
+        # Verificar problemas de registro
+        if analisis_contextual.get("registro_linguistico", {}).get("puntuacion", 10) < 7:
+            recursos_registro = RECURSOS_DB.get(
+                nivel_db, {}).get("Registro", [])
+            if recursos_registro:
+                recursos_recomendados.extend(recursos_registro[:1])
+
+    except Exception as e:
+        logger.error(f"Error al obtener recursos: {str(e)}")
+
+    return recursos_recomendados
+
+
+# Ejercicios que se ofrecen por corrección
+EJERCICIOS_POR_CORRECCION = 3
+
+CATEGORIAS_ERROR = ["Gramática", "Léxico", "Puntuación", "Estructura textual"]
+
+
+def patrones_de_errores(errores_obj):
+    """
+    Lista los patrones de error distintos de una corrección.
+
+    Args:
+        errores_obj: Objeto con errores detectados
+
+    Returns:
+        list: Tuplas (categoría, patrón normalizado, error) sin repetir patrón
+    """
+    patrones = []
+    vistos = set()
+    for categoria in CATEGORIAS_ERROR:
+        for error in errores_obj.get(categoria, []) or []:
+            if not isinstance(error, dict):
+                continue
+            patron = patron_error(error)
+            if patron and (categoria, patron) not in vistos:
+                vistos.add((categoria, patron))
+                patrones.append((categoria, patron, error))
+    return patrones
+
+
+def generar_ejercicios_personalizado(errores_obj, analisis_contextual, nivel, idioma):
+    """
+    Genera ejercicios personalizados basados en los errores y análisis del estudiante.
+    Los tipos de error frecuentes (conjugación, concordancia, ser/estar,
+    por/para) se cubren con las plantillas locales y los patrones ya conocidos
+    con el banco de ejercicios; solo se piden a la IA los que faltan, que se
+    guardan en el banco para los siguientes estudiantes.
+
+    Args:
+        errores_obj: Objeto con errores detectados
+        analisis_contextual: Objeto con análisis contextual
+        nivel: Nivel del estudiante
+        idioma: Idioma de las instrucciones
+
+    Returns:
+        dict: Datos de ejercicios generados. Si no se pudieron generar, los
+              ejercicios son avisos genéricos y el diccionario incluye "error".
+    """
+    # Verificar entradas
+    if not isinstance(errores_obj, dict):
+        errores_obj = {}
+    if not isinstance(analisis_contextual, dict):
+        analisis_contextual = {}
+
+    # 1) Plantillas locales para los tipos de error frecuentes, 2) banco de
+    # ejercicios para los patrones ya conocidos, 3) IA para el resto
+    banda = banda_nivel(nivel)
+    usar_plantillas = idioma in IDIOMAS_PLANTILLAS
+    banco = get_exercise_bank()
+    locales = []
+    tipos_locales = set()
+    sin_cubrir = []
+    for categoria, patron, error in patrones_de_errores(errores_obj):
+        if len(locales) >= EJERCICIOS_POR_CORRECCION:
+            break
+        clasificacion = clasificar_error(error) if usar_plantillas else None
+        if clasificacion is not None:
+            if clasificacion["tipo"] not in tipos_locales:
+                tipos_locales.add(clasificacion["tipo"])
+                locales.append(generar_ejercicio_local(clasificacion, banda, semilla=patron))
+            continue
+
+        encontrados = banco.buscar(nivel, categoria, patron, idioma) if banco is not None else []
+        if encontrados:
+            locales.extend(encontrados)
+        else:
+            sin_cubrir.append((categoria, patron, error))
+
+    if len(locales) >= EJERCICIOS_POR_CORRECCION or (locales and not sin_cubrir):
+        logger.info(f"Ejercicios sin IA: {len(locales)} "
+                    f"({len(tipos_locales)} de plantillas locales)")
+        return {"ejercicios": locales[:EJERCICIOS_POR_CORRECCION]}
+
+    client = get_openai_client()
+    if client is None:
+        if locales:
+            return {"ejercicios": locales}
+        return {"error": "Cliente de OpenAI no disponible",
+                "ejercicios": [{"titulo": "Servicio no disponible",
+                                "tipo": "Error",
+                                "instrucciones": "El servicio de generación de ejercicios no está disponible en este momento.",
+                                "contenido": "Inténtelo más tarde.",
+                                "solucion": "N/A"}]}
+
+    if not circuit_breaker.can_execute("openai"):
+        if locales:
+            return {"ejercicios": locales}
+        return {"error": "Circuit breaker abierto",
+                "ejercicios": [{"titulo": "Servicio temporalmente no disponible",
+                                "tipo": "Error",
+                                "instrucciones": "El servicio está temporalmente deshabilitado debido a errores previos.",
+                                "contenido": "Inténtelo más tarde.",
+                                "solucion": "N/A"}]}
+
+    try:
+        faltan = EJERCICIOS_POR_CORRECCION - len(locales)
+
+        # Preparar datos para el prompt
+        errores_gramatica = errores_obj.get("Gramática", [])
+        errores_lexico = errores_obj.get("Léxico", [])
+        errores_puntuacion = errores_obj.get("Puntuación", [])
+        errores_estructura = errores_obj.get("Estructura textual", [])
+
+        # Extraer puntos débiles del análisis contextual
+        coherencia = analisis_contextual.get("coherencia", {})
+        cohesion = analisis_contextual.get("cohesion", {})
+        registro = analisis_contextual.get("registro_linguistico", {})
+
+        # Mapear nivel para el prompt
+        if "principiante" in nivel.lower():
+            nivel_prompt = "A1-A2"
+        elif "intermedio" in nivel.lower():
+            nivel_prompt = "B1-B2"
+        else:
+            nivel_prompt = "C1-C2"
+
+        # Obtener ejemplos de errores (con manejo seguro)
+        ejemplos_gramatica = ", ".join([e.get('fragmento_erroneo', '')
+                                       for e in errores_gramatica[:2]]) if errores_gramatica else ""
+        ejemplos_lexico = ", ".join([e.get('fragmento_erroneo', '')
+                                    for e in errores_lexico[:2]]) if errores_lexico else ""
+
+        # Errores concretos sin ejercicio en el banco, numerados para que cada
+        # ejercicio indique cuál trabaja
+        sin_cubrir = sin_cubrir[:5]
+        lista_sin_cubrir = "\n".join(
+            f'{n}. [{categoria}] "{error.get("fragmento_erroneo", "")}" -> "{error.get("correccion", "")}"'
+            for n, (categoria, _, error) in enumerate(sin_cubrir, start=1))
+
+        # Construir prompt para OpenAI
+        system_message, prompt_ejercicios = EJERCICIOS.render(
+            nivel=nivel_prompt, faltan=faltan,
+            errores_gramatica=f"{len(errores_gramatica)}"
+                              + (f" (ejemplos: {ejemplos_gramatica})" if ejemplos_gramatica else ""),
+            errores_lexico=f"{len(errores_lexico)}"
+                           + (f" (ejemplos: {ejemplos_lexico})" if ejemplos_lexico else ""),
+            errores_puntuacion=len(errores_puntuacion),
+            errores_estructura=len(errores_estructura),
+            coherencia=coherencia.get("puntuacion", 0),
+            cohesion=cohesion.get("puntuacion", 0),
+            registro=registro.get("tipo_detectado", "No especificado"),
+            errores_concretos=lista_sin_cubrir or "(ninguno en particular)",
+            idioma=idioma)
+
+        # Modelo elegido por el enrutador; una respuesta no válida se repite
+        # con un modelo más capaz
+        ejercicios_data = _completar_enrutado(
+            client, elegir_modelo(EJERCICIOS.nombre, nivel=nivel),
+            [{"role": "system", "content": system_message},
+             {"role": "user", "content": prompt_ejercicios}],
+            plantilla=EJERCICIOS,
+            temperature=0.7,
+            response_format={"type": "json_object"})
+        EJERCICIOS.registrar_respuesta(ejercicios_data)
+
+        # Verificar si se obtuvo un resultado válido
+        if "error" in ejercicios_data:
+            logger.warning(
+                f"Error al extraer JSON de ejercicios: {ejercicios_data['error']}")
+            return {"error": ejercicios_data["error"],
+                    "ejercicios": [{"titulo": "Ejercicio de repaso",
+                                   "tipo": "Ejercicio de práctica",
+                                    "instrucciones": "Revisa los elementos más problemáticos en tu texto",
+                                    "contenido": "Contenido genérico de práctica",
+                                    "solucion": "Consulta con tu profesor"}]}
+
+        # Registrar éxito
+        circuit_breaker.record_success("openai")
+
+        # Guardar en el banco los ejercicios ligados a un error concreto
+        generados = ejercicios_data.get("ejercicios", [])
+        for ejercicio in generados:
+            numero = ejercicio.pop("error", None) if isinstance(ejercicio, dict) else None
+            # El modelo puede devolver el número como texto ("2")
+            try:
+                numero = int(numero)
+            except (ValueError, TypeError):
+                continue
+            if banco is None or not 1 <= numero <= len(sin_cubrir):
+                continue
+            categoria, patron, _ = sin_cubrir[numero - 1]
+            banco.add(nivel, categoria, patron, idioma, ejercicio)
+
+        return {"ejercicios": (locales + generados)[:EJERCICIOS_POR_CORRECCION]}
+
+    except Exception as e:
+        # Se ejecuta en segundo plano: el error se registra pero no se muestra
+        handle_exception("generar_ejercicios_personalizado", e, show_user=False)
+        circuit_breaker.record_failure("openai")
+        return {"error": str(e),
+                "ejercicios": [{"titulo": "Error en la generación",
+                                "tipo": "Error controlado",
+                                "instrucciones": "No se pudieron generar ejercicios personalizados",
+                                "contenido": f"Error: {str(e)}",
+                                "solucion": "Intenta de nuevo más tarde"}]}
+
+
+# Generación en segundo plano: los ejercicios de cada corrección se piden
+# una sola vez, al terminar la corrección, y se guardan en la caché
+_ejercicios_executor = None
+_ejercicios_en_curso = {}  # clave -> Future
+_ejercicios_lock = threading.Lock()
+MAX_TRABAJOS_EJERCICIOS = 200
+
+
+def clave_ejercicios(errores_obj, analisis_contextual, nivel, idioma):
+    """Clave estable de los ejercicios de una corrección."""
+    return digest(
+        json.dumps(errores_obj, sort_keys=True, default=str),
+        json.dumps(analisis_contextual, sort_keys=True, default=str),
+        nivel, idioma)
+
+
+def _generar_y_guardar_ejercicios(clave, errores_obj, analisis_contextual, nivel, idioma):
+    datos = generar_ejercicios_personalizado(
+        errores_obj, analisis_contextual, nivel, idioma)
+    if "error" not in datos:
+        cache_manager.set(NS_EJERCICIOS, (EJERCICIOS.version, clave), datos)
+    return datos
+
+
+def _trabajo_fallido(futuro):
+    try:
+        return "error" in futuro.result()
+    except Exception:
+        return True
+
+
+def programar_ejercicios_personalizados(errores_obj, analisis_contextual, nivel, idioma,
+                                        reintentar=False):
+    """
+    Lanza en segundo plano la generación de los ejercicios de una corrección,
+    salvo que ya estén en la caché o en curso. Un intento fallido se conserva
+    (para mostrar el aviso) hasta que se pida reintentar.
+
+    Args:
+        errores_obj: Objeto con errores detectados
+        analisis_contextual: Objeto con análisis contextual
+        nivel: Nivel del estudiante
+        idioma: Idioma de las instrucciones
+        reintentar: Volver a generar aunque el último intento fallara
+
+    Returns:
+        str: Clave de los ejercicios (ver obtener_ejercicios_personalizados)
+    """
+    global _ejercicios_executor
+
+    clave = clave_ejercicios(errores_obj, analisis_contextual, nivel, idioma)
+    if (EJERCICIOS.version, clave) in cache_manager.namespace(NS_EJERCICIOS):
+        return clave
+
+    with _ejercicios_lock:
+        futuro = _ejercicios_en_curso.get(clave)
+        if futuro is not None:
+            if not futuro.done():
+                return clave
+            if _trabajo_fallido(futuro) and not reintentar:
+                return clave
+
+        # Olvidar los trabajos correctos ya terminados (están en la caché) y,
+        # si se acumulan demasiados, también los fallidos
+        terminados = [k for k, f in _ejercicios_en_curso.items() if f.done()]
+        if len(_ejercicios_en_curso) < MAX_TRABAJOS_EJERCICIOS:
+            terminados = [k for k in terminados
+                          if not _trabajo_fallido(_ejercicios_en_curso[k])]
+        for k in terminados:
+            del _ejercicios_en_curso[k]
+
+        if _ejercicios_executor is None:
+            _ejercicios_executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="ejercicios")
+        _ejercicios_en_curso[clave] = _ejercicios_executor.submit(
+            _generar_y_guardar_ejercicios, clave,
+            errores_obj, analisis_contextual, nivel, idioma)
+
+    logger.info(f"Ejercicios personalizados programados ({clave[:12]})")
+    return clave
+
+
+def obtener_ejercicios_personalizados(clave):
+    """
+    Consulta, sin bloquear, los ejercicios de una corrección.
+
+    Args:
+        clave: Clave devuelta por programar_ejercicios_personalizados
+
+    Returns:
+        tuple: (estado, datos). El estado es "listo", "generando", "error"
+               (datos con los avisos genéricos) o "sin_generar"
+    """
+    datos = cache_manager.get(NS_EJERCICIOS, (EJERCICIOS.version, clave))
+    if datos is not None:
+        return "listo", datos
+
+    with _ejercicios_lock:
+        futuro = _ejercicios_en_curso.get(clave)
+    if futuro is None:
+        return "sin_generar", None
+    if not futuro.done():
+        return "generando", None
+
+    try:
+        datos = futuro.result()
+    except Exception as e:
+        logger.error(f"Error en la generación de ejercicios en segundo plano: {e}")
+        return "error", {"error": str(e), "ejercicios": []}
+    return ("error" if "error" in datos else "listo"), datos
+
+
+def generar_plan_estudio_personalizado(nombre, nivel, datos_historial):
+    """
+    Genera un plan de estudio personalizado basado en el historial del estudiante.
+
+    Args:
+        nombre: Nombre del estudiante
+        nivel: Nivel del estudiante
+        datos_historial: DataFrame con historial de correcciones
+
+    Returns:
+        dict: Plan de estudio generado
+    """
+    client = get_openai_client()
+    if client is None:
+        return {"error": "Servicio no disponible", "plan": None}
+
+    if not circuit_breaker.can_execute("openai"):
+        return {"error": "Servicio temporalmente no disponible", "plan": None}
+
+    if datos_historial is None or datos_historial.empty:
+        return {"error": "No hay suficientes datos para generar un plan personalizado", "plan": None}
+
+    try:
+        # Extraer estadísticas básicas
+        if 'Errores Gramática' in datos_historial.columns and 'Errores Léxico' in datos_historial.columns:
+            # Calcular promedios
+            promedio_gramatica = datos_historial['Errores Gramática'].mean()
+            promedio_lexico = datos_historial['Errores Léxico'].mean()
+
+            # Verificar columnas de análisis contextual
+            coherencia_promedio = datos_historial['Puntuación Coherencia'].mean(
+            ) if 'Puntuación Coherencia' in datos_historial.columns else 5
+            cohesion_promedio = datos_historial['Puntuación Cohesión'].mean(
+            ) if 'Puntuación Cohesión' in datos_historial.columns else 5
+
+            # Extraer nivel del último registro
+            if 'Nivel' in datos_historial.columns:
+                nivel_actual = datos_historial.iloc[-1]['Nivel']
+            else:
+                nivel_actual = nivel
+
+            # Verificar consejos finales para extraer temas recurrentes
+            temas_recurrentes = []
+            if 'Consejo Final' in datos_historial.columns:
+                # Aquí podríamos implementar un análisis más sofisticado de los consejos
+                temas_recurrentes = ["conjugación verbal",
+                                     "uso de preposiciones", "concordancia"]
+
+            # Construir contexto para la IA
+            errores_frecuentes = (
+                f"Promedio de errores gramaticales: {promedio_gramatica:.1f}, "
+                f"Promedio de errores léxicos: {promedio_lexico:.1f}. "
+                f"Puntuación en coherencia: {coherencia_promedio:.1f}/10, "
+                f"Puntuación en cohesión: {cohesion_promedio:.1f}/10. "
+                f"Temas recurrentes: {', '.join(temas_recurrentes)}."
+            )
+
+            # Prompt para la IA
+            system_message, prompt_plan = PLAN_ESTUDIO.render(
+                nombre=nombre, nivel=nivel_actual, errores_frecuentes=errores_frecuentes)
+
+            # Modelo elegido por el enrutador; una respuesta no válida se repite
+            # con un modelo más capaz
+            plan_estudio = _completar_enrutado(
+                client, elegir_modelo(PLAN_ESTUDIO.nombre, nivel=nivel_actual),
+                [{"role": "system", "content": system_message},
+                 {"role": "user", "content": prompt_plan}],
+                temperature=0.7)
+            PLAN_ESTUDIO.registrar_respuesta(plan_estudio)
+
+            # Registrar éxito
+            circuit_breaker.record_success("openai")
+
+            # Dividir el plan por semanas
+            semanas = plan_estudio.split("Semana")
+
+            # Procesar el resultado
+            plan_procesado = {
+                "completo": plan_estudio,
+                "semanas": []
+            }
+
+            # Ignorar el elemento vacío al inicio
+            for i, semana in enumerate(semanas[1:], 1):
+                titulo_semana = extraer_titulo(semana)
+                contenido_semana = semana.strip()
+                plan_procesado["semanas"].append({
+                    "numero": i,
+                    "titulo": titulo_semana,
+                    "contenido": contenido_semana
+                })
+
+            return {"error": None, "plan": plan_procesado}
+
+        else:
+            return {"error": "No se encontraron columnas necesarias en los datos", "plan": None}
+
+    except Exception as e:
+        handle_exception("generar_plan_estudio_personalizado", e)
+        circuit_breaker.record_failure("openai")
+        return {"error": f"Error al generar plan de estudio: {str(e)}", "plan": None}
@@ -0,0 +1,439 @@
+"""Plantillas de los prompts de la aplicación (ver prompt_registry)."""
+
+import textwrap
+
+from prompt_registry import registrar_plantilla
+
+# Las plantillas se compilan y registran una vez, al importar el módulo. Cada
+# una tiene una versión que resume su contenido: las cachés de respuestas y
+# las mediciones se indexan por esa versión.
+
+# El proveedor reutiliza el cómputo de la parte inicial de un prompt cuando
+# coincide byte a byte con una petición reciente (a partir de unos 1024
+# tokens). Por eso cada prompt empieza por un prefijo fijo (papel, esquema y
+# reglas) que no contiene ningún dato de la petición, y todos los parámetros
+# (nivel, idioma, tipo de texto, contexto) van al final.
+
+# Mapeo de niveles para instrucciones más específicas
+INSTRUCCIONES_NIVEL = {
+    "Nivel principiante (A1-A2)": {
+        "descripcion": "principiante (A1-A2)",
+        "enfoque": "Enfócate en estructuras básicas, vocabulario fundamental y errores comunes. Utiliza explicaciones simples y claras. Evita terminología lingüística compleja."
+    },
+    "Nivel intermedio (B1-B2)": {
+        "descripcion": "intermedio (B1-B2)",
+        "enfoque": "Puedes señalar errores más sutiles de concordancia, uso de tiempos verbales y preposiciones. Puedes usar alguna terminología lingüística básica en las explicaciones."
+    },
+    "Nivel avanzado (C1-C2)": {
+        "descripcion": "avanzado (C1-C2)",
+        "enfoque": "Céntrate en matices, coloquialismos, registro lingüístico y fluidez. Puedes usar terminología lingüística específica y dar explicaciones más detalladas y técnicas."
+    }
+}
+
+
+def info_nivel(nivel):
+    """Instrucciones del nivel del estudiante (intermedio si no se reconoce)."""
+    return INSTRUCCIONES_NIVEL.get(nivel, INSTRUCCIONES_NIVEL["Nivel intermedio (B1-B2)"])
+
+
+# --- Partes comunes ---
+
+PAPEL = """\
+Eres Diego, un profesor experto en ELE (Español como Lengua Extranjera) especializado en análisis lingüístico contextual.
+Adaptas tu feedback al nivel del estudiante y al idioma de corrección que se indican en PARÁMETROS, al final de estas instrucciones.
+"""
+
+ERROR = """\
+           {
+             "fragmento_erroneo": "string",
+             "correccion": "string",
+             "explicacion": "string"   // en el idioma de corrección
+           }"""
+
+ESQUEMA_ERRORES = f"""\
+  "errores": {{
+       "Gramática": [
+{ERROR}
+           // más errores de Gramática (o [] si ninguno)
+       ],
+       "Léxico": [
+{ERROR}
+       ],
+       "Puntuación": [
+{ERROR}
+       ],
+       "Estructura textual": [
+{ERROR}
+       ]
+  }}"""
+
+ESQUEMA_ANALISIS = """\
+  "analisis_contextual": {
+       "coherencia": {
+           "puntuacion": number,     // del 1 al 10
+           "comentario": "string",   // en el idioma de corrección
+           "sugerencias": [          // listado de sugerencias en el idioma de corrección
+               "string",
+               "string"
+           ]
+       },
+       "cohesion": {
+           "puntuacion": number,     // del 1 al 10
+           "comentario": "string",   // en el idioma de corrección
+           "sugerencias": [          // listado de sugerencias en el idioma de corrección
+               "string",
+               "string"
+           ]
+       },
+       "registro_linguistico": {
+           "puntuacion": number,     // del 1 al 10
+           "tipo_detectado": "string", // tipo de registro detectado en el idioma de corrección
+           "adecuacion": "string",   // evaluación de adecuación en el idioma de corrección
+           "sugerencias": [          // listado de sugerencias en el idioma de corrección
+               "string",
+               "string"
+           ]
+       },
+       "adecuacion_cultural": {
+           "puntuacion": number,     // del 1 al 10
+           "comentario": "string",   // en el idioma de corrección
+           "elementos_destacables": [  // elementos culturales destacables en el idioma de corrección
+               "string",
+               "string"
+           ],
+           "sugerencias": [          // listado de sugerencias en el idioma de corrección
+               "string",
+               "string"
+           ]
+       }
+  }"""
+
+REGLAS_COMUNES = """\
+- Las explicaciones de los errores deben estar en el idioma de corrección
+- El texto corregido SIEMPRE debe estar en español, independientemente del idioma de corrección
+- Adapta tus explicaciones y sugerencias al nivel y al enfoque indicados en PARÁMETROS
+- Considera el tipo de texto y el contexto cultural indicados en PARÁMETROS
+- No devuelvas ningún texto extra fuera del JSON"""
+
+PARAMETROS = """
+PARÁMETROS
+- Nivel del estudiante: $descripcion
+- Enfoque para este nivel: $enfoque
+- Idioma de corrección: $idioma
+- Tipo de texto: $tipo_texto
+- Contexto cultural: $contexto_cultural
+"""
+
+# Lista de errores de la revisión local que se añade a los mensajes del usuario
+AVISO_ERRORES_DETECTADOS = (
+    'Errores de ortografía, puntuación, concordancia y formas verbales ya detectados '
+    'automáticamente. NO los incluyas en "errores" (se añadirán después), pero sí '
+    'corrígelos en "texto_corregido":\n')
+
+
+# --- Prefijos estáticos de cada tipo de petición ---
+
+PREFIJO_CORRECCION = f"""\
+{PAPEL}
+Cuando corrijas un texto, DEBES devolver la respuesta únicamente en un JSON válido, sin texto adicional, con la siguiente estructura EXACTA:
+
+{{
+  "saludo": "string",                // en el idioma de corrección
+  "tipo_texto": "string",            // en el idioma de corrección
+{ESQUEMA_ERRORES},
+  "texto_corregido": "string",       // siempre en español
+{ESQUEMA_ANALISIS},
+  "consejo_final": "string",         // en español
+  "fin": "Fin de texto corregido."
+}}
+
+IMPORTANTE:
+{REGLAS_COMUNES}
+- Todo el análisis contextual debe estar en el idioma de corrección
+- El consejo final SIEMPRE debe estar en español
+"""
+
+PREFIJO_FRAGMENTO = f"""\
+{PAPEL}
+Corriges un texto largo por fragmentos: recibirás UN fragmento y el resumen del texto completo como contexto.
+Devuelve únicamente un JSON válido, sin texto adicional, con la siguiente estructura EXACTA:
+
+{{
+{ESQUEMA_ERRORES},
+  "texto_corregido": "string"        // el fragmento corregido, siempre en español
+}}
+
+IMPORTANTE:
+{REGLAS_COMUNES}
+- Corrige solo el fragmento recibido; el resumen es únicamente contexto
+- Conserva la división en párrafos del fragmento en "texto_corregido"
+"""
+
+PREFIJO_ANALISIS_GLOBAL = f"""\
+{PAPEL}
+Analiza el texto completo del estudiante. Sus errores se corrigen aparte: NO los enumeres ni reescribas el texto.
+Devuelve únicamente un JSON válido, sin texto adicional, con la siguiente estructura EXACTA:
+
+{{
+  "saludo": "string",                // en el idioma de corrección
+  "tipo_texto": "string",            // en el idioma de corrección
+{ESQUEMA_ANALISIS},
+  "consejo_final": "string"          // en español
+}}
+
+IMPORTANTE:
+- Todo el análisis contextual debe estar en el idioma de corrección
+- El consejo final SIEMPRE debe estar en español
+- Considera el tipo de texto y el contexto cultural indicados en PARÁMETROS
+- No devuelvas ningún texto extra fuera del JSON
+"""
+
+PREFIJO_RECORRECCION = f"""\
+{PAPEL}
+El estudiante ha modificado algunas oraciones de un texto que ya corregiste: corrige SOLO las oraciones numeradas que recibas.
+Devuelve únicamente un JSON válido, sin texto adicional, con la siguiente estructura EXACTA:
+
+{{
+  "oraciones": [
+       {{
+         "numero": number,             // el número de la oración recibida
+         "texto_corregido": "string",  // la oración corregida, siempre en español
+{textwrap.indent(ESQUEMA_ERRORES, " " * 7)}
+       }}
+  ]
+}}
+
+IMPORTANTE:
+{REGLAS_COMUNES}
+- Devuelve una entrada por cada oración recibida, con el mismo número
+- Cada "texto_corregido" debe ser una sola oración
+"""
+
+
+def parametros_correccion(nivel, idioma, tipo_texto, contexto_cultural):
+    """
+    Valores del bloque PARÁMETROS de las plantillas de corrección.
+
+    Args:
+        nivel: Nivel del estudiante
+        idioma: Idioma de corrección
+        tipo_texto: Tipo de texto
+        contexto_cultural: Contexto cultural relevante
+
+    Returns:
+        dict: Campos descripcion, enfoque, idioma, tipo_texto y contexto_cultural
+    """
+    nivel_info = info_nivel(nivel)
+    return {"descripcion": nivel_info["descripcion"], "enfoque": nivel_info["enfoque"],
+            "idioma": idioma, "tipo_texto": tipo_texto, "contexto_cultural": contexto_cultural}
+
+
+ESQUEMA_CORRECCION = {"errores": dict, "texto_corregido": str, "analisis_contextual": dict}
+
+CORRECCION = registrar_plantilla("correccion", PREFIJO_CORRECCION + PARAMETROS, '''
+Texto del alumno:
+"""
+$texto
+"""
+Nivel: $nivel
+Nombre del alumno: $nombre
+Idioma de corrección: $idioma
+Tipo de texto: $tipo_texto
+Contexto cultural: $contexto_cultural
+$info_adicional
+$errores_detectados''', ESQUEMA_CORRECCION)
+
+CORRECCION_FRAGMENTO = registrar_plantilla("correccion_fragmento", PREFIJO_FRAGMENTO + PARAMETROS, '''
+Resumen del texto completo: $resumen
+
+Fragmento $posicion de $total del texto de $nombre:
+"""
+$fragmento
+"""
+$errores_detectados''', {"errores": dict, "texto_corregido": str})
+
+ANALISIS_GLOBAL = registrar_plantilla("analisis_global", PREFIJO_ANALISIS_GLOBAL + PARAMETROS, '''
+Texto de $nombre:
+"""
+$texto
+"""
+$info_adicional''', {"analisis_contextual": dict, "consejo_final": str})
+
+RECORRECCION = registrar_plantilla("recorreccion", PREFIJO_RECORRECCION + PARAMETROS, '''
+Oraciones modificadas del texto de $nombre:
+$oraciones
+$errores_detectados''', {"oraciones": list})
+
+
+# --- Análisis de complejidad ---
+
+SISTEMA_COMPLEJIDAD = "Eres un experto lingüista y analista textual especializado en complejidad lingüística."
+
+
+def _usuario_complejidad(datos_lexico, esquema_lexico):
+    return f"""
+Analiza la complejidad lingüística del siguiente texto en español.
+Proporciona un análisis detallado que incluya:
+
+1. Complejidad léxica (variedad de vocabulario, riqueza léxica, palabras poco comunes)
+2. Complejidad sintáctica (longitud de frases, subordinación, tipos de oraciones)
+3. Complejidad textual (coherencia, cohesión, estructura general)
+4. Nivel MCER estimado (A1-C2) con explicación
+
+Datos ya calculados del texto (no los recalcules, úsalos como apoyo):
+$palabras palabras, $oraciones oraciones, TTR $ttr,
+densidad léxica $densidad_lexica, índice Flesch-Szigriszt $szigriszt ($inflesz)
+{datos_lexico}
+Texto a analizar:
+"$texto"
+
+Devuelve el análisis ÚNICAMENTE en formato JSON con la siguiente estructura:
+{{
+  {esquema_lexico}
+  "complejidad_sintactica": {{
+    "nivel": "string",
+    "descripcion": "string",
+    "estructuras_destacadas": ["string1", "string2"]
+  }},
+  "complejidad_textual": {{
+    "nivel": "string",
+    "descripcion": "string"
+  }},
+  "nivel_mcer": {{
+    "nivel": "string",
+    "justificacion": "string"
+  }},
+  "recomendaciones": ["string1", "string2"]
+}}
+"""
+
+
+ESQUEMA_COMPLEJIDAD = {"complejidad_lexica": dict, "complejidad_sintactica": dict,
+                       "complejidad_textual": dict, "nivel_mcer": dict}
+
+COMPLEJIDAD = registrar_plantilla("complejidad", SISTEMA_COMPLEJIDAD, _usuario_complejidad(
+    "", '''"complejidad_lexica": {
+    "nivel": "string",
+    "descripcion": "string",
+    "palabras_destacadas": ["string1", "string2"]
+  },'''), ESQUEMA_COMPLEJIDAD)
+
+# El nivel léxico y las palabras destacadas ya vienen del índice local
+COMPLEJIDAD_CON_LEXICO = registrar_plantilla("complejidad_con_lexico", SISTEMA_COMPLEJIDAD, _usuario_complejidad(
+    "Nivel léxico estimado con una lista de vocabulario por niveles: $nivel_lexico "
+    "(palabras de nivel alto o poco comunes: $palabras_destacadas)\n",
+    '''"complejidad_lexica": {
+    "descripcion": "string"
+  },'''), ESQUEMA_COMPLEJIDAD)
+
+
+# --- Consignas, exámenes y planes de estudio (respuestas en texto libre) ---
+
+CONSIGNA = registrar_plantilla(
+    "consigna",
+    "Eres un profesor de español experto en diseñar actividades de escritura.",
+    """
+Eres un profesor experto en la enseñanza de español como lengua extranjera.
+Crea una consigna de escritura adaptada al nivel $nivel para el tipo de texto: $tipo_consigna.
+
+Tu respuesta debe tener este formato exacto:
+1. Un título atractivo y claro
+2. Instrucciones precisas que incluyan:
+   - Situación o contexto
+   - Tarea específica a realizar
+   - Extensión requerida (número de palabras apropiado para el nivel)
+   - Elementos que debe incluir el texto
+
+Adapta la complejidad lingüística y temática al nivel $nivel:
+- Para niveles principiante: usa vocabulario básico, estructuras simples y temas cotidianos
+- Para niveles intermedio: incluye vocabulario más variado, conectores y temas que requieran opinión
+- Para niveles avanzado: incorpora elementos para expresar matices, argumentación compleja y temas abstractos
+
+Proporciona solo la consigna, sin explicaciones adicionales ni metacomentarios.
+""")
+
+TAREA_EXAMEN = registrar_plantilla(
+    "tarea_examen",
+    "Eres un experto en exámenes oficiales de español como lengua extranjera.",
+    """
+Crea una tarea de expresión escrita para el examen $tipo_examen de nivel $nivel_examen.
+La tarea debe incluir:
+1. Instrucciones claras y precisas
+2. Contexto o situación comunicativa
+3. Número de palabras requerido
+4. Aspectos que se evaluarán
+
+El formato debe ser idéntico al que aparece en los exámenes oficiales $tipo_examen.
+La tarea debe ser apropiada para el nivel $nivel_examen, siguiendo los estándares oficiales.
+""")
+
+EJEMPLOS_EVALUADOS = registrar_plantilla(
+    "ejemplos_evaluados",
+    "Eres un evaluador experto de exámenes oficiales de español.",
+    """
+Genera un ejemplo de texto de un estudiante para el examen $tipo_examen nivel $nivel_examen,
+junto con una evaluación detallada usando los criterios oficiales.
+Muestra:
+1. La tarea solicitada
+2. El texto del estudiante (con algunos errores típicos de ese nivel)
+3. Evaluación punto por punto según los criterios oficiales
+4. Puntuación desglosada y comentarios
+""")
+
+PLAN_ESTUDIO = registrar_plantilla(
+    "plan_estudio",
+    "Eres un experto en diseño curricular ELE que crea planes de estudio personalizados.",
+    """
+Crea un plan de estudio personalizado para un estudiante de español llamado $nombre de nivel $nivel
+con los siguientes errores frecuentes: $errores_frecuentes
+
+Organiza el plan por semanas (4 semanas) con objetivos claros, actividades concretas y recursos recomendados.
+Para cada semana, incluye:
+
+1. Objetivos específicos
+2. Temas gramaticales a trabajar
+3. Vocabulario a practicar
+4. 1-2 actividades concretas
+5. Recursos o materiales recomendados
+
+Adapta todo el contenido al nivel del estudiante y sus necesidades específicas.
+""")
+
+
+# --- Ejercicios personalizados ---
+
+EJERCICIOS = registrar_plantilla(
+    "ejercicios_personalizados",
+    "Eres un experto profesor de ELE especializado en crear ejercicios personalizados.",
+    """
+Basándote en los errores y análisis contextual de un estudiante de español de nivel $nivel,
+crea $faltan ejercicios personalizados que le ayuden a mejorar. El estudiante tiene:
+
+- Errores gramaticales: $errores_gramatica
+- Errores léxicos: $errores_lexico
+- Errores de puntuación: $errores_puntuacion
+- Errores de estructura: $errores_estructura
+
+- Puntuación en coherencia: $coherencia/10
+- Puntuación en cohesión: $cohesion/10
+- Registro lingüístico: $registro
+
+Errores concretos que conviene trabajar:
+$errores_concretos
+
+Crea ejercicios breves y específicos en formato JSON con esta estructura:
+{
+  "ejercicios": [
+    {
+      "titulo": "Título del ejercicio",
+      "tipo": "tipo de ejercicio (completar huecos, ordenar frases, etc.)",
+      "instrucciones": "instrucciones claras y breves",
+      "contenido": "el contenido del ejercicio",
+      "solucion": "la solución del ejercicio",
+      "error": número del error concreto que trabaja el ejercicio, o null si es general
+    }
+  ]
+}
+
+Escribe las instrucciones y el título en $idioma, pero mantén el contenido del ejercicio en español.
+""", {"ejercicios": list})
@@ -0,0 +1,72 @@
+"""Inicialización y acceso seguro a st.session_state."""
+
+import uuid
+
+import streamlit as st
+
+
+def init_session_state():
+    """
+    Inicializa variables de session_state con valores predeterminados seguros
+    para evitar KeyError durante la ejecución.
+    """
+    default_values = {
+        "nivel_estudiante": "intermedio",
+        "consigna_actual": "",
+        "usar_consigna_como_texto": False,
+        "texto_correccion_corregir": "",
+        "info_adicional_corregir": "",
+        "ultima_imagen_url": "",
+        "ultima_descripcion": "",
+        "ultimo_texto_transcrito": "",
+        "tarea_modelo_generada": None,
+        "respuesta_modelo_examen": "",
+        "inicio_simulacro": None,
+        "duracion_simulacro": None,
+        "tarea_simulacro": None,
+        "simulacro_respuesta_texto": "",
+        "request_id": "",
+        "usuario_actual": "",
+        "correction_result": None,
+        "last_correction_time": None,
+        "examen_result": None,
+        "api_error_count": 0,
+        "api_last_error_time": None,
+        "circuit_breaker_open": False,
+        "ultimo_texto": "",
+        "correccion_base": None,
+        "nombre_seleccionado": None,
+        "imagen_generada_state": False,
+        "imagen_url_state": None,
+        "imagen_id_state": None,
+        "descripcion_state": None,
+        "tema_imagen_state": None,
+        "descripcion_estudiante_state": "",
+        "mostrar_correccion_imagen": False,
+        "mostrar_correccion_transcripcion": False,
+        "active_tab_index": 0,
+        "active_tools_tab_index": 0,
+        "tab_navigate_to": None,
+        "app_initialized": False
+    }
+
+    for key, default_value in default_values.items():
+        if key not in st.session_state:
+            st.session_state[key] = default_value
+
+    # Generar ID único para esta sesión si no existe
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())
+
+
+# Funciones seguras para acceso a session_state
+
+
+def get_session_var(key, default=None):
+    """Obtiene una variable de session_state de forma segura"""
+    return st.session_state.get(key, default)
+
+
+def set_session_var(key, value):
+    """Establece una variable en session_state"""
+    st.session_state[key] = value
@@ -0,0 +1,385 @@
+"""Persistencia: Google Sheets, almacén de imágenes y reserva de ejercicios."""
+
+import json
+import logging
+import os
+import requests
+import streamlit as st
+from datetime import datetime
+
+from exercise_bank import ExerciseBank
+from exercise_pool import ImageExercisePool
+from image_store import ImageStore
+
+from textocorrector.cache import NS_HISTORIALES, NS_IMAGENES, cache_manager, clave_estudiante
+from textocorrector.clients import (
+    api_keys, circuit_breaker, extract_json_safely, generar_imagen_dalle, retry_with_backoff,
+    get_sheets_connection
+)
+from textocorrector.session import get_session_var
+
+logger = logging.getLogger(__name__)
+
+
+# --- 1. ALMACÉN DE IMÁGENES Y RESERVA DE EJERCICIOS ---
+
+
+@st.cache_resource(show_spinner=False)
+def get_image_store():
+    """
+    Devuelve el almacén local de imágenes compartido por todas las sesiones.
+
+    Returns:
+        ImageStore: Almacén de imágenes direccionado por contenido
+    """
+    return ImageStore()
+
+
+def guardar_imagen_generada(imagen_url):
+    """
+    Descarga una imagen generada una sola vez y la guarda en el almacén local,
+    para no depender de la URL remota (que caduca) en cada recarga.
+
+    Args:
+        imagen_url: URL temporal devuelta por DALL-E
+
+    Returns:
+        str: Identificador de la imagen en el almacén, o None si falla la descarga
+    """
+    if not imagen_url:
+        return None
+
+    try:
+        def download_image():
+            response = requests.get(imagen_url, timeout=30)
+            response.raise_for_status()
+            return response.content
+
+        imagen_bytes = retry_with_backoff(download_image, max_retries=2)
+        return get_image_store().put(imagen_bytes)
+
+    except Exception as e:
+        logger.error(f"Error al guardar imagen generada: {str(e)}")
+        return None
+
+
+def obtener_imagen_ejercicio(miniatura=False):
+    """
+    Obtiene la imagen del ejercicio actual desde el almacén local.
+    Si no está disponible, recurre a la URL original.
+
+    Args:
+        miniatura: Devolver la miniatura pregenerada en lugar de la imagen completa
+
+    Returns:
+        bytes o str: Bytes de la imagen, URL de respaldo o None
+    """
+    imagen_id = get_session_var("imagen_id_state", None)
+    if imagen_id:
+        # Evitar leer el fichero del almacén en cada rerun
+        clave_cache = (imagen_id, miniatura)
+        imagen = cache_manager.get(NS_IMAGENES, clave_cache)
+        if imagen is not None:
+            return imagen
+
+        store = get_image_store()
+        imagen = store.get_thumbnail(
+            imagen_id) if miniatura else store.get(imagen_id)
+        if imagen is not None:
+            cache_manager.set(NS_IMAGENES, clave_cache, imagen)
+            return imagen
+
+    return get_session_var("imagen_url_state", None)
+
+
+# Temas que se mantienen precalentados en la reserva de ejercicios de imagen
+TEMAS_POPULARES_IMAGEN = [
+    "Una fiesta de cumpleaños",
+    "Un día en la playa",
+    "Un mercado tradicional",
+    "Una familia cenando en casa",
+    "Un día de lluvia en la ciudad",
+    "Una clase en el colegio"
+]
+
+
+NIVELES_IMAGEN = ["principiante", "intermedio", "avanzado"]
+
+
+# Ejercicios listos por (nivel, tema), suficientes para que una clase empiece a
+# la vez con el mismo tema; 0 desactiva la reposición en segundo plano
+POOL_EJERCICIOS_POR_TEMA = int(os.environ.get("TEXTOCORRECTOR_RESERVA_POR_TEMA", "6"))
+
+
+POOL_INTERVALO_SEGUNDOS = 30  # Intervalo mínimo entre generaciones de reposición
+
+
+POOL_INTERVALO_RAFAGA_SEGUNDOS = 5  # Intervalo cuando un tema está casi agotado
+
+
+def generar_ejercicio_imagen(tema, nivel):
+    """
+    Genera un ejercicio completo (imagen guardada + descripción con preguntas)
+    sin interacción con la interfaz. Se usa para reponer la reserva.
+
+    Args:
+        tema: Tema para la imagen
+        nivel: Nivel de español
+
+    Returns:
+        tuple: (identificador de la imagen, descripción) o None si falla
+    """
+    if api_keys["openai"] is None or not circuit_breaker.can_execute("openai"):
+        return None
+
+    imagen_url, descripcion = generar_imagen_dalle(
+        tema, nivel, mostrar_errores=False)
+    imagen_id = guardar_imagen_generada(imagen_url)
+    if not imagen_id:
+        return None
+
+    return imagen_id, descripcion
+
+
+@st.cache_resource(show_spinner=False)
+def get_exercise_pool():
+    """
+    Devuelve la reserva de ejercicios de imagen (sin arrancar su reposición,
+    ver arrancar_reserva_ejercicios).
+
+    Returns:
+        ImageExercisePool: Reserva compartida por todas las sesiones
+    """
+    return ImageExercisePool(
+        get_image_store(),
+        generar_ejercicio_imagen,
+        TEMAS_POPULARES_IMAGEN,
+        NIVELES_IMAGEN,
+        objetivo=POOL_EJERCICIOS_POR_TEMA,
+        intervalo_minimo=POOL_INTERVALO_SEGUNDOS,
+        intervalo_rafaga=POOL_INTERVALO_RAFAGA_SEGUNDOS
+    )
+
+
+def arrancar_reserva_ejercicios():
+    """
+    Arranca la reposición en segundo plano de la reserva de ejercicios de
+    imagen si OpenAI está configurado y el objetivo no es 0. Se llama al usar
+    la herramienta de imágenes, para no generar imágenes que nadie pide.
+
+    Returns:
+        ImageExercisePool: Reserva compartida por todas las sesiones
+    """
+    pool = get_exercise_pool()
+    if api_keys["openai"] is not None and pool.objetivo > 0:
+        pool.start()
+    return pool
+
+
+@st.cache_resource(show_spinner=False)
+def get_exercise_bank():
+    """
+    Devuelve el banco local de ejercicios por patrón de error, compartido por
+    todas las sesiones.
+
+    Returns:
+        ExerciseBank: Banco de ejercicios, o None si no se pudo abrir
+    """
+    try:
+        return ExerciseBank()
+    except Exception as e:
+        logger.error(f"No se pudo abrir el banco de ejercicios: {e}")
+        return None
+
+
+# --- 2. GUARDADO DE DATOS EN GOOGLE SHEETS ---
+
+
+def guardar_correccion(nombre, nivel, idioma, texto, resultado_json):
+    """
+    Guarda los datos de una corrección en Google Sheets.
+
+    Args:
+        nombre: Nombre del estudiante
+        nivel: Nivel de español
+        idioma: Idioma de corrección
+        texto: Texto original
+        resultado_json: Resultado de la corrección en formato JSON (como string o dict)
+
+    Returns:
+        dict: Resultado de la operación
+    """
+    sheets_connection = get_sheets_connection()
+    if sheets_connection is None:
+        return {"success": False, "message": "Conexión a Google Sheets no disponible"}
+
+    # Fecha actual para el registro
+    fecha = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    # Convertir resultado_json a string si es un diccionario
+    if isinstance(resultado_json, dict):
+        raw_output = json.dumps(resultado_json)
+    else:
+        raw_output = resultado_json
+
+    result = {
+        "success": True,
+        "corrections_saved": False,
+        "tracking_saved": False,
+        "message": ""
+    }
+
+    # Guardar en Historial_Correcciones_ELE
+    if sheets_connection["corrections"] is not None:
+        try:
+            sheets_connection["corrections"].append_row(
+                [nombre, nivel, idioma, fecha, texto, raw_output]
+            )
+            result["corrections_saved"] = True
+            logger.info(f"Corrección guardada para {nombre}")
+        except Exception as e:
+            logger.error(
+                f"Error al guardar en Historial_Correcciones_ELE: {str(e)}")
+            result["message"] += f"Error al guardar historial: {str(e)}. "
+
+    # Guardar en hoja de seguimiento si hay datos de análisis contextual
+    if sheets_connection["tracking"] is not None:
+        try:
+            # Extraer datos del resultado
+            if isinstance(resultado_json, str):
+                data_json = extract_json_safely(resultado_json)
+            else:
+                data_json = resultado_json
+
+            # Extraer datos relevantes para seguimiento
+            errores = data_json.get("errores", {})
+            analisis = data_json.get("analisis_contextual", {})
+
+            # Contar errores por categoría
+            num_gramatica = len(errores.get("Gramática", []))
+            num_lexico = len(errores.get("Léxico", []))
+            num_puntuacion = len(errores.get("Puntuación", []))
+            num_estructura = len(errores.get("Estructura textual", []))
+            total_errores = num_gramatica + num_lexico + num_puntuacion + num_estructura
+
+            # Extraer puntuaciones
+            coherencia = analisis.get("coherencia", {})
+            cohesion = analisis.get("cohesion", {})
+            registro = analisis.get("registro_linguistico", {})
+            adecuacion = analisis.get("adecuacion_cultural", {})
+
+            puntuacion_coherencia = coherencia.get("puntuacion", 0)
+            puntuacion_cohesion = cohesion.get("puntuacion", 0)
+            puntuacion_registro = registro.get("puntuacion", 0)
+            puntuacion_adecuacion = adecuacion.get("puntuacion", 0)
+
+            # Extraer consejo final
+            consejo_final = data_json.get("consejo_final", "")
+
+            # Datos para guardar
+            datos_seguimiento = [
+                nombre,
+                nivel,
+                fecha,
+                num_gramatica,
+                num_lexico,
+                num_puntuacion,
+                num_estructura,
+                total_errores,
+                puntuacion_coherencia,
+                puntuacion_cohesion,
+                puntuacion_registro,
+                puntuacion_adecuacion,
+                consejo_final
+            ]
+
+            # Guardar en hoja de seguimiento
+            sheets_connection["tracking"].append_row(datos_seguimiento)
+            result["tracking_saved"] = True
+            logger.info(f"Estadísticas guardadas para {nombre}")
+        except Exception as e:
+            logger.error(f"Error al guardar en hoja de Seguimiento: {str(e)}")
+            result["message"] += f"Error al guardar estadísticas: {str(e)}."
+
+    # Resultado final
+    if result["corrections_saved"] or result["tracking_saved"]:
+        result["success"] = True
+        # El historial y los informes cacheados del estudiante ya no están al día
+        cache_manager.invalidar_estudiante(nombre)
+        if not result["message"]:
+            result["message"] = "Datos guardados correctamente."
+    else:
+        result["success"] = False
+        if not result["message"]:
+            result["message"] = "No se pudo guardar ningún dato."
+
+    return result
+
+
+def obtener_historial_estudiante(nombre):
+    """
+    Obtiene el historial de correcciones y seguimiento para un estudiante específico.
+
+    Args:
+        nombre: Nombre del estudiante
+
+    Returns:
+        pd.DataFrame o None: DataFrame con historial o None si no hay datos
+    """
+    # Historial cacheado (se invalida al guardar una nueva corrección del estudiante)
+    clave_cache = (clave_estudiante(nombre),)
+    df_cacheado = cache_manager.get(NS_HISTORIALES, clave_cache)
+    if df_cacheado is not None:
+        return df_cacheado.copy()
+
+    sheets_connection = get_sheets_connection()
+    if sheets_connection is None or sheets_connection["tracking"] is None:
+        logger.warning("No hay conexión con hoja de seguimiento")
+        return None
+
+    try:
+        # Obtener todos los datos
+        todos_datos = sheets_connection["tracking"].get_all_records()
+
+        if not todos_datos:
+            return None
+
+        # Crear una versión limpia del nombre buscado
+        nombre_buscar = nombre.strip().lower()
+
+        # Buscar en todos los registros con un enfoque más flexible
+        datos_estudiante = []
+        for row in todos_datos:
+            for key, value in row.items():
+                # Buscar en cualquier columna que tenga 'nombre'
+                if 'nombre' in key.lower() and value:
+                    if str(value).strip().lower() == nombre_buscar:
+                        datos_estudiante.append(row)
+                        break
+
+        # Convertir a DataFrame
+        if datos_estudiante:
+            import pandas as pd
+
+            df = pd.DataFrame(datos_estudiante)
+
+            # Convertir columnas numéricas explícitamente para evitar errores con PyArrow
+            columnas_numericas = [
+                'Errores Gramática', 'Errores Léxico', 'Errores Puntuación',
+                'Errores Estructura', 'Total Errores', 'Puntuación Coherencia',
+                'Puntuación Cohesión', 'Puntuación Registro', 'Puntuación Adecuación Cultural'
+            ]
+
+            for col in columnas_numericas:
+                if col in df.columns:
+                    # Convertir a float de manera segura
+                    df[col] = pd.to_numeric(
+                        df[col], errors='coerce').fillna(0).astype(float)
+
+            cache_manager.set(NS_HISTORIALES, clave_cache, df.copy())
+            return df
+
+        return None
+    except Exception as e:
+        logger.error(f"Error en obtener_historial_estudiante: {str(e)}")
+        return None
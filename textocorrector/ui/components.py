@@ -0,0 +1,1116 @@
+"""Componentes de interfaz reutilizables y visualización de resultados."""
+
+import logging
+import streamlit as st
+import time
+import traceback
+from datetime import datetime
+
+from span_index import localizar_fragmentos, resaltar_html
+
+from textocorrector.clients import generar_audio_consejo
+from textocorrector.config import APP_VERSION
+from textocorrector.exports import generar_csv_analisis, generar_informe_docx, generar_informe_html
+from textocorrector.pipelines import (
+    obtener_ejercicios_personalizados, obtener_recursos_recomendados,
+    programar_ejercicios_personalizados
+)
+from textocorrector.session import get_session_var, set_session_var
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre consultas mientras se generan los ejercicios personalizados
+INTERVALO_SONDEO_EJERCICIOS = 3
+
+
+# --- 1. COMPONENTES DE UI REUTILIZABLES ---
+
+
+def ui_header():
+    """Muestra el encabezado principal de la aplicación."""
+    col1, col2 = st.columns([6, 1])
+    with col1:
+        st.title("📝 Textocorrector ELE")
+        st.markdown(
+            "Corrección de textos en español con análisis contextual avanzado.")
+
+    with col2:
+        # Mostrar indicador de versión
+        st.markdown(f"""
+        <div style="background-color:#f0f2f6;padding:8px;border-radius:5px;margin-top:20px;text-align:center">
+            <small>v{APP_VERSION}</small>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+def ui_user_info_form(form_key="form_user_info"):
+    """
+    Formulario para obtener información básica del usuario, con mejor validación.
+
+    Args:
+        form_key: Clave única para el formulario
+
+    Returns:
+        dict: Datos del usuario (nombre, nivel)
+    """
+    with st.form(key=form_key):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            nombre = st.text_input(
+                "Nombre y apellido:",
+                value=get_session_var("usuario_actual", ""),
+                help="Por favor, introduce tu nombre (y apellido opcional)."
+            )
+
+        with col2:
+            nivel = st.selectbox(
+                "¿Cuál es tu nivel?",
+                [
+                    "Nivel principiante (A1-A2)",
+                    "Nivel intermedio (B1-B2)",
+                    "Nivel avanzado (C1-C2)"
+                ],
+                index=["principiante", "intermedio", "avanzado"].index(
+                    get_session_var("nivel_estudiante", "intermedio")
+                )
+            )
+
+        submit = st.form_submit_button("Guardar", use_container_width=True)
+
+        if submit:
+            # SOLUCIÓN: Validación de nombre mejorada
+            if not nombre.strip():
+                st.warning("Por favor, introduce al menos tu nombre.")
+                return None
+
+            # Guardar en session_state
+            set_session_var("usuario_actual", nombre)
+
+            # Guardar nivel en formato simplificado
+            nivel_map = {
+                "Nivel principiante (A1-A2)": "principiante",
+                "Nivel intermedio (B1-B2)": "intermedio",
+                "Nivel avanzado (C1-C2)": "avanzado"
+            }
+            set_session_var("nivel_estudiante",
+                            nivel_map.get(nivel, "intermedio"))
+
+            return {"nombre": nombre, "nivel": nivel}
+
+        return None
+
+
+def ui_idioma_correcciones_tipo():
+    """
+    Componente para seleccionar idioma de correcciones y tipo de texto.
+
+    Returns:
+        dict: Opciones seleccionadas
+    """
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        idioma = st.selectbox(
+            "Idioma de corrección",
+            ["Español", "Inglés", "Francés"],
+            help="Idioma en el que recibirás las explicaciones y análisis."
+        )
+
+    with col2:
+        tipo_texto = st.selectbox(
+            "Tipo de texto",
+            [
+                "General/No especificado",
+                "Académico",
+                "Profesional/Laboral",
+                "Informal/Cotidiano",
+                "Creativo/Literario"
+            ],
+            help="Tipo de texto que estás escribiendo."
+        )
+
+    with col3:
+        contexto_cultural = st.selectbox(
+            "Contexto cultural",
+            [
+                "General/Internacional",
+                "España",
+                "Latinoamérica",
+                "Contexto académico",
+                "Contexto empresarial"
+            ],
+            help="Contexto cultural relevante para tu texto."
+        )
+
+    return {
+        "idioma": idioma,
+        "tipo_texto": tipo_texto,
+        "contexto_cultural": contexto_cultural
+    }
+
+
+def ui_examen_options():
+    """
+    Componente para seleccionar opciones de examen.
+
+    Returns:
+        dict: Opciones de examen seleccionadas
+    """
+    col1, col2 = st.columns(2)
+
+    with col1:
+        tipo_examen = st.selectbox(
+            "Examen oficial:",
+            ["DELE", "SIELE", "CELU", "DUCLE"],
+            help="Selecciona el tipo de examen para el que quieres prepararte."
+        )
+
+    with col2:
+        nivel_examen = st.selectbox(
+            "Nivel:",
+            ["A1", "A2", "B1", "B2", "C1", "C2"],
+            help="Nivel del examen."
+        )
+
+    return {
+        "tipo_examen": tipo_examen,
+        "nivel_examen": nivel_examen
+    }
+
+
+def ui_loading_spinner(text="Procesando..."):
+    """
+    Spinner de carga con texto personalizable.
+
+    Args:
+        text: Texto a mostrar durante la carga
+
+    Returns:
+        st.spinner: Objeto spinner de Streamlit
+    """
+    return st.spinner(text)
+
+
+def ui_empty_placeholder():
+    """
+    Crea un placeholder vacío para contenido dinámico.
+
+    Returns:
+        st.empty: Objeto empty de Streamlit
+    """
+    return st.empty()
+
+
+def ui_countdown_timer(total_seconds, start_time=None):
+    """
+    Muestra un temporizador de cuenta regresiva.
+
+    Args:
+        total_seconds: Tiempo total en segundos
+        start_time: Tiempo de inicio (None = ahora)
+
+    Returns:
+        dict: Estado del temporizador
+    """
+    # Manejar el caso donde total_seconds es None
+    if total_seconds is None:
+        total_seconds = 0  # Usar 0 como valor por defecto
+
+    if start_time is None:
+        start_time = time.time()
+
+    # Calcular tiempo transcurrido
+    tiempo_transcurrido = time.time() - start_time
+    tiempo_restante_segundos = max(0, total_seconds - tiempo_transcurrido)
+
+    # Formatear tiempo restante
+    minutos = int(tiempo_restante_segundos // 60)
+    segundos = int(tiempo_restante_segundos % 60)
+    tiempo_formateado = f"{minutos:02d}:{segundos:02d}"
+
+    # Calcular porcentaje (evitar división por cero)
+    if total_seconds > 0:
+        porcentaje = 1 - (tiempo_restante_segundos / total_seconds)
+    else:
+        porcentaje = 1  # Si no hay tiempo total, consideramos que está completo
+
+    porcentaje = max(0, min(1, porcentaje))  # Asegurar entre 0 y 1
+
+    # Determinar color según tiempo restante
+    if tiempo_restante_segundos > total_seconds * 0.5:  # Más del 50% restante
+        color = "normal"  # Verde/Normal
+    elif tiempo_restante_segundos > total_seconds * 0.25:  # Entre 25% y 50%
+        color = "warning"  # Amarillo/Advertencia
+    else:  # Menos del 25%
+        color = "error"  # Rojo/Error
+
+    return {
+        "tiempo_restante": tiempo_restante_segundos,
+        "tiempo_formateado": tiempo_formateado,
+        "porcentaje": porcentaje,
+        "color": color,
+        "terminado": tiempo_restante_segundos <= 0
+    }
+
+
+# --- 2. UTILIDADES DE INTERFAZ ---
+
+
+def ui_error_message(error_msg, show_details=True):
+    """
+    Muestra un mensaje de error formateado.
+
+    Args:
+        error_msg: Mensaje de error
+        show_details: Mostrar detalles adicionales
+    """
+    st.error(f"⚠️ {error_msg}")
+
+    if show_details:
+        with st.expander("Ver detalles del error"):
+            st.code(traceback.format_exc())
+            st.info(
+                "Si el problema persiste, contacta con el administrador del sistema.")
+
+
+def ui_success_message(msg):
+    """
+    Muestra un mensaje de éxito formateado.
+
+    Args:
+        msg: Mensaje de éxito
+    """
+    st.success(f"✅ {msg}")
+
+
+def ui_info_message(msg):
+    """
+    Muestra un mensaje informativo formateado.
+
+    Args:
+        msg: Mensaje informativo
+    """
+    st.info(f"ℹ️ {msg}")
+
+
+def ui_warning_message(msg):
+    """
+    Muestra un mensaje de advertencia formateado.
+
+    Args:
+        msg: Mensaje de advertencia
+    """
+    st.warning(f"⚠️ {msg}")
+
+
+def ui_show_progress(title, value, max_value=100, style="progress"):
+    """
+    Muestra una barra de progreso con diferentes estilos.
+
+    Args:
+        title: Título del progreso
+        value: Valor actual
+        max_value: Valor máximo
+        style: Estilo (progress/metric/percent)
+    """
+    if style == "progress":
+        st.markdown(f"#### {title}")
+        st.progress(value / max_value)
+    elif style == "metric":
+        st.metric(title, f"{value}/{max_value}")
+    elif style == "percent":
+        percent = (value / max_value) * 100
+        st.metric(title, f"{percent:.0f}%")
+    else:
+        st.markdown(f"**{title}:** {value}/{max_value}")
+
+
+def ui_confirm_dialog(title, message, ok_button="Confirmar", cancel_button="Cancelar"):
+    """
+    Muestra un diálogo de confirmación.
+
+    Args:
+        title: Título del diálogo
+        message: Mensaje del diálogo
+        ok_button: Texto del botón de confirmación
+        cancel_button: Texto del botón de cancelación
+
+    Returns:
+        bool: True si se confirma, False si se cancela
+    """
+    st.markdown(f"### {title}")
+    st.markdown(message)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        cancel = st.button(cancel_button, key=f"cancel_{hash(title)}")
+    with col2:
+        confirm = st.button(ok_button, key=f"confirm_{hash(title)}")
+
+    if confirm:
+        return True
+
+    if cancel:
+        return False
+
+    return None  # No se ha tomado decisión
+
+
+def ui_tooltip(text, tooltip):
+    """
+    Muestra un texto con tooltip al pasar el ratón.
+
+    Args:
+        text: Texto a mostrar
+        tooltip: Texto del tooltip
+    """
+    st.markdown(f"""
+    <span title="{tooltip}" style="border-bottom: 1px dotted #000; cursor: help;">
+        {text}
+    </span>
+    """, unsafe_allow_html=True)
+
+
+def ui_feedback_form():
+    """
+    Muestra un formulario de feedback para el usuario.
+
+    Returns:
+        dict: Datos del feedback o None si no se envía
+    """
+    with st.expander("📝 Danos tu opinión", expanded=False):
+        with st.form(key="feedback_form"):
+            st.markdown("### Nos gustaría conocer tu opinión")
+
+            rating = st.slider(
+                "¿Cómo valorarías la utilidad de esta herramienta?",
+                min_value=1,
+                max_value=5,
+                value=4,
+                help="1 = Poco útil, 5 = Muy útil"
+            )
+
+            feedback_text = st.text_area(
+                "Comentarios o sugerencias:",
+                height=100,
+                help="¿Qué podríamos mejorar?"
+            )
+
+            submit = st.form_submit_button("Enviar feedback")
+
+            if submit:
+                # En una implementación real, aquí se enviaría el feedback a una base de datos
+                ui_success_message("¡Gracias por tu feedback!")
+                return {
+                    "rating": rating,
+                    "feedback": feedback_text,
+                    "timestamp": datetime.now().isoformat()
+                }
+
+            return None
+
+
+# --- 3. VISUALIZACIÓN DE RESULTADOS DE CORRECCIÓN ---
+
+
+# Color de resaltado por categoría de error
+COLORES_CATEGORIA_ERROR = {
+    "Gramática": "#ffd6d6",
+    "Léxico": "#fff1b8",
+    "Puntuación": "#d6e8ff",
+    "Estructura textual": "#e8dcff"
+}
+
+
+def ui_revision_local(hallazgos):
+    """
+    Muestra los errores de la revisión local (ortografía, puntuación,
+    concordancia y formas verbales) mientras se espera la corrección completa.
+
+    Args:
+        hallazgos: Lista devuelta por revisar_texto
+    """
+    if not hallazgos:
+        return
+
+    with st.expander(f"🔎 Revisión rápida: {len(hallazgos)} errores detectados automáticamente", expanded=True):
+        for h in hallazgos:
+            st.markdown(
+                f"- **{h['fragmento_erroneo'].strip()}** → **{h['correccion'].strip()}**: {h['explicacion']}")
+        st.caption("La corrección completa los incluirá junto con el resto del análisis.")
+
+
+def ui_texto_con_errores_resaltados(texto_original, errores_obj):
+    """
+    Muestra el texto original con cada fragmento erróneo resaltado en su posición.
+
+    Args:
+        texto_original: Texto enviado por el estudiante
+        errores_obj: Objeto con errores detectados por categoría
+    """
+    if not texto_original or not isinstance(errores_obj, dict):
+        return
+
+    # Lista plana de errores (categoría, error) en el orden de la interfaz
+    errores_planos = [
+        (categoria, err)
+        for categoria in COLORES_CATEGORIA_ERROR
+        for err in errores_obj.get(categoria, []) or []
+        if isinstance(err, dict)
+    ]
+    spans = localizar_fragmentos(
+        texto_original, [err.get("fragmento_erroneo", "") for _, err in errores_planos])
+    if not spans:
+        return
+
+    def estilo(span):
+        categoria = errores_planos[span["indice"]][0]
+        return f"background-color: {COLORES_CATEGORIA_ERROR[categoria]}; padding: 0 2px; border-radius: 3px;"
+
+    def titulo(span):
+        categoria, err = errores_planos[span["indice"]]
+        return f"{categoria}: {err.get('correccion', '')}"
+
+    html_resaltado = resaltar_html(texto_original, spans, estilo, titulo)
+    leyenda = " ".join(
+        f'<span style="background-color: {color}; padding: 0 6px; border-radius: 3px;">{categoria}</span>'
+        for categoria, color in COLORES_CATEGORIA_ERROR.items()
+    )
+
+    with st.expander("Texto original con los errores señalados", expanded=True):
+        st.markdown(
+            f'<div style="line-height: 1.8; white-space: normal;">{html_resaltado}</div>'
+            f'<div style="margin-top: 10px; font-size: 0.8em;">{leyenda}</div>',
+            unsafe_allow_html=True
+        )
+        st.caption(
+            f"{len(spans)} de {len(errores_planos)} errores localizados en el texto. "
+            "Pasa el ratón por encima para ver la corrección.")
+
+
+def ui_show_correction_results(result, show_export=True):
+    """
+    Muestra los resultados de una corrección de texto.
+
+    Args:
+        result: Resultados de la corrección
+        show_export: Mostrar opciones de exportación
+    """
+    if "error" in result:
+        st.error(f"Error en la corrección: {result['error']}")
+        return
+
+    if result.get("aviso"):
+        st.warning(result["aviso"])
+
+    # Extraer campos del JSON
+    saludo = result.get("saludo", "")
+    tipo_texto_detectado = result.get("tipo_texto", "")
+    errores_obj = result.get("errores", {})
+    texto_corregido = result.get("texto_corregido", "")
+    analisis_contextual = result.get("analisis_contextual", {})
+    consejo_final = result.get("consejo_final", "")
+    fin = result.get("fin", "")
+
+    # Extraer puntuaciones del análisis contextual
+    coherencia = analisis_contextual.get("coherencia", {})
+    cohesion = analisis_contextual.get("cohesion", {})
+    registro = analisis_contextual.get("registro_linguistico", {})
+    adecuacion = analisis_contextual.get("adecuacion_cultural", {})
+
+    puntuacion_coherencia = coherencia.get("puntuacion", 0)
+    puntuacion_cohesion = cohesion.get("puntuacion", 0)
+    puntuacion_registro = registro.get("puntuacion", 0)
+    puntuacion_adecuacion = adecuacion.get("puntuacion", 0)
+
+    # --- CONTEO DE ERRORES ---
+    num_gramatica = len(errores_obj.get("Gramática", []))
+    num_lexico = len(errores_obj.get("Léxico", []))
+    num_puntuacion = len(errores_obj.get("Puntuación", []))
+    num_estructura = len(errores_obj.get("Estructura textual", []))
+    total_errores = num_gramatica + num_lexico + num_puntuacion + num_estructura
+
+    # --- MOSTRAR RESULTADOS EN LA INTERFAZ ---
+    # Mostrar el saludo directamente
+    st.write(saludo)
+
+    # Mostrar tipo de texto detectado con contextualización
+    st.info(
+        f"He identificado tu escrito como un texto de tipo **{tipo_texto_detectado.lower()}**.")
+
+    # Errores detectados
+    st.subheader("Errores detectados")
+    if not any(errores_obj.get(cat, []) for cat in ["Gramática", "Léxico", "Puntuación", "Estructura textual"]):
+        st.success("¡Felicidades! No se han detectado errores significativos.")
+    else:
+        # Señalar los errores dentro del texto original del estudiante
+        ui_texto_con_errores_resaltados(
+            get_session_var("ultimo_texto", ""), errores_obj)
+
+        for categoria in ["Gramática", "Léxico", "Puntuación", "Estructura textual"]:
+            lista_errores = errores_obj.get(categoria, [])
+            if lista_errores:
+                with st.expander(f"**{categoria}** ({len(lista_errores)} errores)"):
+                    for i, err in enumerate(lista_errores, 1):
+                        st.markdown(f"**Error {i}:**")
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.error(f"❌ {err.get('fragmento_erroneo', '')}")
+                        with col2:
+                            st.success(f"✅ {err.get('correccion', '')}")
+                        st.info(f"💡 {err.get('explicacion', '')}")
+                        if i < len(lista_errores):
+                            st.divider()
+
+    # Texto corregido
+    st.subheader("Texto corregido completo")
+    st.write(texto_corregido)
+
+    # --- ANÁLISIS CONTEXTUAL ---
+    st.header("Análisis contextual avanzado")
+
+    # Crear columnas para las puntuaciones generales
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Coherencia", f"{puntuacion_coherencia}/10")
+    with col2:
+        st.metric("Cohesión", f"{puntuacion_cohesion}/10")
+    with col3:
+        st.metric("Registro", f"{puntuacion_registro}/10")
+    with col4:
+        st.metric("Adecuación cultural", f"{puntuacion_adecuacion}/10")
+
+    # Gráfico sencillo para visualizar las puntuaciones
+    puntuaciones = [puntuacion_coherencia, puntuacion_cohesion,
+                    puntuacion_registro, puntuacion_adecuacion]
+    categorias = ["Coherencia", "Cohesión", "Registro", "Ad. Cultural"]
+
+    # Calcular el promedio de las puntuaciones
+    promedio_contextual = sum(puntuaciones) / \
+        len(puntuaciones) if puntuaciones else 0
+
+    # Mostrar un progreso general
+    st.markdown(f"##### Evaluación global: {promedio_contextual:.1f}/10")
+    st.progress(promedio_contextual / 10)
+
+    # Detalles de coherencia
+    with st.expander("Coherencia textual", expanded=True):
+        st.markdown(f"**Comentario**: {coherencia.get('comentario', '')}")
+        sugerencias = coherencia.get("sugerencias", [])
+        if sugerencias:
+            st.markdown("**Sugerencias para mejorar:**")
+            for sug in sugerencias:
+                st.markdown(f"- {sug}")
+
+    # Detalles de cohesión
+    with st.expander("Cohesión textual", expanded=True):
+        st.markdown(f"**Comentario**: {cohesion.get('comentario', '')}")
+        sugerencias = cohesion.get("sugerencias", [])
+        if sugerencias:
+            st.markdown("**Sugerencias para mejorar:**")
+            for sug in sugerencias:
+                st.markdown(f"- {sug}")
+
+    # Detalles de registro lingüístico
+    with st.expander("Registro lingüístico", expanded=True):
+        st.markdown(
+            f"**Tipo de registro detectado**: {registro.get('tipo_detectado', '')}")
+        st.markdown(
+            f"**Adecuación al contexto**: {registro.get('adecuacion', '')}")
+        sugerencias = registro.get("sugerencias", [])
+        if sugerencias:
+            st.markdown("**Sugerencias para mejorar:**")
+            for sug in sugerencias:
+                st.markdown(f"- {sug}")
+
+    # Detalles de adecuación cultural
+    with st.expander("Adecuación cultural y pragmática", expanded=True):
+        st.markdown(f"**Comentario**: {adecuacion.get('comentario', '')}")
+        elementos = adecuacion.get("elementos_destacables", [])
+        if elementos:
+            st.markdown("**Elementos culturales destacables:**")
+            for elem in elementos:
+                st.markdown(f"- {elem}")
+        sugerencias = adecuacion.get("sugerencias", [])
+        if sugerencias:
+            st.markdown("**Sugerencias para mejorar:**")
+            for sug in sugerencias:
+                st.markdown(f"- {sug}")
+
+    # Consejo final
+    st.subheader("Consejo final")
+    st.info(consejo_final)
+    st.write(fin)
+
+    # --- GENERAR AUDIO CON ELEVENLABS (Consejo final en español) ---
+    ui_audio_consejo(consejo_final)
+
+    # --- MOSTRAR RECOMENDACIONES PERSONALIZADAS ---
+    ui_show_recommendations(errores_obj, analisis_contextual, get_session_var(
+        "nivel_estudiante", "intermedio"), IDIOMA_EJERCICIOS)
+
+    # --- OPCIONES DE EXPORTACIÓN ---
+    if show_export:
+        ui_export_options(result)
+
+
+@st.fragment
+def ui_audio_consejo(consejo_final):
+    """
+    Reproduce el consejo final leído en voz alta.
+    Es un fragmento: se dibuja por separado del resto de los resultados.
+
+    Args:
+        consejo_final: Texto del consejo final
+    """
+    if not consejo_final:
+        return
+
+    st.markdown("**🔊 Consejo leído en voz alta:**")
+    with st.spinner("Generando audio con ElevenLabs..."):
+        # El audio de un mismo consejo se sirve desde la caché (sin nueva llamada TTS)
+        audio_bytes = generar_audio_consejo(consejo_final)
+        if audio_bytes:
+            st.audio(audio_bytes, format="audio/mpeg")
+        else:
+            st.warning("⚠️ No se pudo generar el audio del consejo.")
+
+
+# --- 4. MOSTRAR RECOMENDACIONES ---
+
+
+# Idioma de las instrucciones de los ejercicios personalizados
+IDIOMA_EJERCICIOS = "Spanish"
+
+
+def programar_ejercicios_correccion(result):
+    """
+    Programa en segundo plano los ejercicios personalizados de una corrección,
+    con los mismos parámetros con los que los leerá ui_show_recommendations.
+
+    Args:
+        result: Resultados de la corrección
+    """
+    programar_ejercicios_personalizados(
+        result.get("errores", {}), result.get("analisis_contextual", {}),
+        get_session_var("nivel_estudiante", "intermedio"), IDIOMA_EJERCICIOS)
+
+
+@st.fragment
+def ui_show_recommendations(errores_obj, analisis_contextual, nivel, idioma):
+    """
+    Muestra recomendaciones personalizadas basadas en el análisis.
+    Es un fragmento: sus interacciones no vuelven a ejecutar la página. Los
+    ejercicios se generan en segundo plano al terminar la corrección (ver
+    programar_ejercicios_correccion) y aquí solo se leen de la caché.
+
+    Args:
+        errores_obj: Objeto con errores detectados
+        analisis_contextual: Objeto con análisis contextual
+        nivel: Nivel del estudiante
+        idioma: Idioma de las instrucciones
+    """
+    st.header("📚 Recomendaciones personalizadas")
+
+    # Pestañas para diferentes tipos de recomendaciones
+    tab1, tab2 = st.tabs(
+        ["📖 Recursos recomendados", "✏️ Ejercicios personalizados"])
+
+    with tab1:
+        recursos = obtener_recursos_recomendados(
+            errores_obj, analisis_contextual, nivel)
+
+        if recursos:
+            st.write("Basado en tu análisis, te recomendamos estos recursos:")
+
+            for i, recurso in enumerate(recursos):
+                col1, col2, col3 = st.columns([2, 1, 1])
+                with col1:
+                    st.markdown(f"**{recurso['título']}**")
+                with col2:
+                    st.write(f"Tipo: {recurso['tipo']}")
+                with col3:
+                    st.write(f"Nivel: {recurso['nivel']}")
+                st.markdown(f"[Ver recurso]({recurso['url']})")
+                if i < len(recursos) - 1:
+                    st.divider()
+        else:
+            st.info("No hay recursos específicos para recomendar en este momento.")
+
+    with tab2:
+        st.write("Ejercicios personalizados según tus necesidades:")
+
+        # Solo se leen los ejercicios generados en segundo plano tras la
+        # corrección; si no existen (p. ej. caducaron) se vuelven a programar
+        clave = programar_ejercicios_personalizados(
+            errores_obj, analisis_contextual, nivel, idioma)
+        estado, ejercicios_data = obtener_ejercicios_personalizados(clave)
+
+        if estado in ("generando", "sin_generar"):
+            # El aviso se consulta solo cada pocos segundos mientras se generan
+            def ejercicios_pendientes():
+                estado_actual, _ = obtener_ejercicios_personalizados(clave)
+                if estado_actual in ("generando", "sin_generar"):
+                    st.info("⏳ Los ejercicios se están generando a partir de tu corrección.")
+                else:
+                    # Ejercicios listos: una recarga completa detiene el sondeo
+                    st.rerun()
+
+            st.fragment(ejercicios_pendientes, run_every=INTERVALO_SONDEO_EJERCICIOS)()
+        else:
+            if estado == "error":
+                st.warning("⚠️ No se pudieron generar los ejercicios personalizados.")
+                if st.button("🔄 Reintentar", key="reintentar_ejercicios"):
+                    programar_ejercicios_personalizados(
+                        errores_obj, analisis_contextual, nivel, idioma,
+                        reintentar=True)
+                    st.rerun(scope="fragment")
+
+            ejercicios = ejercicios_data.get("ejercicios", [])
+
+            for i, ejercicio in enumerate(ejercicios):
+                # Usar st.expander para el ejercicio principal
+                with st.expander(f"{ejercicio.get('titulo', f'Ejercicio {i+1}')}"):
+                    # Crear pestañas para ejercicio y solución
+                    ejercicio_tab, solucion_tab = st.tabs(
+                        ["Ejercicio", "Solución"])
+
+                    with ejercicio_tab:
+                        st.markdown(
+                            f"**{ejercicio.get('tipo', 'Actividad')}**")
+                        st.markdown(
+                            f"*Instrucciones:* {ejercicio.get('instrucciones', '')}")
+                        st.markdown("---")
+                        st.markdown(ejercicio.get('contenido', ''))
+
+                    with solucion_tab:
+                        st.markdown(f"#### Solución del ejercicio:")
+                        st.markdown(ejercicio.get('solucion', ''))
+
+
+# --- 5. UI PARA EXPORTACIÓN DE RESULTADOS (FUNCIÓN CORREGIDA) ---
+
+
+@st.fragment
+def ui_export_options(data):
+    """
+    Muestra opciones para exportar los resultados de la corrección.
+    Es un fragmento: pulsar "Generar" solo vuelve a ejecutar este panel,
+    sin reconstruir la página ni repetir llamadas a la IA o al audio.
+
+    Args:
+        data: Resultados de la corrección
+    """
+    st.header("📊 Exportar informe")
+
+    # Verificación básica de datos
+    if not isinstance(data, dict):
+        st.warning("⚠️ No hay datos suficientes para exportar.")
+        return
+
+    # Extraer datos para la exportación con manejo seguro
+    nombre = get_session_var("usuario_actual", "Usuario")
+    nivel = get_session_var("nivel_estudiante", "intermedio")
+    # Fecha de la corrección (estable entre clics, lo que permite reutilizar informes cacheados)
+    fecha_correccion = get_session_var("last_correction_time")
+    try:
+        fecha = datetime.fromisoformat(fecha_correccion).strftime("%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M")
+    texto_original = get_session_var("ultimo_texto", "")
+    texto_corregido = data.get("texto_corregido", "")
+    errores_obj = data.get("errores", {})
+    analisis_contextual = data.get("analisis_contextual", {})
+    consejo_final = data.get("consejo_final", "")
+
+    # Opciones de exportación en pestañas
+    export_tab1, export_tab2, export_tab3 = st.tabs(
+        ["📝 Documento Word", "🌐 Documento HTML", "📊 Excel/CSV"]
+    )
+
+    with export_tab1:
+        st.write("Exporta este informe como documento Word (DOCX)")
+        
+        # Usar botones directamente (sin form)
+        if st.button("Generar documento Word", key="gen_docx"):
+            with st.spinner("Generando documento Word..."):
+                docx_buffer = generar_informe_docx(
+                    nombre, nivel, fecha, texto_original, texto_corregido,
+                    errores_obj, analisis_contextual, consejo_final
+                )
+
+                if docx_buffer:
+                    nombre_archivo = f"informe_{nombre.replace(' ', '_')}_{fecha.replace(':', '_').replace(' ', '_')}.docx"
+                    st.download_button(
+                        label="📥 Descargar documento Word",
+                        data=docx_buffer,
+                        file_name=nombre_archivo,
+                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                        key="docx_download_corregir"
+                    )
+                    st.success("✅ Documento generado correctamente")
+                else:
+                    st.error(
+                        "No se pudo generar el documento Word. Inténtalo de nuevo.")
+
+    with export_tab2:
+        st.write("Exporta este informe como página web (HTML)")
+        
+        # Sin usar formularios
+        if st.button("Generar documento HTML", key="gen_html"):
+            with st.spinner("Generando HTML..."):
+                html_content = generar_informe_html(
+                    nombre, nivel, fecha, texto_original, texto_corregido,
+                    analisis_contextual, consejo_final
+                )
+
+                if html_content:
+                    # Convertir a bytes para descargar
+                    html_bytes = html_content.encode()
+
+                    # Botón de descarga
+                    nombre_archivo = f"informe_{nombre.replace(' ', '_')}_{fecha.replace(':', '_').replace(' ', '_')}.html"
+                    st.download_button(
+                        label="📥 Descargar página HTML",
+                        data=html_bytes,
+                        file_name=nombre_archivo,
+                        mime="text/html",
+                        key="html_download_corregir"
+                    )
+                    st.success("✅ HTML generado correctamente")
+
+                    # Opción para previsualizar
+                    with st.expander("Previsualizar HTML"):
+                        # Sanitizar de manera segura para la previsualización
+                        sanitized_html = html_content.replace('"', '&quot;')
+                        st.markdown(
+                            f'<iframe srcdoc="{sanitized_html}" width="100%" height="600" style="border: 1px solid #ddd; border-radius: 5px;"></iframe>',
+                            unsafe_allow_html=True
+                        )
+                else:
+                    st.error("No se pudo generar el HTML. Inténtalo de nuevo.")
+
+    with export_tab3:
+        st.write("Exporta los datos del análisis en formato CSV")
+        
+        # Sin usar formularios
+        if st.button("Generar CSV", key="gen_csv"):
+            with st.spinner("Generando CSV..."):
+                csv_buffer = generar_csv_analisis(
+                    nombre, nivel, fecha, data
+                )
+
+                if csv_buffer:
+                    # Botón de descarga
+                    nombre_archivo = f"datos_{nombre.replace(' ', '_')}_{fecha.replace(':', '_').replace(' ', '_')}.csv"
+                    st.download_button(
+                        label="📥 Descargar CSV",
+                        data=csv_buffer,
+                        file_name=nombre_archivo,
+                        mime="text/csv",
+                        key="csv_download_corregir"
+                    )
+                    st.success("✅ CSV generado correctamente")
+                else:
+                    st.error("No se pudo generar el CSV. Inténtalo de nuevo.")
+
+
+# --- 6. GRÁFICOS DE PROGRESO ---
+
+
+def crear_grafico_radar(valores, categorias):
+    """
+    Crea un gráfico de radar para visualizar habilidades contextuales.
+
+    Args:
+        valores: Lista de valores numéricos
+        categorias: Lista de nombres de categorías
+
+    Returns:
+        matplotlib.figure.Figure: Figura con el gráfico
+    """
+    try:
+        # Verificar entradas
+        if not isinstance(valores, list) or not isinstance(categorias, list):
+            logger.error("Valores o categorías no son listas")
+            return None
+
+        if len(valores) != len(categorias) or len(valores) == 0:
+            logger.error(
+                f"Longitud incorrecta: valores={len(valores)}, categorias={len(categorias)}")
+            return None
+
+        # Convertir valores a tipo numérico
+        valores_num = []
+        for val in valores:
+            try:
+                valores_num.append(float(val))
+            except (ValueError, TypeError):
+                valores_num.append(0.0)
+
+        # Crear figura
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
+
+        # Número de categorías
+        N = len(categorias)
+
+        # Ángulos para cada eje
+        angulos = [n / float(N) * 2 * 3.14159 for n in range(N)]
+        angulos += angulos[:1]  # Cerrar el círculo
+
+        # Añadir los valores, repitiendo el primero
+        valores_radar = valores_num + [valores_num[0]]
+
+        # Dibujar los ejes
+        plt.xticks(angulos[:-1], categorias)
+
+        # Dibujar el polígono
+        ax.plot(angulos, valores_radar)
+        ax.fill(angulos, valores_radar, alpha=0.1)
+
+        # Ajustar escala
+        ax.set_yticks([2, 4, 6, 8, 10])
+        ax.set_ylim(0, 10)
+
+        plt.title("Habilidades contextuales")
+
+        return fig
+
+    except Exception as e:
+        logger.error(f"Error al crear gráfico radar: {str(e)}")
+        return None
+
+
+def mostrar_progreso(df):
+    """
+    Crea gráficos de progreso a partir de un DataFrame con historial de correcciones.
+
+    Args:
+        df: DataFrame con historial de correcciones
+
+    Returns:
+        dict: Diccionario con gráficos generados (altair)
+    """
+    resultado = {
+        "errores_totales": None,
+        "tipos_error": None,
+        "radar": None,
+        "fecha_col": None
+    }
+
+    if df is None or df.empty:
+        logger.warning("DataFrame vacío o nulo")
+        return resultado
+
+    import altair as alt
+    import pandas as pd
+
+    try:
+        # Verificar si existe la columna Fecha
+        fecha_col = None
+        # Buscar la columna de fecha de manera flexible
+        for col in df.columns:
+            if 'fecha' in col.lower().strip():
+                fecha_col = col
+                break
+
+        if fecha_col is None:
+            logger.error("No se encontró la columna 'Fecha' en los datos")
+            return resultado
+
+        resultado["fecha_col"] = fecha_col
+
+        # Asegurarse de que la columna Fecha está en formato datetime
+        try:
+            df[fecha_col] = pd.to_datetime(df[fecha_col], errors='coerce')
+            df = df.sort_values(fecha_col)
+        except Exception as e:
+            logger.error(f"Error al convertir fechas: {str(e)}")
+            return resultado
+
+        # Verificar que Total Errores es numérico
+        if 'Total Errores' in df.columns:
+            # Convertir a numérico de manera segura
+            df['Total Errores'] = pd.to_numeric(
+                df['Total Errores'], errors='coerce').fillna(0)
+
+            # Crear un gráfico con Altair para total de errores
+            # Convertir a formato largo para Altair
+            source = pd.DataFrame({
+                'Fecha': df[fecha_col],
+                'Total Errores': df['Total Errores'],
+                'Nivel': df.get('Nivel', 'No especificado')
+            })
+
+            chart_errores = alt.Chart(source).mark_line(point=True).encode(
+                x=alt.X('Fecha:T', title='Fecha'),
+                y=alt.Y('Total Errores:Q', title='Total Errores'),
+                tooltip=['Fecha:T', 'Total Errores:Q', 'Nivel:N']
+            ).properties(
+                title='Evolución de errores totales a lo largo del tiempo'
+            ).interactive()
+
+            resultado["errores_totales"] = chart_errores
+
+        # Gráfico de tipos de errores
+        columnas_errores = [
+            'Errores Gramática', 'Errores Léxico', 'Errores Puntuación',
+            'Errores Estructura'
+        ]
+
+        # Encontrar las columnas que realmente existen en el DataFrame
+        columnas_errores_existentes = [
+            col for col in columnas_errores if col in df.columns]
+
+        if columnas_errores_existentes:
+            # Convertir columnas a numérico
+            for col in columnas_errores_existentes:
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+            # Crear DataFrame en formato largo para Altair
+            tipos_error_data = []
+            for idx, row in df.iterrows():
+                for col in columnas_errores_existentes:
+                    tipos_error_data.append({
+                        'Fecha': row[fecha_col],
+                        'Tipo de Error': col,
+                        'Cantidad': row[col]
+                    })
+
+            tipos_error_df = pd.DataFrame(tipos_error_data)
+
+            chart_tipos = alt.Chart(tipos_error_df).mark_line(point=True).encode(
+                x=alt.X('Fecha:T', title='Fecha'),
+                y=alt.Y('Cantidad:Q', title='Cantidad'),
+                color=alt.Color('Tipo de Error:N', title='Tipo de Error'),
+                tooltip=['Fecha:T', 'Tipo de Error:N', 'Cantidad:Q']
+            ).properties(
+                title='Evolución por tipo de error'
+            ).interactive()
+
+            resultado["tipos_error"] = chart_tipos
+
+        # Datos para el gráfico de radar (última entrada)
+        if 'Puntuación Coherencia' in df.columns and len(df) > 0:
+            ultima_entrada = df.iloc[-1]
+
+            # Datos para el gráfico de radar
+            categorias = ['Coherencia', 'Cohesión', 'Registro', 'Ad. Cultural']
+            valores = [
+                ultima_entrada.get('Puntuación Coherencia', 0),
+                ultima_entrada.get('Puntuación Cohesión', 0),
+                ultima_entrada.get('Puntuación Registro', 0),
+                ultima_entrada.get('Puntuación Adecuación Cultural', 0)
+            ]
+
+            fig_radar = crear_grafico_radar(valores, categorias)
+            resultado["radar"] = fig_radar
+
+        return resultado
+
+    except Exception as e:
+        logger.error(f"Error al mostrar progreso: {str(e)}")
+        return resultado
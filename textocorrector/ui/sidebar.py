@@ -0,0 +1,139 @@
+"""Barra lateral: información de la sesión, estado de conexiones y diagnóstico."""
+
+import importlib.util
+
+import streamlit as st
+
+from textocorrector.clients import api_keys, circuit_breaker, get_sheets_connection
+from textocorrector.config import APP_VERSION
+
+
+# --- 1. BARRA LATERAL ---
+
+
+def ui_sidebar():
+    """Muestra la barra lateral: bienvenida, avisos de configuración, conexiones y diagnóstico."""
+    # Mensaje de bienvenida en sidebar
+    st.sidebar.title("📝 Textocorrector ELE")
+    st.sidebar.info(
+        """
+        Versión: {0}
+
+        Una herramienta para corrección de textos
+        en español con análisis contextual avanzado.
+
+        ID de sesión: {1}
+        """.format(APP_VERSION, st.session_state.session_id[:8])
+    )
+
+    mostrar_avisos_configuracion()
+    show_connection_status()
+
+    # Mostrar diagnósticos del sistema si es necesario
+    problemas = diagnosticar_aplicacion()
+    if problemas:
+        with st.sidebar.expander("⚠️ Diagnóstico del sistema", expanded=len([p for p in problemas if p["tipo"] == "crítico"]) > 0):
+            for problema in problemas:
+                if problema["tipo"] == "crítico":
+                    st.error(f"❌ {problema['mensaje']}")
+                elif problema["tipo"] == "advertencia":
+                    st.warning(f"⚠️ {problema['mensaje']}")
+                st.info(f"💡 Solución: {problema['solucion']}")
+
+
+def mostrar_avisos_configuracion():
+    """Avisa en la barra lateral de las claves de API que faltan."""
+    if api_keys["openai"] is None:
+        st.sidebar.warning(
+            "⚠️ API de OpenAI no configurada. Algunas funciones estarán limitadas.")
+
+    if not api_keys["elevenlabs"]["api_key"] or not api_keys["elevenlabs"]["voice_id"]:
+        st.sidebar.warning(
+            "⚠️ API de ElevenLabs no configurada. La función de audio estará deshabilitada.")
+
+    if api_keys["google_credentials"] is None:
+        st.sidebar.warning(
+            "⚠️ Credenciales de Google no configuradas. El guardado de datos estará deshabilitado.")
+
+
+# --- 2. ESTADO DE CONEXIONES Y DIAGNÓSTICO ---
+
+
+def show_connection_status():
+    """Muestra el estado de conexión de los servicios externos"""
+    sheets_connection = get_sheets_connection()
+    with st.sidebar.expander("Estado de conexiones", expanded=False):
+        status = circuit_breaker.get_status()
+
+        # OpenAI
+        if api_keys["openai"] is not None:
+            if not status["openai"]["open"]:
+                st.sidebar.success("✅ OpenAI: Conectado")
+            else:
+                st.sidebar.error(
+                    f"❌ OpenAI: Desconectado ({status['openai']['failures']} fallos)")
+        else:
+            st.sidebar.warning("⚠️ OpenAI: No configurado")
+
+        # Google Sheets
+        if sheets_connection is not None:
+            sheets_status = []
+            if sheets_connection["corrections"] is not None:
+                sheets_status.append("Historial")
+            if sheets_connection["tracking"] is not None:
+                sheets_status.append("Seguimiento")
+
+            if sheets_status:
+                st.sidebar.success(
+                    f"✅ Google Sheets: {', '.join(sheets_status)}")
+            else:
+                st.sidebar.error("❌ Google Sheets: Error de conexión")
+        else:
+            if api_keys["google_credentials"] is not None:
+                st.sidebar.error("❌ Google Sheets: Error de conexión")
+            else:
+                st.sidebar.warning("⚠️ Google Sheets: No configurado")
+
+        # ElevenLabs
+        if api_keys["elevenlabs"]["api_key"] is not None:
+            if not status["elevenlabs"]["open"]:
+                st.sidebar.success("✅ ElevenLabs: Conectado")
+            else:
+                st.sidebar.error(
+                    f"❌ ElevenLabs: Desconectado ({status['elevenlabs']['failures']} fallos)")
+        else:
+            st.sidebar.warning("⚠️ ElevenLabs: No configurado")
+
+
+# Función para diagnóstico proactivo de problemas
+
+
+def diagnosticar_aplicacion():
+    """Diagnostica problemas comunes en la aplicación"""
+    problemas = []
+
+    # Verificar conexión a OpenAI
+    if api_keys["openai"] is None:
+        problemas.append({
+            "tipo": "crítico",
+            "mensaje": "API Key de OpenAI no configurada",
+            "solucion": "Configura la API Key de OpenAI en los secretos de la aplicación"
+        })
+
+    # Verificar conexión a Google Sheets
+    if get_sheets_connection() is None:
+        problemas.append({
+            "tipo": "advertencia",
+            "mensaje": "Conexión a Google Sheets no disponible",
+            "solucion": "Verifica las credenciales de Google Sheets"
+        })
+
+    # Verificar si hay archivos necesarios
+    if importlib.util.find_spec("docx") is None:
+        problemas.append({
+            "tipo": "crítico",
+            "mensaje": "Librería python-docx no instalada",
+            "solucion": "Instala python-docx con pip install python-docx"
+        })
+
+    return problemas
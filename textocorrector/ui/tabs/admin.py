@@ -0,0 +1,177 @@
+"""Sección de administración: ocupación y tasas de acierto de las cachés."""
+
+import hmac
+
+import streamlit as st
+
+from model_router import activar_enrutado, enrutado_activo, resumen_decisiones
+from prompt_registry import registro_prompts
+from real_time_writing_assistant import shared_cache_stats
+from textocorrector.cache import PROMPT_VERSION, cache_manager
+from textocorrector.clients import (
+    activar_medicion_prompts, api_keys, medicion_prompts_activa, resumen_mediciones_prompts)
+from textocorrector.session import get_session_var, set_session_var
+from textocorrector.storage import get_exercise_bank, get_exercise_pool, get_image_store
+
+
+def es_administrador():
+    """
+    Indica si la sesión actual tiene acceso a la administración.
+
+    Se activa abriendo la aplicación con `?admin=<ADMIN_KEY>` (clave definida
+    en los secretos) y se recuerda durante la sesión.
+    """
+    clave = api_keys.get("admin")
+    if not clave:
+        return False
+    if get_session_var("es_administrador", False):
+        return True
+
+    if hmac.compare_digest(str(st.query_params.get("admin", "")), str(clave)):
+        set_session_var("es_administrador", True)
+        return True
+    return False
+
+
+def formato_bytes(n):
+    """Formatea un tamaño en bytes de forma legible."""
+    for unidad in ["B", "KB", "MB"]:
+        if n < 1024:
+            return f"{n:.0f} {unidad}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def tab_admin():
+    """Implementación de la sección de administración de cachés."""
+    st.header("🛠️ Administración de cachés")
+    st.caption(f"Versión de los prompts sin plantilla: {PROMPT_VERSION}")
+
+    stats = cache_manager.stats()
+    filas = []
+    for nombre, s in stats.items():
+        filas.append({
+            "Espacio": nombre,
+            "Entradas": f"{s['entradas']} / {s['max_entradas']}",
+            "Ocupación": f"{formato_bytes(s['bytes'])} / {formato_bytes(s['max_bytes'])}",
+            "Aciertos": s["aciertos"],
+            "Fallos": s["fallos"],
+            "Tasa de aciertos": f"{s['tasa_aciertos']:.0%}",
+            "Desalojos": s["desalojos"],
+            "Caducadas": s["caducadas"],
+            "TTL (min)": round(s["ttl"] / 60) if s["ttl"] else "∞"
+        })
+
+    # Totales del proceso
+    aciertos = sum(s["aciertos"] for s in stats.values())
+    consultas = aciertos + sum(s["fallos"] for s in stats.values())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Memoria en cachés", formato_bytes(sum(s["bytes"] for s in stats.values())))
+    col2.metric("Entradas", sum(s["entradas"] for s in stats.values()))
+    col3.metric("Tasa de aciertos global", f"{aciertos / consultas:.0%}" if consultas else "—")
+
+    st.dataframe(filas, hide_index=True, width="stretch")
+
+    # --- Invalidación ---
+    st.subheader("Invalidación")
+    col1, col2 = st.columns(2)
+    with col1:
+        espacio = st.selectbox("Espacio", ["(todos)"] + cache_manager.namespaces(),
+                               key="admin_cache_espacio")
+        if st.button("Vaciar", key="admin_cache_vaciar"):
+            cache_manager.clear(None if espacio == "(todos)" else espacio)
+            st.success(f"Caché vaciada: {espacio}")
+        if st.button("Eliminar entradas caducadas", key="admin_cache_purgar"):
+            st.success(f"{cache_manager.purge_expired()} entradas caducadas eliminadas")
+        if st.button("Eliminar respuestas de otras versiones de prompt", key="admin_cache_prompts"):
+            st.success(f"{cache_manager.invalidar_versiones_prompt()} respuestas eliminadas")
+
+    with col2:
+        estudiante = st.text_input("Estudiante", key="admin_cache_estudiante")
+        if st.button("Invalidar datos del estudiante", key="admin_cache_invalidar_estudiante"):
+            if estudiante.strip():
+                st.success(f"{cache_manager.invalidar_estudiante(estudiante)} entradas eliminadas")
+            else:
+                st.warning("Indica el nombre del estudiante.")
+
+    # --- Almacenes en disco ---
+    st.subheader("Almacenes de imágenes y ejercicios")
+    store = get_image_store().stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Imágenes en disco", store["imagenes"],
+                help=f"{formato_bytes(store['bytes'])} de {formato_bytes(store['max_bytes'])}")
+    pool = get_exercise_pool()
+    if pool is not None:
+        col2.metric("Ejercicios servidos desde la reserva", pool.stats["servidos"],
+                    help=f"Generados: {pool.stats['generados']} · Fallos: {pool.stats['fallos_reserva']}")
+    banco = get_exercise_bank()
+    if banco is not None:
+        resumen = banco.resumen()
+        col3.metric("Ejercicios en el banco", resumen["ejercicios"],
+                    help=f"Patrones cubiertos: {resumen['patrones']} · "
+                         f"Aciertos: {banco.stats['aciertos']} · Fallos: {banco.stats['fallos']}")
+
+    # --- Asistente de escritura ---
+    st.subheader("Asistente de escritura")
+    asistente = shared_cache_stats()
+    if asistente is not None:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Aciertos caché (clase)", f"{asistente['tasa_aciertos']:.0%}",
+                    help="Oraciones ya analizadas para otro estudiante de la clase")
+        col2.metric("Oraciones en caché", asistente["entradas"],
+                    help=formato_bytes(asistente["bytes"]))
+        col3.metric("Sesiones", asistente["sesiones"])
+    else:
+        st.caption("El asistente de escritura aún no se ha usado.")
+
+    # --- Plantillas de prompt ---
+    st.subheader("Plantillas de prompt")
+    st.dataframe([{
+        "Plantilla": p["nombre"],
+        "Versión": p["version"],
+        "Tokens estimados": p["tokens_estimados"],
+        "Esquema": p["esquema"],
+        "Usos": p["usos"],
+        "Respuestas inválidas": p["respuestas_invalidas"]
+    } for p in registro_prompts.resumen()], hide_index=True, width="stretch")
+
+    # --- Medición de prompts ---
+    st.subheader("Medición de prompts")
+    medir = st.toggle("Medir tokens cacheados y tiempo hasta el primer token",
+                      value=medicion_prompts_activa(), key="admin_medir_prompts",
+                      help="Las peticiones se hacen en streaming mientras esté activo.")
+    activar_medicion_prompts(medir)
+    filas = resumen_mediciones_prompts()
+    if filas:
+        st.dataframe([{
+            "Modelo": f["modelo"],
+            "Prompt": f["prompt"],
+            "Peticiones": f["peticiones"],
+            "Tokens de entrada (media)": f["tokens_entrada"],
+            "Cacheados": f"{f['proporcion_cacheada']:.0%}",
+            "Primer token (s)": round(f["ttft_medio"], 2) if f["ttft_medio"] is not None else "—",
+            "Total (s)": round(f["duracion_media"], 2)
+        } for f in filas], hide_index=True, width="stretch")
+    elif medir:
+        st.caption("Aún no hay peticiones medidas.")
+
+    # --- Enrutado de modelos ---
+    st.subheader("Enrutado de modelos")
+    enrutar = st.toggle("Elegir el modelo según la función, el nivel y la longitud del texto",
+                        value=enrutado_activo(), key="admin_enrutar_modelos",
+                        help="Desactivado, cada función usa su modelo por defecto.")
+    activar_enrutado(enrutar)
+    filas = resumen_decisiones()
+    if filas:
+        st.dataframe([{
+            "Función": f["funcion"],
+            "Modelo": f["modelo"],
+            "Peticiones": f["peticiones"],
+            "Escaladas": f["escaladas"],
+            "No válidas": f["no_validas"],
+            "Latencia estimada (s)": round(f["latencia_estimada"], 2),
+            "Latencia real (s)": round(f["latencia_media"], 2),
+            "Coste estimado (USD)": round(f["coste_estimado"], 4)
+        } for f in filas], hide_index=True, width="stretch")
+    else:
+        st.caption("Aún no hay peticiones enrutadas.")
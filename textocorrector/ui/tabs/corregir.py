@@ -0,0 +1,169 @@
+"""Sección "Corregir texto"."""
+
+import streamlit as st
+from datetime import datetime
+
+from orthography_checker import revisar_texto
+
+from textocorrector.pipelines import corregir_texto, generar_consigna_escritura
+from textocorrector.session import get_session_var, set_session_var
+from textocorrector.ui.components import (
+    programar_ejercicios_correccion, ui_idioma_correcciones_tipo, ui_revision_local,
+    ui_show_correction_results, ui_user_info_form
+)
+
+
+def tab_corregir():
+    """Implementación de la pestaña de corrección de texto."""
+    # Limpiar variables de simulacro si venimos de otra pestaña
+    if "inicio_simulacro" in st.session_state:
+        set_session_var("inicio_simulacro", None)
+    if "duracion_simulacro" in st.session_state:
+        set_session_var("duracion_simulacro", None)
+    if "tarea_simulacro" in st.session_state:
+        set_session_var("tarea_simulacro", None)
+
+    st.header("📝 Corrección de texto")
+
+    with st.expander("ℹ️ Información sobre el análisis contextual", expanded=False):
+        st.markdown("""
+        Esta versión mejorada del Textocorrector incluye:
+        - **Análisis de coherencia**: Evalúa si las ideas están conectadas de manera lógica y si el texto tiene sentido en su conjunto.
+        - **Análisis de cohesión**: Revisa los mecanismos lingüísticos que conectan las diferentes partes del texto.
+        - **Evaluación del registro lingüístico**: Determina si el lenguaje usado es apropiado para el contexto y propósito del texto.
+        - **Análisis de adecuación cultural**: Identifica si hay expresiones o referencias culturalmente apropiadas o inapropiadas.
+
+        Las correcciones se adaptan automáticamente al nivel del estudiante.
+        """)
+
+    # Obtener datos del usuario - usando key única para este formulario
+    user_data = ui_user_info_form(form_key="form_user_info_corregir")
+
+    # El resto del código permanece igual...
+    if not user_data:
+        if "usuario_actual" not in st.session_state or not st.session_state.usuario_actual:
+            st.info("👆 Por favor, introduce tu nombre y nivel para comenzar.")
+            return
+
+    # GENERADOR DE CONSIGNAS
+    with st.expander("¿No sabes qué escribir? Yo te ayudo...", expanded=False):
+        tipo_consigna = st.selectbox(
+            "Tipo de texto a escribir:",
+            [
+                "Cualquiera (aleatorio)",
+                "Narración",
+                "Correo/Carta formal",
+                "Opinión/Argumentación",
+                "Descripción",
+                "Diálogo"
+            ],
+            key="tipo_consigna_corregir"
+        )
+
+        if st.button("Generar consigna de escritura", key="generar_consigna"):
+            with st.spinner("Generando consigna adaptada a tu nivel..."):
+                # Determinar el nivel para la IA
+                nivel_actual = get_session_var(
+                    "nivel_estudiante", "intermedio")
+
+                # Generar la consigna
+                consigna_generada = generar_consigna_escritura(
+                    nivel_actual, tipo_consigna)
+
+                # Guardar en session_state
+                set_session_var("consigna_actual", consigna_generada)
+
+            # Mostrar la consigna generada
+            if "consigna_actual" in st.session_state and st.session_state.consigna_actual:
+                st.success("✨ Consigna generada:")
+                st.info(st.session_state.consigna_actual)
+
+                # Opción para usar esta consigna
+                if st.button("Usar esta consigna como contexto", key="usar_consigna"):
+                    set_session_var("info_adicional_corregir",
+                                    f"Consigna: {st.session_state.consigna_actual}")
+                    set_session_var("usar_consigna_como_texto", True)
+                    st.rerun()  # Recargar para actualizar el formulario
+
+    # FORMULARIO DE CORRECCIÓN
+    with st.form(key="formulario_corregir"):
+        # Opciones de corrección
+        options = ui_idioma_correcciones_tipo()
+
+        # Texto inicial con contenido de la consigna si está disponible
+        texto_inicial = ""
+        if get_session_var("usar_consigna_como_texto", False) and "consigna_actual" in st.session_state:
+            texto_inicial = f"[Instrucción: {st.session_state.consigna_actual}]\n\n"
+            # Reset para no añadirlo cada vez
+            set_session_var("usar_consigna_como_texto", False)
+
+        # Área de texto para la corrección
+        texto = st.text_area(
+            "Escribe tu texto aquí:",
+            value=texto_inicial,
+            height=250,
+            key="texto_correccion_corregir"
+        )
+
+        info_adicional = st.text_area(
+            "Información adicional o contexto (opcional):",
+            value=get_session_var("info_adicional_corregir", ""),
+            height=100,
+            key="info_adicional_widget_key"  # Clave diferente para el widget
+        )
+
+        # Guardar sin conflicto (dentro del formulario, pero fuera de la definición del widget)
+        set_session_var("info_adicional_corregir", info_adicional)
+
+        # Botón de envío
+        enviar = st.form_submit_button("Corregir", use_container_width=True)
+
+        # PROCESAMIENTO DEL FORMULARIO (dentro del form, será ejecutado solo cuando se envíe)
+        if enviar:
+            if not texto.strip():
+                st.warning("Por favor, escribe un texto para corregir.")
+            else:
+                # Guardar el texto para posible uso futuro
+                set_session_var("ultimo_texto", texto)
+
+                # Los errores mecánicos se muestran antes de la corrección de la IA
+                revision = revisar_texto(texto, options.get("idioma", "Español"))
+                ui_revision_local(revision)
+
+                with st.spinner("Analizando texto y generando corrección contextual..."):
+                    # Obtener los datos del usuario
+                    nombre = get_session_var("usuario_actual", "")
+                    nivel = user_data.get("nivel") if user_data else get_session_var(
+                        "nivel_estudiante", "intermedio")
+
+                    # Obtener las opciones seleccionadas
+                    idioma = options.get("idioma", "Español")
+                    tipo_texto = options.get(
+                        "tipo_texto", "General/No especificado")
+                    contexto_cultural = options.get(
+                        "contexto_cultural", "General/Internacional")
+
+                    # Llamar a la función de corrección
+                    resultado = corregir_texto(
+                        texto, nombre, nivel, idioma,
+                        tipo_texto, contexto_cultural, info_adicional,
+                        revision=revision
+                    )
+
+                    # Guardar el resultado: la vista de resultados se dibuja
+                    # desde session_state, fuera del formulario
+                    set_session_var("correction_result", resultado)
+                    set_session_var(
+                        "last_correction_time", datetime.now().isoformat())
+
+                    # Los ejercicios personalizados se generan en segundo plano
+                    if "error" not in resultado:
+                        programar_ejercicios_correccion(resultado)
+
+    # RESULTADOS DE LA ÚLTIMA CORRECCIÓN (sobreviven a cualquier rerun)
+    resultado = get_session_var("correction_result")
+    if resultado:
+        if "error" in resultado:
+            st.error(f"Error en la corrección: {resultado['error']}")
+        else:
+            ui_show_correction_results(resultado)
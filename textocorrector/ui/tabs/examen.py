@@ -0,0 +1,192 @@
+"""Sección "Exámenes oficiales"."""
+
+import streamlit as st
+import time
+
+from textocorrector.pipelines import (
+    corregir_examen, generar_ejemplos_evaluados, generar_tarea_examen,
+    obtener_criterios_evaluacion, obtener_duracion_examen
+)
+from textocorrector.session import get_session_var, set_session_var
+from textocorrector.ui.components import (
+    ui_countdown_timer, ui_examen_options, ui_show_correction_results, ui_user_info_form
+)
+
+
+def tab_examen():
+    """Implementación de la pestaña de preparación para exámenes."""
+    st.header("🎓 Preparación para exámenes")
+
+    # Obtener datos del usuario
+    user_data = ui_user_info_form(form_key="form_user_info_examen")
+
+    if not user_data and "usuario_actual" not in st.session_state:
+        st.info(
+            "Por favor, introduce tu información para iniciar la preparación para exámenes.")
+        return
+
+    # Nombre del estudiante actual
+    nombre_estudiante = get_session_var("usuario_actual")
+
+    # Opciones de examen
+    options = ui_examen_options()
+
+    # Información sobre el examen y criterios
+    with st.expander(f"ℹ️ Sobre el examen {options['tipo_examen']} nivel {options['nivel_examen']}", expanded=False):
+        st.markdown(
+            f"### Examen {options['tipo_examen']} nivel {options['nivel_examen']}")
+
+        # Mostrar criterios de evaluación
+        criterios = obtener_criterios_evaluacion(
+            options["tipo_examen"], options["nivel_examen"])
+        st.markdown(criterios)
+
+    # Dos pestañas: "Simulacro de examen" y "Ejemplos evaluados"
+    sim_tab, ejemplos_tab = st.tabs(
+        ["🧪 Simulacro de examen", "📑 Ejemplos evaluados"])
+
+    with sim_tab:
+        st.markdown(
+            "### Simulacro de expresión escrita")
+        st.markdown(
+            "Realiza un simulacro de expresión escrita con tiempo controlado.")
+
+        # Comprobar si hay un simulacro activo
+        inicio_simulacro = get_session_var("inicio_simulacro", None)
+        duracion_simulacro = get_session_var("duracion_simulacro", None)
+        tarea_simulacro = get_session_var("tarea_simulacro", None)
+
+        if inicio_simulacro is None or duracion_simulacro is None or tarea_simulacro is None:
+            # No hay simulacro activo, mostrar opciones para iniciar
+            with st.form(key="form_iniciar_simulacro"):
+                st.write(
+                    "Haz clic en el botón para generar una tarea de examen y comenzar el simulacro.")
+                tiempo_personalizado = st.slider(
+                    "Tiempo para el simulacro (minutos):", min_value=10, max_value=120, value=45)
+                submit_iniciar = st.form_submit_button(
+                    "Iniciar simulacro", use_container_width=True)
+
+                if submit_iniciar:
+                    # Generar una tarea de expresión escrita
+                    with st.spinner("Generando tarea de examen..."):
+                        # Obtener la duración y la tarea para el nivel y tipo seleccionado
+                        duracion_examen = obtener_duracion_examen(
+                            options["tipo_examen"], options["nivel_examen"])
+                        if tiempo_personalizado:
+                            duracion_examen = tiempo_personalizado * 60  # Convertir minutos a segundos
+
+                        tarea_examen = generar_tarea_examen(
+                            options["tipo_examen"], options["nivel_examen"])
+
+                        # Guardar datos del simulacro
+                        set_session_var("inicio_simulacro", time.time())
+                        set_session_var("duracion_simulacro", duracion_examen)
+                        set_session_var("tarea_simulacro", tarea_examen)
+
+                        # Recargar para mostrar el simulacro
+                        st.rerun()
+
+        else:
+            # Hay un simulacro activo, mostrar tarea y temporizador
+            st.markdown("### Tarea de expresión escrita")
+            st.markdown(tarea_simulacro)
+
+            # Temporizador
+            timer_state = ui_countdown_timer(
+                duracion_simulacro, inicio_simulacro)
+            tiempo_formateado = timer_state["tiempo_formateado"]
+            porcentaje = timer_state["porcentaje"]
+            color = timer_state["color"]
+            terminado = timer_state["terminado"]
+
+            # Mostrar tiempo restante
+            if color == "normal":
+                st.success(f"⏱️ Tiempo restante: {tiempo_formateado}")
+            elif color == "warning":
+                st.warning(f"⏱️ Tiempo restante: {tiempo_formateado}")
+            else:
+                st.error(f"⏱️ Tiempo restante: {tiempo_formateado}")
+
+            # Barra de progreso
+            st.progress(porcentaje)
+
+            # Formulario para la respuesta
+            with st.form(key="form_simulacro_respuesta"):
+                respuesta = st.text_area(
+                    "Tu respuesta:",
+                    value=get_session_var("simulacro_respuesta_texto", ""),
+                    height=300,
+                    key="simulacro_respuesta_texto"
+                )
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    submit_finalizar = st.form_submit_button(
+                        "Finalizar y corregir", use_container_width=True)
+                with col2:
+                    submit_cancelar = st.form_submit_button(
+                        "Cancelar simulacro", use_container_width=True)
+
+            # Opción para finalizar manualmente incluso si el tiempo no ha acabado
+            if submit_finalizar:
+                if not respuesta.strip():
+                    st.warning(
+                        "Por favor, escribe tu respuesta antes de finalizar.")
+                else:
+                    # Calcular tiempo usado
+                    tiempo_usado = time.time() - inicio_simulacro
+                    minutos_usados = int(tiempo_usado // 60)
+                    segundos_usados = int(tiempo_usado % 60)
+                    tiempo_usado_str = f"{minutos_usados}m {segundos_usados}s"
+
+                    # Corregir la respuesta
+                    with st.spinner("Analizando tu respuesta..."):
+                        resultado = corregir_examen(
+                            respuesta,
+                            options["tipo_examen"],
+                            options["nivel_examen"],
+                            tiempo_usado_str
+                        )
+
+                        # Limpiar datos del simulacro
+                        set_session_var("inicio_simulacro", None)
+                        set_session_var("duracion_simulacro", None)
+                        set_session_var("tarea_simulacro", None)
+                        set_session_var("simulacro_respuesta_texto", "")
+
+                        # Mostrar resultados de la corrección
+                        st.success(
+                            f"✅ Simulacro completado. Tiempo usado: {tiempo_usado_str}")
+
+                        # Mostrar el resultado
+                        if "error" in resultado:
+                            st.error(
+                                f"Error en la corrección: {resultado['error']}")
+                        else:
+                            ui_show_correction_results(resultado)
+
+            # Opción para cancelar el simulacro
+            if submit_cancelar:
+                st.warning("Simulacro cancelado.")
+                # Limpiar datos del simulacro
+                set_session_var("inicio_simulacro", None)
+                set_session_var("duracion_simulacro", None)
+                set_session_var("tarea_simulacro", None)
+                set_session_var("simulacro_respuesta_texto", "")
+                st.rerun()
+
+            # Si el tiempo ha terminado y no se ha enviado, mostrar advertencia
+            if terminado and not submit_finalizar and not submit_cancelar:
+                st.error(
+                    "⏰ ¡Tiempo terminado! Por favor, finaliza tu respuesta.")
+
+    with ejemplos_tab:
+        st.markdown("### Ejemplos de respuestas evaluadas")
+        st.markdown(
+            "A continuación se muestran ejemplos de respuestas de estudiantes con su evaluación correspondiente.")
+
+        if st.button("Generar ejemplos", key="generar_ejemplos"):
+            with st.spinner("Generando ejemplos de respuestas evaluadas..."):
+                ejemplos = generar_ejemplos_evaluados(
+                    options["tipo_examen"], options["nivel_examen"])
+                st.markdown(ejemplos)
@@ -0,0 +1,698 @@
+"""Sección "Herramientas complementarias"."""
+
+import logging
+import streamlit as st
+import traceback
+from datetime import datetime
+
+from lexical_index import estimar_nivel_lexico
+from text_metrics import calcular_indices, calcular_indices_lote
+
+from textocorrector.clients import generar_imagen_dalle, transcribir_imagen_texto
+from textocorrector.pipelines import (
+    RECURSOS_DB, analizar_complejidad_texto, corregir_descripcion_imagen, corregir_texto
+)
+from textocorrector.session import get_session_var, set_session_var
+from textocorrector.storage import (
+    NIVELES_IMAGEN, TEMAS_POPULARES_IMAGEN, arrancar_reserva_ejercicios, guardar_imagen_generada,
+    obtener_imagen_ejercicio
+)
+from textocorrector.ui.components import ui_idioma_correcciones_tipo, ui_show_correction_results
+
+logger = logging.getLogger(__name__)
+
+
+# --- 1. VISUALIZACIÓN DE TEXTO MANUSCRITO (FUNCIÓN CORREGIDA) ---
+
+
+def visualizar_texto_manuscrito():
+    """
+    Función corregida para visualizar y corregir texto transcrito de imágenes.
+    Soluciona problemas de flujo entre transcripción y corrección.
+    """
+    st.subheader("Corrección de texto manuscrito transcrito")
+
+    # Verificar si hay texto transcrito para corregir
+    texto_transcrito = get_session_var("ultimo_texto_transcrito", "")
+    if not texto_transcrito:
+        st.info("No hay texto transcrito para corregir.")
+        # Botón para volver a la herramienta de transcripción
+        if st.button("Volver a transcripción", key="volver_transcripcion"):
+            set_session_var("mostrar_correccion_transcripcion", False)
+            st.rerun()
+        return
+
+    # Mostrar texto transcrito
+    texto_transcrito_editable = st.text_area(
+        "Texto transcrito (puedes editarlo si hay errores):",
+        value=texto_transcrito,
+        height=200,
+        key="texto_transcrito_editable"
+    )
+
+    # Opciones de corrección
+    options = ui_idioma_correcciones_tipo()
+
+    # SOLUCIÓN: Crear un formulario en lugar de un botón simple
+    # Esto evita problemas de estado y reinicios innecesarios
+    with st.form(key="form_correccion_transcripcion"):
+        st.write("Ajusta las opciones y haz clic en 'Corregir texto' para continuar.")
+
+        # Botón de envío del formulario
+        submit_correccion = st.form_submit_button(
+            "Corregir texto", use_container_width=True)
+
+    # Botones fuera del formulario
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Botón para cancelar y volver
+        if st.button("Cancelar y volver", key="cancelar_correccion_transcripcion"):
+            set_session_var("mostrar_correccion_transcripcion", False)
+            st.rerun()
+
+    with col2:
+        # Botón para enviar a la pestaña principal de corrección
+        if st.button("Enviar a pestaña principal", key="enviar_a_principal"):
+            # Guardar el texto para usarlo en la pestaña principal
+            set_session_var("texto_correccion_corregir",
+                            texto_transcrito_editable)
+            set_session_var("mostrar_correccion_transcripcion", False)
+            # Navegar a la pestaña de corrección
+            st.session_state.tab_navigate_to = 0  # Índice de la pestaña "Corregir texto"
+            # Recargar la página
+            st.rerun()
+
+    # Procesar la corrección cuando se envía el formulario
+    if submit_correccion:
+        if not texto_transcrito_editable.strip():
+            st.warning(
+                "El texto está vacío. Por favor, asegúrate de que hay contenido para corregir.")
+        else:
+            # Guardar para futura referencia
+            set_session_var("ultimo_texto", texto_transcrito_editable)
+
+            with st.spinner("Analizando texto transcrito..."):
+                # Obtener datos necesarios
+                nombre = get_session_var("usuario_actual", "Usuario")
+                nivel = get_session_var("nivel_estudiante", "intermedio")
+
+                # Llamar a la función de corrección directamente
+                resultado = corregir_texto(
+                    texto_transcrito_editable, nombre, nivel, options["idioma"],
+                    options["tipo_texto"], options["contexto_cultural"],
+                    "Texto transcrito de imagen manuscrita"
+                )
+
+                # Guardar resultado
+                set_session_var("correction_result", resultado)
+                set_session_var("last_correction_time",
+                                datetime.now().isoformat())
+
+                # Mostrar resultados sin recargar la página
+                if "error" not in resultado:
+                    # Mostrar los resultados primero
+                    ui_show_correction_results(resultado)
+
+                    # Añadir el botón para volver después
+                    if st.button("Volver a transcripción", key="volver_despues_correccion"):
+                        set_session_var(
+                            "mostrar_correccion_transcripcion", False)
+                        st.rerun()
+                else:
+                    st.error(f"Error en la corrección: {resultado['error']}")
+
+
+# --- 2. HERRAMIENTA DE TEXTO MANUSCRITO (FUNCIÓN CORREGIDA) ---
+
+
+def herramienta_texto_manuscrito():
+    """
+    Implementación optimizada de la herramienta de transcripción de textos manuscritos.
+    Soluciona problemas de flujo entre transcripción y corrección.
+    """
+    st.subheader("✍️ Transcripción de textos manuscritos")
+    st.markdown("""
+    Esta herramienta te permite subir imágenes de textos manuscritos para transcribirlos
+    automáticamente y luego enviarlos a corrección.
+    """)
+
+    # SOLUCIÓN: Verificar si estamos en modo de corrección de transcripción y usar un estado más robusto
+    mostrar_correccion = get_session_var(
+        "mostrar_correccion_transcripcion", False)
+    if mostrar_correccion:
+        # Redireccionamos al componente de visualización
+        visualizar_texto_manuscrito()
+        return
+
+    # Selección de idioma para la transcripción
+    idioma_manuscrito = st.selectbox(
+        "Idioma del texto manuscrito:",
+        ["Español", "Francés", "Inglés"],
+        key="idioma_manuscrito"
+    )
+
+    # Mapeo de idiomas para la API
+    idioma_map = {
+        "Español": "es",
+        "Francés": "fr",
+        "Inglés": "en"
+    }
+
+    # Subida de imagen
+    imagen_manuscrito = st.file_uploader(
+        "Sube una imagen de tu texto manuscrito (JPG, PNG):",
+        type=["jpg", "jpeg", "png"],
+        key="imagen_manuscrito"
+    )
+
+    if imagen_manuscrito is not None:
+        # Mostrar la imagen subida
+        try:
+            from PIL import Image
+
+            imagen = Image.open(imagen_manuscrito)
+            # CORREGIDO: Reemplazo de use_column_width por use_container_width
+            st.image(imagen, caption="Imagen subida", use_container_width=True)
+        except Exception as e:
+            st.error(f"Error al procesar la imagen: {str(e)}")
+            return
+
+        # SOLUCIÓN: Usar un formulario para la transcripción para evitar problemas de estado
+        with st.form(key="form_transcribir_manuscrito"):
+            st.write("Haz clic en el botón para transcribir el texto de la imagen.")
+            submit_transcribir = st.form_submit_button(
+                "Transcribir texto", use_container_width=True)
+
+        if submit_transcribir:
+            with st.spinner("Transcribiendo texto manuscrito..."):
+                try:
+                    # Leer bytes de la imagen
+                    imagen_bytes = imagen_manuscrito.getvalue()
+
+                    # Obtener código de idioma
+                    codigo_idioma = idioma_map.get(idioma_manuscrito, "es")
+
+                    # Transcribir la imagen
+                    texto_transcrito = transcribir_imagen_texto(
+                        imagen_bytes, codigo_idioma
+                    )
+
+                    if texto_transcrito and not texto_transcrito.startswith("Error"):
+                        # Mostrar el texto transcrito
+                        st.success("✅ Texto transcrito correctamente")
+
+                        with st.expander("Texto transcrito", expanded=True):
+                            st.write(texto_transcrito)
+
+                            # Guardar en session_state de forma segura
+                            set_session_var(
+                                "ultimo_texto_transcrito", texto_transcrito)
+
+                        # SOLUCIÓN: Añadir opciones para usar el texto transcrito
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            # Opción 1: Corregir directamente
+                            if st.button("Corregir texto transcrito", key="btn_corregir_texto_transcrito"):
+                                # Activar la bandera que mostrará la vista de corrección
+                                set_session_var(
+                                    "mostrar_correccion_transcripcion", True)
+                                # Recargar la página (la herramienta activa se conserva)
+                                st.rerun()
+                        with col2:
+                            # SOLUCIÓN NUEVA: Copiar a la pestaña principal de corrección
+                            if st.button("Enviar a pestaña de corrección", key="btn_enviar_a_correccion"):
+                                # Guardar el texto transcrito para usarlo en la pestaña principal
+                                set_session_var(
+                                    "texto_correccion_corregir", texto_transcrito)
+                                # Navegar a la pestaña de corrección
+                                st.session_state.tab_navigate_to = 0  # Índice de la pestaña "Corregir texto"
+                                # Recargar la página
+                                st.rerun()
+                    else:
+                        st.error(
+                            texto_transcrito or "No se pudo transcribir el texto. Por favor, verifica que la imagen sea clara y contiene texto manuscrito legible.")
+
+                except Exception as e:
+                    st.error(f"Error durante la transcripción: {str(e)}")
+                    logger.error(
+                        f"Error en herramienta_texto_manuscrito: {str(e)}")
+                    logger.error(traceback.format_exc())
+
+
+def tab_herramientas():
+    """Implementación de la pestaña de herramientas complementarias."""
+    st.header("🧰 Herramientas complementarias")
+
+    # Selector de herramienta: a diferencia de st.tabs, solo se ejecuta la elegida
+    indice = st.radio(
+        "Herramienta",
+        options=range(len(HERRAMIENTAS)),
+        format_func=lambda i: HERRAMIENTAS[i][0],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_tools_tab_index"
+    )
+
+    HERRAMIENTAS[indice][1]()
+
+
+def herramienta_analisis_complejidad():
+    """Herramienta para análisis de complejidad textual."""
+    st.subheader("📊 Análisis de complejidad textual")
+    st.markdown(
+        "Esta herramienta analiza la complejidad lingüística de un texto y proporciona información sobre su nivel.")
+
+    with st.form(key="form_analisis_complejidad"):
+        texto = st.text_area(
+            "Introduce el texto a analizar:",
+            height=200,
+            placeholder="Pega aquí el texto que quieres analizar..."
+        )
+        submit_analizar = st.form_submit_button(
+            "Analizar complejidad", use_container_width=True)
+
+    if submit_analizar:
+        if not texto.strip():
+            st.warning("Por favor, introduce un texto para analizar.")
+            return
+
+        # Los índices se calculan localmente y se muestran al instante; el
+        # análisis cualitativo de la IA se rellena después
+        indices = calcular_indices(texto)
+        if "error" in indices:
+            st.error(f"Error al analizar la complejidad: {indices['error']}")
+            return
+
+        cabecera = st.container()
+
+        # Crear pestañas para los diferentes aspectos del análisis
+        complejidad_tab1, complejidad_tab2, complejidad_tab3, complejidad_tab4 = st.tabs([
+            "Léxico", "Sintaxis", "Estructura", "Índices"
+        ])
+
+        # Índices estadísticos
+        with complejidad_tab4:
+            st.markdown("### Índices lingüísticos")
+
+            # Crear métricas para índices
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("TTR (Type-Token Ratio)", f"{indices['ttr']:.3f}")
+
+            with col2:
+                st.metric("Densidad léxica", f"{indices['densidad_lexica']:.3f}")
+
+            with col3:
+                st.metric("Índice Szigriszt", f"{indices['szigriszt']:.1f}",
+                          help=f"Escala Inflesz: {indices['inflesz']}")
+
+            # Interpretación
+            st.markdown("##### Interpretación:")
+            st.markdown(indices["interpretacion"])
+
+        # Complejidad léxica: el nivel sale del índice de vocabulario local y
+        # la descripción de la IA se añade después
+        lexico = estimar_nivel_lexico(texto)
+        if "error" not in lexico:
+            with complejidad_tab1:
+                st.markdown(f"### Complejidad léxica: {lexico['nivel']}")
+                st.caption(" · ".join(
+                    f"{nivel} {proporcion:.0%}" for nivel, proporcion in lexico["distribucion"].items()
+                    if proporcion) + f" — cobertura de la lista: {lexico['cobertura']:.0%}")
+                descripcion_lexico = st.empty()
+                descripcion_lexico.markdown(lexico["descripcion"])
+
+                # Palabras destacadas
+                if lexico["palabras_destacadas"]:
+                    st.markdown("##### Palabras destacadas:")
+                    cols = st.columns(min(3, len(lexico["palabras_destacadas"])))
+                    for i, palabra in enumerate(lexico["palabras_destacadas"]):
+                        cols[i % 3].markdown(f"- _{palabra}_")
+
+        with st.spinner("Analizando complejidad textual..."):
+            resultado_analisis = analizar_complejidad_texto(texto, indices=indices, lexico=lexico)
+
+        if "error" in resultado_analisis:
+            st.error(
+                f"Error al analizar la complejidad: {resultado_analisis['error']}")
+            return
+
+        with cabecera:
+            if "aviso" in resultado_analisis:
+                st.warning(f"⚠️ {resultado_analisis['aviso']} Los índices calculados siguen disponibles.")
+            else:
+                # Mostrar resultados del análisis
+                st.success("Análisis completado. Resultados:")
+
+                # Nivel MCER
+                nivel_mcer = resultado_analisis.get("nivel_mcer", {})
+                st.subheader("📌 Nivel MCER estimado")
+                st.info(
+                    f"**{nivel_mcer.get('nivel', 'No disponible')}** - {nivel_mcer.get('justificacion', '')}")
+
+        # Complejidad léxica
+        if "error" not in lexico:
+            descripcion_lexico.markdown(
+                resultado_analisis.get("complejidad_lexica", {}).get("descripcion", lexico["descripcion"]))
+        else:
+            with complejidad_tab1:
+                lexico = resultado_analisis.get(
+                    "complejidad_lexica", {})
+                st.markdown(
+                    f"### Complejidad léxica: {lexico.get('nivel', 'No disponible')}")
+                st.markdown(lexico.get("descripcion", ""))
+
+                # Palabras destacadas
+                if "palabras_destacadas" in lexico and lexico["palabras_destacadas"]:
+                    st.markdown("##### Palabras destacadas:")
+                    cols = st.columns(min(3, len(
+                        lexico["palabras_destacadas"])))
+                    for i, palabra in enumerate(lexico["palabras_destacadas"]):
+                        cols[i % 3].markdown(f"- _{palabra}_")
+
+        # Complejidad sintáctica
+        with complejidad_tab2:
+            sintaxis = resultado_analisis.get(
+                "complejidad_sintactica", {})
+            st.markdown(
+                f"### Complejidad sintáctica: {sintaxis.get('nivel', 'No disponible')}")
+            st.markdown(sintaxis.get("descripcion", ""))
+
+            # Estructuras destacadas
+            if "estructuras_destacadas" in sintaxis and sintaxis["estructuras_destacadas"]:
+                st.markdown("##### Estructuras destacadas:")
+                for estructura in sintaxis["estructuras_destacadas"]:
+                    st.markdown(f"- _{estructura}_")
+
+        # Complejidad textual
+        with complejidad_tab3:
+            textual = resultado_analisis.get(
+                "complejidad_textual", {})
+            st.markdown(
+                f"### Estructura textual: {textual.get('nivel', 'No disponible')}")
+            st.markdown(textual.get("descripcion", ""))
+
+        # Recomendaciones finales
+        if "recomendaciones" in resultado_analisis and resultado_analisis["recomendaciones"]:
+            st.subheader("📝 Recomendaciones")
+            for rec in resultado_analisis["recomendaciones"]:
+                st.markdown(f"- {rec}")
+
+
+def herramienta_comparar_clase():
+    """Herramienta para comparar la complejidad de los textos de toda una clase."""
+    st.subheader("📈 Comparar textos de una clase")
+    st.markdown(
+        "Sube los textos de tus estudiantes (varios .txt o un .csv con una columna "
+        "`texto` y, opcionalmente, `nombre`) para comparar sus índices de "
+        "legibilidad y riqueza léxica. El cálculo es local y no usa la IA.")
+
+    archivos = st.file_uploader(
+        "Textos de la clase", type=["txt", "csv"], accept_multiple_files=True,
+        key="comparar_clase_archivos")
+    if not archivos:
+        return
+
+    import pandas as pd
+
+    textos, nombres = [], []
+    for archivo in archivos:
+        if archivo.name.lower().endswith(".csv"):
+            try:
+                df_archivo = pd.read_csv(archivo)
+            except Exception as e:
+                st.error(f"No se pudo leer {archivo.name}: {e}")
+                continue
+            if "texto" not in df_archivo.columns:
+                st.error(f"{archivo.name} no tiene una columna 'texto'.")
+                continue
+            etiquetas = df_archivo["nombre"] if "nombre" in df_archivo.columns else \
+                [f"{archivo.name}:{i + 1}" for i in range(len(df_archivo))]
+            textos.extend(df_archivo["texto"].fillna("").astype(str))
+            nombres.extend(str(e) for e in etiquetas)
+        else:
+            textos.append(archivo.getvalue().decode("utf-8", errors="replace"))
+            nombres.append(archivo.name)
+
+    if not textos:
+        return
+
+    indices = calcular_indices_lote(textos, nombres=nombres)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Textos", len(indices))
+    col2.metric("TTR medio", f"{indices['ttr'].mean():.3f}")
+    col3.metric("MTLD medio", f"{indices['mtld'].mean():.1f}")
+    col4.metric("Szigriszt medio", f"{indices['szigriszt'].mean():.1f}")
+
+    st.dataframe(indices.round(3), width="stretch")
+    st.download_button(
+        "📥 Descargar CSV",
+        data=indices.to_csv(index_label="texto").encode("utf-8"),
+        file_name="indices_clase.csv",
+        mime="text/csv",
+        key="comparar_clase_descargar")
+
+
+def herramienta_recursos_didacticos():
+    """Herramienta para acceder a recursos didácticos."""
+    st.subheader("📚 Recursos didácticos")
+
+    # Filtro de recursos
+    st.markdown("Selecciona los filtros para encontrar recursos:")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        nivel_filtro = st.selectbox(
+            "Nivel:",
+            ["Todos", "A1-A2", "B1-B2", "C1-C2"],
+            key="nivel_filtro_recursos"
+        )
+    with col2:
+        categoria_filtro = st.selectbox(
+            "Categoría:",
+            ["Todos", "Gramática", "Léxico", "Cohesión", "Registro"],
+            key="categoria_filtro_recursos"
+        )
+    with col3:
+        tipo_filtro = st.selectbox(
+            "Tipo de recurso:",
+            ["Todos", "Guía", "Ejercicios", "Vídeo", "Ficha", "Curso", "Podcast"],
+            key="tipo_filtro_recursos"
+        )
+
+    # Filtrar recursos según los criterios seleccionados
+    recursos_filtrados = []
+    for nivel, categorias in RECURSOS_DB.items():
+        if nivel_filtro == "Todos" or nivel == nivel_filtro:
+            for categoria, recursos in categorias.items():
+                if categoria_filtro == "Todos" or categoria == categoria_filtro:
+                    for recurso in recursos:
+                        if tipo_filtro == "Todos" or recurso["tipo"] == tipo_filtro:
+                            recursos_filtrados.append(
+                                {**recurso, "categoria": categoria, "nivel_grupo": nivel})
+
+    # Mostrar resultados
+    st.markdown(f"Se encontraron **{len(recursos_filtrados)}** recursos:")
+
+    # Agrupar por nivel
+    if recursos_filtrados:
+        for nivel in ["A1-A2", "B1-B2", "C1-C2"]:
+            recursos_nivel = [
+                r for r in recursos_filtrados if r["nivel_grupo"] == nivel]
+            if recursos_nivel:
+                with st.expander(f"Nivel {nivel} ({len(recursos_nivel)} recursos)"):
+                    for i, recurso in enumerate(recursos_nivel):
+                        st.markdown(
+                            f"**{recurso['título']}** - {recurso['tipo']} - Nivel {recurso['nivel']}")
+                        st.markdown(
+                            f"*Categoría: {recurso['categoria']}*")
+                        st.markdown(
+                            f"[Acceder al recurso]({recurso['url']})")
+                        if i < len(recursos_nivel) - 1:
+                            st.divider()
+    else:
+        st.info("No se encontraron recursos con los filtros seleccionados.")
+
+    # Botón para sugerir recursos personalizados
+    st.markdown("---")
+    st.markdown("¿No encuentras lo que necesitas?")
+    if st.button("Sugerir recursos personalizados"):
+        # Esta función podría implementarse para generar recursos personalizados
+        # con alguna API como OpenAI basado en criterios específicos
+        st.info("Función en desarrollo. Próximamente disponible.")
+
+
+def herramienta_descripcion_imagenes():
+    """Herramienta para generar y describir imágenes."""
+    st.subheader("🖼️ Descripción de imágenes")
+    st.markdown(
+        "Esta herramienta te permite generar o subir imágenes y practicar describiéndolas en español.")
+
+    # La reserva de ejercicios (compartida entre sesiones) se repone desde el
+    # primer uso de la herramienta
+    pool = arrancar_reserva_ejercicios()
+
+    # Verificar si estamos en modo de corrección
+    mostrar_correccion = get_session_var("mostrar_correccion_imagen", False)
+    if mostrar_correccion:
+        # Obtener datos de la imagen (la miniatura basta mientras se escribe)
+        imagen = obtener_imagen_ejercicio(miniatura=True)
+        descripcion = get_session_var("descripcion_state", None)
+        tema_imagen = get_session_var("tema_imagen_state", None)
+        descripcion_estudiante = get_session_var(
+            "descripcion_estudiante_state", "")
+
+        if not imagen or not descripcion:
+            st.error("No hay datos de imagen para corregir.")
+            if st.button("Volver", key="volver_descripcion_error"):
+                set_session_var("mostrar_correccion_imagen", False)
+                st.rerun()
+            return
+
+        # Mostrar la imagen
+        st.image(imagen, caption=f"Imagen sobre: {tema_imagen}")
+        with st.expander("Ver imagen a tamaño completo", expanded=False):
+            st.image(obtener_imagen_ejercicio(), use_container_width=True)
+
+        # Mostrar descripción
+        with st.expander("Ver descripción de referencia", expanded=False):
+            st.markdown(descripcion)
+
+        # Formulario para la descripción del estudiante
+        with st.form(key="form_correccion_descripcion"):
+            descripcion_estudiante = st.text_area(
+                "Tu descripción:",
+                value=descripcion_estudiante,
+                height=200,
+                placeholder="Escribe aquí tu descripción de la imagen..."
+            )
+            submit_correccion = st.form_submit_button(
+                "Corregir descripción", use_container_width=True)
+
+        if st.button("Volver", key="volver_descripcion"):
+            set_session_var("mostrar_correccion_imagen", False)
+            set_session_var("descripcion_estudiante_state", "")
+            st.rerun()
+
+        if submit_correccion:
+            if not descripcion_estudiante.strip():
+                st.warning(
+                    "Por favor, escribe una descripción antes de corregir.")
+            else:
+                set_session_var(
+                    "descripcion_estudiante_state", descripcion_estudiante)
+
+                with st.spinner("Analizando tu descripción..."):
+                    # Obtener datos necesarios
+                    nombre = get_session_var("usuario_actual", "Usuario")
+                    nivel = get_session_var("nivel_estudiante", "intermedio")
+
+                    # Llamar a la función de corrección
+                    resultado = corregir_descripcion_imagen(
+                        descripcion_estudiante, tema_imagen, nivel)
+
+                    # Mostrar el resultado
+                    if "error" in resultado:
+                        st.error(
+                            f"Error en la corrección: {resultado['error']}")
+                    else:
+                        ui_show_correction_results(resultado)
+
+    else:
+        # Pestañas para las opciones de imágenes
+        imagen_tab1, imagen_tab2 = st.tabs(
+            ["🎨 Generar imagen", "📷 Subir imagen"])
+
+        with imagen_tab1:
+            st.markdown(
+                "Genera una imagen para describir, adaptada a tu nivel de español.")
+
+            # Opciones para la generación
+            with st.form(key="form_generar_imagen"):
+                opcion_tema_propio = "(Escribir mi propio tema)"
+                tema_sugerido = st.selectbox(
+                    "Tema sugerido (ejercicio disponible al instante):",
+                    [opcion_tema_propio] + TEMAS_POPULARES_IMAGEN
+                )
+                tema_imagen = st.text_input(
+                    "Tema de la imagen:",
+                    placeholder="Ej: Una fiesta de cumpleaños, Un día en la playa, etc."
+                )
+                nivel = st.selectbox(
+                    "Nivel de complejidad:",
+                    NIVELES_IMAGEN,
+                    index=NIVELES_IMAGEN.index(
+                        get_session_var("nivel_estudiante", "intermedio")
+                    )
+                )
+                submit_generar = st.form_submit_button(
+                    "Generar imagen", use_container_width=True)
+
+            if submit_generar:
+                # El tema escrito tiene prioridad sobre el sugerido
+                if not tema_imagen.strip() and tema_sugerido != opcion_tema_propio:
+                    tema_imagen = tema_sugerido
+
+                # Intentar servir un ejercicio ya preparado de la reserva
+                ejercicio = pool.take(nivel, tema_imagen) if tema_imagen.strip() else None
+
+                if not tema_imagen.strip():
+                    st.warning("Por favor, introduce un tema para la imagen.")
+                elif ejercicio:
+                    set_session_var("imagen_generada_state", True)
+                    set_session_var("imagen_url_state", None)
+                    set_session_var("imagen_id_state", ejercicio["imagen_id"])
+                    set_session_var("descripcion_state",
+                                    ejercicio["descripcion"])
+                    set_session_var("tema_imagen_state", ejercicio["tema"])
+                else:
+                    with st.spinner("Generando imagen con DALL-E..."):
+                        imagen_url, descripcion = generar_imagen_dalle(
+                            tema_imagen, nivel)
+
+                        if imagen_url:
+                            # Descargar la imagen una sola vez al almacén local
+                            imagen_id = guardar_imagen_generada(imagen_url)
+
+                            # Guardar datos en session state
+                            set_session_var("imagen_generada_state", True)
+                            set_session_var("imagen_url_state", imagen_url)
+                            set_session_var("imagen_id_state", imagen_id)
+                            set_session_var("descripcion_state", descripcion)
+                            set_session_var("tema_imagen_state", tema_imagen)
+                        else:
+                            st.error(
+                                "Error al generar la imagen. Por favor, intenta de nuevo.")
+
+            # Mostrar la última imagen generada desde el estado (sobrevive a las recargas)
+            if get_session_var("imagen_generada_state", False):
+                imagen = obtener_imagen_ejercicio()
+                if imagen:
+                    st.image(imagen, caption=f"Imagen sobre: {get_session_var('tema_imagen_state', '')}",
+                             use_container_width=True)
+
+                    # Mostrar la descripción
+                    with st.expander("Descripción de la imagen", expanded=True):
+                        st.markdown(get_session_var("descripcion_state", ""))
+
+                    # Botón para empezar a describir
+                    if st.button("Practicar descripción de esta imagen", key="practicar_descripcion"):
+                        set_session_var("mostrar_correccion_imagen", True)
+                        st.rerun()
+
+        with imagen_tab2:
+            st.markdown("Sube tu propia imagen para practicar describiéndola.")
+            st.warning(
+                "Esta función está en desarrollo y será implementada próximamente.")
+
+
+# Herramientas disponibles (etiqueta, función) en el orden del selector
+HERRAMIENTAS = [
+    ("📊 Análisis de complejidad", herramienta_analisis_complejidad),
+    ("📚 Recursos didácticos", herramienta_recursos_didacticos),
+    ("🖼️ Descripción de imágenes", herramienta_descripcion_imagenes),
+    ("✍️ Texto manuscrito", herramienta_texto_manuscrito),
+    ("📈 Comparar clase", herramienta_comparar_clase)
+]
@@ -0,0 +1,145 @@
+"""Sección "Tu progreso"."""
+
+import logging
+import streamlit as st
+
+from textocorrector.pipelines import generar_plan_estudio_personalizado
+from textocorrector.session import get_session_var
+from textocorrector.storage import obtener_historial_estudiante
+from textocorrector.ui.components import mostrar_progreso, ui_user_info_form
+
+logger = logging.getLogger(__name__)
+
+
+def tab_progreso():
+    """Implementación de la pestaña de progreso con manejo seguro de columnas."""
+    st.header("📊 Tu progreso")
+
+    # Obtener datos del usuario
+    user_data = ui_user_info_form(form_key="form_user_info_progreso")
+
+    if not user_data and "usuario_actual" not in st.session_state:
+        st.info("Por favor, introduce tu información para ver tu progreso.")
+        return
+
+    # Nombre del estudiante actual
+    nombre_estudiante = get_session_var("usuario_actual")
+
+    # Mostrar resumen general
+    st.subheader("Resumen de tu progreso")
+    with st.container():
+        # Intentar obtener historial
+        historial = obtener_historial_estudiante(nombre_estudiante)
+
+        if historial is None or historial.empty:
+            st.warning(
+                "No hay datos de progreso disponibles. Realiza algunas correcciones primero.")
+            return
+
+        # Calcular resumen (última entrada)
+        ultima_entrada = historial.iloc[-1]
+        num_correcciones = len(historial)
+
+        # SOLUCIÓN: Verificar existencia de columnas antes de acceder
+        fecha_col = None
+        for col in historial.columns:
+            if 'fecha' in col.lower():
+                fecha_col = col
+                break
+
+        fecha_primera = historial.iloc[0][fecha_col] if fecha_col and len(
+            historial) > 0 else "No disponible"
+        fecha_ultima = ultima_entrada[fecha_col] if fecha_col else "No disponible"
+
+        # Mostrar stats básicos
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Correcciones realizadas", num_correcciones)
+        with col2:
+            st.metric("Primera corrección", fecha_primera)
+        with col3:
+            st.metric("Última corrección", fecha_ultima)
+        with col4:
+            nivel_actual = get_session_var("nivel_estudiante", "intermedio")
+            nivel_map = {
+                "principiante": "A1-A2",
+                "intermedio": "B1-B2",
+                "avanzado": "C1-C2"
+            }
+            st.metric("Nivel actual", nivel_map.get(
+                nivel_actual, nivel_actual))
+
+        # Mostrar gráficos de progreso
+        st.subheader("Gráficos de progreso")
+
+        # Obtener gráficos
+        graficos = mostrar_progreso(historial)
+
+        if graficos["errores_totales"] is not None:
+            # Pestaña para gráficos
+            grafico_tab1, grafico_tab2, grafico_tab3 = st.tabs(
+                ["Errores totales", "Tipos de errores", "Habilidades"])
+
+            with grafico_tab1:
+                st.altair_chart(graficos["errores_totales"],
+                                use_container_width=True)
+
+            with grafico_tab2:
+                if graficos["tipos_error"] is not None:
+                    st.altair_chart(graficos["tipos_error"],
+                                    use_container_width=True)
+                else:
+                    st.info(
+                        "No hay datos suficientes para mostrar errores por tipo.")
+
+            with grafico_tab3:
+                if graficos["radar"] is not None:
+                    st.pyplot(graficos["radar"])
+                else:
+                    st.info(
+                        "No hay datos suficientes para mostrar el gráfico de habilidades contextuales.")
+
+        else:
+            st.warning("No hay suficientes datos para generar gráficos.")
+
+        # Mostrar últimos consejos
+        # SOLUCIÓN: Verificar existencia de columna antes de acceder
+        if "Consejo Final" in historial.columns and fecha_col:
+            st.subheader("Últimos consejos recibidos")
+            try:
+                consejos_recientes = historial.sort_values(
+                    by=fecha_col, ascending=False)["Consejo Final"].head(3)
+                if not consejos_recientes.empty:
+                    for i, consejo in enumerate(consejos_recientes):
+                        # Verificar que no esté vacío
+                        if consejo and str(consejo).strip():
+                            st.info(f"**Consejo {i+1}**: {consejo}")
+            except Exception as e:
+                logger.error(f"Error al mostrar consejos: {str(e)}")
+                st.warning("No se pudieron mostrar los consejos recientes.")
+        else:
+            st.info("No hay consejos disponibles en el historial.")
+
+        # Generar plan de estudio personalizado
+        st.subheader("Plan de estudio personalizado")
+        if st.button("Generar plan de estudio", key="generar_plan"):
+            with st.spinner("Analizando tu historial y generando plan de estudio..."):
+                plan_result = generar_plan_estudio_personalizado(
+                    nombre_estudiante, nivel_actual, historial)
+
+                if "error" in plan_result and plan_result["error"]:
+                    st.error(
+                        f"No se pudo generar el plan de estudio: {plan_result['error']}")
+                else:
+                    plan = plan_result.get("plan", {})
+                    if plan and "semanas" in plan:
+                        st.success(
+                            "¡Plan de estudio generado! Revisa cada semana a continuación:")
+
+                        # Mostrar plan por semanas
+                        for semana in plan["semanas"]:
+                            with st.expander(f"Semana {semana['numero']}: {semana['titulo']}"):
+                                st.markdown(semana["contenido"])
+                    else:
+                        st.warning(
+                            "No se pudo generar un plan de estudio detallado. Intenta realizar más correcciones.")